@@ -0,0 +1,44 @@
+"""Raw float32 embedding files written by ``TextEmbedder.embed_iter``."""
+
+import os
+
+import numpy as np
+
+EMBEDDING_DTYPE = np.float32
+
+
+def stored_embedding_rows(path: str, embedding_dim: int) -> int:
+    """Count complete embeddings in a file written by ``embed_iter``.
+
+    A partially written last row is cut off, so writing resumes at a row boundary.
+
+    Args:
+        path: Path to the embeddings file
+        embedding_dim: Embedding dimension
+
+    Returns:
+        int: Number of stored embeddings
+    """
+    if not os.path.exists(path):
+        return 0
+    row_bytes = embedding_dim * np.dtype(EMBEDDING_DTYPE).itemsize
+    rows = os.path.getsize(path) // row_bytes
+    with open(path, 'r+b') as embeddings_file:
+        embeddings_file.truncate(rows * row_bytes)
+    return rows
+
+
+def open_embeddings(path: str, embedding_dim: int) -> np.memmap:
+    """Open embeddings written by ``embed_iter`` as a memory map.
+
+    The embeddings are not loaded into memory.
+
+    Args:
+        path: Path to the embeddings file
+        embedding_dim: Embedding dimension
+
+    Returns:
+        np.memmap: Read-only array with shape (n_chunks, embedding_dim)
+    """
+    embeddings = np.memmap(path, dtype=EMBEDDING_DTYPE, mode='r')
+    return embeddings.reshape(-1, embedding_dim)
@@ -0,0 +1,212 @@
+"""Multi-process CPU embedding with shared-memory outputs."""
+
+import logging
+import multiprocessing
+import queue
+from contextlib import ExitStack, closing
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from InformationRetrieval.embedding_file import EMBEDDING_DTYPE
+from InformationRetrieval.embedding_worker import (
+    ERROR,
+    EmbeddingTask,
+    embed_worker,
+    plan_workers,
+)
+from InformationRetrieval.text_embedder import (
+    DEFAULT_MAX_BATCH_TOKENS,
+    TextEmbedder,
+)
+from InformationRetrieval.text_parser import ParsedText
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_SIZE = 256
+WORKER_START_TIMEOUT = 600
+RESULT_TIMEOUT = 3600
+
+
+def _copy_shared_array(shm: shared_memory.SharedMemory, shape: Tuple[int, int]) -> np.ndarray:
+    """Copy an array out of shared memory.
+
+    The view of the buffer is released on return, so the shared memory can
+    be closed afterwards.
+
+    Args:
+        shm: Shared memory holding the array
+        shape: Array shape
+
+    Returns:
+        np.ndarray: Copy of the array
+    """
+    shared = np.ndarray(shape, dtype=EMBEDDING_DTYPE, buffer=shm.buf)
+    return shared.copy()
+
+
+class EmbeddingPool(TextEmbedder):
+    """TransformerEmbedder running in several worker processes.
+
+    Each worker loads the model once. Texts are split into tasks that workers
+    take from a shared queue, and embeddings are written straight into a
+    shared-memory array, so only texts are pickled.
+
+    Use as a context manager or call ``close`` to stop the workers.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        max_batch_tokens: Optional[int] = DEFAULT_MAX_BATCH_TOKENS,
+        task_size: int = DEFAULT_TASK_SIZE,
+    ):
+        """Start worker processes and wait until their models are loaded.
+
+        Args:
+            model_name: SentenceTransformer model name or path
+            num_workers: Number of worker processes, see ``plan_workers``
+            threads_per_worker: Torch threads per worker. Defaults to an equal share of CPUs
+            max_batch_tokens: Padded token budget of a batch in a worker
+            task_size: Number of texts sent to a worker at once
+
+        Raises:
+            RuntimeError: If a worker fails to load the model
+        """
+        planned_workers, planned_threads = plan_workers(num_workers)
+        self.num_workers = planned_workers
+        self.threads_per_worker = threads_per_worker or planned_threads
+        self.task_size = task_size
+        context = multiprocessing.get_context('spawn')
+        self._task_queue = context.Queue()
+        self._result_queue = context.Queue()
+        worker_args = (
+            model_name,
+            max_batch_tokens,
+            self.threads_per_worker,
+            self._task_queue,
+            self._result_queue,
+        )
+        self._workers = []
+        for _ in range(self.num_workers):
+            worker = context.Process(target=embed_worker, args=worker_args, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info('Started %s embedding workers with %s threads each', self.num_workers, self.threads_per_worker)
+
+        ready = [self._get_result(WORKER_START_TIMEOUT) for _ in self._workers]
+        self.embedding_dim = ready[0]
+
+    def __enter__(self) -> 'EmbeddingPool':
+        """Use the pool as a context manager.
+
+        Returns:
+            EmbeddingPool: This pool
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_value) -> None:
+        """Stop the workers.
+
+        Args:
+            exc_type: Exception type raised inside the block
+            exc_value: Exception raised inside the block
+            traceback_value: Traceback of the exception
+        """
+        self.close()
+
+    def embed(self, text: Union[ParsedText, List[ParsedText]]) -> np.ndarray:
+        """Create embeddings in the worker processes.
+
+        Args:
+            text: ParsedText object or list of ParsedText objects
+
+        Returns:
+            numpy array of embeddings with shape (n_chunks, embedding_dim)
+
+        Raises:
+            RuntimeError: If the pool is closed or a worker failed
+        """
+        if not self._workers:
+            raise RuntimeError('Embedding pool is closed')
+        if isinstance(text, ParsedText):
+            text = [text]
+        sentences = [' '.join(chunk.tokens) for chunk in text]
+        if not sentences:
+            return np.empty((0, self.embedding_dim), dtype=EMBEDDING_DTYPE)
+
+        shape = (len(sentences), self.embedding_dim)
+        row_bytes = self.embedding_dim * EMBEDDING_DTYPE().itemsize
+        size = len(sentences) * row_bytes
+        with ExitStack() as stack:
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            stack.callback(shm.unlink)
+            stack.enter_context(closing(shm))
+            tasks = self._make_tasks(shm.name, sentences)
+            for task in tasks:
+                self._task_queue.put(task)
+            for _ in tasks:
+                self._get_result(RESULT_TIMEOUT)
+            return _copy_shared_array(shm, shape)
+
+    def close(self) -> None:
+        """Stop the workers and wait for them to exit."""
+        for worker in self._workers:
+            if worker.is_alive():
+                self._task_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=WORKER_START_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def _make_tasks(self, shm_name: str, sentences: Sequence[str]) -> List[EmbeddingTask]:
+        """Split sentences into tasks of similar total length.
+
+        Sentences are sorted by length, so every task is padded little and
+        the longest tasks are queued first.
+
+        Args:
+            shm_name: Name of the shared output array
+            sentences: Sentences to embed
+
+        Returns:
+            List[EmbeddingTask]: Tasks
+        """
+        lengths = [len(sentence) for sentence in sentences]
+        positions = range(len(lengths))
+        order = sorted(positions, key=lengths.__getitem__, reverse=True)
+        tasks = []
+        for start in range(0, len(order), self.task_size):
+            indices = order[start : start + self.task_size]
+            task_sentences = [sentences[index] for index in indices]
+            tasks.append((shm_name, len(sentences), indices, task_sentences))
+        return tasks
+
+    def _get_result(self, timeout: float) -> int:
+        """Wait for a worker result.
+
+        The pool is closed on failure: results of the remaining tasks would
+        be mixed up with later calls.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            int: Embedding dimension for ready messages, number of texts for finished tasks
+
+        Raises:
+            RuntimeError: If a worker failed or did not answer in time
+        """
+        try:
+            status, payload = self._result_queue.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise RuntimeError('Embedding workers did not respond in {0} seconds'.format(timeout))
+        if status == ERROR:
+            self.close()
+            raise RuntimeError('Embedding worker failed:\n{0}'.format(payload))
+        return payload
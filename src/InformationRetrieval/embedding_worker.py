@@ -0,0 +1,110 @@
+"""Worker processes of the multi-process CPU embedding pool."""
+
+import multiprocessing
+import os
+import traceback
+from contextlib import closing
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from InformationRetrieval.embedding_file import EMBEDDING_DTYPE
+from InformationRetrieval.text_embedder import TransformerEmbedder
+from InformationRetrieval.text_parser import ParsedText
+
+DEFAULT_THREADS_PER_WORKER = 4
+READY = 'ready'
+DONE = 'done'
+ERROR = 'error'
+
+Sentences = List[str]
+# (shared memory name, number of rows, row indices, sentences)
+EmbeddingTask = Tuple[str, int, List[int], Sentences]
+# (status, embedding dimension, number of embedded texts or error traceback)
+WorkerResult = Tuple[str, Union[int, str]]
+
+
+def available_cpus() -> int:
+    """Count CPUs the process may run on.
+
+    Returns:
+        int: Number of usable CPUs
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_workers(
+    num_workers: Optional[int] = None,
+    cpus: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Choose the number of workers and torch threads per worker.
+
+    Every worker gets an equal share of the CPUs, so workers do not compete
+    for cores with each other's intra-op threads.
+
+    Args:
+        num_workers: Number of worker processes. Defaults to one per 4 CPUs
+        cpus: Number of CPUs. Defaults to the CPUs available to the process
+
+    Returns:
+        Tuple[int, int]: Number of workers and threads per worker
+    """
+    cpus = cpus or available_cpus()
+    num_workers = num_workers or max(1, cpus // DEFAULT_THREADS_PER_WORKER)
+    return num_workers, max(1, cpus // num_workers)
+
+
+def embed_worker(
+    model_name: str,
+    max_batch_tokens: Optional[int],
+    num_threads: int,
+    task_queue: 'multiprocessing.Queue[Optional[EmbeddingTask]]',
+    result_queue: 'multiprocessing.Queue[WorkerResult]',
+) -> None:
+    """Load the model once and embed tasks until a None task arrives.
+
+    Args:
+        model_name: SentenceTransformer model name or path
+        max_batch_tokens: Padded token budget of a batch
+        num_threads: Torch intra-op threads
+        task_queue: Queue of embedding tasks
+        result_queue: Queue of task results
+    """
+    torch.set_num_threads(num_threads)
+    try:
+        embedder = TransformerEmbedder(model_name=model_name, max_batch_tokens=max_batch_tokens)
+    except Exception:
+        result_queue.put((ERROR, traceback.format_exc()))
+        return
+    result_queue.put((READY, embedder.embedding_dim))
+
+    for task in iter(task_queue.get, None):
+        try:
+            _run_task(embedder, task)
+        except Exception:
+            result_queue.put((ERROR, traceback.format_exc()))
+            continue
+        result_queue.put((DONE, len(task[2])))
+
+
+def _run_task(embedder: TransformerEmbedder, task: EmbeddingTask) -> None:
+    """Embed task sentences into the shared output array.
+
+    Args:
+        embedder: Embedder of the worker
+        task: Embedding task
+    """
+    shm_name, rows, indices, sentences = task
+    sentence_words = [sentence.split(' ') for sentence in sentences]
+    parsed_texts = [ParsedText(words, 0, 0, {}) for words in sentence_words]
+    embeddings = embedder.embed(parsed_texts)
+    shape = (rows, embedder.embedding_dim)
+    with closing(shared_memory.SharedMemory(name=shm_name)) as shm:
+        output = np.ndarray(shape, dtype=EMBEDDING_DTYPE, buffer=shm.buf)
+        output[indices] = embeddings
+        # The array must release the buffer before the shared memory is closed
+        del output  # noqa: WPS420
@@ -0,0 +1,162 @@
+"""ONNX Runtime int8 embedding backend for CPU-only search nodes."""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+from InformationRetrieval.onnx_export import (
+    EMBEDDER_CONFIG_FILE,
+    FP32_MODEL_FILE,
+    INT8_MODEL_FILE,
+    OUTPUT_NAME,
+    export_onnx,
+)
+from InformationRetrieval.text_embedder import (
+    DEFAULT_MAX_BATCH_TOKENS,
+    TextEmbedder,
+    resolve_russian_model,
+    token_budget_batches,
+)
+from InformationRetrieval.text_parser import ParsedText
+
+DEFAULT_ONNX_DIR = 'onnx_models'
+EXECUTION_PROVIDERS = ('CPUExecutionProvider',)
+NORM_EPSILON = 1e-12
+
+
+def _model_dir_name(model_name: str) -> str:
+    """Convert a model name or path to a directory name.
+
+    Args:
+        model_name: SentenceTransformer model name or path
+
+    Returns:
+        str: Directory name
+    """
+    return re.sub(r'[^\w.-]+', '_', model_name).strip('_')
+
+
+def _load_embedder_config(model_dir: str) -> Dict[str, Union[int, str]]:
+    """Load the settings saved with an exported model.
+
+    Args:
+        model_dir: Directory with the exported files
+
+    Returns:
+        Dict[str, Union[int, str]]: Embedder settings, empty if the model is not exported
+    """
+    config_path = os.path.join(model_dir, EMBEDDER_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as config_file:
+        return json.load(config_file)
+
+
+class OnnxTransformerEmbedder(TextEmbedder):
+    """ONNX Runtime embedder for exported SentenceTransformer models.
+
+    Produces the same L2-normalized sentence embeddings as
+    TransformerEmbedder for the same model, usually several times faster
+    on CPU with int8 weights.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        cache_dir: str = DEFAULT_ONNX_DIR,
+        quantize: bool = True,
+        num_threads: Optional[int] = None,
+    ):
+        """Initialize embedder, exporting the model on first use.
+
+        Args:
+            model_name: SentenceTransformer model name or path, see TransformerEmbedder
+            cache_dir: Directory with exported models, one subdirectory per model
+            quantize: Use int8 weights instead of fp32
+            num_threads: ONNX Runtime intra-op threads. Defaults to all cores
+        """
+        model_dir = os.path.join(cache_dir, _model_dir_name(model_name))
+        model_file = INT8_MODEL_FILE if quantize else FP32_MODEL_FILE
+        model_path = os.path.join(model_dir, model_file)
+        embedder_config = _load_embedder_config(model_dir)
+        # Exports without the sentence embedding output lack the modules after the encoder
+        is_current = embedder_config.get('output_name') == OUTPUT_NAME
+        if not is_current or not os.path.exists(model_path):
+            export_onnx(model_name, model_dir, quantize)
+            embedder_config = _load_embedder_config(model_dir)
+        self.max_seq_length = int(embedder_config['max_seq_length'])
+        self.embedding_dim = int(embedder_config['embedding_dim'])
+        self.max_batch_tokens = DEFAULT_MAX_BATCH_TOKENS
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        session_options = ort.SessionOptions()
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, session_options, providers=list(EXECUTION_PROVIDERS))
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def embed(self, text: Union[ParsedText, List[ParsedText]]) -> np.ndarray:
+        """Create embeddings with the ONNX model.
+
+        Args:
+            text: ParsedText object or list of ParsedText objects
+
+        Returns:
+            numpy array of embeddings with shape (n_chunks, embedding_dim)
+        """
+        if isinstance(text, ParsedText):
+            text = [text]
+
+        sentences = [' '.join(chunk.tokens) for chunk in text]
+        shape = (len(sentences), self.embedding_dim)
+        embeddings = np.empty(shape, dtype=np.float32)
+        if not sentences:
+            return embeddings
+
+        encoded = self.tokenizer(sentences, truncation=True, max_length=self.max_seq_length)
+        lengths = [len(input_ids) for input_ids in encoded['input_ids']]
+        for batch in token_budget_batches(lengths, self.max_batch_tokens):
+            batch_sentences = [sentences[index] for index in batch]
+            embeddings[batch] = self._embed_batch(batch_sentences)
+        return embeddings
+
+    def _embed_batch(self, sentences: List[str]) -> np.ndarray:
+        """Embed one batch of sentences.
+
+        Args:
+            sentences: Sentences to embed
+
+        Returns:
+            np.ndarray: Normalized sentence embeddings
+        """
+        encoded = self.tokenizer(
+            sentences,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors='np',
+        )
+        feeds = {}
+        for name in self._input_names:
+            feeds[name] = encoded[name].astype(np.int64)
+        embeddings = self.session.run([OUTPUT_NAME], feeds)[0]
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, NORM_EPSILON)
+
+
+class RussianOnnxTransformerEmbedder(OnnxTransformerEmbedder):
+    """ONNX embedder with the Russian models of RussianTransformerEmbedder."""
+
+    def __init__(self, model_type: str = 'deeppavlov', **kwargs):
+        """Initialize embedder with a Russian-optimized model.
+
+        Args:
+            model_type: 'deeppavlov', 'sbert' or 'labse', see RussianTransformerEmbedder
+            kwargs: OnnxTransformerEmbedder options
+        """
+        super().__init__(model_name=resolve_russian_model(model_type), **kwargs)
@@ -0,0 +1,175 @@
+"""Export of SentenceTransformer models to ONNX with int8 quantization.
+
+The whole module chain is exported: the transformer, pooling and any Dense
+or Normalize modules after it, so the ONNX model outputs the same sentence
+embeddings as the SentenceTransformer.
+"""
+
+import json
+import logging
+import os
+from typing import Sequence
+
+import onnx
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from onnxruntime.transformers.optimizer import optimize_model
+from sentence_transformers import SentenceTransformer
+from transformers import PretrainedConfig
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET = 17
+MODEL_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+OUTPUT_NAME = 'sentence_embedding'
+EXPORTED_MODEL_FILE = 'model_exported.onnx'
+FP32_MODEL_FILE = 'model.onnx'
+INT8_MODEL_FILE = 'model_int8.onnx'
+EMBEDDER_CONFIG_FILE = 'embedder_config.json'
+EXPORT_SAMPLE_TEXT = 'пример текста для экспорта'
+# Encoder types whose attention and layer norm subgraphs ONNX Runtime fuses
+FUSABLE_MODEL_TYPES = frozenset(('bert',))
+
+
+class _SentenceEmbeddingModel(torch.nn.Module):
+    """SentenceTransformer wrapper returning only the sentence embeddings."""
+
+    def __init__(self, model: SentenceTransformer, input_names: Sequence[str]):
+        """Wrap a SentenceTransformer model.
+
+        Args:
+            model: SentenceTransformer model
+            input_names: Names of the model inputs in ``forward`` order
+        """
+        super().__init__()
+        self.model = model
+        self.input_names = tuple(input_names)
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        """Run all modules of the model.
+
+        Args:
+            inputs: Tokenized inputs in ``input_names`` order
+
+        Returns:
+            torch.Tensor: Sentence embeddings
+        """
+        features = dict(zip(self.input_names, inputs))
+        return self.model(features)[OUTPUT_NAME]
+
+
+def _export_model(model: SentenceTransformer, exported_path: str) -> None:
+    """Export all modules of a SentenceTransformer model to ONNX.
+
+    Args:
+        model: SentenceTransformer model
+        exported_path: Path to the exported ONNX model
+
+    Raises:
+        ValueError: If the modules of the model output no sentence embeddings
+    """
+    model.eval()
+    sample = model.tokenizer([EXPORT_SAMPLE_TEXT], return_tensors='pt')
+    input_names = [name for name in MODEL_INPUT_NAMES if name in sample]
+    sample_inputs = tuple(sample[name] for name in input_names)
+    dynamic_axes = dict.fromkeys(input_names, {0: 'batch', 1: 'sequence'})
+    dynamic_axes[OUTPUT_NAME] = {0: 'batch'}
+    with torch.no_grad():
+        sample_features = model(dict(zip(input_names, sample_inputs)))
+    if OUTPUT_NAME not in sample_features:
+        module_names = ', '.join(type(module).__name__ for module in model)
+        raise ValueError('Modules {0} output no {1}, cannot export them'.format(module_names, OUTPUT_NAME))
+    with torch.no_grad():
+        torch.onnx.export(
+            _SentenceEmbeddingModel(model, input_names),
+            sample_inputs,
+            exported_path,
+            input_names=input_names,
+            output_names=[OUTPUT_NAME],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+
+
+def _optimize_graph(exported_path: str, output_path: str, model_config: PretrainedConfig) -> None:
+    """Fuse attention, GELU and layer norm subgraphs of a BERT encoder.
+
+    Unfused attention materializes the attention mask for every head and is
+    several times slower than PyTorch on long chunks. Other encoders are
+    copied as exported.
+
+    Args:
+        exported_path: Path to the exported ONNX model
+        output_path: Path to the optimized ONNX model
+        model_config: HuggingFace config of the encoder
+    """
+    if model_config.model_type not in FUSABLE_MODEL_TYPES:
+        os.replace(exported_path, output_path)
+        return
+    optimized = optimize_model(
+        exported_path,
+        model_type=model_config.model_type,
+        num_heads=model_config.num_attention_heads,
+        hidden_size=model_config.hidden_size,
+    )
+    optimized.save_model_to_file(output_path)
+    os.remove(exported_path)
+
+
+def _save_embedder_config(model: SentenceTransformer, output_dir: str) -> None:
+    """Save the tokenizer and embedding settings next to the ONNX model.
+
+    Args:
+        model: SentenceTransformer model
+        output_dir: Directory with the exported files
+    """
+    model.tokenizer.save_pretrained(output_dir)
+    embedder_config = {
+        'output_name': OUTPUT_NAME,
+        'max_seq_length': model.max_seq_length,
+        'embedding_dim': model.get_sentence_embedding_dimension(),
+    }
+    config_path = os.path.join(output_dir, EMBEDDER_CONFIG_FILE)
+    with open(config_path, 'w', encoding='utf-8') as config_file:
+        json.dump(embedder_config, config_file)
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """Export a SentenceTransformer model to ONNX, optionally quantized.
+
+    The tokenizer and embedding settings are saved next to the model, so the
+    exported directory is loaded without PyTorch models.
+
+    Args:
+        model_name: SentenceTransformer model name or path
+        output_dir: Directory for the exported files
+        quantize: Apply dynamic int8 quantization to the weights
+
+    Returns:
+        str: Path to the ONNX model
+    """
+    # Eager attention exports the pattern that ONNX Runtime fuses into one Attention node
+    model_kwargs = {'attn_implementation': 'eager'}
+    model = SentenceTransformer(model_name, device='cpu', model_kwargs=model_kwargs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    exported_path = os.path.join(output_dir, EXPORTED_MODEL_FILE)
+    _export_model(model, exported_path)
+    model_path = os.path.join(output_dir, FP32_MODEL_FILE)
+    _optimize_graph(exported_path, model_path, model[0].auto_model.config)
+
+    if quantize:
+        fp32_path = model_path
+        model_path = os.path.join(output_dir, INT8_MODEL_FILE)
+        # Fused contrib operators have no shape inference, so their outputs need a default type
+        quantize_dynamic(
+            fp32_path,
+            model_path,
+            weight_type=QuantType.QInt8,
+            extra_options={'DefaultTensorType': onnx.TensorProto.FLOAT},
+        )
+
+    _save_embedder_config(model, output_dir)
+    logger.info('Exported %s to %s', model_name, model_path)
+    return model_path
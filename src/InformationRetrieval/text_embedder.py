@@ -1,13 +1,23 @@
+import itertools
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
 
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from transformers import BatchEncoding
 
+from InformationRetrieval.embedding_file import (
+    EMBEDDING_DTYPE,
+    stored_embedding_rows,
+)
 from InformationRetrieval.text_parser import ParsedText
 
 # Module-level constants
 DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_BATCH_TOKENS = 8192
+MAX_BATCH_SIZE = 256
+DEFAULT_BLOCK_SIZE = 1024
 DEFAULT_RANDOM_SEED = 42
 
 # Model mappings
@@ -18,19 +28,135 @@ RUSSIAN_MODEL_MAPPING = (
 )
 
 
+def resolve_russian_model(model_type: str) -> str:
+    """Get the model name of a Russian model type.
+
+    Args:
+        model_type: 'deeppavlov', 'sbert' or 'labse'
+
+    Returns:
+        str: SentenceTransformer model name
+
+    Raises:
+        ValueError: If provided model_type is not supported
+    """
+    model_mapping = dict(RUSSIAN_MODEL_MAPPING)
+    if model_type not in model_mapping:
+        available_types = list(model_mapping.keys())
+        raise ValueError(
+            'Unknown model type: {0}. Available types: {1}'.format(
+                model_type,
+                available_types,
+            ),
+        )
+    return model_mapping[model_type]
+
+
+def token_budget_batches(
+    lengths: Sequence[int],
+    max_batch_tokens: int,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> List[List[int]]:
+    """Group texts of similar length into batches under a padded token budget.
+
+    Texts are sorted by length, longest first, and a batch is closed when its
+    size times its longest text would exceed ``max_batch_tokens``. Short texts
+    thus go in large batches and one long text no longer pads a whole batch.
+
+    Args:
+        lengths: Tokenized length of every text
+        max_batch_tokens: Maximum number of tokens in a padded batch
+        max_batch_size: Maximum number of texts in a batch
+
+    Returns:
+        List[List[int]]: Text indices of every batch
+    """
+    indices = range(len(lengths))
+    order = sorted(indices, key=lengths.__getitem__, reverse=True)
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in order:
+        # The first text of a sorted batch is the longest, so it sets the padded length
+        padded_length = lengths[batch[0]] if batch else lengths[index]
+        over_budget = padded_length * (len(batch) + 1) > max_batch_tokens
+        batch_full = len(batch) == max_batch_size
+        if batch and (over_budget or batch_full):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 class TextEmbedder(ABC):
     """Abstract base class for text embedding."""
 
+    embedding_dim: int
+
     @abstractmethod
     def embed(self, text: Union[ParsedText, List[ParsedText]]) -> np.ndarray:
         """Convert text into vector embeddings."""
         raise NotImplementedError
 
+    def embed_iter(
+        self,
+        texts: Iterable[ParsedText],
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        output_path: Optional[str] = None,
+    ) -> Iterator[np.ndarray]:
+        """Embed a stream of texts block by block.
+
+        Only one block of texts and embeddings is held in memory, so texts can
+        come straight from ``DocumentChunker.create_chunks``.
+
+        Args:
+            texts: Texts to embed
+            block_size: Number of texts per block
+            output_path: File to append raw float32 embeddings to. If it already
+                holds embeddings, that many texts are skipped, so an interrupted
+                run resumes. Read the file with ``open_embeddings``
+
+        Yields:
+            np.ndarray: Embeddings of every block with shape (block_size, embedding_dim),
+                the last block may be shorter
+        """
+        texts_iter = iter(texts)
+        if output_path is None:
+            yield from self._embed_blocks(texts_iter, block_size)
+            return
+
+        resume_offset = stored_embedding_rows(output_path, self.embedding_dim)
+        with open(output_path, 'ab') as output_file:
+            for embeddings in self._embed_blocks(itertools.islice(texts_iter, resume_offset, None), block_size):
+                output_file.write(embeddings.tobytes())
+                output_file.flush()
+                yield embeddings
+
+    def _embed_blocks(self, texts: Iterator[ParsedText], block_size: int) -> Iterator[np.ndarray]:
+        """Embed consecutive blocks of texts.
+
+        Args:
+            texts: Texts to embed
+            block_size: Number of texts per block
+
+        Yields:
+            np.ndarray: Float32 embeddings of every block
+        """
+        block = list(itertools.islice(texts, block_size))
+        while block:
+            yield np.asarray(self.embed(block), dtype=EMBEDDING_DTYPE)
+            block = list(itertools.islice(texts, block_size))
+
 
 class TransformerEmbedder(TextEmbedder):
     """Text embedder using Sentence Transformers."""
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        max_batch_tokens: Optional[int] = DEFAULT_MAX_BATCH_TOKENS,
+    ):
         """Initialize embedder with specific transformer model.
 
         Args:
@@ -40,10 +166,13 @@ class TransformerEmbedder(TextEmbedder):
                 - 'all-mpnet-base-v2' (higher quality, slower)
                 - 'paraphrase-multilingual-MiniLM-L12-v2' (multilingual)
                 - 'all-distilroberta-v1' (faster, slightly lower quality)
+            max_batch_tokens: Padded token budget of a batch, see ``token_budget_batches``.
+                If None, texts are encoded in batches of ``batch_size``
         """
         self.model = SentenceTransformer(model_name)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         self.batch_size = DEFAULT_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens
 
     def embed(self, text: Union[ParsedText, List[ParsedText]]) -> np.ndarray:
         """Create embeddings using transformer model.
@@ -60,9 +189,69 @@ class TransformerEmbedder(TextEmbedder):
         # Reconstruct sentences from tokens for better semantic understanding
         sentences = [' '.join(chunk.tokens) for chunk in text]
 
+        if self.max_batch_tokens is None:
+            return self._encode(sentences, self.batch_size)
+        return self._encode_budget_batches(sentences, self.max_batch_tokens)
+
+    def _encode_budget_batches(self, sentences: List[str], max_batch_tokens: int) -> np.ndarray:
+        """Encode sentences in batches under a padded token budget.
+
+        Args:
+            sentences: Sentences to embed
+            max_batch_tokens: Padded token budget of a batch
+
+        Returns:
+            numpy array of L2-normalized embeddings in input order
+        """
+        shape = (len(sentences), self.embedding_dim)
+        embeddings = np.empty(shape, dtype=np.float32)
+        if not sentences:
+            return embeddings
+
+        # Tokenize once: the lengths drive batching and the token ids are reused for encoding
+        encoded = self.model.tokenizer(
+            sentences,
+            truncation=True,
+            max_length=self.model.max_seq_length,
+        )
+        lengths = [len(input_ids) for input_ids in encoded['input_ids']]
+        for batch in token_budget_batches(lengths, max_batch_tokens):
+            embeddings[batch] = self._encode_tokens(encoded, batch)
+        return embeddings
+
+    def _encode_tokens(self, encoded: BatchEncoding, batch: List[int]) -> np.ndarray:
+        """Encode a batch of tokenized sentences.
+
+        Args:
+            encoded: Tokenized sentences
+            batch: Indices of the sentences to encode
+
+        Returns:
+            numpy array of L2-normalized embeddings
+        """
+        batch_tokens = {}
+        for name, name_tokens in encoded.items():
+            batch_tokens[name] = [name_tokens[index] for index in batch]
+        padded = self.model.tokenizer.pad(batch_tokens, return_tensors='pt')
+        features = dict(padded.to(self.model.device))
+        with torch.no_grad():
+            sentence_embeddings = self.model(features)['sentence_embedding']
+        normalized = torch.nn.functional.normalize(sentence_embeddings, dim=1)
+        return normalized.cpu().numpy()
+
+    def _encode(self, sentences: List[str], batch_size: int) -> np.ndarray:
+        """Encode sentences with the transformer model.
+
+        Args:
+            sentences: Sentences to embed
+            batch_size: Number of sentences per forward pass
+
+        Returns:
+            numpy array of L2-normalized embeddings
+        """
         return self.model.encode(
             sentences,
-            batch_size=self.batch_size,
+            batch_size=batch_size,
             show_progress_bar=False,
             normalize_embeddings=True,  # L2 normalize embeddings
         )
@@ -100,13 +289,4 @@ class RussianTransformerEmbedder(TransformerEmbedder):
             ValueError: If provided model_type is not supported
         """
         self.model_mapping = dict(RUSSIAN_MODEL_MAPPING)  # For backward compatibility
-        if model_type not in self.model_mapping:
-            available_types = list(self.model_mapping.keys())
-            raise ValueError(
-                'Unknown model type: {0}. Available types: {1}'.format(
-                    model_type,
-                    available_types,
-                ),
-            )
-
-        super().__init__(model_name=self.model_mapping[model_type])
+        super().__init__(model_name=resolve_russian_model(model_type))
@@ -1,9 +1,11 @@
 import logging
 from dataclasses import dataclass
-from typing import Dict, Iterator, List, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from InformationRetrieval.token_counter import TokenCounter
+
 MetadataValue = Union[str, float, int]
 
 logger = logging.getLogger(__name__)
@@ -79,23 +81,30 @@ class DocumentChunker:
         chunk_size: int = 500,
         chunk_overlap: int = 100,
         language: str = 'russian',
+        token_counter: Optional[TokenCounter] = None,
     ):
         """Initialize chunker with configuration.
 
         Args:
-            chunk_size: Target size of each chunk in characters
-            chunk_overlap: Number of characters to overlap between chunks
+            chunk_size: Target size of each chunk in characters, or in tokens with a token counter
+            chunk_overlap: Overlap between chunks in the same unit as ``chunk_size``
             language: Language code ('russian' or 'english')
+            token_counter: Counter of embedding model tokens. Chunks are then
+                sized by tokens and never exceed the encoder window
         """
+        if token_counter is not None:
+            chunk_size = min(chunk_size, token_counter.capacity)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.language = language
+        self.token_counter = token_counter
 
         # Use regular RecursiveCharacterTextSplitter for natural language
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=['\n\n', '\n', '.', '!', '?', ' ', ''],  # Common natural language separators
+            length_function=token_counter or len,
         )
 
     def create_chunks(self, parsed_text: ParsedText) -> Iterator[ParsedText]:
@@ -109,6 +118,8 @@ class DocumentChunker:
         """
         text = ' '.join(parsed_text.tokens)
         chunks = self.text_splitter.split_text(text)
+        if self.token_counter is not None:
+            self.token_counter.record(chunks)
         position = 0
 
         for chunk_index, chunk_text in enumerate(chunks):
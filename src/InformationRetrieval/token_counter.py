@@ -0,0 +1,203 @@
+"""Token counts for sizing chunks by the tokens of an embedding model.
+
+Chunk sizes in characters either waste the encoder window or overflow it,
+and overflowing text is silently truncated by the model. ``TokenCounter``
+counts tokens with the fast batch tokenizer of the model, caches the counts of
+recently seen texts and records how many chunks would still be truncated.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from sentence_transformers import SentenceTransformer
+from transformers import PreTrainedTokenizerBase
+
+logger = logging.getLogger(__name__)
+
+# Token counts of the most recently counted texts kept for repeated lookups
+TOKEN_COUNT_CACHE_SIZE = 8192
+
+
+@dataclass
+class TruncationStats:
+    """Accumulated truncation statistics of chunks."""
+
+    texts: int = 0
+    truncated_texts: int = 0
+    total_tokens: int = 0
+    lost_tokens: int = 0
+
+    @property
+    def truncated_share(self) -> float:
+        """Get the share of truncated chunks.
+
+        Returns:
+            float: Truncated chunks divided by all chunks
+        """
+        return self.truncated_texts / max(self.texts, 1)
+
+    @property
+    def lost_share(self) -> float:
+        """Get the share of tokens cut off by truncation.
+
+        Returns:
+            float: Lost tokens divided by all tokens
+        """
+        return self.lost_tokens / max(self.total_tokens, 1)
+
+    def add(self, lengths: Sequence[int], capacity: int) -> None:
+        """Add chunks of known token lengths.
+
+        Args:
+            lengths: Token count of every chunk without special tokens
+            capacity: Tokens that fit into the encoder window
+        """
+        self.texts += len(lengths)
+        self.total_tokens += sum(lengths)
+        overflow = [length - capacity for length in lengths if length > capacity]
+        self.truncated_texts += len(overflow)
+        self.lost_tokens += sum(overflow)
+
+
+class TokenCounter:
+    """Cached token counter of an embedding model tokenizer."""
+
+    def __init__(
+        self,
+        tokenizer: PreTrainedTokenizerBase,
+        max_tokens: int,
+        cache_size: int = TOKEN_COUNT_CACHE_SIZE,
+    ):
+        """Initialize counter.
+
+        Args:
+            tokenizer: Tokenizer of the embedding model, preferably a fast one
+            max_tokens: Encoder window including special tokens
+            cache_size: Number of most recently counted texts whose counts are kept
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        # Tokens left for text after [CLS], [SEP] and similar tokens
+        self.capacity = max_tokens - tokenizer.num_special_tokens_to_add()
+        self.stats = TruncationStats()
+        self.cache_size = cache_size
+        self._counts: OrderedDict[str, int] = OrderedDict()
+
+    def __call__(self, text: str) -> int:
+        """Count tokens of a single text.
+
+        Args:
+            text: Text
+
+        Returns:
+            int: Token count without special tokens
+        """
+        return self.count([text])[0]
+
+    @classmethod
+    def for_sentence_transformer(cls, model: SentenceTransformer) -> 'TokenCounter':
+        """Create a counter for the window of a SentenceTransformer model.
+
+        Args:
+            model: SentenceTransformer model
+
+        Returns:
+            TokenCounter: Counter with the model tokenizer and ``max_seq_length``
+        """
+        return cls(model.tokenizer, model.max_seq_length)
+
+    def count(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens of texts without special tokens.
+
+        Texts missing from the cache are tokenized in one batch call, the
+        least recently counted texts are evicted above ``cache_size``.
+
+        Args:
+            texts: Texts
+
+        Returns:
+            List[int]: Token count of every text
+        """
+        counts: Dict[str, int] = {}
+        for unique_text in dict.fromkeys(texts):
+            if unique_text in self._counts:
+                counts[unique_text] = self._counts.pop(unique_text)
+        missing = [text for text in dict.fromkeys(texts) if text not in counts]
+        if missing:
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False,
+            )
+            lengths = map(len, encoded['input_ids'])
+            counts.update(zip(missing, lengths))
+        # Reinserted counts become the most recent ones
+        self._counts.update(counts)
+        while len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+        return [counts[text] for text in texts]
+
+    def split(self, texts: Sequence[str]) -> List[str]:
+        """Split texts longer than the window at word boundaries.
+
+        Args:
+            texts: Texts
+
+        Returns:
+            List[str]: Texts in order, each long text replaced by its pieces
+        """
+        pieces = []
+        for text, length in zip(texts, self.count(texts)):
+            if length <= self.capacity:
+                pieces.append(text)
+            else:
+                pieces.extend(self._split_words(text.split()))
+        return pieces
+
+    def record(self, chunks: Sequence[str]) -> TruncationStats:
+        """Record truncation statistics of final chunks.
+
+        Args:
+            chunks: Chunk texts
+
+        Returns:
+            TruncationStats: Statistics accumulated over all recorded chunks
+        """
+        self.stats.add(self.count(chunks), self.capacity)
+        logger.info(
+            '%s of %s chunks exceed the %s-token window, %.1f%% of tokens are truncated',
+            self.stats.truncated_texts,
+            self.stats.texts,
+            self.max_tokens,
+            self.stats.lost_share * 100,
+        )
+        return self.stats
+
+    def _split_words(self, words: List[str]) -> List[str]:
+        """Group words into pieces that fit the window.
+
+        Word token counts add up to the count of the joined text for WordPiece
+        tokenizers, which split on whitespace before matching subwords.
+
+        Args:
+            words: Words of a long text
+
+        Returns:
+            List[str]: Pieces of the text
+        """
+        pieces = []
+        piece: List[str] = []
+        piece_length = 0
+        for word, length in zip(words, self.count(words)):
+            if piece and piece_length + length > self.capacity:
+                pieces.append(' '.join(piece))
+                piece, piece_length = [], 0
+            piece.append(word)
+            piece_length += length
+        if piece:
+            pieces.append(' '.join(piece))
+        return pieces
@@ -1,18 +1,42 @@
+import asyncio
 import os
-from typing import Dict, List
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Sequence
 
 import nest_asyncio
 from dotenv import load_dotenv
-from llama_index.core import Document, SimpleDirectoryReader
 from llama_parse import LlamaParse
 
+from Parsers.parse_cache import (
+    PARSE_CACHE_DIR,
+    PARSER_OPTIONS,
+    ParseCache,
+    parse_key,
+)
+
 nest_asyncio.apply()
 load_dotenv()
 
+MARKDOWN_RESULT = 'markdown'
+TEXT_RESULT = 'txt'
+MAX_CONCURRENT_PARSES = 4
+OUTPUT_KEY_LENGTH = 12
+RESULT_EXTENSIONS: Mapping[str, str] = MappingProxyType(
+    {
+        MARKDOWN_RESULT: 'md',
+        TEXT_RESULT: 'txt',
+    },
+)
+
 
+@lru_cache(maxsize=None)
 def _create_parser(result_type: str) -> LlamaParse:
     """Create a LlamaParse instance with common configuration.
 
+    The instance is created once per result type and reused by all parses.
+
     Args:
         result_type: Type of parsing result ('markdown' or 'txt')
 
@@ -22,58 +46,102 @@ def _create_parser(result_type: str) -> LlamaParse:
     return LlamaParse(
         result_type=result_type,
         show_progress=True,
-        parsing_instruction=None,
-        disable_ocr=True,
-        disable_image_extraction=True,
         api_key=os.getenv('LLAMA_CLOUD_API_KEY'),
+        **PARSER_OPTIONS,
     )
 
 
-def _format_page_content(page_num: int, document: Document) -> str:
-    """Format content for a single page.
+def _write_pages(pages: Iterable[str], output_path: str) -> str:
+    """Write pages to file one by one, each under its page header.
 
     Args:
-        page_num: Page number
-        document: Document to format
+        pages: Page texts to save
+        output_path: Path where to save the content
 
     Returns:
-        str: Formatted page content
+        str: Path to the saved file
     """
-    page_header = f'### Page {page_num}\n\n'
-    page_content = f'{document.text}\n\n'
-    return page_header + page_content
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        for page_num, page_text in enumerate(pages, start=1):
+            output_file.write(f'### Page {page_num}\n\n{page_text}\n\n')
+    return output_path
 
 
-def _save_content(doc_content: str, output_path: str) -> str:
-    """Save content to file.
+def _output_path(file_path: str, key: str, result_type: str, output_dir: str) -> str:
+    """Build a unique output path for a parsed document.
 
     Args:
-        doc_content: Content to save
-        output_path: Path where to save the content
+        file_path: Path to the source document
+        key: Cache key of the parse
+        result_type: Type of parsing result
+        output_dir: Directory for output files
 
     Returns:
-        str: Path to the saved file
+        str: Path of the output file
     """
-    with open(output_path, 'w', encoding='utf-8') as output_file:
-        output_file.write(doc_content)
-    return output_path
+    file_name = '{0}-{1}.{2}'.format(
+        Path(file_path).stem,
+        key[:OUTPUT_KEY_LENGTH],
+        RESULT_EXTENSIONS[result_type],
+    )
+    return os.path.join(output_dir, file_name)
 
 
-def _process_documents(documents: List[Document], output_path: str) -> str:
-    """Process documents and save to file.
+async def aparse_files(
+    file_paths: Sequence[str],
+    result_type: str = MARKDOWN_RESULT,
+    parser: Optional[LlamaParse] = None,
+    max_concurrency: int = MAX_CONCURRENT_PARSES,
+    cache_dir: str = PARSE_CACHE_DIR,
+    output_dir: str = '.',
+) -> List[str]:
+    """Parse many documents concurrently with a persistent parse cache.
 
     Args:
-        documents: List of documents to process
-        output_path: Path where to save the output file
+        file_paths: Paths to the documents to parse
+        result_type: Type of parsing result ('markdown' or 'txt')
+        parser: Parser to use instead of the shared LlamaParse client
+        max_concurrency: Maximum number of documents parsed at once
+        cache_dir: Directory of the parse cache
+        output_dir: Directory for output files
 
     Returns:
-        str: Path to the saved output file
+        List[str]: Paths to the output files in the order of ``file_paths``
     """
-    content_parts = []
-    for page_num, document in enumerate(documents, start=1):
-        content_parts.append(_format_page_content(page_num, document))
-    all_pages_content = ''.join(content_parts)
-    return _save_content(all_pages_content, output_path)
+    cache = ParseCache(cache_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    keys = [parse_key(file_path, result_type) for file_path in file_paths]
+    # Identical files are parsed once even if listed several times
+    unique_files = dict(zip(keys, file_paths))
+    parser = parser or _create_parser(result_type)
+    parsed_pages = await cache.aload_documents(unique_files, parser, max_concurrency)
+
+    output_paths = {}
+    for unique_key, file_path in unique_files.items():
+        output_paths[unique_key] = _output_path(file_path, unique_key, result_type, output_dir)
+    for pages, output_path in zip(parsed_pages, output_paths.values()):
+        _write_pages(pages, output_path)
+    return [output_paths[key] for key in keys]
+
+
+def parse_files(
+    file_paths: Sequence[str],
+    result_type: str = MARKDOWN_RESULT,
+    parser: Optional[LlamaParse] = None,
+    max_concurrency: int = MAX_CONCURRENT_PARSES,
+) -> List[str]:
+    """Parse many documents concurrently with a persistent parse cache.
+
+    Args:
+        file_paths: Paths to the documents to parse
+        result_type: Type of parsing result ('markdown' or 'txt')
+        parser: Parser to use instead of the shared LlamaParse client
+        max_concurrency: Maximum number of documents parsed at once
+
+    Returns:
+        List[str]: Paths to the output files in the order of ``file_paths``
+    """
+    return asyncio.run(aparse_files(file_paths, result_type, parser, max_concurrency))
 
 
 def parse_md(file_path: str) -> str:
@@ -85,15 +153,7 @@ def parse_md(file_path: str) -> str:
     Returns:
         str: Path to the output markdown file
     """
-    parser = _create_parser('markdown')
-    file_extractor: Dict[str, LlamaParse] = {'.docx': parser}
-
-    documents = SimpleDirectoryReader(
-        input_files=[file_path],
-        file_extractor=file_extractor,
-    ).load_data(show_progress=True)
-
-    return _process_documents(documents, 'all_pages_output.md')
+    return parse_files([file_path], MARKDOWN_RESULT)[0]
 
 
 def parse_txt(file_path: str) -> str:
@@ -105,12 +165,4 @@ def parse_txt(file_path: str) -> str:
     Returns:
         str: Path to the output text file
     """
-    parser = _create_parser('txt')
-    file_extractor: Dict[str, LlamaParse] = {'.docx': parser}
-
-    documents = SimpleDirectoryReader(
-        input_files=[file_path],
-        file_extractor=file_extractor,
-    ).load_data(show_progress=True)
-
-    return _process_documents(documents, 'all_pages_output.txt')
+    return parse_files([file_path], TEXT_RESULT)[0]
@@ -0,0 +1,131 @@
+"""Persistent cache of LlamaParse pages keyed by file content and options."""
+
+import asyncio
+import hashlib
+import json
+import os
+from functools import partial
+from types import MappingProxyType
+from typing import List, Mapping, Optional
+
+from llama_index.core import Document
+from llama_parse import LlamaParse
+
+PARSE_CACHE_DIR = '.llama_parse_cache'
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Options that change parsing results and therefore take part in the cache key
+PARSER_OPTIONS: Mapping[str, Optional[bool]] = MappingProxyType(
+    {
+        'parsing_instruction': None,
+        'disable_ocr': True,
+        'disable_image_extraction': True,
+    },
+)
+
+
+def parse_key(file_path: str, result_type: str) -> str:
+    """Compute cache key of a parse from file content and parser options.
+
+    Args:
+        file_path: Path to the document
+        result_type: Type of parsing result
+
+    Returns:
+        str: Hex digest identifying the parse result
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as source_file:
+        for block in iter(partial(source_file.read, READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    options = json.dumps({'result_type': result_type, **PARSER_OPTIONS}, sort_keys=True)
+    digest.update(options.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Directory of parsed page texts, one JSON file per parse key."""
+
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR):
+        """Open the cache, creating its directory if needed.
+
+        Args:
+            cache_dir: Directory of the parse cache
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+
+    async def aload_documents(
+        self,
+        files: Mapping[str, str],
+        parser: LlamaParse,
+        max_concurrency: int,
+    ) -> List[List[str]]:
+        """Get page texts of documents, parsing the ones not in the cache.
+
+        Args:
+            files: Document paths by parse key
+            parser: Parser used on cache miss
+            max_concurrency: Maximum number of documents parsed at once
+
+        Returns:
+            List[List[str]]: Page texts of every document in the order of ``files``
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        load_pages = partial(self._aload_pages, parser=parser, semaphore=semaphore)
+        file_items = files.items()
+        page_loads = (load_pages(file_path, key) for key, file_path in file_items)
+        return await asyncio.gather(*page_loads)
+
+    async def _aload_pages(
+        self,
+        file_path: str,
+        key: str,
+        parser: LlamaParse,
+        semaphore: asyncio.Semaphore,
+    ) -> List[str]:
+        """Get page texts of a document from the cache or the parse service.
+
+        Args:
+            file_path: Path to the document
+            key: Cache key of the parse
+            parser: Parser used on cache miss
+            semaphore: Semaphore bounding concurrent uploads
+
+        Returns:
+            List[str]: Page texts
+        """
+        cache_path = os.path.join(self.cache_dir, f'{key}.json')
+        pages = self._load(cache_path)
+        if pages is None:
+            async with semaphore:
+                documents: List[Document] = await parser.aload_data(file_path)
+            pages = [document.text for document in documents]
+            self._save(pages, cache_path)
+        return pages
+
+    def _load(self, cache_path: str) -> Optional[List[str]]:
+        """Load cached page texts.
+
+        Args:
+            cache_path: Path to the cache entry
+
+        Returns:
+            Optional[List[str]]: Page texts or None if not cached
+        """
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, 'r', encoding='utf-8') as cache_file:
+            return json.load(cache_file)
+
+    def _save(self, pages: List[str], cache_path: str) -> None:
+        """Save page texts to the cache atomically.
+
+        Args:
+            pages: Page texts
+            cache_path: Path to the cache entry
+        """
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(pages, cache_file, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
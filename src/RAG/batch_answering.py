@@ -0,0 +1,59 @@
+"""Batched offline answering of question lists.
+
+Run ``python -m RAG.batch_answering document.docx questions.txt --output answers.json``
+from ``src``. Questions come from a text file with one question per line or
+from a file in the ``dataset/qa_pairs.json`` layout and are answered by
+``answer_questions``. Known FAQ questions (``--faq``) are answered without the
+LLM. Answers are written in the ``dataset/qa_pairs.json`` layout.
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+
+from RAG.batch_pipeline import answer_questions
+from RAG.config import GENERATION_BATCH_SIZE
+from RAG.qa_system import initialize_faq_index, initialize_qa_system
+from RAG.question_file import QUESTION_KEY, load_questions, write_answers
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Answer a list of questions about a document in batches')
+    parser.add_argument('docx_path', help='Document to answer questions about')
+    parser.add_argument('questions_path', help='Text file with one question per line or QA pairs JSON')
+    parser.add_argument('--output', default='answers.json', help='Path of the answers in the QA pairs layout')
+    parser.add_argument('--bot', type=int, default=1, help='Store answers in the botN_answer field')
+    parser.add_argument('--batch-size', type=int, default=GENERATION_BATCH_SIZE)
+    parser.add_argument('--faq', help='QA pairs with curated answers to known questions')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Answer questions from a file and save the answers.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    records = load_questions(args.questions_path)
+    qa_chain, doc_data = initialize_qa_system(args.docx_path)
+    faq_index = initialize_faq_index(args.faq, qa_chain) if args.faq else None
+    questions = [record[QUESTION_KEY] for record in records]
+    answers = answer_questions(questions, qa_chain, doc_data, args.batch_size, faq_index)
+    write_answers(records, answers, args.bot, args.output)
+    logger.info('Saved %s answers to %s', len(answers), args.output)
+
+
+if __name__ == '__main__':
+    main()
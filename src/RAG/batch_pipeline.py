@@ -0,0 +1,172 @@
+"""Batched retrieval and generation for lists of questions.
+
+All questions are embedded in one call and searched in the index with one
+multi-query search that applies the metadata filter of the retriever, then
+the answers are generated with batched decoding.
+Table cell questions and known FAQ questions are answered without the LLM as
+in ``process_query``; a cell question naming an unknown column joins the
+batch with its row group chunk as context.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain import chains, schema
+from langchain.docstore.document import Document
+from langchain.llms.base import LLM
+
+from observability.tracing import span
+from RAG.config import GENERATION_BATCH_SIZE, PROMPT_PARTS
+from RAG.faq_index import FAQIndex
+from RAG.llama_solo import find_cell_answer
+from RAG.prefix_cache import PrefixCachedLLM
+from RAG.table_query import parse_cell_request
+from RAG.types import BatchRetriever, DocumentData
+
+DOCUMENT_SEPARATOR = '\n\n'
+PROMPT_TEMPLATE = '\n'.join(PROMPT_PARTS)
+
+
+def retrieve_contexts(retriever: schema.BaseRetriever, questions: Sequence[str]) -> List[str]:
+    """Retrieve the context of every question.
+
+    A ``BatchRetriever`` like ``FilteredRetriever`` or ``ShardedRetriever``
+    embeds all questions at once and searches them with its own filter, other
+    retrievers answer the questions concurrently.
+
+    Args:
+        retriever: Retriever of the QA chain
+        questions: Questions
+
+    Returns:
+        List[str]: Joined chunks for every question
+    """
+    with span('retrieve_batch', queries=len(questions)):
+        if isinstance(retriever, BatchRetriever):
+            retrieved = retriever.retrieve_many(questions)
+        else:
+            retrieved = retriever.batch(list(questions)) if questions else []
+    return [_join_chunks(documents) for documents in retrieved]
+
+
+def generate_answers(llm: LLM, prompts: Sequence[str], batch_size: int = GENERATION_BATCH_SIZE) -> List[str]:
+    """Generate answers for prompts in batches.
+
+    Args:
+        llm: LLM of the QA chain
+        prompts: Full prompts
+        batch_size: Number of prompts decoded together
+
+    Returns:
+        List[str]: Stripped answers in prompt order
+    """
+    if isinstance(llm, PrefixCachedLLM):
+        answers = llm.generator.generate_batch(prompts, batch_size)
+    else:
+        answers = llm.batch(list(prompts), config={'max_concurrency': batch_size})
+    return [answer.strip() for answer in answers]
+
+
+def answer_questions(
+    questions: Sequence[str],
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    batch_size: int = GENERATION_BATCH_SIZE,
+    faq_index: Optional[FAQIndex] = None,
+) -> List[str]:
+    """Answer a list of questions with the retriever and LLM of a QA chain.
+
+    Args:
+        questions: Questions
+        qa_chain: QA chain from ``create_qa_chain``
+        doc_data: Document data for table cell questions
+        batch_size: Number of prompts decoded together
+        faq_index: Index of curated answers to known questions
+
+    Returns:
+        List[str]: Answers in question order
+    """
+    answers, contexts = _collect_contexts(questions, qa_chain, doc_data, faq_index)
+    llm_indices = sorted(contexts)
+    prompts = []
+    for index in llm_indices:
+        context, question = contexts[index], questions[index]
+        prompts.append(PROMPT_TEMPLATE.format(context=context, question=question))
+    llm = qa_chain.combine_documents_chain.llm_chain.llm
+    with span('generate_batch', prompts=len(prompts)):
+        chain_answers = generate_answers(llm, prompts, batch_size)
+    for index, answer in zip(llm_indices, chain_answers):
+        answers[index] = answer
+    return answers
+
+
+def _collect_contexts(
+    questions: Sequence[str],
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    faq_index: Optional[FAQIndex],
+) -> Tuple[List[str], Dict[int, str]]:
+    """Answer questions without the LLM and collect contexts of the others.
+
+    Args:
+        questions: Questions
+        qa_chain: QA chain from ``create_qa_chain``
+        doc_data: Document data for table cell questions
+        faq_index: Index of curated answers to known questions
+
+    Returns:
+        Tuple[List[str], Dict[int, str]]: Answers, empty for LLM questions, and
+        the context of every LLM question by its index
+    """
+    answers = ['' for _ in questions]
+    contexts: Dict[int, str] = {}
+    retrieval_indices = []
+    for index, question in enumerate(questions):
+        answer, row_group = _answer_without_llm(question, qa_chain, doc_data, faq_index)
+        if row_group:
+            contexts[index] = _join_chunks(row_group)
+        elif answer is None:
+            retrieval_indices.append(index)
+        else:
+            answers[index] = answer
+
+    retrieval_questions = [questions[retrieval_index] for retrieval_index in retrieval_indices]
+    retrieved = retrieve_contexts(qa_chain.retriever, retrieval_questions)
+    contexts.update(zip(retrieval_indices, retrieved))
+    return answers, contexts
+
+
+def _answer_without_llm(
+    question: str,
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    faq_index: Optional[FAQIndex],
+) -> Tuple[Optional[str], List[Document]]:
+    """Answer a table cell or known FAQ question.
+
+    Args:
+        question: Question
+        qa_chain: QA chain with the index of the row group chunks
+        doc_data: Document data for table cell questions
+        faq_index: Index of curated answers to known questions
+
+    Returns:
+        Tuple[Optional[str], List[Document]]: Answer or None if the question needs
+        retrieval, and the row group chunks of a cell question the LLM answers from
+    """
+    cell_request = parse_cell_request(question)
+    if cell_request:
+        return find_cell_answer(cell_request, qa_chain, doc_data)
+    answer = None if faq_index is None else faq_index.lookup(question)
+    return answer, []
+
+
+def _join_chunks(documents: Sequence[Document]) -> str:
+    """Join retrieved chunks into a prompt context.
+
+    Args:
+        documents: Chunks
+
+    Returns:
+        str: Chunk texts separated by blank lines
+    """
+    return DOCUMENT_SEPARATOR.join(document.page_content for document in documents)
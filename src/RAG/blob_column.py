@@ -0,0 +1,223 @@
+"""Append-only columns of byte strings read through ``mmap``.
+
+A column is a blob file with the values one after another and an offsets
+file with the end offset of every value. Metadata columns store JSON
+encoded values, one column per metadata key.
+"""
+
+import itertools
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+METADATA_PREFIX = 'meta.'
+BLOB_SUFFIX = '.bin'
+OFFSETS_SUFFIX = '.idx'
+OFFSET_DTYPE = np.int64
+OFFSET_SIZE = np.dtype(OFFSET_DTYPE).itemsize
+NULL_VALUE = b'null'
+ENCODING = 'utf-8'
+
+
+def _map_file(path: str) -> mmap.mmap:
+    """Map a file into memory for reading.
+
+    An empty file cannot be mapped, its values are all empty, so it gets an
+    anonymous map instead.
+
+    Args:
+        path: File path
+
+    Returns:
+        mmap.mmap: Read-only memory map
+    """
+    with open(path, 'rb') as mapped_file:
+        if os.fstat(mapped_file.fileno()).st_size:
+            return mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return mmap.mmap(-1, 1)
+
+
+def _encode(metadata_value: object) -> bytes:
+    """Encode a metadata value.
+
+    Args:
+        metadata_value: JSON serializable value
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    return json.dumps(metadata_value, ensure_ascii=False).encode(ENCODING)
+
+
+class BlobColumn:
+    """Append-only column of byte strings with an offsets file."""
+
+    def __init__(self, prefix: str):
+        """Open or create the column files.
+
+        Args:
+            prefix: Path of the column files without suffix
+        """
+        self.blob_path = prefix + BLOB_SUFFIX
+        self.offsets_path = prefix + OFFSETS_SUFFIX
+        for path in (self.blob_path, self.offsets_path):
+            Path(path).touch()
+        self._blob: Optional[mmap.mmap] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._length = os.path.getsize(self.offsets_path) // OFFSET_SIZE
+
+    def __len__(self) -> int:
+        """Count stored values.
+
+        Returns:
+            int: Number of values
+        """
+        return self._length
+
+    def append(self, encoded_values: Sequence[bytes]) -> None:
+        """Append values to the end of the column.
+
+        Args:
+            encoded_values: Encoded values
+        """
+        end = os.path.getsize(self.blob_path)
+        lengths = [len(encoded) for encoded in encoded_values]
+        ends = np.cumsum(lengths, dtype=OFFSET_DTYPE) + end
+        with open(self.blob_path, 'ab') as blob_file:
+            blob_file.write(b''.join(encoded_values))
+        with open(self.offsets_path, 'ab') as offsets_file:
+            offsets_file.write(ends.tobytes())
+        self._length += len(encoded_values)
+        self.close()
+
+    def get(self, row: int) -> bytes:
+        """Read one value.
+
+        Args:
+            row: Row number
+
+        Returns:
+            bytes: Encoded value
+        """
+        blob, offsets = self._maps()
+        start = int(offsets[row - 1]) if row else 0
+        end = int(offsets[row])
+        return blob[start:end]
+
+    def close(self) -> None:
+        """Release the memory maps, they are reopened on the next read."""
+        if self._blob is not None:
+            self._blob.close()
+        self._blob = None
+        self._offsets = None
+
+    def _maps(self) -> Tuple[mmap.mmap, np.ndarray]:
+        """Map the column files into memory if they are not mapped yet.
+
+        Returns:
+            Tuple[mmap.mmap, np.ndarray]: Values and their end offsets
+        """
+        if self._blob is None or self._offsets is None:
+            self._offsets = np.memmap(
+                self.offsets_path,
+                dtype=OFFSET_DTYPE,
+                mode='r',
+                shape=(len(self),),
+            )
+            self._blob = _map_file(self.blob_path)
+        return self._blob, self._offsets
+
+
+class MetadataColumns:
+    """JSON encoded metadata columns of a chunk store, one per key."""
+
+    def __init__(self, directory: str):
+        """Open the metadata columns stored in a directory.
+
+        Args:
+            directory: Directory of the store files
+        """
+        self.directory = directory
+        self._columns: Dict[str, BlobColumn] = {}
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.startswith(METADATA_PREFIX) and file_name.endswith(OFFSETS_SUFFIX):
+                column_file = file_name.removesuffix(OFFSETS_SUFFIX)
+                self._add_column(column_file.removeprefix(METADATA_PREFIX))
+
+    @property
+    def names(self) -> List[str]:
+        """List metadata keys.
+
+        Returns:
+            List[str]: Metadata keys with a column
+        """
+        return list(self._columns)
+
+    def append(self, metadatas: Sequence[Mapping[str, object]], stored_rows: int) -> None:
+        """Append the metadata of new rows.
+
+        Columns of new keys are filled with nulls for the stored rows.
+
+        Args:
+            metadatas: Metadata of every new row
+            stored_rows: Number of rows stored before the new ones
+        """
+        keys = {key for metadata in metadatas for key in metadata}
+        for name in sorted(keys.difference(self._columns)):
+            nulls = itertools.repeat(NULL_VALUE, stored_rows)
+            self._add_column(name).append(list(nulls))
+        for name, column in self._columns.items():
+            encoded_values = [_encode(metadata.get(name)) for metadata in metadatas]
+            column.append(encoded_values)
+
+    def read(self, row: int) -> Dict[str, object]:
+        """Read the metadata of a row.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Dict[str, object]: Values of the keys set for the row
+        """
+        metadata = {}
+        for name, column in self._columns.items():
+            stored = json.loads(column.get(row))
+            if stored is not None:
+                metadata[name] = stored
+        return metadata
+
+    def column(self, name: str) -> List[object]:
+        """Read a whole metadata column.
+
+        Args:
+            name: Metadata key
+
+        Returns:
+            List[object]: Value of every row, None where the key is missing
+        """
+        column = self._columns[name]
+        encoded_values = map(column.get, range(len(column)))
+        return [json.loads(encoded) for encoded in encoded_values]
+
+    def close(self) -> None:
+        """Release the memory maps of all columns."""
+        for column in self._columns.values():
+            column.close()
+
+    def _add_column(self, name: str) -> BlobColumn:
+        """Open a metadata column.
+
+        Args:
+            name: Metadata key
+
+        Returns:
+            BlobColumn: Column
+        """
+        prefix = os.path.join(self.directory, METADATA_PREFIX + name)
+        column = BlobColumn(prefix)
+        self._columns[name] = column
+        return column
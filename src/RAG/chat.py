@@ -6,6 +6,9 @@ from typing import Optional, Protocol, TextIO
 
 from langchain import chains
 
+from observability.langchain_tracing import tracing_callbacks
+from observability.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -126,7 +129,8 @@ def process_question(query: str, qa_chain: chains.RetrievalQA) -> str:
         str: Model's response or error message
     """
     try:
-        return qa_chain.run(query).strip()
+        with span('query', query_chars=len(query)):
+            return qa_chain.run(query, callbacks=tracing_callbacks()).strip()
     except Exception as error:
         logger.error('Error processing question: %s', error)
         return 'Sorry, I encountered an error processing your question.'
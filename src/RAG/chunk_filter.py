@@ -0,0 +1,76 @@
+"""Chunk metadata keys and filters restricting a search to some chunks."""
+
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+from RAG.table_formatter import TABLE_SOURCE
+from RAG.types import ChunkMetadata
+
+PARAGRAPH_SOURCE = 'paragraph'
+DOC_ID_KEY = 'doc_id'
+SOURCE_KEY = 'source'
+TABLE_KEY = 'table'
+FIRST_ROW_KEY = 'first_row'
+LAST_ROW_KEY = 'last_row'
+NO_ROW = -1
+
+# Inclusive 1-based row range
+RowRange = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class ChunkFilter:
+    """Restriction of a search to some chunks, None fields match all chunks."""
+
+    doc_ids: Optional[Tuple[str, ...]] = None
+    # PARAGRAPH_SOURCE or TABLE_SOURCE
+    source: Optional[str] = None
+    # 1-based table number as in table cell requests
+    table: Optional[int] = None
+    # Matches table chunks overlapping the row range
+    rows: Optional[RowRange] = None
+
+    @classmethod
+    def tables(
+        cls,
+        table: Optional[int] = None,
+        rows: Optional[RowRange] = None,
+    ) -> 'ChunkFilter':
+        """Match table chunks.
+
+        Args:
+            table: 1-based table number, None for all tables
+            rows: Inclusive 1-based row range
+
+        Returns:
+            ChunkFilter: Filter of table chunks
+        """
+        return cls(source=TABLE_SOURCE, table=table, rows=rows)
+
+    @classmethod
+    def document(cls, doc_id: str) -> 'ChunkFilter':
+        """Match the chunks of one document.
+
+        Args:
+            doc_id: Document id
+
+        Returns:
+            ChunkFilter: Filter of the document chunks
+        """
+        return cls(doc_ids=(doc_id,))
+
+
+def chunk_metadata(fields: Mapping[str, object], doc_id: str = '') -> ChunkMetadata:
+    """Build vector store metadata of a chunk.
+
+    Args:
+        fields: Source type and, for table chunks, table number and row range
+        doc_id: Document id, empty if unknown
+
+    Returns:
+        ChunkMetadata: Metadata
+    """
+    metadata = dict(fields)
+    if doc_id:
+        metadata[DOC_ID_KEY] = doc_id
+    return metadata
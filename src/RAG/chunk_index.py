@@ -0,0 +1,48 @@
+"""Vector index of the chunks of a single document."""
+
+from typing import List, Optional
+
+from langchain import embeddings
+
+from observability.langchain_tracing import TracedEmbeddings
+from observability.tracing import span
+from RAG.config import TOP_K_DOCS
+from RAG.dedup import deduplicate_chunks
+from RAG.metadata_filter import FilteredRetriever, MetadataBitmaps
+from RAG.mmap_docstore import build_vectorstore
+from RAG.types import ChunkMetadata
+
+
+def build_chunk_retriever(
+    text_chunks: List[str],
+    model_embeddings: embeddings.HuggingFaceEmbeddings,
+    metadatas: Optional[List[ChunkMetadata]] = None,
+) -> FilteredRetriever:
+    """Deduplicate and index chunks behind a metadata filtered retriever.
+
+    Args:
+        text_chunks: Processed text chunks
+        model_embeddings: Embeddings model
+        metadatas: Metadata of every chunk
+
+    Returns:
+        FilteredRetriever: Retriever of the top-k chunks
+    """
+    with span('dedup', chunks=len(text_chunks)) as dedup_span:
+        unique_chunks = deduplicate_chunks(text_chunks)
+        dedup_span.set_attribute('removed', unique_chunks.removed)
+    metadatas = metadatas or [{} for _ in text_chunks]
+    chunk_metadatas = unique_chunks.metadatas(metadatas)
+    with span('vectorstore', chunks=len(unique_chunks.chunks)):
+        vectorstore = build_vectorstore(
+            unique_chunks.chunks,
+            TracedEmbeddings(model_embeddings),
+            chunk_metadatas,
+        )
+        # Bitmaps of the kept chunks cover the metadata of all chunks merged into them
+        bitmaps = MetadataBitmaps(metadatas, unique_chunks.representative)
+    return FilteredRetriever(
+        vectorstore=vectorstore,
+        search_kwargs={'k': TOP_K_DOCS},
+        bitmaps=bitmaps,
+    )
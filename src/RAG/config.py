@@ -6,7 +6,26 @@ from typing import Mapping, Sequence
 # Constants
 CHUNK_SIZE: int = 500
 OVERLAP_SIZE: int = 100
+# Overlap of chunks sized by embedding model tokens, the chunk size is the model window
+CHUNK_OVERLAP_TOKENS: int = 16
+EMBEDDING_MODEL: str = 'sentence-transformers/distiluse-base-multilingual-cased-v2'
+# Directory of the memory-mapped chunk store, empty keeps chunk texts in memory
+DOCSTORE_DIR: str = ''
+# Library index: documents with fewer chunks share bucket shards of this size
+SHARD_BUCKET_CHUNKS: int = 512
+# Search only the shards of this many documents closest to the query, so search latency
+# stays flat as the library grows. 0 searches all shards for exact top-k results
+SHARD_PROBE_DOCUMENTS: int = 32
+SHARD_SEARCH_WORKERS: int = 8
 TOP_K_DOCS: int = 5
+PREFIX_CACHE_SIZE: int = 4
+GENERATION_BATCH_SIZE: int = 8
+# Token budget of a table chunk, tokens are approximated by words by default
+TABLE_CHUNK_TOKENS: int = 128
+# Minimum cosine similarity of a question to a known FAQ question
+FAQ_SIMILARITY_THRESHOLD: float = 0.9
+# Minimum Jaccard similarity of word 3-grams for a chunk dropped before indexing
+DEDUP_THRESHOLD: float = 0.8
 
 # Model configuration
 MODEL_CONFIG: Mapping[str, str | int | float] = MappingProxyType(
@@ -16,6 +35,18 @@ MODEL_CONFIG: Mapping[str, str | int | float] = MappingProxyType(
         'max_new_tokens': 200,
         'temperature': 0.3,
         'top_k': 100,
+        # 'auto', 'cuda_4bit', 'cpu_bf16', 'cpu_int8' or 'gguf', see RAG.model
+        'backend': 'auto',
+        # Path to a .gguf file for the 'gguf' backend
+        'gguf_path': '',
+        # llama.cpp context window and threads, 0 uses all cores
+        'gguf_context_size': 8192,
+        'gguf_threads': 0,
+        # Speculative decoding: a small model with the same tokenizer, e.g.
+        # 'meta-llama/Llama-3.2-1B-Instruct', or prompt lookup with N tokens per draft.
+        # Both are off when empty / 0, and only one of them may be set
+        'draft_model': '',
+        'prompt_lookup_tokens': 0,
     },
 )
 
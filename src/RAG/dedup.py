@@ -0,0 +1,237 @@
+"""Near-duplicate chunk elimination with MinHash LSH.
+
+Every chunk is reduced to a MinHash signature of its word 3-gram
+shingles. Signatures are split into bands; chunks sharing any band are
+candidate duplicates, and candidates whose estimated Jaccard similarity
+reaches the threshold are duplicates. A chunk is dropped if it
+duplicates an earlier kept chunk. Duplicates are not merged
+transitively, so a chain of overlapping windows never collapses into its
+first window. Memory grows linearly with the number of chunks, so
+millions of chunks are deduplicated in minutes.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from RAG.config import DEDUP_THRESHOLD
+from RAG.minhash import NUM_PERMUTATIONS, minhash_signatures
+from RAG.types import ChunkMetadata
+
+logger = logging.getLogger(__name__)
+
+NUM_BANDS = 16
+# Candidate pairs verified at once (2**18), bounds temporary memory to ~64 MB
+VERIFY_BLOCK_PAIRS = 262144
+BAND_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+@dataclass
+class DedupResult:
+    """Representative chunks with back-references to the removed duplicates."""
+
+    chunks: List[str]
+    # Index into ``chunks`` of the representative of every input chunk
+    representative: np.ndarray
+
+    @property
+    def input_size(self) -> int:
+        """Count input chunks.
+
+        Returns:
+            int: Number of chunks before deduplication
+        """
+        return len(self.representative)
+
+    @property
+    def removed(self) -> int:
+        """Count removed duplicates.
+
+        Returns:
+            int: Number of chunks not indexed
+        """
+        return self.input_size - len(self.chunks)
+
+    @property
+    def shrink_ratio(self) -> float:
+        """Get the share of removed chunks.
+
+        Returns:
+            float: Removed chunks divided by input chunks
+        """
+        return self.removed / max(self.input_size, 1)
+
+    def members(self) -> List[List[int]]:
+        """Get input chunk indices of every representative.
+
+        Returns:
+            List[List[int]]: Input indices per kept chunk, the first one is the
+            kept chunk itself
+        """
+        clusters: List[List[int]] = [[] for _ in self.chunks]
+        for index, cluster in enumerate(self.representative.tolist()):
+            clusters[cluster].append(index)
+        return clusters
+
+    def metadatas(
+        self,
+        chunk_metadatas: Optional[Sequence[ChunkMetadata]] = None,
+    ) -> List[ChunkMetadata]:
+        """Build vector store metadata with back-references.
+
+        Args:
+            chunk_metadatas: Metadata of every input chunk, kept chunks keep their own
+
+        Returns:
+            List[ChunkMetadata]: ``chunk_ids`` of all chunks merged into every kept chunk
+        """
+        clusters = self.members()
+        if chunk_metadatas is None:
+            return [{'chunk_ids': cluster} for cluster in clusters]
+        return [{**chunk_metadatas[cluster[0]], 'chunk_ids': cluster} for cluster in clusters]
+
+
+def _bucket_pairs(keys: np.ndarray) -> np.ndarray:
+    """Pair every chunk with the first chunk of its bucket.
+
+    Args:
+        keys: Band key of every chunk
+
+    Returns:
+        np.ndarray: Pairs ``(first, chunk)`` of chunk indices with shape (n_pairs, 2)
+    """
+    _, first_indices, buckets = np.unique(
+        keys,
+        return_index=True,
+        return_inverse=True,
+    )
+    first = first_indices[buckets]
+    is_later = first != np.arange(len(keys))
+    later = np.flatnonzero(is_later)
+    return np.stack([first[later], later], axis=1)
+
+
+def _band_keys(signatures: np.ndarray, num_bands: int) -> Iterator[np.ndarray]:
+    """Hash every band of the signatures to one key per chunk.
+
+    Args:
+        signatures: MinHash signatures
+        num_bands: Number of bands
+
+    Yields:
+        np.ndarray: uint64 key of every chunk in a band
+    """
+    num_chunks, signature_length = signatures.shape
+    rows = signature_length // num_bands
+    bands = signatures.reshape(num_chunks, num_bands, rows)
+    powers = np.arange(rows, dtype=np.uint64)
+    multipliers = np.uint64(BAND_MULTIPLIER) ** powers
+    for band in range(num_bands):
+        band_values = np.take(bands, band, axis=1)
+        weighted = band_values.astype(np.uint64) * multipliers
+        yield weighted.sum(axis=1, dtype=np.uint64)
+
+
+def candidate_pairs(signatures: np.ndarray, num_bands: int = NUM_BANDS) -> np.ndarray:
+    """Find chunk pairs that share at least one signature band.
+
+    Every chunk is paired with the first chunk of its bucket, which connects
+    all chunks of the bucket with ``len(bucket) - 1`` pairs. Pairs found in
+    several bands are returned once.
+
+    Args:
+        signatures: MinHash signatures
+        num_bands: Number of bands, must divide the signature length
+
+    Returns:
+        np.ndarray: Pairs of chunk indices with shape (n_pairs, 2)
+    """
+    band_pairs = [_bucket_pairs(keys) for keys in _band_keys(signatures, num_bands)]
+    earlier, later = np.concatenate(band_pairs).T
+    num_chunks = len(signatures)
+    pair_keys = np.unique(earlier * num_chunks + later)
+    return np.stack(np.divmod(pair_keys, num_chunks), axis=1)
+
+
+def pair_similarity(signatures: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    """Estimate Jaccard similarity of chunk pairs from their signatures.
+
+    Args:
+        signatures: MinHash signatures
+        pairs: Pairs of chunk indices
+
+    Returns:
+        np.ndarray: Share of equal signature values of every pair
+    """
+    similarities = [np.empty(0)]
+    for start in range(0, len(pairs), VERIFY_BLOCK_PAIRS):
+        earlier, later = pairs[start : start + VERIFY_BLOCK_PAIRS].T
+        matches = signatures[earlier] == signatures[later]
+        similarities.append(matches.mean(axis=1))
+    return np.concatenate(similarities)
+
+
+def assign_representatives(num_chunks: int, pairs: np.ndarray) -> np.ndarray:
+    """Map every chunk to the earliest kept chunk it duplicates.
+
+    Chunks are visited in input order. A chunk duplicating a kept chunk is
+    dropped, otherwise it is kept and represents itself.
+
+    Args:
+        num_chunks: Number of chunks
+        pairs: Duplicate pairs ``(earlier, later)`` with shape (n_pairs, 2)
+
+    Returns:
+        np.ndarray: Input index of the representative of every chunk
+    """
+    representative = list(range(num_chunks))
+    earlier_chunks, later_chunks = pairs.T
+    order = np.lexsort((earlier_chunks, later_chunks))
+    for earlier, later in pairs[order].tolist():
+        if representative[later] == later and representative[earlier] == earlier:
+            representative[later] = earlier
+    return np.array(representative, dtype=np.int64)
+
+
+def deduplicate_chunks(
+    chunks: Sequence[str],
+    threshold: float = DEDUP_THRESHOLD,
+    num_permutations: int = NUM_PERMUTATIONS,
+    num_bands: int = NUM_BANDS,
+) -> DedupResult:
+    """Remove near-duplicate chunks.
+
+    With 16 bands of 4 rows, pairs with Jaccard similarity of 0.8 become
+    candidates with probability above 0.999 and pairs at 0.3 with 0.12.
+    Candidates are then checked against the threshold on full signatures.
+    Every dropped chunk has estimated similarity of at least ``threshold``
+    with the chunk that replaces it.
+
+    Args:
+        chunks: Chunk texts
+        threshold: Minimum estimated Jaccard similarity of word 3-grams
+        num_permutations: MinHash signature length
+        num_bands: Number of LSH bands
+
+    Returns:
+        DedupResult: Kept chunks in input order with back-references
+    """
+    signatures = minhash_signatures(chunks, num_permutations)
+    pairs = candidate_pairs(signatures, num_bands)
+    duplicates = pairs[pair_similarity(signatures, pairs) >= threshold]
+    representative = assign_representatives(len(chunks), duplicates)
+
+    is_kept = representative == np.arange(len(chunks))
+    # Position of every chunk among the kept chunks
+    position = np.cumsum(is_kept) - 1
+    kept_chunks = [chunks[index] for index in np.flatnonzero(is_kept)]
+    unique_chunks = DedupResult(kept_chunks, position[representative])
+    logger.info(
+        'Removed %s near-duplicate chunks of %s (%.1f%%)',
+        unique_chunks.removed,
+        unique_chunks.input_size,
+        unique_chunks.shrink_ratio * 100,
+    )
+    return unique_chunks
@@ -8,8 +8,10 @@ import mammoth
 import torch
 from bs4 import BeautifulSoup
 from huggingface_hub import login
-from langchain import embeddings, llms, vectorstores
+from langchain import embeddings, vectorstores
+from langchain.llms.base import LLM
 
+from observability.langchain_tracing import TracedEmbeddings
 from Parsers.llama_parser import parse_md, parse_txt
 from RAG import html_processor, model, text_processor, types
 
@@ -51,11 +53,11 @@ def parse_document(file_path: str, output_format: str) -> List[str]:
         return text_processor.chunk_text(doc_file.readlines())
 
 
-def initialize_model() -> llms.HuggingFacePipeline:
-    """Initialize the language model.
+def initialize_model() -> LLM:
+    """Initialize the language model with the configured generation backend.
 
     Returns:
-        HuggingFacePipeline: Initialized language model
+        LLM: Initialized language model, see RAG.model.get_llm
 
     Raises:
         ValueError: If HUGGINGFACE_TOKEN is not set
@@ -67,8 +69,7 @@ def initialize_model() -> llms.HuggingFacePipeline:
     login(token=huggingface_token)
     torch.cuda.empty_cache()
 
-    _, _, llm_pipeline = model.get_model_pipeline()
-    return llms.HuggingFacePipeline(pipeline=llm_pipeline)
+    return model.get_llm()
 
 
 def create_vectorstore(text_chunks: List[str]) -> vectorstores.FAISS:
@@ -83,7 +84,7 @@ def create_vectorstore(text_chunks: List[str]) -> vectorstores.FAISS:
     model_embeddings = embeddings.HuggingFaceEmbeddings(
         model_name='sentence-transformers/distiluse-base-multilingual-cased-v2',
     )
-    return vectorstores.FAISS.from_texts(text_chunks, model_embeddings)
+    return vectorstores.FAISS.from_texts(text_chunks, TracedEmbeddings(model_embeddings))
 
 
 def parse_docx(filepath: str) -> types.DocumentData:
@@ -0,0 +1,134 @@
+"""Index of curated question/answer pairs answered without the LLM.
+
+Known questions are embedded once at startup. An incoming question that
+is close enough to a known one gets its curated answer, which skips
+retrieval and generation.
+"""
+
+import json
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from observability.telemetry import record_cache_lookup
+from RAG.config import FAQ_SIMILARITY_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+PAIRS_KEY = 'qa_pairs'
+QUESTION_KEY = 'question'
+ANSWER_KEY = 'reference_answer'
+NORM_EPSILON = 1e-12
+
+
+def normalize_question(question: str) -> str:
+    """Normalize case and whitespace for exact question matches.
+
+    Args:
+        question: Question text
+
+    Returns:
+        str: Lowercase question with single spaces
+    """
+    return ' '.join(question.lower().split())
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors to unit length.
+
+    Args:
+        vectors: Matrix with one vector per row
+
+    Returns:
+        np.ndarray: Unit vectors
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, NORM_EPSILON)
+
+
+class FAQIndex:
+    """Cosine similarity index of known questions with their answers."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        questions: Sequence[str],
+        answers: Sequence[str],
+        threshold: float = FAQ_SIMILARITY_THRESHOLD,
+    ):
+        """Embed the known questions.
+
+        Args:
+            embeddings: Embeddings model, usually the one of the QA chain
+            questions: Known questions
+            answers: Answers of the questions
+            threshold: Minimum cosine similarity for a match
+        """
+        self.embeddings = embeddings
+        self.answers = list(answers)
+        self.threshold = threshold
+        normalized = [normalize_question(question) for question in questions]
+        self._exact = {question: index for index, question in enumerate(normalized)}
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        if questions:
+            embedded = embeddings.embed_documents(list(questions))
+            self._vectors = _normalize_rows(np.asarray(embedded, dtype=np.float32))
+
+    @classmethod
+    def from_qa_pairs(
+        cls,
+        path: str,
+        embeddings: Embeddings,
+        threshold: float = FAQ_SIMILARITY_THRESHOLD,
+    ) -> 'FAQIndex':
+        """Build the index from a file in the ``dataset/qa_pairs.json`` layout.
+
+        Pairs without a reference answer are skipped.
+
+        Args:
+            path: Path to the QA pairs file
+            embeddings: Embeddings model
+            threshold: Minimum cosine similarity for a match
+
+        Returns:
+            FAQIndex: Index of the answered pairs
+        """
+        with open(path, 'r', encoding='utf-8') as pairs_file:
+            all_pairs = json.load(pairs_file)[PAIRS_KEY]
+        pairs = [pair for pair in all_pairs if pair.get(ANSWER_KEY)]
+        logger.info('Loaded %s FAQ answers from %s', len(pairs), path)
+        questions = [pair[QUESTION_KEY] for pair in pairs]
+        answers = [pair[ANSWER_KEY] for pair in pairs]
+        return cls(embeddings, questions, answers, threshold)
+
+    def __len__(self) -> int:
+        """Get number of known questions.
+
+        Returns:
+            int: Number of questions
+        """
+        return len(self.answers)
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Find the answer of the most similar known question.
+
+        Args:
+            question: Incoming question
+
+        Returns:
+            Optional[str]: Curated answer or None if no known question is similar enough
+        """
+        index = self._exact.get(normalize_question(question))
+        if index is None and len(self):
+            embedded = self.embeddings.embed_query(question)
+            query = np.asarray([embedded], dtype=np.float32)
+            similarities = self._vectors @ _normalize_rows(query)[0]
+            best = int(np.argmax(similarities))
+            logger.debug('Closest FAQ question has similarity %.3f', similarities[best])
+            if similarities[best] >= self.threshold:
+                index = best
+
+        record_cache_lookup('faq', hits=int(index is not None))
+        return None if index is None else self.answers[index]
@@ -0,0 +1,207 @@
+"""Shards of the sharded library index and the documents they hold.
+
+A shard is a FAISS vector store with the row range of every document in it.
+``LibraryDocuments`` keeps the shard and mean embedding of every document to
+prune shards before a query is searched.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain import vectorstores
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.embeddings.base import Embeddings
+
+from RAG.chunk_filter import DOC_ID_KEY
+from RAG.mmap_docstore import MmapDocstore
+from RAG.types import ChunkMetadata
+
+SHARD_DIR_TEMPLATE = 'shard_{0}'
+
+# Distance and row of a search hit in a shard
+ShardHit = Tuple[float, int]
+DocIds = Optional[Collection[str]]
+
+
+@dataclass
+class IndexShard:
+    """FAISS vector store holding the chunks of one or more documents."""
+
+    vectorstore: vectorstores.FAISS
+    # Row range [start, end) of every document in the shard
+    documents: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        """Count chunks.
+
+        Returns:
+            int: Number of indexed chunks
+        """
+        return self.vectorstore.index.ntotal
+
+    def add_document(
+        self,
+        doc_id: str,
+        chunks: Sequence[str],
+        vectors: np.ndarray,
+        metadatas: Sequence[ChunkMetadata],
+    ) -> None:
+        """Index the embedded chunks of a document.
+
+        Args:
+            doc_id: Document id, stored in the ``doc_id`` metadata of its chunks
+            chunks: Chunk texts
+            vectors: Chunk embeddings
+            metadatas: Metadata of every chunk
+        """
+        start = len(self)
+        docstore = self.vectorstore.docstore
+        is_mapped = isinstance(docstore, MmapDocstore)
+        self.vectorstore.add_embeddings(
+            zip(chunks, vectors),
+            metadatas=[{**metadata, DOC_ID_KEY: doc_id} for metadata in metadatas],
+            ids=docstore.next_ids(len(chunks)) if is_mapped else None,
+        )
+        self.documents[doc_id] = (start, len(self))
+
+    def search(self, vector: np.ndarray, top_k: int, doc_ids: DocIds = None) -> List[ShardHit]:
+        """Find the nearest chunks.
+
+        Args:
+            vector: Query embedding with shape (1, dim)
+            top_k: Number of chunks
+            doc_ids: Search only chunks of these documents
+
+        Returns:
+            List[ShardHit]: Distances and rows, nearest first
+        """
+        selector = self._selector(doc_ids)
+        search_params = None if selector is None else faiss.SearchParameters(sel=selector)
+        faiss_index = self.vectorstore.index
+        distances, rows = faiss_index.search(vector, top_k, params=search_params)
+        found = rows[0] >= 0
+        found_distances = distances[0][found].tolist()
+        found_rows = rows[0][found].tolist()
+        return list(zip(found_distances, found_rows))
+
+    def document(self, row: int) -> Document:
+        """Read the document of a row.
+
+        Args:
+            row: Row in the FAISS index
+
+        Returns:
+            Document: Chunk with metadata
+        """
+        docstore_id = self.vectorstore.index_to_docstore_id[row]
+        return self.vectorstore.docstore.search(docstore_id)
+
+    def _selector(self, doc_ids: DocIds) -> Optional[faiss.IDSelector]:
+        """Build an id selector for the rows of some documents.
+
+        Args:
+            doc_ids: Documents to search, None for all
+
+        Returns:
+            Optional[faiss.IDSelector]: Selector or None if all rows are searched
+        """
+        shard_doc_ids = set(self.documents)
+        if doc_ids is None or shard_doc_ids.issubset(doc_ids):
+            return None
+        requested = sorted(shard_doc_ids.intersection(doc_ids))
+        bounds = [self.documents[doc_id] for doc_id in requested]
+        ranges = [np.arange(start, end) for start, end in bounds]
+        rows = np.concatenate(ranges).astype(np.int64)
+        return faiss.IDSelectorBatch(rows)
+
+
+def create_shard(embeddings: Embeddings, dim: int, docstore_dir: str, position: int) -> IndexShard:
+    """Create an empty shard.
+
+    Args:
+        embeddings: Embeddings model of chunks and queries
+        dim: Embedding size
+        docstore_dir: Directory for memory-mapped shard docstores, empty keeps texts in memory
+        position: Shard position in the index
+
+    Returns:
+        IndexShard: Empty shard
+    """
+    shard_dir = os.path.join(docstore_dir, SHARD_DIR_TEMPLATE.format(position))
+    docstore = MmapDocstore.create(shard_dir) if docstore_dir else InMemoryDocstore()
+    vectorstore = vectorstores.FAISS(embeddings, faiss.IndexFlatL2(dim), docstore, {})
+    return IndexShard(vectorstore)
+
+
+class LibraryDocuments:
+    """Shard and centroid of every indexed document."""
+
+    def __init__(self) -> None:
+        """Initialize an empty library."""
+        self.doc_ids: List[str] = []
+        self.shard_positions: List[int] = []
+        self.centroids: List[np.ndarray] = []
+        self._centroid_matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        """Count documents.
+
+        Returns:
+            int: Number of documents
+        """
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, shard_position: int, centroid: np.ndarray) -> None:
+        """Register an indexed document.
+
+        Args:
+            doc_id: Document id
+            shard_position: Position of the shard holding the document
+            centroid: Mean embedding of the document chunks
+        """
+        self.doc_ids.append(doc_id)
+        self.shard_positions.append(shard_position)
+        self.centroids.append(centroid)
+        self._centroid_matrix = None
+
+    def select_shards(self, vector: np.ndarray, doc_ids: DocIds, probe_documents: int) -> Set[int]:
+        """Prune shards by requested documents and centroid distance.
+
+        Args:
+            vector: Query embedding
+            doc_ids: Requested documents, None for all
+            probe_documents: Keep only this many documents closest to the query,
+                0 keeps all
+
+        Returns:
+            Set[int]: Positions of the shards to search
+        """
+        candidates = np.arange(len(self))
+        if doc_ids is not None:
+            is_requested = np.isin(self.doc_ids, list(doc_ids))
+            candidates = np.flatnonzero(is_requested)
+        if probe_documents and len(candidates) > probe_documents:
+            candidates = self._nearest(vector, candidates, probe_documents)
+        return {self.shard_positions[index] for index in candidates}
+
+    def _nearest(self, vector: np.ndarray, candidates: np.ndarray, count: int) -> np.ndarray:
+        """Find the candidate documents with centroids closest to a query.
+
+        Args:
+            vector: Query embedding
+            candidates: Document indices
+            count: Number of documents to keep
+
+        Returns:
+            np.ndarray: Indices of the closest documents
+        """
+        if self._centroid_matrix is None:
+            self._centroid_matrix = np.stack(self.centroids)
+        offsets = self._centroid_matrix[candidates] - vector
+        distances = np.linalg.norm(offsets, axis=1)
+        nearest = np.argpartition(distances, count - 1)
+        return candidates[nearest[:count]]
@@ -0,0 +1,30 @@
+"""Ingestion of DOCX documents into a sharded library index."""
+
+import os
+
+from InformationRetrieval.token_counter import TokenCounter
+from observability.tracing import span
+from RAG.dedup import deduplicate_chunks
+from RAG.document_parser import parse_docx
+from RAG.sharded_index import ShardedIndex
+from RAG.text_processor import process_text_chunks_with_metadata
+
+
+def index_document(library: ShardedIndex, docx_path: str, token_counter: TokenCounter) -> None:
+    """Parse, chunk and deduplicate a document and add it to a library.
+
+    Args:
+        library: Library index
+        docx_path: Path to DOCX file, its file name is the document id
+        token_counter: Token counter of the embedding model
+    """
+    with span('parse'):
+        doc_data = parse_docx(docx_path)
+    doc_id = os.path.basename(docx_path)
+    text_chunks, metadatas = process_text_chunks_with_metadata(
+        doc_data,
+        doc_id,
+        token_counter=token_counter,
+    )
+    unique_chunks = deduplicate_chunks(text_chunks)
+    library.add_document(doc_id, unique_chunks.chunks, unique_chunks.metadatas(metadatas))
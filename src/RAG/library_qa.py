@@ -0,0 +1,40 @@
+"""Initialization of a QA system over a library of documents."""
+
+from typing import Sequence
+
+from langchain import chains
+
+from InformationRetrieval.token_counter import TokenCounter
+from observability.langchain_tracing import TracedEmbeddings
+from observability.telemetry import INDEX_SIZE
+from observability.tracing import span
+from RAG.library_ingest import index_document
+from RAG.llama_solo import BOT_NAME
+from RAG.model_manager import create_embeddings, create_retrieval_chain
+from RAG.sharded_index import ShardedIndex
+from RAG.sharded_retriever import ShardedRetriever
+
+
+def initialize_library_qa_system(docx_paths: Sequence[str]) -> chains.RetrievalQA:
+    """Initialize a QA system over a library of documents.
+
+    Every document is indexed in a sharded library index under its file
+    name. Table cell requests need the data of a single document, so pass
+    ``{'dataframes': []}`` as document data to ``process_query``. The search
+    threads of the index stop when the chain is garbage collected.
+
+    Args:
+        docx_paths: Paths to DOCX files
+
+    Returns:
+        RetrievalQA: QA chain retrieving from all documents
+    """
+    with span('initialize_library_qa_system', documents=len(docx_paths)):
+        model_embeddings = create_embeddings()
+        token_counter = TokenCounter.for_sentence_transformer(model_embeddings.client)
+        library = ShardedIndex(TracedEmbeddings(model_embeddings))
+        for docx_path in docx_paths:
+            index_document(library, docx_path, token_counter)
+        indexed_chunks = sum(len(shard) for shard in library.shards)
+        INDEX_SIZE.labels(bot=BOT_NAME).set(indexed_chunks)
+    return create_retrieval_chain(ShardedRetriever(index=library))
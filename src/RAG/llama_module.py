@@ -2,8 +2,10 @@
 
 import logging
 
-from langchain import chains, llms, prompts, vectorstores
+from langchain import chains, prompts, vectorstores
+from langchain.llms.base import LLM
 
+from observability.tracing import span
 from RAG.chat import chat
 from RAG.config import PROMPT_PARTS, TOP_K_DOCS
 from RAG.document_processor import (
@@ -17,7 +19,7 @@ logger = logging.getLogger(__name__)
 
 
 def create_qa_chain(
-    llm: llms.HuggingFacePipeline,
+    llm: LLM,
     vectorstore: vectorstores.FAISS,
 ) -> chains.RetrievalQA:
     """Create a RetrievalQA chain with the specified prompt template.
@@ -52,9 +54,16 @@ def process_docx(file_path: str, output_format: str = 'txt') -> None:
         file_path: Path to the DOCX file to process
         output_format: Output format for parsing ('txt' or 'md')
     """
-    validate_file(file_path, output_format)
-    text_chunks = parse_document(file_path, output_format)
-    llm = initialize_model()
-    vectorstore = create_vectorstore(text_chunks)
-    qa_chain = create_qa_chain(llm, vectorstore)
+    with span('process_docx', output_format=output_format):
+        with span('validate'):
+            validate_file(file_path, output_format)
+        with span('parse_and_chunk') as parse_span:
+            text_chunks = parse_document(file_path, output_format)
+            parse_span.set_attribute('chunks', len(text_chunks))
+        with span('model_init'):
+            llm = initialize_model()
+        with span('vectorstore', chunks=len(text_chunks)):
+            vectorstore = create_vectorstore(text_chunks)
+        qa_chain = create_qa_chain(llm, vectorstore)
+
     chat(qa_chain)
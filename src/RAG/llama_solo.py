@@ -1,47 +1,161 @@
 """Main module for standalone LLaMA RAG system."""
 
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 from langchain import chains
+from langchain.docstore.document import Document
 
-from RAG.document_parser import parse_docx
+from observability.langchain_tracing import tracing_callbacks
+from observability.telemetry import QUEUE_DEPTH, STAGE_LATENCY, serve_metrics
+from observability.tracing import NoopSpan, Span, span
+from RAG.faq_index import FAQIndex
 from RAG.io_utils import get_user_input
-from RAG.model_manager import create_qa_chain
-from RAG.table_query import get_table_cell, parse_cell_request
-from RAG.text_processor import process_text_chunks
+from RAG.metadata_filter import FilteredRetriever
+from RAG.table_query import (
+    MISSING_CELL_ANSWER,
+    get_table_cell,
+    parse_cell_request,
+)
 from RAG.types import DocumentData
 
 logger = logging.getLogger(__name__)
 
+BOT_NAME = 'llama_solo'
+QUERY_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='query')
+TABLE_CELL_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='table_cell')
+FAQ_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='faq')
+QA_CHAIN_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='qa_chain')
+QUERIES_IN_PROGRESS = QUEUE_DEPTH.labels(bot=BOT_NAME, queue='in_progress')
 
-def process_query(
+
+def find_cell_answer(
+    cell_request: Tuple[int, int, str],
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+) -> Tuple[str, List[Document]]:
+    """Look up a table cell, or its row group if the column is not found.
+
+    The row group is the indexed chunk holding the requested row, found by
+    its ``table``, ``first_row`` and ``last_row`` metadata.
+
+    Args:
+        cell_request: Table number, row number and column name
+        qa_chain: QA chain with a ``FilteredRetriever``
+        doc_data: Document data
+
+    Returns:
+        Tuple[str, List[Document]]: Cell value or ``MISSING_CELL_ANSWER``, and the
+        row group chunks if the LLM has to answer from them
+    """
+    table_num, row_num, col_name = cell_request
+    answer = get_table_cell(doc_data['dataframes'], table_num, row_num, col_name)
+    retriever = qa_chain.retriever
+    if answer != MISSING_CELL_ANSWER or not isinstance(retriever, FilteredRetriever):
+        return answer, []
+    return answer, retriever.table_row_chunks(table_num, row_num)
+
+
+def answer_cell_request(
     query: str,
+    cell_request: Tuple[int, int, str],
     qa_chain: chains.RetrievalQA,
     doc_data: DocumentData,
 ) -> str:
-    """Process user query.
+    """Answer a table cell request.
+
+    If the column is not found, the LLM answers from the row group chunk of
+    the requested row instead of retrieved chunks.
 
     Args:
         query: User query
+        cell_request: Table number, row number and column name
         qa_chain: QA chain
         doc_data: Document data
 
     Returns:
-        str: Response to query
+        str: Cell value or LLM answer
+    """
+    with TABLE_CELL_LATENCY.time():
+        answer, row_group = find_cell_answer(cell_request, qa_chain, doc_data)
+    if not row_group:
+        return answer
+
+    with QA_CHAIN_LATENCY.time():
+        return qa_chain.combine_documents_chain.run(
+            input_documents=row_group,
+            question=query,
+            callbacks=tracing_callbacks(),
+        ).strip()
+
+
+def answer_without_retrieval(
+    query: str,
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    faq_index: Optional[FAQIndex],
+    query_span: Union[Span, NoopSpan],
+) -> Optional[str]:
+    """Answer a table cell request or a known FAQ question.
+
+    Args:
+        query: User query
+        qa_chain: QA chain
+        doc_data: Document data
+        faq_index: Index of curated answers to known questions
+        query_span: Span of the query, gets the route of the answer
+
+    Returns:
+        Optional[str]: Answer or None if the query needs the QA chain
     """
     cell_request = parse_cell_request(query)
     if cell_request:
-        table_num, row_num, col_name = cell_request
-        return get_table_cell(doc_data['dataframes'], table_num, row_num, col_name)
+        query_span.set_attribute('route', 'table_cell')
+        return answer_cell_request(query, cell_request, qa_chain, doc_data)
+
+    faq_answer = None
+    if faq_index is not None:
+        with FAQ_LATENCY.time():
+            faq_answer = faq_index.lookup(query)
+    if faq_answer is not None:
+        query_span.set_attribute('route', 'faq')
+    return faq_answer
+
+
+def process_query(
+    query: str,
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    faq_index: Optional[FAQIndex] = None,
+) -> str:
+    """Process user query.
+
+    Table cell requests and known FAQ questions are answered without the LLM.
+
+    Args:
+        query: User query
+        qa_chain: QA chain
+        doc_data: Document data
+        faq_index: Index of curated answers to known questions
 
-    return qa_chain.run(query).strip()
+    Returns:
+        str: Response to query
+    """
+    with span('query', query_chars=len(query)) as query_span, QUERY_LATENCY.time():
+        with QUERIES_IN_PROGRESS.track_in_progress():
+            answer = answer_without_retrieval(query, qa_chain, doc_data, faq_index, query_span)
+            if answer is None:
+                query_span.set_attribute('route', 'qa_chain')
+                with QA_CHAIN_LATENCY.time():
+                    answer = qa_chain.run(query, callbacks=tracing_callbacks()).strip()
+    return answer
 
 
 def handle_query(
     query: Optional[str],
     qa_chain: chains.RetrievalQA,
     doc_data: DocumentData,
+    faq_index: Optional[FAQIndex] = None,
 ) -> bool:
     """Handle a single query.
 
@@ -49,6 +163,7 @@ def handle_query(
         query: User query
         qa_chain: QA chain
         doc_data: Document data
+        faq_index: Index of curated answers to known questions
 
     Returns:
         bool: True if chat should continue, False otherwise
@@ -61,7 +176,7 @@ def handle_query(
         return False
 
     try:
-        response = process_query(query, qa_chain, doc_data)
+        response = process_query(query, qa_chain, doc_data, faq_index)
     except Exception as error:
         logger.error('Error processing query: %s', error)
         raise
@@ -70,30 +185,21 @@ def handle_query(
     return True
 
 
-def initialize_qa_system(docx_path: str) -> tuple[chains.RetrievalQA, DocumentData]:
-    """Initialize QA system.
-
-    Args:
-        docx_path: Path to DOCX file
-
-    Returns:
-        tuple: (QA chain, Document data)
-    """
-    doc_data = parse_docx(docx_path)
-    text_chunks = process_text_chunks(doc_data)
-    qa_chain = create_qa_chain(text_chunks)
-    return qa_chain, doc_data
-
-
-def run_chat_session(qa_chain: chains.RetrievalQA, doc_data: DocumentData) -> None:
+def run_chat_session(
+    qa_chain: chains.RetrievalQA,
+    doc_data: DocumentData,
+    faq_index: Optional[FAQIndex] = None,
+) -> None:
     """Run interactive chat session.
 
     Args:
         qa_chain: QA chain
         doc_data: Document data
+        faq_index: Index of curated answers to known questions
     """
+    serve_metrics()
     logger.info("Chat session started. Type 'exit' to end.")
     while True:
         query = get_user_input()
-        if not handle_query(query, qa_chain, doc_data):
+        if not handle_query(query, qa_chain, doc_data, faq_index):
             break
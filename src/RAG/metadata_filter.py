@@ -0,0 +1,328 @@
+"""Metadata filters compiled to bitmaps of FAISS rows.
+
+Every chunk carries its document id, source type (``paragraph`` or
+``table``) and, for table chunks, the table number and row range. At index
+time one bitmap of FAISS rows is precomputed per document, source type and
+table. A chunk kept by deduplication sets its bit in the bitmaps of every
+chunk merged into it, so a filter finds it for any of their tables and rows.
+A filter is compiled by AND-ing the packed bitmaps of its values and is
+passed to FAISS as an ``IDSelectorBitmap``, so rows outside the filter are
+skipped inside the index scan. A filtered query scans the index once like an
+unfiltered one and always returns ``k`` matching chunks when there are that
+many, unlike post-hoc filtering of a larger top-k.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain import vectorstores
+from langchain.docstore.document import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.vectorstores import VectorStoreRetriever
+
+from RAG.chunk_filter import (
+    DOC_ID_KEY,
+    FIRST_ROW_KEY,
+    LAST_ROW_KEY,
+    NO_ROW,
+    SOURCE_KEY,
+    TABLE_KEY,
+    ChunkFilter,
+)
+from RAG.config import TOP_K_DOCS
+from RAG.types import ChunkMetadata
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys with a precomputed bitmap per value
+BITMAP_KEYS = (DOC_ID_KEY, SOURCE_KEY, TABLE_KEY)
+# Compiled filters kept for repeated queries
+FILTER_CACHE_SIZE = 64
+
+# Metadata key and value of a precomputed bitmap
+BitmapKey = Tuple[str, object]
+# Chunks of one query with their L2 distances
+ScoredDocuments = List[Tuple[Document, float]]
+
+
+class MetadataBitmaps:
+    """Precomputed bitmaps of FAISS rows by metadata value."""
+
+    def __init__(
+        self,
+        metadatas: Sequence[ChunkMetadata],
+        chunk_rows: Optional[np.ndarray] = None,
+    ) -> None:
+        """Index chunk metadata.
+
+        Args:
+            metadatas: Metadata of every chunk
+            chunk_rows: FAISS row of every chunk, one row per chunk in order by default.
+                Chunks merged by deduplication share the row of the kept chunk,
+                pass ``DedupResult.representative``
+        """
+        if chunk_rows is None:
+            chunk_rows = np.arange(len(metadatas))
+        self._chunk_rows = np.asarray(chunk_rows)
+        last_row = self._chunk_rows.max(initial=-1)
+        self.size = int(last_row) + 1
+        self._bitmaps: Dict[BitmapKey, np.ndarray] = {}
+        for bitmap_key, chunk_mask in _value_masks(metadatas).items():
+            self._bitmaps[bitmap_key] = self._pack_chunks(chunk_mask)
+        self._first_rows = _row_bounds(metadatas, FIRST_ROW_KEY)
+        self._last_rows = _row_bounds(metadatas, LAST_ROW_KEY)
+        self._empty = _pack(np.zeros(self.size, dtype=bool))
+        self._all = _pack(np.ones(self.size, dtype=bool))
+        self._compiled: OrderedDict[ChunkFilter, np.ndarray] = OrderedDict()
+
+    def compile(self, chunk_filter: ChunkFilter) -> np.ndarray:
+        """Compile a filter to a bitmap of matching rows.
+
+        Args:
+            chunk_filter: Filter
+
+        Returns:
+            np.ndarray: Packed little-endian bitmap as read by ``faiss.IDSelectorBitmap``
+        """
+        bitmap = self._compiled.get(chunk_filter)
+        if bitmap is None:
+            bitmap = self._match(chunk_filter)
+            self._compiled[chunk_filter] = bitmap
+            if len(self._compiled) > FILTER_CACHE_SIZE:
+                self._compiled.popitem(last=False)
+        self._compiled.move_to_end(chunk_filter)
+        return bitmap
+
+    def rows(self, chunk_filter: ChunkFilter) -> np.ndarray:
+        """List FAISS rows matching a filter.
+
+        Args:
+            chunk_filter: Filter
+
+        Returns:
+            np.ndarray: Matching rows in index order
+        """
+        bitmap = self.compile(chunk_filter)
+        mask = np.unpackbits(bitmap, count=self.size, bitorder='little')
+        return np.flatnonzero(mask)
+
+    def count(self, chunk_filter: ChunkFilter) -> int:
+        """Count chunks matching a filter.
+
+        Args:
+            chunk_filter: Filter
+
+        Returns:
+            int: Number of matching rows
+        """
+        return len(self.rows(chunk_filter))
+
+    def _match(self, chunk_filter: ChunkFilter) -> np.ndarray:
+        """AND the bitmaps of the values set in a filter.
+
+        Args:
+            chunk_filter: Filter
+
+        Returns:
+            np.ndarray: Packed bitmap
+        """
+        bitmap = self._all
+        if chunk_filter.doc_ids is not None:
+            bitmap = bitmap & self._any_of(DOC_ID_KEY, chunk_filter.doc_ids)
+        value_filters = ((SOURCE_KEY, chunk_filter.source), (TABLE_KEY, chunk_filter.table))
+        for key, filter_value in value_filters:
+            if filter_value is not None:
+                bitmap = bitmap & self._any_of(key, [filter_value])
+        if chunk_filter.rows is not None:
+            first_row, last_row = chunk_filter.rows
+            starts_before = self._first_rows <= last_row
+            ends_after = (self._last_rows >= first_row) & (self._last_rows != NO_ROW)
+            bitmap = bitmap & self._pack_chunks(starts_before & ends_after)
+        return bitmap
+
+    def _pack_chunks(self, chunk_mask: np.ndarray) -> np.ndarray:
+        """Pack a mask of chunks into a bitmap of the rows holding them.
+
+        Args:
+            chunk_mask: Boolean mask of chunks
+
+        Returns:
+            np.ndarray: Packed bitmap of FAISS rows
+        """
+        row_mask = np.zeros(self.size, dtype=bool)
+        row_mask[self._chunk_rows[chunk_mask]] = True
+        return _pack(row_mask)
+
+    def _any_of(self, key: str, accepted: Sequence[object]) -> np.ndarray:
+        """OR the bitmaps of several values of a key.
+
+        Args:
+            key: Metadata key
+            accepted: Accepted values
+
+        Returns:
+            np.ndarray: Packed bitmap
+        """
+        bitmap_keys = [(key, accepted_value) for accepted_value in accepted]
+        value_bitmaps = [self._bitmaps.get(bitmap_key, self._empty) for bitmap_key in bitmap_keys]
+        return np.bitwise_or.reduce([self._empty, *value_bitmaps])
+
+
+def filtered_search(
+    vectorstore: vectorstores.FAISS,
+    vectors: Sequence[Sequence[float]],
+    top_k: int,
+    bitmap: Optional[np.ndarray] = None,
+) -> List[ScoredDocuments]:
+    """Search only the rows set in a bitmap, all queries in one index scan.
+
+    Args:
+        vectorstore: FAISS vector store
+        vectors: Query embeddings
+        top_k: Number of chunks per query
+        bitmap: Packed bitmap from ``MetadataBitmaps.compile``, None searches all rows
+
+    Returns:
+        List[ScoredDocuments]: Chunks with L2 distances of every query, nearest first
+    """
+    empty_filter = bitmap is not None and not bitmap.any()
+    if empty_filter or not vectors:
+        return [[] for _ in vectors]
+    search_params = None
+    if bitmap is not None:
+        search_params = faiss.SearchParameters(sel=faiss.IDSelectorBitmap(bitmap))
+    queries = np.asarray(vectors, dtype=np.float32)
+    distances, rows = vectorstore.index.search(queries, top_k, params=search_params)
+    hits = []
+    for query_distances, query_rows in zip(distances.astype(float), rows):
+        found = query_rows >= 0
+        documents = _read_documents(vectorstore, query_rows[found])
+        hits.append(list(zip(documents, query_distances[found])))
+    return hits
+
+
+class FilteredRetriever(VectorStoreRetriever):
+    """FAISS retriever applying a metadata filter inside the index scan.
+
+    Set ``chunk_filter`` to restrict the following queries, None searches all chunks.
+    ``retrieve_many`` applies the filter to batches of queries.
+    """
+
+    bitmaps: MetadataBitmaps
+    chunk_filter: Optional[ChunkFilter] = None
+
+    def table_row_chunks(self, table: int, row: int) -> List[Document]:
+        """Read the indexed chunks holding a table row.
+
+        Args:
+            table: 1-based table number
+            row: 1-based row number
+
+        Returns:
+            List[Document]: Chunks whose indexed row range holds the row, in index order
+        """
+        row_filter = ChunkFilter.tables(table=table, rows=(row, row))
+        return _read_documents(self.vectorstore, self.bitmaps.rows(row_filter))
+
+    def retrieve_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """Retrieve the nearest chunks matching the filter for every query.
+
+        The queries are embedded with one ``embed_documents`` call, which gives
+        the same vectors as ``embed_query`` for HuggingFace sentence embeddings,
+        and searched in one index scan.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            List[List[Document]]: Nearest chunks of every query
+        """
+        vectors = []
+        if queries:
+            vectors = self.vectorstore.embeddings.embed_documents(list(queries))
+        bitmap = None
+        if self.chunk_filter is not None:
+            bitmap = self.bitmaps.compile(self.chunk_filter)
+        top_k = self.search_kwargs.get('k', TOP_K_DOCS)
+        hits = filtered_search(self.vectorstore, vectors, top_k, bitmap)
+        return [[document for document, _ in query_hits] for query_hits in hits]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        """Retrieve the nearest chunks matching the filter.
+
+        Args:
+            query: Query text
+            run_manager: Callback manager of the retriever run
+
+        Returns:
+            List[Document]: Nearest chunks
+        """
+        if self.chunk_filter is None:
+            return super()._get_relevant_documents(query, run_manager=run_manager)
+        bitmap = self.bitmaps.compile(self.chunk_filter)
+        vector = self.vectorstore.embeddings.embed_query(query)
+        top_k = self.search_kwargs.get('k', TOP_K_DOCS)
+        hits = filtered_search(self.vectorstore, [vector], top_k, bitmap)
+        return [document for document, _ in hits[0]]
+
+
+def _value_masks(metadatas: Sequence[ChunkMetadata]) -> Dict[BitmapKey, np.ndarray]:
+    """Find the chunks of every value of the bitmap keys.
+
+    Args:
+        metadatas: Metadata of every chunk
+
+    Returns:
+        Dict[BitmapKey, np.ndarray]: Boolean chunk mask by metadata key and value
+    """
+    masks: Dict[BitmapKey, np.ndarray] = {}
+    for key in BITMAP_KEYS:
+        chunk_values = [metadata.get(key) for metadata in metadatas]
+        key_values = np.array(chunk_values, dtype=object)
+        for metadata_value in set(key_values.tolist()) - {None}:
+            masks[key, metadata_value] = key_values == metadata_value
+    return masks
+
+
+def _row_bounds(metadatas: Sequence[ChunkMetadata], key: str) -> np.ndarray:
+    """Collect the first or last table row of every chunk.
+
+    Args:
+        metadatas: Metadata of every chunk
+        key: FIRST_ROW_KEY or LAST_ROW_KEY
+
+    Returns:
+        np.ndarray: Row of every chunk, NO_ROW for paragraph chunks
+    """
+    bounds = [metadata.get(key, NO_ROW) for metadata in metadatas]
+    return np.array(bounds, dtype=np.int64)
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean row mask into a bitmap.
+
+    Args:
+        mask: Boolean mask of rows
+
+    Returns:
+        np.ndarray: uint8 bitmap, bit ``i % 8`` of byte ``i // 8`` is row ``i``
+    """
+    return np.packbits(mask, bitorder='little')
+
+
+def _read_documents(vectorstore: vectorstores.FAISS, rows: np.ndarray) -> List[Document]:
+    """Read the documents of FAISS rows.
+
+    Args:
+        vectorstore: FAISS vector store
+        rows: Rows in the FAISS index
+
+    Returns:
+        List[Document]: Documents in row order
+    """
+    docstore = vectorstore.docstore
+    docstore_ids = vectorstore.index_to_docstore_id
+    return [docstore.search(docstore_ids[row]) for row in rows.tolist()]
@@ -0,0 +1,122 @@
+"""MinHash signatures of word 3-gram shingles.
+
+Shingles are hashed with multiply-shift hash functions vectorized with
+numpy, so memory grows linearly with the number of chunks.
+"""
+
+import zlib
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+NUM_PERMUTATIONS = 64
+SHINGLE_WORDS = 3
+# Shingles hashed per vectorized block (2**16), bounds temporary memory to ~32 MB
+BLOCK_SHINGLES = 65536
+HASH_SHIFT_BITS = 32
+HASH_SHIFT = np.uint64(HASH_SHIFT_BITS)
+RANDOM_SEED = 1
+ENCODING = 'utf-8'
+
+# uint64 shingle hashes of a block and the offset of every chunk in them
+ShingleBlock = Tuple[np.ndarray, np.ndarray]
+
+
+def shingle_hashes(text: str) -> List[int]:
+    """Hash the word 3-grams of a text.
+
+    Texts shorter than a shingle are hashed as a whole.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        List[int]: 32-bit hashes of the shingles
+    """
+    words = text.lower().split()
+    num_shingles = max(len(words) - SHINGLE_WORDS + 1, 1)
+    starts = range(num_shingles)
+    windows = (words[start : start + SHINGLE_WORDS] for start in starts)
+    shingles = (' '.join(window) for window in windows)
+    return [zlib.crc32(shingle.encode(ENCODING)) for shingle in shingles]
+
+
+def _permutations(num_permutations: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Draw multiply-shift hash functions ``(a * x + b) mod 2**64 >> 32``.
+
+    They need no modulo by a prime, which is the slowest part of hashing.
+
+    Args:
+        num_permutations: Number of hash functions
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Odd multipliers and offsets
+    """
+    rng = np.random.default_rng(RANDOM_SEED)
+    max_value = np.iinfo(np.uint64).max
+    multipliers, offsets = (
+        rng.integers(
+            0,
+            max_value,
+            size=num_permutations,
+            dtype=np.uint64,
+            endpoint=True,
+        )
+        for _ in range(2)
+    )
+    return multipliers | np.uint64(1), offsets
+
+
+def _as_block(hashes: List[int], offsets: List[int]) -> ShingleBlock:
+    """Convert collected shingle hashes and chunk offsets to arrays.
+
+    Args:
+        hashes: Shingle hashes of a block
+        offsets: Offset of every chunk in the hashes
+
+    Returns:
+        ShingleBlock: Hashes and chunk offsets
+    """
+    hash_array = np.array(hashes, dtype=np.uint64)
+    return hash_array, np.array(offsets)
+
+
+def _shingle_blocks(chunks: Sequence[str]) -> Iterator[ShingleBlock]:
+    """Group chunk shingles into blocks of about ``BLOCK_SHINGLES`` hashes.
+
+    Args:
+        chunks: Chunk texts
+
+    Yields:
+        ShingleBlock: Hashes and chunk offsets of a block
+    """
+    hashes: List[int] = []
+    offsets: List[int] = []
+    for chunk in chunks:
+        offsets.append(len(hashes))
+        hashes.extend(shingle_hashes(chunk))
+        if len(hashes) >= BLOCK_SHINGLES:
+            yield _as_block(hashes, offsets)
+            hashes, offsets = [], []
+    if offsets:
+        yield _as_block(hashes, offsets)
+
+
+def minhash_signatures(chunks: Sequence[str], num_permutations: int = NUM_PERMUTATIONS) -> np.ndarray:
+    """Compute MinHash signatures of chunks.
+
+    Args:
+        chunks: Chunk texts
+        num_permutations: Signature length
+
+    Returns:
+        np.ndarray: uint32 signatures with shape (n_chunks, num_permutations)
+    """
+    multipliers, offsets = _permutations(num_permutations)
+    blocks = [np.empty((0, num_permutations), dtype=np.uint32)]
+    for hashes, chunk_offsets in _shingle_blocks(chunks):
+        column = hashes.reshape(-1, 1)
+        permuted = (column * multipliers + offsets) >> HASH_SHIFT
+        block = np.minimum.reduceat(permuted, chunk_offsets, axis=0)
+        blocks.append(block.astype(np.uint32))
+    return np.concatenate(blocks)
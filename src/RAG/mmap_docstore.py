@@ -0,0 +1,161 @@
+"""Memory-mapped chunk store for the FAISS vector store.
+
+Chunk texts are appended to a single file and their end offsets to an
+offsets file. Every metadata key is a column stored the same way with JSON
+encoded values. Files are read through ``mmap``, so a query decodes only the
+texts of its top-k chunks and the store itself holds no text in memory.
+Pickling the store keeps only its directory, which keeps ``FAISS.save_local``
+output small.
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Union
+
+from langchain import vectorstores
+from langchain.docstore.base import AddableMixin, Docstore
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+
+from RAG.blob_column import (
+    BLOB_SUFFIX,
+    ENCODING,
+    OFFSETS_SUFFIX,
+    BlobColumn,
+    MetadataColumns,
+)
+from RAG.config import DOCSTORE_DIR
+from RAG.types import ChunkMetadata
+
+logger = logging.getLogger(__name__)
+
+TEXTS_COLUMN = 'texts'
+
+
+class MmapDocstore(Docstore, AddableMixin):
+    """Docstore reading chunk texts and metadata columns through ``mmap``.
+
+    Document ids are row numbers as strings, pass ``ids=store.next_ids(n)``
+    to ``FAISS.from_texts`` or ``FAISS.add_texts``. Metadata columns are
+    read through ``metadata`` and chunk texts through ``texts``.
+    """
+
+    def __init__(self, directory: str):
+        """Open or create a store.
+
+        Args:
+            directory: Directory of the store files
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.metadata = MetadataColumns(directory)
+        self.texts = BlobColumn(os.path.join(directory, TEXTS_COLUMN))
+
+    @classmethod
+    def create(cls, directory: str) -> 'MmapDocstore':
+        """Create an empty store, removing the files of a previous store.
+
+        Args:
+            directory: Directory of the store files
+
+        Returns:
+            MmapDocstore: Empty store
+        """
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if file_name.endswith((BLOB_SUFFIX, OFFSETS_SUFFIX)):
+                    os.remove(os.path.join(directory, file_name))
+        return cls(directory)
+
+    def __getstate__(self) -> str:
+        """Pickle only the directory.
+
+        Returns:
+            str: Directory of the store files
+        """
+        return self.directory
+
+    def __setstate__(self, directory: str) -> None:
+        """Reopen the store files on unpickling.
+
+        Args:
+            directory: Directory of the store files
+        """
+        MmapDocstore.__init__(self, directory)
+
+    def next_ids(self, count: int) -> List[str]:
+        """Get the ids of the next documents to add.
+
+        Args:
+            count: Number of documents
+
+        Returns:
+            List[str]: Consecutive row numbers as strings
+        """
+        start = len(self.texts)
+        return [str(row) for row in range(start, start + count)]
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Append documents.
+
+        Args:
+            texts: Documents by id, ids must be ``next_ids(len(texts))`` in order
+
+        Raises:
+            ValueError: If ids are not the next row numbers
+        """
+        if list(texts) != self.next_ids(len(texts)):
+            raise ValueError('MmapDocstore ids must be consecutive row numbers, use next_ids()')
+        documents = list(texts.values())
+        metadatas = [document.metadata for document in documents]
+        self.metadata.append(metadatas, len(self.texts))
+        page_contents = [document.page_content for document in documents]
+        self.texts.append([page_content.encode(ENCODING) for page_content in page_contents])
+
+    def search(self, search: str) -> Union[str, Document]:
+        """Read a document.
+
+        Args:
+            search: Document id
+
+        Returns:
+            Union[str, Document]: Document, or a message if the id is unknown
+            as in ``InMemoryDocstore``
+        """
+        stored_rows = len(self.texts)
+        row = int(search) if search.isdigit() else stored_rows
+        if row >= stored_rows:
+            return f'ID {search} not found.'
+        page_content = self.texts.get(row).decode(ENCODING)
+        return Document(page_content=page_content, metadata=self.metadata.read(row))
+
+
+def build_vectorstore(
+    text_chunks: List[str],
+    model_embeddings: Embeddings,
+    metadatas: Optional[List[ChunkMetadata]] = None,
+    docstore_dir: str = DOCSTORE_DIR,
+) -> vectorstores.FAISS:
+    """Embed chunks into a FAISS vector store.
+
+    Args:
+        text_chunks: Chunk texts
+        model_embeddings: Embeddings model
+        metadatas: Metadata of every chunk
+        docstore_dir: Directory of a memory-mapped chunk store, replaced if it exists.
+            Empty keeps chunk texts in memory
+
+    Returns:
+        FAISS: Vector store
+    """
+    if not docstore_dir:
+        return vectorstores.FAISS.from_texts(text_chunks, model_embeddings, metadatas=metadatas)
+
+    docstore = MmapDocstore.create(docstore_dir)
+    return vectorstores.FAISS.from_texts(
+        text_chunks,
+        model_embeddings,
+        metadatas=metadatas,
+        ids=docstore.next_ids(len(text_chunks)),
+        docstore=docstore,
+    )
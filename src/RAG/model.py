@@ -1,8 +1,19 @@
-"""Model initialization and pipeline setup for the LLaMA RAG system."""
+"""Model initialization and pipeline setup for the LLaMA RAG system.
 
-from typing import Tuple
+The generation backend is chosen by ``MODEL_CONFIG['backend']``:
+
+- ``cuda_4bit``: NF4 4-bit weights on a CUDA GPU via bitsandbytes
+- ``cpu_bf16``: bfloat16 weights on CPU
+- ``cpu_int8``: int8 dynamically quantized linear layers on CPU
+- ``gguf``: a quantized GGUF model served by llama.cpp
+- ``auto``: ``cuda_4bit`` if a GPU is available, ``cpu_bf16`` otherwise
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
 
 import torch
+from langchain.llms.base import LLM
 from transformers import (
     AutoModelForCausalLM,
     AutoTokenizer,
@@ -10,42 +21,126 @@ from transformers import (
     pipeline,
 )
 
-from RAG.config import MODEL_CONFIG
+from RAG.config import MODEL_CONFIG, PROMPT_PARTS
+from RAG.prefix_cache import create_prefix_cached_llm
 
+logger = logging.getLogger(__name__)
+
+BACKEND_AUTO = 'auto'
+BACKEND_CUDA_NF4 = 'cuda_4bit'
+BACKEND_CPU_BF16 = 'cpu_bf16'
+BACKEND_CPU_INT8 = 'cpu_int8'
+BACKEND_GGUF = 'gguf'
+HF_BACKENDS = (BACKEND_CUDA_NF4, BACKEND_CPU_BF16, BACKEND_CPU_INT8)
+BACKENDS = (*HF_BACKENDS, BACKEND_GGUF)
+
+
+def detect_backend() -> str:
+    """Choose a HuggingFace backend for the available hardware.
+
+    Returns:
+        str: 'cuda_4bit' if a CUDA GPU is available, 'cpu_bf16' otherwise
+    """
+    if torch.cuda.is_available():
+        return BACKEND_CUDA_NF4
+    return BACKEND_CPU_BF16
 
-def get_model_pipeline(device: str = 'cuda') -> Tuple[AutoTokenizer, AutoModelForCausalLM, pipeline]:
-    """Initialize the model pipeline with the specified configuration.
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Resolve the backend name from an argument or the model configuration.
 
     Args:
-        device: Device to run the model on ('cuda' or 'cpu')
+        backend: Backend name. Defaults to ``MODEL_CONFIG['backend']``
 
     Returns:
-        Tuple containing:
-            - tokenizer: Configured tokenizer
-            - model: Loaded and configured model
-            - pipeline: Text generation pipeline
+        str: One of ``BACKENDS``
+
+    Raises:
+        ValueError: If the backend is unknown
     """
-    bnb_config = BitsAndBytesConfig(
-        load_in_4bit=True,
-        bnb_4bit_use_double_quant=True,
-        bnb_4bit_quant_type='nf4',
-        bnb_4bit_compute_dtype=torch.bfloat16,
-    )
+    backend = backend or str(MODEL_CONFIG['backend'])
+    if backend == BACKEND_AUTO:
+        backend = detect_backend()
+    if backend not in BACKENDS:
+        choices = ', '.join((BACKEND_AUTO, *BACKENDS))
+        raise ValueError(f'Unknown generation backend: {backend}. Use one of: {choices}')
+    return backend
 
-    tokenizer = AutoTokenizer.from_pretrained(
-        MODEL_CONFIG['name'],
-        cache_dir=MODEL_CONFIG['cache_dir'],
-    )
 
+def load_tokenizer(model_name: str) -> AutoTokenizer:
+    """Load the tokenizer of a causal language model.
+
+    Args:
+        model_name: HuggingFace model name or path
+
+    Returns:
+        AutoTokenizer: Tokenizer with a padding token
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=MODEL_CONFIG['cache_dir'])
     if 'pad_token' not in tokenizer.special_tokens_map:
         tokenizer.add_special_tokens({'pad_token': '[PAD]'})
+    return tokenizer
+
+
+def load_causal_lm(backend: str, model_name: str) -> AutoModelForCausalLM:
+    """Load a causal language model for a HuggingFace backend.
+
+    Args:
+        backend: One of ``HF_BACKENDS``
+        model_name: HuggingFace model name or path
+
+    Returns:
+        AutoModelForCausalLM: Model in eval mode
+
+    Raises:
+        ValueError: If the backend does not run HuggingFace models
+    """
+    if backend not in HF_BACKENDS:
+        raise ValueError(f'Backend {backend} does not run HuggingFace models')
+
+    load_kwargs: Dict[str, object] = {'cache_dir': MODEL_CONFIG['cache_dir']}
+    if backend == BACKEND_CUDA_NF4:
+        # Quantized weights are placed by device_map and cannot be moved with .to()
+        load_kwargs['device_map'] = 'auto'
+        load_kwargs['quantization_config'] = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_quant_type='nf4',
+            bnb_4bit_compute_dtype=torch.bfloat16,
+        )
+    elif backend == BACKEND_CPU_BF16:
+        load_kwargs['dtype'] = torch.bfloat16
+    else:
+        load_kwargs['dtype'] = torch.float32
 
-    model = AutoModelForCausalLM.from_pretrained(
-        MODEL_CONFIG['name'],
-        device_map='auto',
-        cache_dir=MODEL_CONFIG['cache_dir'],
-        quantization_config=bnb_config,
-    ).to(device)
+    model = AutoModelForCausalLM.from_pretrained(model_name, **load_kwargs).eval()
+    if backend == BACKEND_CPU_INT8:
+        quantized_layers = {torch.nn.Linear}
+        model = torch.ao.quantization.quantize_dynamic(model, quantized_layers, dtype=torch.qint8)
+    return model
+
+
+def get_model_pipeline(
+    backend: Optional[str] = None,
+    model_name: Optional[str] = None,
+) -> Tuple[AutoTokenizer, AutoModelForCausalLM, pipeline]:
+    """Initialize the model pipeline with the specified configuration.
+
+    Args:
+        backend: HuggingFace backend name or 'auto'. Defaults to ``MODEL_CONFIG['backend']``
+        model_name: HuggingFace model name or path. Defaults to ``MODEL_CONFIG['name']``
+
+    Returns:
+        Tuple containing:
+            - tokenizer: Configured tokenizer
+            - model: Loaded and configured model
+            - pipeline: Text generation pipeline
+    """
+    backend = resolve_backend(backend)
+    model_name = model_name or str(MODEL_CONFIG['name'])
+    logger.info('Loading %s with the %s backend', model_name, backend)
+    model = load_causal_lm(backend, model_name)
+    tokenizer = load_tokenizer(model_name)
 
     text_pipeline = pipeline(
         'text-generation',
@@ -58,3 +153,65 @@ def get_model_pipeline(device: str = 'cuda') -> Tuple[AutoTokenizer, AutoModelFo
     )
 
     return tokenizer, model, text_pipeline
+
+
+def create_gguf_llm(model_path: Optional[str] = None) -> LLM:
+    """Create a llama.cpp LLM for a GGUF model.
+
+    llama.cpp keeps the key/value cache of the previous prompt and reuses its
+    longest common prefix, so the static prompt prefix is not prefilled again.
+
+    Args:
+        model_path: Path to the .gguf file. Defaults to ``MODEL_CONFIG['gguf_path']``
+
+    Returns:
+        LLM: LangChain LLM
+
+    Raises:
+        ValueError: If no GGUF file is configured
+        ImportError: If llama-cpp-python is not installed
+    """
+    model_path = model_path or str(MODEL_CONFIG['gguf_path'])
+    if not model_path:
+        raise ValueError("Set MODEL_CONFIG['gguf_path'] to use the gguf backend")
+    try:
+        from langchain_community.llms import LlamaCpp  # noqa: WPS433
+    except ImportError as error:
+        raise ImportError('The gguf backend requires llama-cpp-python: pip install llama-cpp-python') from error
+
+    return LlamaCpp(
+        model_path=model_path,
+        n_ctx=MODEL_CONFIG['gguf_context_size'],
+        n_threads=MODEL_CONFIG['gguf_threads'] or None,
+        max_tokens=MODEL_CONFIG['max_new_tokens'],
+        temperature=MODEL_CONFIG['temperature'],
+        top_k=MODEL_CONFIG['top_k'],
+        verbose=False,
+    )
+
+
+def get_llm(backend: Optional[str] = None) -> LLM:
+    """Initialize the language model for the configured backend.
+
+    HuggingFace backends get the static prompt prefix prefilled once and
+    speculative decoding if ``MODEL_CONFIG`` sets a draft model or prompt lookup.
+
+    Args:
+        backend: Backend name or 'auto'. Defaults to ``MODEL_CONFIG['backend']``
+
+    Returns:
+        LLM: LangChain LLM that answers prompts built from ``PROMPT_PARTS``
+    """
+    backend = resolve_backend(backend)
+    if backend == BACKEND_GGUF:
+        return create_gguf_llm()
+    tokenizer, model, _ = get_model_pipeline(backend)
+    llm = create_prefix_cached_llm(tokenizer, model, ['\n'.join(PROMPT_PARTS)])
+
+    draft_name = str(MODEL_CONFIG['draft_model'])
+    prompt_lookup_tokens = int(MODEL_CONFIG['prompt_lookup_tokens'])
+    if draft_name or prompt_lookup_tokens:
+        draft_model = load_causal_lm(backend, draft_name) if draft_name else None
+        llm.generator.enable_speculation(draft_model, prompt_lookup_tokens)
+        logger.info('Speculative decoding with %s', draft_name or f'prompt lookup of {prompt_lookup_tokens} tokens')
+    return llm
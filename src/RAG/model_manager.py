@@ -2,18 +2,18 @@
 
 import logging
 import os
+from typing import List, Optional
 
 import torch
 from huggingface_hub import login
-from langchain import chains, embeddings, llms, prompts, vectorstores
-from transformers import (
-    AutoModelForCausalLM,
-    AutoTokenizer,
-    BitsAndBytesConfig,
-    pipeline,
-)
+from langchain import chains, embeddings, prompts
+from langchain_core.retrievers import BaseRetriever
 
-from RAG.config import MODEL_CONFIG, PROMPT_PARTS
+from observability.tracing import span
+from RAG.chunk_index import build_chunk_retriever
+from RAG.config import EMBEDDING_MODEL, PROMPT_PARTS
+from RAG.model import get_llm
+from RAG.types import ChunkMetadata
 
 logger = logging.getLogger(__name__)
 
@@ -32,71 +32,60 @@ def initialize_huggingface() -> None:
     torch.cuda.empty_cache()
 
 
-def create_model_pipeline() -> tuple[AutoTokenizer, AutoModelForCausalLM, pipeline]:
-    """Create model pipeline.
+def create_embeddings() -> embeddings.HuggingFaceEmbeddings:
+    """Load the embeddings model of the vector store.
 
     Returns:
-        tuple: (tokenizer, model, pipeline)
+        HuggingFaceEmbeddings: Embeddings, ``client`` is the SentenceTransformer model
     """
-    tokenizer = AutoTokenizer.from_pretrained(
-        MODEL_CONFIG['name'],
-        cache_dir=MODEL_CONFIG['cache_dir'],
-    )
-    if 'pad_token' not in tokenizer.special_tokens_map:
-        tokenizer.add_special_tokens({'pad_token': '[PAD]'})
-
-    bnb_config = BitsAndBytesConfig(
-        load_in_4bit=True,
-        bnb_4bit_use_double_quant=True,
-        bnb_4bit_quant_type='nf4',
-        bnb_4bit_compute_dtype=torch.bfloat16,
-    )
-
-    model = AutoModelForCausalLM.from_pretrained(
-        MODEL_CONFIG['name'],
-        device_map='auto',
-        cache_dir=MODEL_CONFIG['cache_dir'],
-        quantization_config=bnb_config,
-    ).to('cuda')
-
-    text_pipeline = pipeline(
-        'text-generation',
-        model=model,
-        tokenizer=tokenizer,
-        max_new_tokens=MODEL_CONFIG['max_new_tokens'],
-        temperature=MODEL_CONFIG['temperature'],
-        top_k=MODEL_CONFIG['top_k'],
-        pad_token_id=tokenizer.eos_token_id,
-    )
+    return embeddings.HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
 
-    return tokenizer, model, text_pipeline
 
-
-def create_qa_chain(text_chunks: list[str]) -> chains.RetrievalQA:
+def create_qa_chain(
+    text_chunks: list[str],
+    model_embeddings: Optional[embeddings.HuggingFaceEmbeddings] = None,
+    metadatas: Optional[List[ChunkMetadata]] = None,
+) -> chains.RetrievalQA:
     """Create QA chain with vector store.
 
+    Near-duplicate chunks are removed before indexing. Every indexed chunk
+    keeps the indices of the chunks merged into it in ``chunk_ids`` metadata.
+    The retriever is a ``FilteredRetriever``: set its ``chunk_filter`` to
+    search only some documents, tables or table rows.
+
     Args:
         text_chunks: Processed text chunks
+        model_embeddings: Embeddings model, loaded with ``create_embeddings`` if not given
+        metadatas: Metadata of every chunk from ``process_text_chunks_with_metadata``
 
     Returns:
         RetrievalQA: Configured QA chain
     """
-    model_embeddings = embeddings.HuggingFaceEmbeddings(
-        model_name='sentence-transformers/distiluse-base-multilingual-cased-v2',
-    )
-    vectorstore = vectorstores.FAISS.from_texts(text_chunks, model_embeddings)
+    model_embeddings = model_embeddings or create_embeddings()
+    retriever = build_chunk_retriever(text_chunks, model_embeddings, metadatas)
+    return create_retrieval_chain(retriever)
 
+
+def create_retrieval_chain(retriever: BaseRetriever) -> chains.RetrievalQA:
+    """Create QA chain answering from the chunks of a retriever.
+
+    Args:
+        retriever: Chunk retriever
+
+    Returns:
+        RetrievalQA: Configured QA chain
+    """
     prompt = prompts.PromptTemplate(
         input_variables=['context', 'question'],
         template='\n'.join(PROMPT_PARTS),
     )
 
-    _, _, llm_pipeline = create_model_pipeline()
-    llm = llms.HuggingFacePipeline(pipeline=llm_pipeline)
+    with span('model_init'):
+        llm = get_llm()
 
     return chains.RetrievalQA.from_chain_type(
         llm=llm,
-        retriever=vectorstore.as_retriever(search_kwargs={'k': 5}),
+        retriever=retriever,
         return_source_documents=False,
         chain_type_kwargs={'prompt': prompt},
     )
@@ -0,0 +1,420 @@
+"""Prefix key/value caching for the LLaMA RAG system.
+
+The instruction part of every prompt built from ``PROMPT_PARTS`` is the same
+for all queries, so its past key/values are computed once per model and reused.
+Each request then prefills only the variable suffix (context and question).
+Decoding follows the model generation config with the ``MODEL_CONFIG``
+temperature and top-k, as the text generation pipeline did.
+"""
+
+import copy
+import logging
+import time
+from typing import Dict, List, Optional, OrderedDict, Sequence, Tuple
+
+import torch
+from langchain.llms.base import LLM
+from transformers import Cache, PreTrainedTokenizerBase
+
+from observability.telemetry import (
+    DRAFT_ACCEPTED_TOKENS,
+    MODEL_MEMORY,
+    record_cache_lookup,
+    record_generation,
+)
+from observability.tracing import span
+from RAG.config import GENERATION_BATCH_SIZE, MODEL_CONFIG, PREFIX_CACHE_SIZE
+from RAG.speculative import (
+    ForwardPassCounter,
+    SpeculationKwargs,
+    SpeculationStats,
+    speculation_kwargs,
+)
+from RAG.types import CausalLM
+
+logger = logging.getLogger(__name__)
+
+MAX_NEW_TOKENS = int(MODEL_CONFIG['max_new_tokens'])
+
+PrefixState = Tuple[torch.Tensor, Optional[Cache]]
+# (input ids, attention mask)
+PaddedBatch = Tuple[torch.Tensor, torch.Tensor]
+
+
+def sampling_kwargs(model: CausalLM) -> Dict[str, float]:
+    """Get ``generate`` arguments for the configured sampling.
+
+    Models whose generation config samples get the ``MODEL_CONFIG`` temperature
+    and top-k, the others decode greedily.
+
+    Args:
+        model: Causal language model
+
+    Returns:
+        Dict[str, float]: Sampling arguments, empty for greedy decoding
+    """
+    if not model.generation_config.do_sample:
+        return {}
+    temperature = float(MODEL_CONFIG['temperature'])
+    return {'temperature': temperature, 'top_k': int(MODEL_CONFIG['top_k'])}
+
+
+def split_prompt_template(template: str) -> Tuple[str, str]:
+    """Split a prompt template into its static prefix and variable suffix.
+
+    Args:
+        template: Prompt template with ``{placeholder}`` variables
+
+    Returns:
+        Tuple[str, str]: (static prefix, rest of the template)
+    """
+    placeholder_start = template.find('{')
+    if placeholder_start < 0:
+        return template, ''
+
+    # Cut at a line boundary so the prefix tokenizes the same way alone and in the full prompt
+    line_start = template.rfind('\n', 0, placeholder_start) + 1
+    return template[:line_start], template[line_start:]
+
+
+def _left_pad(token_ids: Sequence[List[int]], pad_id: int) -> PaddedBatch:
+    """Left-pad prompts to the length of the longest one.
+
+    Args:
+        token_ids: Prompt token ids
+        pad_id: Token id of the padding
+
+    Returns:
+        PaddedBatch: Input ids and attention mask
+    """
+    width = max(len(ids) for ids in token_ids)
+    shape = (len(token_ids), width)
+    input_ids = torch.full(shape, pad_id)
+    attention_mask = torch.zeros(shape, dtype=torch.long)
+    for row, ids in enumerate(token_ids):
+        offset = width - len(ids)
+        input_ids[row, offset:] = torch.tensor(ids)
+        attention_mask[row, offset:] = 1
+    return input_ids, attention_mask
+
+
+class PrefixKVCache:
+    """LRU cache of prefilled key/value states for static prompt prefixes."""
+
+    def __init__(
+        self,
+        tokenizer: PreTrainedTokenizerBase,
+        model: CausalLM,
+        max_size: int = PREFIX_CACHE_SIZE,
+    ):
+        """Initialize the cache for a single model.
+
+        Args:
+            tokenizer: Tokenizer of the model
+            model: Causal language model
+            max_size: Maximum number of cached prefixes
+        """
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._states: OrderedDict[str, PrefixState] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get number of cached prefixes.
+
+        Returns:
+            int: Number of cached prefixes
+        """
+        return len(self._states)
+
+    def get(self, prefix: str) -> PrefixState:
+        """Get prefix token ids and a private copy of their key/values.
+
+        Args:
+            prefix: Static prompt prefix
+
+        Returns:
+            PrefixState: (prefix input ids, past key/values safe to extend)
+        """
+        record_cache_lookup('prefix_kv', hits=int(prefix in self._states))
+        if prefix in self._states:
+            self.hits += 1
+            self._states.move_to_end(prefix)
+        else:
+            self.misses += 1
+            self._states[prefix] = self._prefill(prefix)
+            if len(self._states) > self.max_size:
+                self._states.popitem(last=False)
+
+        input_ids, past_key_values = self._states[prefix]
+        # Generation appends to the cache in place, so callers get their own copy
+        return input_ids, copy.deepcopy(past_key_values)
+
+    def _prefill(self, prefix: str) -> PrefixState:
+        """Run the model over the prefix once and keep its key/values.
+
+        Args:
+            prefix: Static prompt prefix
+
+        Returns:
+            PrefixState: (prefix input ids, past key/values)
+        """
+        logger.debug('Prefilling prompt prefix of %s chars', len(prefix))
+        input_ids = self.tokenizer(prefix, return_tensors='pt').input_ids
+        input_ids = input_ids.to(self.model.device)
+        with torch.no_grad():
+            outputs = self.model(input_ids, use_cache=True)
+        return input_ids, outputs.past_key_values
+
+
+class PrefixCachedGenerator:
+    """Generator that prefills only the prompt after its cached prefix."""
+
+    def __init__(
+        self,
+        tokenizer: PreTrainedTokenizerBase,
+        model: CausalLM,
+        prefixes: Sequence[str] = (),
+        max_new_tokens: int = MAX_NEW_TOKENS,
+    ):
+        """Initialize generator and warm up the prefix cache.
+
+        Args:
+            tokenizer: Tokenizer of the model
+            model: Causal language model
+            prefixes: Static prompt prefixes to precompute
+            max_new_tokens: Maximum number of generated tokens
+        """
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_new_tokens = max_new_tokens
+        self.prefixes: List[str] = sorted(set(prefixes), key=len, reverse=True)
+        cache_size = max(PREFIX_CACHE_SIZE, len(self.prefixes))
+        self.cache = PrefixKVCache(tokenizer, model, max_size=cache_size)
+        self.speculation_stats = SpeculationStats()
+        self._sampling = sampling_kwargs(model)
+        self._speculation: SpeculationKwargs = {}
+        self._model_name = model.config.name_or_path or type(model).__name__
+        self._accepted_tokens = DRAFT_ACCEPTED_TOKENS.labels(model=self._model_name)
+        MODEL_MEMORY.labels(model=self._model_name).set(model.get_memory_footprint())
+        for prefix in self.prefixes:
+            self.cache.get(prefix)
+
+    def enable_speculation(
+        self,
+        draft_model: Optional[CausalLM] = None,
+        prompt_lookup_tokens: int = 0,
+    ) -> None:
+        """Verify drafts of a small model or prompt lookup in one pass.
+
+        The prefix cache is not used for generation while speculation is on.
+
+        Args:
+            draft_model: Small causal LM with the tokenizer of the main model
+            prompt_lookup_tokens: Number of tokens copied from the prompt per draft
+        """
+        self._speculation = speculation_kwargs(draft_model, prompt_lookup_tokens)
+        self.speculation_stats = SpeculationStats()
+
+    def add_template(self, template: str) -> str:
+        """Register the static prefix of a prompt template.
+
+        Args:
+            template: Prompt template with ``{placeholder}`` variables
+
+        Returns:
+            str: Registered static prefix
+        """
+        prefix, _ = split_prompt_template(template)
+        if prefix and prefix not in self.prefixes:
+            self.prefixes.append(prefix)
+            self.prefixes.sort(key=len, reverse=True)
+            self.cache.get(prefix)
+        return prefix
+
+    def generate(self, prompt: str) -> str:
+        """Generate a continuation of the prompt.
+
+        Args:
+            prompt: Full prompt text
+
+        Returns:
+            str: Generated text without the prompt
+        """
+        # Prefixes are sorted longest first
+        matching = (prefix for prefix in self.prefixes if prompt.startswith(prefix))
+        prefix = next(matching, None)
+        # Assisted generation feeds the whole prompt on its first pass and would
+        # count a prefilled prefix twice, so speculation prefills the full prompt
+        if prefix is None or self._speculation:
+            input_ids = self.tokenizer(prompt, return_tensors='pt').input_ids
+            return self._decode_new_tokens(input_ids.to(self.model.device), None)
+
+        prefix_ids, past_key_values = self.cache.get(prefix)
+        suffix_ids = self.tokenizer(
+            prompt[len(prefix) :],
+            add_special_tokens=False,
+            return_tensors='pt',
+        ).input_ids.to(self.model.device)
+        input_ids = torch.cat([prefix_ids, suffix_ids], dim=-1)
+        return self._decode_new_tokens(input_ids, past_key_values)
+
+    def generate_batch(self, prompts: Sequence[str], batch_size: int = GENERATION_BATCH_SIZE) -> List[str]:
+        """Generate continuations of several prompts with batched decoding.
+
+        Prompts are sorted by token length, so every batch is left-padded
+        little. Left padding shifts the shared prefix, so the prefix cache is not
+        used here.
+
+        Args:
+            prompts: Full prompt texts
+            batch_size: Number of prompts decoded together
+
+        Returns:
+            List[str]: Generated texts in prompt order
+        """
+        token_ids = self.tokenizer(list(prompts))['input_ids']
+        lengths = [len(ids) for ids in token_ids]
+        positions = range(len(lengths))
+        order = sorted(positions, key=lengths.__getitem__)
+        answers: Dict[int, str] = {}
+        for start in range(0, len(order), batch_size):
+            batch = order[start : start + batch_size]
+            texts = self._generate_padded([token_ids[index] for index in batch])
+            answers.update(zip(batch, texts))
+        return [answers[index] for index in positions]
+
+    def _generate_padded(self, token_ids: List[List[int]]) -> List[str]:
+        """Generate for one batch of left-padded prompts.
+
+        Padding uses the end-of-sequence id, because an added padding token may
+        lie outside of the model embeddings.
+
+        Args:
+            token_ids: Prompt token ids
+
+        Returns:
+            List[str]: Generated texts
+        """
+        pad_id = self.tokenizer.eos_token_id
+        input_ids, attention_mask = _left_pad(token_ids, pad_id)
+        width = input_ids.shape[-1]
+
+        start = time.perf_counter()
+        batch_span = span(
+            'model_generate',
+            prompt_tokens=input_ids.numel(),
+            batch_size=len(token_ids),
+        )
+        with batch_span, torch.no_grad():
+            output_ids = self.model.generate(
+                input_ids.to(self.model.device),
+                attention_mask=attention_mask.to(self.model.device),
+                max_new_tokens=self.max_new_tokens,
+                pad_token_id=pad_id,
+                **self._sampling,
+            )
+        new_tokens = output_ids[..., width:]
+        texts = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        new_token_count = int((new_tokens != pad_id).sum())
+        record_generation(self._model_name, new_token_count, time.perf_counter() - start)
+        return texts
+
+    def _decode_new_tokens(self, input_ids: torch.Tensor, past_key_values: Optional[Cache]) -> str:
+        """Run generation and decode only the new tokens.
+
+        Args:
+            input_ids: Full prompt token ids
+            past_key_values: Cached key/values for the leading tokens or None
+
+        Returns:
+            str: Generated text
+        """
+        start = time.perf_counter()
+        prompt_length = input_ids.shape[-1]
+        forward_passes = ForwardPassCounter(self.model)
+        with span('model_generate', prompt_tokens=prompt_length) as generate_span, torch.no_grad():
+            with forward_passes:
+                output_ids = self.model.generate(
+                    input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=past_key_values,
+                    max_new_tokens=self.max_new_tokens,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    **self._sampling,
+                    **self._speculation,
+                )
+            generate_span.set_attribute('cached_prefix', past_key_values is not None)
+            generate_span.set_attribute('new_tokens', output_ids.shape[-1] - prompt_length)
+            generate_span.set_attribute('forward_passes', forward_passes.count)
+        new_tokens = output_ids[0, prompt_length:]
+        new_token_count = len(new_tokens)
+        elapsed = time.perf_counter() - start
+        record_generation(self._model_name, new_token_count, elapsed)
+        if self._speculation:
+            self.speculation_stats.add(new_token_count, forward_passes.count, elapsed)
+            self._accepted_tokens.inc(max(0, new_token_count - forward_passes.count))
+            logger.debug('Draft acceptance rate %.2f', self.speculation_stats.acceptance_rate)
+        texts = self.tokenizer.batch_decode(new_tokens.unsqueeze(0), skip_special_tokens=True)
+        return texts[0]
+
+
+class PrefixCachedLLM(LLM):
+    """LangChain LLM backed by a prefix-cached generator."""
+
+    generator: PrefixCachedGenerator
+
+    @property
+    def _llm_type(self) -> str:
+        """Get LLM type name.
+
+        Returns:
+            str: LLM type name
+        """
+        return 'prefix_cached_huggingface'
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: object = None,
+        **kwargs: object,
+    ) -> str:
+        """Generate an answer for the prompt.
+
+        Args:
+            prompt: Full prompt text
+            stop: Optional stop sequences
+            run_manager: LangChain callback manager
+            kwargs: Unused generation arguments
+
+        Returns:
+            str: Generated text
+        """
+        text = self.generator.generate(prompt)
+        for stop_sequence in stop or ():
+            text = text.split(stop_sequence)[0]
+        return text
+
+
+def create_prefix_cached_llm(
+    tokenizer: PreTrainedTokenizerBase,
+    model: CausalLM,
+    templates: Sequence[str],
+) -> PrefixCachedLLM:
+    """Create a LangChain LLM with precomputed prefixes for prompt templates.
+
+    Args:
+        tokenizer: Tokenizer of the model
+        model: Causal language model
+        templates: Prompt templates served by the model
+
+    Returns:
+        PrefixCachedLLM: LLM ready for use in chains
+    """
+    generator = PrefixCachedGenerator(tokenizer, model)
+    for template in templates:
+        generator.add_template(template)
+    return PrefixCachedLLM(generator=generator)
@@ -0,0 +1,69 @@
+"""Initialization of the standalone LLaMA RAG system and its FAQ index."""
+
+import os
+
+from langchain import chains
+
+from InformationRetrieval.token_counter import TokenCounter
+from observability.telemetry import INDEX_SIZE
+from observability.tracing import span
+from RAG.document_parser import parse_docx
+from RAG.faq_index import FAQIndex
+from RAG.llama_solo import BOT_NAME
+from RAG.model_manager import create_embeddings, create_qa_chain
+from RAG.sharded_retriever import ShardedRetriever
+from RAG.text_processor import process_text_chunks_with_metadata
+from RAG.types import DocumentData
+
+
+def initialize_qa_system(docx_path: str) -> tuple[chains.RetrievalQA, DocumentData]:
+    """Initialize QA system.
+
+    Chunks are sized by the tokens of the embedding model to fill its window.
+
+    Args:
+        docx_path: Path to DOCX file
+
+    Returns:
+        tuple: (QA chain, Document data)
+    """
+    with span('initialize_qa_system'):
+        with span('parse') as parse_span:
+            doc_data = parse_docx(docx_path)
+            parse_span.set_attribute('paragraphs', len(doc_data['paragraphs']))
+            parse_span.set_attribute('tables', len(doc_data['tables']))
+        model_embeddings = create_embeddings()
+        with span('chunk') as chunk_span:
+            token_counter = TokenCounter.for_sentence_transformer(model_embeddings.client)
+            text_chunks, metadatas = process_text_chunks_with_metadata(
+                doc_data,
+                os.path.basename(docx_path),
+                token_counter=token_counter,
+            )
+            chunk_span.set_attribute('chunks', len(text_chunks))
+            chunk_span.set_attribute('truncated_chunks', token_counter.stats.truncated_texts)
+        qa_chain = create_qa_chain(text_chunks, model_embeddings, metadatas)
+        faiss_index = qa_chain.retriever.vectorstore.index
+        INDEX_SIZE.labels(bot=BOT_NAME).set(faiss_index.ntotal)
+    return qa_chain, doc_data
+
+
+def initialize_faq_index(faq_path: str, qa_chain: chains.RetrievalQA) -> FAQIndex:
+    """Load curated answers and embed their questions with the chain embedder.
+
+    Args:
+        faq_path: QA pairs in the dataset/qa_pairs.json format
+        qa_chain: QA chain
+
+    Returns:
+        FAQIndex: Index of known questions
+    """
+    retriever = qa_chain.retriever
+    if isinstance(retriever, ShardedRetriever):
+        embeddings = retriever.index.embeddings
+    else:
+        embeddings = retriever.vectorstore.embeddings
+    with span('initialize_faq_index') as faq_span:
+        faq_index = FAQIndex.from_qa_pairs(faq_path, embeddings)
+        faq_span.set_attribute('questions', len(faq_index))
+    return faq_index
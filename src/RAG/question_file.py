@@ -0,0 +1,50 @@
+"""Question lists and answers in the ``dataset/qa_pairs.json`` layout."""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+PAIRS_KEY = 'qa_pairs'
+QUESTION_KEY = 'question'
+REFERENCE_KEY = 'reference_answer'
+ENCODING = 'utf-8'
+
+QARecord = Dict[str, str]
+
+
+def load_questions(path: str) -> List[QARecord]:
+    """Load questions as QA pair records.
+
+    Args:
+        path: ``.json`` file in the ``dataset/qa_pairs.json`` layout or a text
+            file with one question per line
+
+    Returns:
+        List[QARecord]: Records with at least the question and reference answer
+    """
+    with Path(path).open('r', encoding=ENCODING) as questions_file:
+        if path.endswith('.json'):
+            return json.load(questions_file)[PAIRS_KEY]
+        questions = (line.strip() for line in questions_file)
+        return [{QUESTION_KEY: question, REFERENCE_KEY: ''} for question in questions if question]
+
+
+def write_answers(
+    records: List[QARecord],
+    answers: Sequence[str],
+    bot_number: int,
+    output_path: str,
+) -> None:
+    """Save answers as a bot in the ``dataset/qa_pairs.json`` layout.
+
+    Args:
+        records: QA pair records of the questions, other fields are kept
+        answers: Answers in record order
+        bot_number: Number N of the ``botN_answer`` field
+        output_path: Path of the JSON file
+    """
+    answer_key = f'bot{bot_number}_answer'
+    answered = zip(records, answers)
+    pairs = [{**record, answer_key: answer} for record, answer in answered]
+    with Path(output_path).open('w', encoding=ENCODING) as output_file:
+        json.dump({PAIRS_KEY: pairs}, output_file, ensure_ascii=False, indent=4)
@@ -0,0 +1,229 @@
+"""Sharded vector index over a library of documents.
+
+Every large document gets its own FAISS shard; small documents are packed
+into shared bucket shards of about ``SHARD_BUCKET_CHUNKS`` chunks. A query
+is searched in all relevant shards on a thread pool (FAISS releases the GIL
+while searching) and the per-shard top-k lists are merged with a heap. Only
+the merged top-k documents are read from the shard docstores.
+
+Shards are pruned before searching:
+
+- by document: a query restricted to some documents skips shards without
+  them and searches mixed buckets with an id selector
+- by centroid: only the shards of the ``probe_documents`` documents whose
+  mean embedding is closest to the query are searched, so the number of
+  searched shards and the latency stay flat as the library grows. Set
+  ``probe_documents = 0`` to search every shard
+
+The search threads stop on ``close`` or when the index is garbage collected
+together with its retriever and chain.
+"""
+
+import heapq
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+
+from observability.tracing import span
+from RAG.config import (
+    DOCSTORE_DIR,
+    SHARD_BUCKET_CHUNKS,
+    SHARD_PROBE_DOCUMENTS,
+    SHARD_SEARCH_WORKERS,
+    TOP_K_DOCS,
+)
+from RAG.index_shard import (
+    DocIds,
+    IndexShard,
+    LibraryDocuments,
+    ShardHit,
+    create_shard,
+)
+from RAG.types import ChunkMetadata
+
+logger = logging.getLogger(__name__)
+
+# Distance, shard position and row of a search hit
+Hit = Tuple[float, int, int]
+# Chunk of a search hit with its L2 distance
+ScoredDocument = Tuple[Document, float]
+
+
+class ShardedIndex:
+    """Library index of many documents with parallel fan-out search."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        bucket_chunks: int = SHARD_BUCKET_CHUNKS,
+        probe_documents: int = SHARD_PROBE_DOCUMENTS,
+        workers: int = SHARD_SEARCH_WORKERS,
+        docstore_dir: str = DOCSTORE_DIR,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            embeddings: Embeddings model of chunks and queries
+            bucket_chunks: Documents with fewer chunks share bucket shards of this size
+            probe_documents: Search only the shards of this many documents closest
+                to the query by centroid, 0 searches all shards
+            workers: Threads searching shards in parallel
+            docstore_dir: Directory for memory-mapped shard docstores, empty keeps texts in memory
+        """
+        self.embeddings = embeddings
+        self.bucket_chunks = bucket_chunks
+        self.probe_documents = probe_documents
+        self.docstore_dir = docstore_dir
+        self.shards: List[IndexShard] = []
+        self.documents = LibraryDocuments()
+        self._open_bucket: Optional[int] = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shard-search')
+        self._stop_threads = weakref.finalize(self, self._executor.shutdown)
+
+    def __len__(self) -> int:
+        """Count indexed documents.
+
+        Returns:
+            int: Number of documents
+        """
+        return len(self.documents)
+
+    def close(self) -> None:
+        """Stop the search threads."""
+        self._stop_threads()
+
+    def add_document(
+        self,
+        doc_id: str,
+        chunks: Sequence[str],
+        metadatas: Optional[Sequence[ChunkMetadata]] = None,
+    ) -> None:
+        """Embed and index the chunks of a document.
+
+        Args:
+            doc_id: Unique document id, stored in the ``doc_id`` metadata of its chunks
+            chunks: Chunk texts
+            metadatas: Metadata of every chunk
+
+        Raises:
+            ValueError: If the document is already indexed or has no chunks
+        """
+        if doc_id in self.documents.doc_ids:
+            raise ValueError(f'Document {doc_id} is already indexed')
+        if not chunks:
+            raise ValueError(f'Document {doc_id} has no chunks')
+
+        with span('embed_document', chunks=len(chunks)):
+            embedded = self.embeddings.embed_documents(list(chunks))
+        vectors = np.asarray(embedded, dtype=np.float32)
+        shard_position = self._target_shard(len(chunks), vectors.shape[1])
+        chunk_metadatas = metadatas or [{} for _ in chunks]
+        self.shards[shard_position].add_document(doc_id, chunks, vectors, chunk_metadatas)
+        self.documents.add(doc_id, shard_position, vectors.mean(axis=0))
+        logger.info('Indexed %s chunks of %s in shard %s', len(chunks), doc_id, shard_position)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        top_k: int = TOP_K_DOCS,
+        doc_ids: DocIds = None,
+    ) -> List[Hit]:
+        """Find the nearest chunks in all relevant shards.
+
+        Args:
+            vector: Query embedding
+            top_k: Number of chunks
+            doc_ids: Search only chunks of these documents
+
+        Returns:
+            List[Hit]: Distance, shard position and row of the nearest chunks, nearest first
+        """
+        query_vector = np.asarray(vector, dtype=np.float32)
+        query = query_vector.reshape(1, -1)
+        selected = self.documents.select_shards(query[0], doc_ids, self.probe_documents)
+        shard_positions = sorted(selected)
+        shard_hits = self._executor.map(
+            lambda position: self.shards[position].search(query, top_k, doc_ids),
+            shard_positions,
+        )
+        tagged = map(_position_hits, shard_positions, shard_hits)
+        hits = (hit for position_hits in tagged for hit in position_hits)
+        return heapq.nsmallest(top_k, hits)
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        top_k: int = TOP_K_DOCS,
+        doc_ids: DocIds = None,
+    ) -> List[Tuple[Document, float]]:
+        """Find the chunks nearest to a query text.
+
+        Args:
+            query: Query text
+            top_k: Number of chunks
+            doc_ids: Search only chunks of these documents
+
+        Returns:
+            List[Tuple[Document, float]]: Chunks with L2 distances, nearest first
+        """
+        with span('sharded_search', shards=len(self.shards)):
+            query_vector = np.asarray(self.embeddings.embed_query(query))
+            hits = self.search(query_vector, top_k, doc_ids)
+        return read_hits(self.shards, hits)
+
+    def _target_shard(self, num_chunks: int, dim: int) -> int:
+        """Choose the shard of a new document, creating it if needed.
+
+        Args:
+            num_chunks: Number of chunks of the document
+            dim: Embedding size
+
+        Returns:
+            int: Shard position
+        """
+        is_small = num_chunks < self.bucket_chunks
+        bucket = self._open_bucket
+        if is_small and bucket is not None:
+            if len(self.shards[bucket]) + num_chunks <= self.bucket_chunks:
+                return bucket
+        position = len(self.shards)
+        shard = create_shard(self.embeddings, dim, self.docstore_dir, position)
+        self.shards.append(shard)
+        if is_small:
+            self._open_bucket = position
+        return position
+
+
+def read_hits(shards: Sequence[IndexShard], hits: Sequence[Hit]) -> List[ScoredDocument]:
+    """Read the documents of search hits from the shard docstores.
+
+    Args:
+        shards: Shards of the index
+        hits: Hits from ``ShardedIndex.search``
+
+    Returns:
+        List[ScoredDocument]: Chunks with L2 distances in the order of the hits
+    """
+    found = []
+    for distance, position, row in hits:
+        document = shards[position].document(row)
+        found.append((document, distance))
+    return found
+
+
+def _position_hits(position: int, shard_hits: List[ShardHit]) -> List[Hit]:
+    """Tag the hits of a shard with its position.
+
+    Args:
+        position: Shard position in the index
+        shard_hits: Distances and rows of the shard hits
+
+    Returns:
+        List[Hit]: Distance, shard position and row of every hit
+    """
+    return [(distance, position, row) for distance, row in shard_hits]
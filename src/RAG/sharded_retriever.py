@@ -0,0 +1,55 @@
+"""LangChain retriever over a sharded library index."""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+from RAG.config import TOP_K_DOCS
+from RAG.sharded_index import ShardedIndex, read_hits
+
+
+class ShardedRetriever(BaseRetriever):
+    """LangChain retriever over a sharded library index."""
+
+    index: ShardedIndex
+    top_k: int = TOP_K_DOCS
+    # Restrict retrieval to these documents, None searches the whole library
+    doc_ids: Optional[List[str]] = None
+
+    def retrieve_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """Retrieve the nearest chunks of every query.
+
+        The queries are embedded with one ``embed_documents`` call and every
+        query is searched in its relevant shards.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            List[List[Document]]: Nearest chunks of every query
+        """
+        if not queries:
+            return []
+        embedded = self.index.embeddings.embed_documents(list(queries))
+        retrieved = []
+        for vector in np.asarray(embedded, dtype=np.float32):
+            hits = self.index.search(vector, self.top_k, self.doc_ids)
+            scored = read_hits(self.index.shards, hits)
+            retrieved.append([document for document, _ in scored])
+        return retrieved
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        """Retrieve the nearest chunks of a query.
+
+        Args:
+            query: Query text
+            run_manager: Callback manager of the retriever run
+
+        Returns:
+            List[Document]: Nearest chunks
+        """
+        scored = self.index.similarity_search_with_score(query, self.top_k, self.doc_ids)
+        return [document for document, _ in scored]
@@ -0,0 +1,146 @@
+"""Speculative decoding settings and statistics for the LLaMA RAG system.
+
+Draft tokens come either from a small draft model sharing the tokenizer
+of the main model or from prompt lookup, which copies n-grams of the
+prompt. Answers are mostly copied from the retrieved context, so the
+main model verifies several draft tokens per forward pass instead of
+generating one. With greedy decoding the output is the same as without
+speculation.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import torch
+from torch.utils.hooks import RemovableHandle
+
+from RAG.types import CausalLM
+
+# ``generate`` arguments enabling speculative decoding
+SpeculationKwargs = Dict[str, object]
+
+
+@dataclass
+class SpeculationStats:
+    """Accumulated statistics of speculative generation.
+
+    Every forward pass of the main model yields exactly one token of its
+    own after the accepted draft tokens, so accepted tokens are
+    generated tokens minus forward passes.
+    """
+
+    generated_tokens: int = 0
+    forward_passes: int = 0
+    elapsed: float = 0
+
+    @property
+    def accepted_tokens(self) -> int:
+        """Count generated tokens accepted from the draft.
+
+        Returns:
+            int: Number of accepted draft tokens
+        """
+        return self.generated_tokens - self.forward_passes
+
+    @property
+    def acceptance_rate(self) -> float:
+        """Get the share of generated tokens accepted from the draft.
+
+        Returns:
+            float: Rate from 0 to 1, 0 before any generation
+        """
+        if not self.generated_tokens:
+            return 0
+        return self.accepted_tokens / self.generated_tokens
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Get the generation speed.
+
+        Returns:
+            float: Generated tokens per second
+        """
+        if self.elapsed <= 0:
+            return 0
+        return self.generated_tokens / self.elapsed
+
+    def add(self, generated_tokens: int, forward_passes: int, elapsed: float) -> None:
+        """Add the statistics of one generation.
+
+        Args:
+            generated_tokens: Number of new tokens
+            forward_passes: Forward passes of the main model
+            elapsed: Generation time in seconds
+        """
+        self.generated_tokens += generated_tokens
+        self.forward_passes += forward_passes
+        self.elapsed += elapsed
+
+
+class ForwardPassCounter:
+    """Context manager counting forward passes of a model."""
+
+    def __init__(self, model: torch.nn.Module):
+        """Initialize counter.
+
+        Args:
+            model: Model to observe. A draft model must be a separate module
+        """
+        self.model = model
+        self.count = 0
+        self._hook: Optional[RemovableHandle] = None
+
+    def __enter__(self) -> 'ForwardPassCounter':
+        """Start counting.
+
+        Returns:
+            ForwardPassCounter: This counter
+        """
+        self._hook = self.model.register_forward_hook(self._count_pass)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_value) -> None:
+        """Stop counting.
+
+        Args:
+            exc_type: Exception type raised inside the block
+            exc_value: Exception raised inside the block
+            traceback_value: Traceback of the exception
+        """
+        if self._hook is not None:
+            self._hook.remove()
+            self._hook = None
+
+    def _count_pass(self, *args: object) -> None:
+        """Count one forward pass.
+
+        Args:
+            args: Hook arguments (module, inputs, outputs)
+        """
+        self.count += 1
+
+
+def speculation_kwargs(
+    draft_model: Optional[CausalLM] = None,
+    prompt_lookup_tokens: int = 0,
+) -> SpeculationKwargs:
+    """Build ``generate`` arguments for speculative decoding.
+
+    Args:
+        draft_model: Small causal LM with the tokenizer of the main model
+        prompt_lookup_tokens: Number of tokens copied from the prompt per draft
+
+    Returns:
+        SpeculationKwargs: Generation arguments, empty without speculation
+
+    Raises:
+        ValueError: If both a draft model and prompt lookup are requested
+    """
+    if draft_model is not None and prompt_lookup_tokens:
+        raise ValueError('Use either a draft model or prompt lookup, not both')
+    speculation: SpeculationKwargs = {}
+    if draft_model is not None:
+        speculation['assistant_model'] = draft_model
+    elif prompt_lookup_tokens:
+        speculation['prompt_lookup_num_tokens'] = prompt_lookup_tokens
+    return speculation
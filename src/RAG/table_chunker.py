@@ -0,0 +1,163 @@
+"""Chunking of tables by groups of rows under a shared column header."""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+import pandas as pd
+
+from RAG.config import TABLE_CHUNK_TOKENS
+from RAG.table_formatter import TABLE_SOURCE, RowGroupFormatter
+from RAG.types import DocumentData
+
+ROW_SEPARATOR = '\n'
+
+LineProcessor = Callable[[str], str]
+# Row position and processed row text
+RowText = Tuple[int, str]
+
+
+@dataclass
+class TableChunk:
+    """Consecutive rows of one table under a single header."""
+
+    text: str
+    # 1-based numbers as in table cell requests
+    table_number: int
+    first_row: int
+    last_row: int
+
+    @property
+    def metadata(self) -> Dict[str, Union[str, int]]:
+        """Build vector store metadata.
+
+        Returns:
+            Dict[str, Union[str, int]]: Source type, table number and row range
+        """
+        return {
+            'source': TABLE_SOURCE,
+            'table': self.table_number,
+            'first_row': self.first_row,
+            'last_row': self.last_row,
+        }
+
+
+def count_words(text: str) -> int:
+    """Approximate the token count of a text by its words.
+
+    Args:
+        text: Text
+
+    Returns:
+        int: Number of whitespace separated words
+    """
+    return len(text.split())
+
+
+def _compact_rows(df: pd.DataFrame, process_line: LineProcessor) -> Iterator[RowText]:
+    """Format non-empty rows of a table without column names.
+
+    Args:
+        df: Table
+        process_line: Function to process each row
+
+    Yields:
+        RowText: Row position and processed row text
+    """
+    for row_idx, (_, row) in enumerate(df.iterrows()):
+        row_text = RowGroupFormatter.format_compact_row(row_idx, row)
+        processed_text = process_line(row_text) if row_text else None
+        if processed_text:
+            yield row_idx, processed_text
+
+
+def _build_table_chunk(
+    table_idx: int,
+    columns: Sequence[str],
+    rows: Sequence[RowText],
+    process_line: LineProcessor,
+) -> TableChunk:
+    """Join a group of rows under their header.
+
+    Args:
+        table_idx: Table index
+        columns: Column names
+        rows: Row positions and texts
+        process_line: Function to process the header
+
+    Returns:
+        TableChunk: Chunk of the rows
+    """
+    first_row, _ = rows[0]
+    last_row, _ = rows[-1]
+    header = RowGroupFormatter.format_header(table_idx, columns, first_row, last_row)
+    row_texts = [row_text for _, row_text in rows]
+    return TableChunk(
+        text=ROW_SEPARATOR.join([process_line(header), *row_texts]),
+        table_number=table_idx + 1,
+        first_row=first_row + 1,
+        last_row=last_row + 1,
+    )
+
+
+def chunk_table(
+    table_idx: int,
+    df: pd.DataFrame,
+    process_line: LineProcessor,
+    max_tokens: int = TABLE_CHUNK_TOKENS,
+    count_tokens: Callable[[str], int] = count_words,
+) -> List[TableChunk]:
+    """Group consecutive rows of a table into chunks under a token budget.
+
+    Column names are written once per chunk instead of once per cell. A row
+    longer than the budget gets a chunk of its own.
+
+    Args:
+        table_idx: Table index
+        df: Table
+        process_line: Function to process each line
+        max_tokens: Token budget of a chunk including its header
+        count_tokens: Function counting the tokens of a line
+
+    Returns:
+        List[TableChunk]: Chunks in row order
+    """
+    columns = [str(column) for column in df.columns]
+    header = RowGroupFormatter.format_header(table_idx, columns, 0, 1)
+    header_tokens = count_tokens(process_line(header))
+    chunks = []
+    group: List[RowText] = []
+    group_tokens = header_tokens
+    for row_idx, row_text in _compact_rows(df, process_line):
+        row_tokens = count_tokens(row_text)
+        if group and group_tokens + row_tokens > max_tokens:
+            chunks.append(_build_table_chunk(table_idx, columns, group, process_line))
+            group, group_tokens = [], header_tokens
+        group.append((row_idx, row_text))
+        group_tokens += row_tokens
+
+    if group:
+        chunks.append(_build_table_chunk(table_idx, columns, group, process_line))
+    return chunks
+
+
+def chunk_tables(
+    doc_data: DocumentData,
+    process_line: LineProcessor,
+    max_tokens: int = TABLE_CHUNK_TOKENS,
+    count_tokens: Callable[[str], int] = count_words,
+) -> List[TableChunk]:
+    """Chunk all tables of a document by row groups.
+
+    Args:
+        doc_data: Document data
+        process_line: Function to process each line
+        max_tokens: Token budget of a chunk including its header
+        count_tokens: Function counting the tokens of a line
+
+    Returns:
+        List[TableChunk]: Chunks of all tables in document order
+    """
+    chunks = []
+    for table_idx, df in enumerate(doc_data['dataframes']):
+        chunks.extend(chunk_table(table_idx, df, process_line, max_tokens, count_tokens))
+    return chunks
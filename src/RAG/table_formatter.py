@@ -1,11 +1,14 @@
 """Table formatting utilities for the LLaMA RAG system."""
 
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Sequence
 
 import pandas as pd
 
 from RAG.types import DocumentData
 
+CELL_SEPARATOR = ' | '
+TABLE_SOURCE = 'table'
+
 
 class TableFormatter:
     """Handles table formatting operations."""
@@ -104,6 +107,50 @@ class TableFormatter:
         return '{0} {1}'.format(location, cell_text)
 
 
+class RowGroupFormatter(TableFormatter):
+    """Formats groups of table rows under a shared column header."""
+
+    @classmethod
+    def format_compact_row(cls, row_idx: int, row_data: pd.Series) -> Optional[str]:
+        """Format row cells without column names.
+
+        Empty cells stay empty between separators, so values keep their
+        column positions.
+
+        Args:
+            row_idx: Row index
+            row_data: Row data
+
+        Returns:
+            Optional[str]: Formatted row text or None if empty
+        """
+        cell_values = row_data.fillna('').tolist()
+        cells = [str(cell).strip() for cell in cell_values]
+        if not any(cells):
+            return None
+        row_prefix = cls.format_row_prefix(row_idx)
+        return '{0}: {1}'.format(row_prefix, CELL_SEPARATOR.join(cells))
+
+    @classmethod
+    def format_header(cls, table_idx: int, columns: Sequence[str], first_row: int, last_row: int) -> str:
+        """Format the header of a group of table rows.
+
+        Args:
+            table_idx: Table index
+            columns: Column names
+            first_row: Index of the first row in the group
+            last_row: Index of the last row in the group
+
+        Returns:
+            str: Table, row range and column names
+        """
+        rows = 'Rows {0}-{1}'.format(first_row + 1, last_row + 1)
+        if first_row == last_row:
+            rows = cls.format_row_prefix(first_row)
+        table_prefix = cls.format_table_prefix(table_idx)
+        return '{0}, {1}: {2}'.format(table_prefix, rows, CELL_SEPARATOR.join(columns))
+
+
 def process_table_row(
     table_idx: int,
     row_idx: int,
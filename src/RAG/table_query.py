@@ -8,6 +8,8 @@ import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+MISSING_CELL_ANSWER = 'Недостаточно информации.'
+
 
 def get_table_cell(
     dataframes: List[pd.DataFrame],
@@ -36,7 +38,7 @@ def get_table_cell(
     except Exception as error:
         logger.error('Error accessing table cell: %s', error)
 
-    return 'Недостаточно информации.'
+    return MISSING_CELL_ANSWER
 
 
 def build_cell_pattern() -> str:
@@ -1,15 +1,18 @@
 """Text processing utilities for the LLaMA RAG system."""
 
-from collections.abc import Sequence
-from typing import List
+from collections.abc import Callable, Sequence
+from functools import partial
+from typing import List, Optional, Tuple
 
 import nltk
 from nltk.tokenize import word_tokenize
 from pymorphy2 import MorphAnalyzer
 
-from RAG.config import CHUNK_SIZE, OVERLAP_SIZE
-from RAG.table_formatter import process_tables
-from RAG.types import DocumentData
+from InformationRetrieval.token_counter import TokenCounter
+from RAG.chunk_filter import PARAGRAPH_SOURCE, SOURCE_KEY, chunk_metadata
+from RAG.config import CHUNK_OVERLAP_TOKENS, CHUNK_SIZE, OVERLAP_SIZE
+from RAG.table_chunker import chunk_tables
+from RAG.types import ChunkMetadata, DocumentData
 
 # Initialize resources
 nltk.download('punkt')
@@ -62,43 +65,88 @@ def process_paragraphs(paragraphs: List[str], lemmatize: bool) -> List[str]:
     return processed
 
 
-def process_text_chunks(doc_data: DocumentData, lemmatize: bool = False) -> List[str]:
+def process_text_chunks(
+    doc_data: DocumentData,
+    lemmatize: bool = False,
+    token_counter: Optional[TokenCounter] = None,
+) -> List[str]:
     """Process document data into text chunks.
 
+    Paragraphs are chunked by length. Tables are chunked separately by groups
+    of consecutive rows with the column names written once per chunk.
+
     Args:
         doc_data: Document data to process
         lemmatize: Whether to apply lemmatization
+        token_counter: Counter of embedding model tokens. Chunks then fill the
+            model window, paragraphs longer than the window are split and
+            truncation statistics are recorded in ``token_counter.stats``
 
     Returns:
-        List[str]: Processed text chunks
+        List[str]: Processed paragraph chunks followed by table chunks
     """
-    text_elements = []
+    chunks, _ = process_text_chunks_with_metadata(doc_data, lemmatize=lemmatize, token_counter=token_counter)
+    return chunks
+
 
-    # Process paragraphs
-    text_elements.extend(process_paragraphs(doc_data['paragraphs'], lemmatize))
+def process_text_chunks_with_metadata(
+    doc_data: DocumentData,
+    doc_id: str = '',
+    lemmatize: bool = False,
+    token_counter: Optional[TokenCounter] = None,
+) -> Tuple[List[str], List[ChunkMetadata]]:
+    """Process document data into text chunks with their metadata.
 
-    # Process tables
-    text_elements.extend(
-        process_tables(
-            doc_data,
-            lambda text: process_text_line(text, lemmatize),
-        ),
-    )
+    Every chunk gets its source type, ``paragraph`` or ``table``, and the
+    document id. Table chunks also get the table number and row range, see
+    ``TableChunk.metadata``.
 
-    return chunk_text(text_elements)
+    Args:
+        doc_data: Document data to process
+        doc_id: Document id, empty if unknown
+        lemmatize: Whether to apply lemmatization
+        token_counter: Counter of embedding model tokens, see ``process_text_chunks``
+
+    Returns:
+        Tuple[List[str], List[ChunkMetadata]]: Chunks as in ``process_text_chunks``
+        and metadata of every chunk
+    """
+    paragraphs = process_paragraphs(doc_data['paragraphs'], lemmatize)
+    process_line = partial(process_text_line, lemmatize=lemmatize)
+    if token_counter is None:
+        paragraph_chunks = chunk_text(paragraphs)
+        table_chunks = chunk_tables(doc_data, process_line)
+    else:
+        paragraph_chunks = chunk_text(
+            token_counter.split(paragraphs),
+            token_counter.capacity,
+            CHUNK_OVERLAP_TOKENS,
+            token_counter,
+        )
+        table_chunks = chunk_tables(doc_data, process_line, token_counter.capacity, token_counter)
+
+    chunks = paragraph_chunks + [table_chunk.text for table_chunk in table_chunks]
+    paragraph_metadata = {SOURCE_KEY: PARAGRAPH_SOURCE}
+    metadatas = [chunk_metadata(paragraph_metadata, doc_id) for _ in paragraph_chunks]
+    metadatas.extend(chunk_metadata(table_chunk.metadata, doc_id) for table_chunk in table_chunks)
+    if token_counter is not None:
+        token_counter.record(chunks)
+    return chunks, metadatas
 
 
 def chunk_text(
     text_lines: Sequence[str],
     chunk_size: int = CHUNK_SIZE,
     overlap_size: int = OVERLAP_SIZE,
+    length: Callable[[str], int] = len,
 ) -> List[str]:
     """Split text lines into overlapping chunks.
 
     Args:
         text_lines: Sequence of text lines to process
         chunk_size: Maximum size of each chunk
-        overlap_size: Size of overlap between chunks
+        overlap_size: Maximum size of the trailing lines repeated in the next chunk
+        length: Function measuring a line, characters by default
 
     Returns:
         List[str]: List of processed text chunks with specified overlap
@@ -108,7 +156,7 @@ def chunk_text(
     chunk_length = 0
 
     for line in text_lines:
-        line_length = len(line)
+        line_length = length(line)
         if chunk_length + line_length <= chunk_size:
             current_chunk.append(line)
             chunk_length += line_length
@@ -116,12 +164,9 @@ def chunk_text(
 
         if current_chunk:
             chunks.append(' '.join(current_chunk))
-            if overlap_size > 0:
-                current_chunk = current_chunk[-overlap_size:]
-                chunk_length = sum(len(line) for line in current_chunk)
-            else:
-                current_chunk = []
-                chunk_length = 0
+            overlap_budget = min(overlap_size, chunk_size - line_length)
+            current_chunk = _overlap_lines(current_chunk, overlap_budget, length)
+            chunk_length = sum(map(length, current_chunk))
 
         current_chunk.append(line)
         chunk_length += line_length
@@ -130,3 +175,28 @@ def chunk_text(
         chunks.append(' '.join(current_chunk))
 
     return chunks
+
+
+def _overlap_lines(
+    lines: List[str],
+    overlap_size: int,
+    length: Callable[[str], int],
+) -> List[str]:
+    """Take the trailing lines of a chunk that fit into the overlap.
+
+    Args:
+        lines: Lines of the finished chunk
+        overlap_size: Maximum total size of the taken lines
+        length: Function measuring a line
+
+    Returns:
+        List[str]: Trailing lines in order
+    """
+    overlap: List[str] = []
+    overlap_length = 0
+    for line in reversed(lines):
+        overlap_length += length(line)
+        if overlap_length > overlap_size:
+            break
+        overlap.append(line)
+    return list(reversed(overlap))
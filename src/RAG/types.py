@@ -1,8 +1,20 @@
 """Type definitions for the LLaMA RAG system."""
 
-from typing import List, Tuple, TypedDict
+from typing import (
+    Dict,
+    List,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypedDict,
+    runtime_checkable,
+)
 
 import pandas as pd
+import torch
+from langchain.docstore.document import Document
+from transformers import GenerationConfig, PretrainedConfig
+from transformers.modeling_outputs import CausalLMOutputWithPast
 
 # Type aliases for table structures
 TableRow = List[str]
@@ -16,6 +28,9 @@ class TableList(List[List[List[str]]]):
 
 TableExtractionResult = Tuple[RawTableList, List[pd.DataFrame]]
 
+# Vector store metadata of a chunk
+ChunkMetadata = Dict[str, object]
+
 
 class DocumentData(TypedDict):
     """Structure for document data."""
@@ -23,3 +38,45 @@ class DocumentData(TypedDict):
     paragraphs: List[str]
     tables: TableList  # List of tables, each table is a list of rows
     dataframes: List[pd.DataFrame]
+
+
+class CausalLM(Protocol):
+    """Protocol for causal LMs loaded by ``AutoModelForCausalLM``."""
+
+    config: PretrainedConfig
+    generation_config: GenerationConfig
+
+    def __call__(self, input_ids: torch.Tensor, *, use_cache: bool) -> CausalLMOutputWithPast:
+        """Run a forward pass.
+
+        Args:
+            input_ids: Prompt token ids
+            use_cache: Whether to return past key/values
+        """
+
+    @property
+    def device(self) -> torch.device:
+        """Get device of the model weights."""
+
+    def generate(self, inputs: torch.Tensor, **kwargs: object) -> torch.Tensor:
+        """Generate token ids continuing the inputs.
+
+        Args:
+            inputs: Prompt token ids
+            kwargs: Generation arguments
+        """
+
+    def get_memory_footprint(self) -> int:
+        """Get memory used by the model in bytes."""
+
+
+@runtime_checkable
+class BatchRetriever(Protocol):
+    """Protocol for retrievers searching a batch of queries at once."""
+
+    def retrieve_many(self, queries: Sequence[str]) -> List[List[Document]]:
+        """Retrieve the nearest chunks of every query.
+
+        Args:
+            queries: Query texts
+        """
@@ -0,0 +1,59 @@
+"""Benchmark corpus built from a synthetic DOCX document."""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from typing import List
+
+from benchmarks.synthetic_docx import generate_docx, make_sentence
+from RAG.config import PROMPT_PARTS
+from RAG.document_parser import parse_docx
+from RAG.text_processor import process_text_chunks
+
+PROMPT_CONTEXT_SENTENCES = 5
+
+
+@dataclass
+class BenchmarkCorpus:
+    """Inputs shared by the benchmark groups."""
+
+    docx_path: str
+    paragraphs: List[str]
+    chunks: List[str]
+    queries: List[str]
+    # Reference answers paired with the first queries in metric benchmarks
+    references: List[str]
+    prompt: str
+
+
+def build_corpus(args: argparse.Namespace, workdir: str) -> BenchmarkCorpus:
+    """Generate the benchmark document and derive queries and a prompt.
+
+    Args:
+        args: Parsed command line arguments
+        workdir: Directory for the generated document
+
+    Returns:
+        BenchmarkCorpus: Corpus of the run
+    """
+    docx_path = generate_docx(
+        os.path.join(workdir, 'synthetic.docx'),
+        paragraphs=args.paragraphs,
+        tables=args.tables,
+        seed=args.seed,
+    )
+    doc_data = parse_docx(docx_path)
+    rng = random.Random(args.seed)
+    queries = [make_sentence(rng) for _ in range(args.queries)]
+    references = [make_sentence(rng) for _ in range(args.metric_pairs)]
+    context = ' '.join(references[:PROMPT_CONTEXT_SENTENCES])
+    prompt_template = '\n'.join(PROMPT_PARTS)
+    return BenchmarkCorpus(
+        docx_path=docx_path,
+        paragraphs=doc_data['paragraphs'],
+        chunks=process_text_chunks(doc_data),
+        queries=queries,
+        references=references,
+        prompt=prompt_template.format(context=context, question=queries[0]),
+    )
@@ -0,0 +1,175 @@
+"""Benchmarks of text generation backends and speculative decoding."""
+
+import logging
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+from benchmarks.timing import BenchmarkResult, measure
+from RAG import model as rag_model
+from RAG.speculative import ForwardPassCounter, speculation_kwargs
+from RAG.types import CausalLM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_LOOKUP_TOKENS = 10
+
+# ``generate`` arguments by drafting method
+SpeculationVariants = Dict[str, Dict[str, object]]
+
+
+def generation_backends(gguf_path: Optional[str]) -> List[str]:
+    """List generation backends that can run on this machine.
+
+    Args:
+        gguf_path: Path to a GGUF model or None
+
+    Returns:
+        List[str]: Backend names
+    """
+    backends = [rag_model.BACKEND_CPU_BF16, rag_model.BACKEND_CPU_INT8]
+    if torch.cuda.is_available():
+        backends.append(rag_model.BACKEND_CUDA_NF4)
+    if gguf_path:
+        backends.append(rag_model.BACKEND_GGUF)
+    return backends
+
+
+def generate_tokens(
+    model: CausalLM,
+    input_ids: torch.Tensor,
+    new_tokens: int,
+    **generate_kwargs: object,
+) -> int:
+    """Greedily generate exactly ``new_tokens`` tokens.
+
+    Args:
+        model: Causal language model
+        input_ids: Prompt token ids
+        new_tokens: Number of generated tokens
+        generate_kwargs: Extra ``generate`` arguments, e.g. speculative decoding
+
+    Returns:
+        int: Forward passes of the model
+    """
+    forward_passes = ForwardPassCounter(model)
+    with torch.no_grad(), forward_passes:
+        model.generate(
+            input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            max_new_tokens=new_tokens,
+            min_new_tokens=new_tokens,
+            do_sample=False,
+            pad_token_id=model.generation_config.eos_token_id,
+            **generate_kwargs,
+        )
+    return forward_passes.count
+
+
+def bench_generation(
+    prompt: str,
+    llm_path: str,
+    gguf_path: Optional[str],
+    new_tokens: int,
+    repeats: int,
+) -> List[BenchmarkResult]:
+    """Benchmark tokens per second of every available generation backend.
+
+    HuggingFace backends generate exactly ``new_tokens`` tokens, so items/s is
+    tokens/s. llama.cpp may stop early at the end-of-sequence token.
+
+    Args:
+        prompt: Prompt text
+        llm_path: HuggingFace causal LM name or path
+        gguf_path: Path to a GGUF model, the gguf backend is skipped without it
+        new_tokens: Number of generated tokens
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Generation results, one per backend
+    """
+    timings = []
+    for backend in generation_backends(gguf_path):
+        name = f'generate[{backend}]'
+        if backend == rag_model.BACKEND_GGUF:
+            llm = rag_model.create_gguf_llm(gguf_path)
+            llm.max_tokens = new_tokens
+            invoke = partial(llm.invoke, prompt)
+            timings.append(measure(name, invoke, repeats, new_tokens))
+            continue
+
+        model, input_ids = _load_model(backend, llm_path, prompt)
+        generate = partial(generate_tokens, model, input_ids, new_tokens)
+        timings.append(measure(name, generate, repeats, new_tokens))
+    return timings
+
+
+def bench_speculation(
+    prompt: str,
+    llm_path: str,
+    draft_path: Optional[str],
+    new_tokens: int,
+    repeats: int,
+) -> List[BenchmarkResult]:
+    """Benchmark speculative decoding on the CPU bf16 backend.
+
+    Prompt lookup is always measured, a draft model only if given. The draft
+    acceptance rate of every variant is logged.
+
+    Args:
+        prompt: Prompt text
+        llm_path: HuggingFace causal LM name or path
+        draft_path: Draft model with the tokenizer of the main model or None
+        new_tokens: Number of generated tokens
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Generation results, one per drafting method
+    """
+    backend = rag_model.BACKEND_CPU_BF16
+    model, input_ids = _load_model(backend, llm_path, prompt)
+    variants = _speculation_variants(backend, draft_path)
+
+    timings = []
+    for variant, generate_kwargs in variants.items():
+        generate = partial(generate_tokens, model, input_ids, new_tokens, **generate_kwargs)
+        accepted_tokens = new_tokens - generate()
+        logger.info('%s acceptance rate %.2f', variant, accepted_tokens / new_tokens)
+        name = f'generate[{backend}+{variant}]'
+        timings.append(measure(name, generate, repeats, new_tokens))
+    return timings
+
+
+def _load_model(backend: str, llm_path: str, prompt: str) -> Tuple[CausalLM, torch.Tensor]:
+    """Load a HuggingFace model and tokenize the prompt for it.
+
+    Args:
+        backend: HuggingFace generation backend
+        llm_path: HuggingFace causal LM name or path
+        prompt: Prompt text
+
+    Returns:
+        Tuple[CausalLM, torch.Tensor]: Model and prompt token ids on its device
+    """
+    tokenizer, model, _ = rag_model.get_model_pipeline(backend, model_name=llm_path)
+    input_ids = tokenizer(prompt, return_tensors='pt').input_ids
+    return model, input_ids.to(model.device)
+
+
+def _speculation_variants(backend: str, draft_path: Optional[str]) -> SpeculationVariants:
+    """Get ``generate`` arguments of the measured drafting methods.
+
+    Args:
+        backend: HuggingFace generation backend of the draft model
+        draft_path: Draft model name or path, None to measure prompt lookup only
+
+    Returns:
+        SpeculationVariants: Speculation arguments by drafting method
+    """
+    prompt_lookup = speculation_kwargs(prompt_lookup_tokens=DEFAULT_PROMPT_LOOKUP_TOKENS)
+    variants = {'prompt_lookup': prompt_lookup}
+    if draft_path:
+        draft_model = rag_model.load_causal_lm(backend, draft_path)
+        variants['draft_model'] = speculation_kwargs(draft_model=draft_model)
+    return variants
@@ -0,0 +1,104 @@
+"""Benchmarks of document parsing and chunk embedding."""
+
+from typing import List
+
+from benchmarks.timing import BenchmarkResult, measure
+from InformationRetrieval.onnx_embedder import OnnxTransformerEmbedder
+from InformationRetrieval.text_embedder import TransformerEmbedder
+from InformationRetrieval.text_parser import (
+    DocumentChunker,
+    ParsedText,
+    TextParser,
+)
+from RAG.document_parser import parse_docx
+from RAG.text_processor import (
+    chunk_text,
+    process_paragraphs,
+    process_text_chunks,
+)
+
+
+def bench_parsing(docx_path: str, repeats: int) -> List[BenchmarkResult]:
+    """Benchmark DOCX parsing and text chunking.
+
+    Args:
+        docx_path: Path to the benchmark document
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Results of the parsing stages
+    """
+    doc_data = parse_docx(docx_path)
+    paragraphs = doc_data['paragraphs']
+    lines = process_paragraphs(paragraphs, lemmatize=False)
+    chunks = process_text_chunks(doc_data)
+    parsed_text = TextParser(language='ru').parse('\n'.join(lines))
+    chunker = DocumentChunker()
+
+    return [
+        measure('parse_docx', lambda: parse_docx(docx_path), repeats, len(paragraphs)),
+        measure('process_text_chunks', lambda: process_text_chunks(doc_data), repeats, len(chunks)),
+        measure('chunk_text', lambda: chunk_text(lines), repeats, len(lines)),
+        measure(
+            'DocumentChunker.create_chunks',
+            lambda: list(chunker.create_chunks(parsed_text)),
+            repeats,
+            len(parsed_text.tokens),
+        ),
+    ]
+
+
+def bench_embeddings(
+    chunks: List[str],
+    paragraphs: List[str],
+    model_path: str,
+    repeats: int,
+    onnx_dir: str,
+) -> List[BenchmarkResult]:
+    """Benchmark chunk embedding with the PyTorch and ONNX int8 backends.
+
+    Chunks mixed with single paragraphs are embedded with token-budget and
+    fixed-size batches to measure padding overhead on mixed-length input.
+
+    Args:
+        chunks: Text chunks to embed
+        paragraphs: Document paragraphs, shorter than chunks
+        model_path: SentenceTransformer model name or path
+        repeats: Number of timed runs
+        onnx_dir: Directory for the exported ONNX model
+
+    Returns:
+        List[BenchmarkResult]: Embedding results
+    """
+    embedder = TransformerEmbedder(model_name=model_path)
+    fixed_batch_embedder = TransformerEmbedder(model_name=model_path, max_batch_tokens=None)
+    onnx_embedder = OnnxTransformerEmbedder(model_name=model_path, cache_dir=onnx_dir)
+    parser = TextParser(language='ru')
+    parsed_chunks: List[ParsedText] = [parser.parse(chunk) for chunk in chunks]
+    parsed_mixed = parsed_chunks + [parser.parse(paragraph) for paragraph in paragraphs]
+    return [
+        measure(
+            'TransformerEmbedder.embed',
+            lambda: embedder.embed(parsed_chunks),
+            repeats,
+            len(chunks),
+        ),
+        measure(
+            'OnnxTransformerEmbedder.embed',
+            lambda: onnx_embedder.embed(parsed_chunks),
+            repeats,
+            len(chunks),
+        ),
+        measure(
+            'TransformerEmbedder.embed[mixed]',
+            lambda: embedder.embed(parsed_mixed),
+            repeats,
+            len(parsed_mixed),
+        ),
+        measure(
+            'TransformerEmbedder.embed[mixed_fixed]',
+            lambda: fixed_batch_embedder.embed(parsed_mixed),
+            repeats,
+            len(parsed_mixed),
+        ),
+    ]
@@ -0,0 +1,111 @@
+"""Benchmark reports saved to JSON and compared with a baseline run."""
+
+import json
+import logging
+import os
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping
+
+from benchmarks.timing import BenchmarkResult
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = 'benchmark_results'
+# Length of the commit hash in default report names
+COMMIT_PREFIX_LENGTH = 12
+UNKNOWN_COMMIT = 'unknown'
+
+
+def get_commit() -> str:
+    """Get the current git commit hash.
+
+    Returns:
+        str: Commit hash or 'unknown' outside of a git checkout
+    """
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return UNKNOWN_COMMIT
+    return completed.stdout.strip()
+
+
+def default_report_path() -> str:
+    """Get the report path named after the current commit.
+
+    Returns:
+        str: Path inside ``RESULTS_DIR``
+    """
+    commit = get_commit()[:COMMIT_PREFIX_LENGTH]
+    return os.path.join(RESULTS_DIR, f'{commit}.json')
+
+
+def save_results(
+    timings: List[BenchmarkResult],
+    config: Mapping[str, object],
+    output_path: str,
+) -> None:
+    """Save benchmark results with run metadata to JSON.
+
+    Args:
+        timings: Benchmark results
+        config: Settings of the run
+        output_path: Path of the JSON file
+    """
+    report = {
+        'commit': get_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'config': dict(config),
+        'results': {timing.name: timing.as_dict() for timing in timings},
+    }
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+
+
+def load_medians(report_path: str) -> Dict[str, float]:
+    """Load median times of a saved report.
+
+    Args:
+        report_path: Path of the JSON file
+
+    Returns:
+        Dict[str, float]: Median time in seconds by benchmark name
+    """
+    with open(report_path, 'r', encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    saved_timings = report['results'].items()
+    return {name: timing['median_s'] for name, timing in saved_timings}
+
+
+def compare_results(
+    timings: List[BenchmarkResult],
+    baseline: Mapping[str, float],
+    max_slowdown: float,
+) -> List[str]:
+    """Compare benchmark medians with a baseline run.
+
+    Args:
+        timings: Current results
+        baseline: Baseline median times by benchmark name
+        max_slowdown: Allowed ratio of current to baseline median time
+
+    Returns:
+        List[str]: Names of benchmarks slower than allowed
+    """
+    regressions = []
+    for timing in timings:
+        if timing.name not in baseline:
+            continue
+        baseline_median = baseline[timing.name]
+        ratio = timing.median_s / baseline_median
+        logger.info('%-40s %8.4fs -> %8.4fs (x%.2f)', timing.name, baseline_median, timing.median_s, ratio)
+        if ratio > max_slowdown:
+            regressions.append(timing.name)
+    return regressions
@@ -0,0 +1,140 @@
+"""Benchmarks of the vector store, deduplication and evaluation metrics."""
+
+import logging
+import random
+from typing import List
+
+from langchain import embeddings, vectorstores
+
+from benchmarks.timing import BenchmarkResult, measure
+from metrics.evaluator import Evaluator
+from metrics.types import RelevanceLists
+from RAG.dedup import deduplicate_chunks
+
+logger = logging.getLogger(__name__)
+
+# Every chunk is indexed this many times in the deduplication benchmark
+DEDUP_COPIES = 3
+RETRIEVAL_TOP_K = 5
+RELEVANCE_LEVELS = (0, 0, 0, 1, 2)
+
+
+def bench_vectorstore(
+    chunks: List[str],
+    queries: List[str],
+    model_path: str,
+    repeats: int,
+) -> List[BenchmarkResult]:
+    """Benchmark FAISS vector store build and similarity search.
+
+    Args:
+        chunks: Text chunks to index
+        queries: Search queries
+        model_path: SentenceTransformer model name or path
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Build and query results
+    """
+    model_embeddings = embeddings.HuggingFaceEmbeddings(model_name=model_path)
+    vectorstore = vectorstores.FAISS.from_texts(chunks, model_embeddings)
+    return [
+        measure(
+            'FAISS.from_texts',
+            lambda: vectorstores.FAISS.from_texts(chunks, model_embeddings),
+            repeats,
+            len(chunks),
+        ),
+        measure(
+            'FAISS.similarity_search',
+            lambda: [vectorstore.similarity_search(query, k=RETRIEVAL_TOP_K) for query in queries],
+            repeats,
+            len(queries),
+        ),
+        *bench_dedup(chunks, model_embeddings, repeats),
+    ]
+
+
+def bench_dedup(
+    chunks: List[str],
+    model_embeddings: embeddings.HuggingFaceEmbeddings,
+    repeats: int,
+) -> List[BenchmarkResult]:
+    """Benchmark index build on repeated chunks with and without deduplication.
+
+    Args:
+        chunks: Unique text chunks
+        model_embeddings: Embeddings model
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Deduplication and index build results
+    """
+    repeated_chunks = chunks * DEDUP_COPIES
+    unique_chunks = deduplicate_chunks(repeated_chunks)
+    logger.info('Deduplication shrinks the index by %.1f%%', unique_chunks.shrink_ratio * 100)
+    return [
+        measure(
+            'deduplicate_chunks',
+            lambda: deduplicate_chunks(repeated_chunks),
+            repeats,
+            len(repeated_chunks),
+        ),
+        measure(
+            'FAISS.from_texts[repeated]',
+            lambda: vectorstores.FAISS.from_texts(repeated_chunks, model_embeddings),
+            repeats,
+            len(repeated_chunks),
+        ),
+        measure(
+            'FAISS.from_texts[dedup]',
+            lambda: vectorstores.FAISS.from_texts(unique_chunks.chunks, model_embeddings),
+            repeats,
+            len(repeated_chunks),
+        ),
+    ]
+
+
+def bench_metrics(
+    candidates: List[str],
+    references: List[str],
+    bert_model_path: str,
+    repeats: int,
+) -> List[BenchmarkResult]:
+    """Benchmark text similarity and retrieval metrics.
+
+    Args:
+        candidates: Candidate answers
+        references: Reference answers
+        bert_model_path: BERT model name or path for BERTScore
+        repeats: Number of timed runs
+
+    Returns:
+        List[BenchmarkResult]: Metric results
+    """
+    evaluator = Evaluator(bert_model_name=bert_model_path)
+    rng = random.Random(len(candidates))
+    relevance_lists: RelevanceLists = [
+        [rng.choice(RELEVANCE_LEVELS) for _ in range(RETRIEVAL_TOP_K)] for _ in candidates
+    ]
+
+    return [
+        measure(
+            'Evaluator.evaluate_text_similarity',
+            lambda: evaluator.evaluate_text_similarity(candidates, references),
+            repeats,
+            len(candidates),
+        ),
+        measure(
+            'RougeEvaluator.compute_average_scores',
+            lambda: evaluator.rouge.compute_average_scores(candidates, references),
+            repeats,
+            len(candidates),
+        ),
+        measure(
+            'Evaluator.evaluate_retrieval',
+            lambda: evaluator.evaluate_retrieval(relevance_lists),
+            repeats,
+            len(relevance_lists),
+        ),
+    ]
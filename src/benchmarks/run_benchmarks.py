@@ -0,0 +1,200 @@
+"""Offline end-to-end benchmarks of the document QA pipeline.
+
+Run ``python -m benchmarks.run_benchmarks`` from ``src``. A synthetic Russian
+DOCX document is generated and all stages run on tiny randomly initialized
+models, so nothing is downloaded. Pass ``--embedding-model``, ``--bert-model``
+and ``--llm-model`` to measure real local models instead.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from functools import partial
+from typing import Dict, List, Optional
+
+from benchmarks import generation, preprocessing, report, retrieval
+from benchmarks.corpus import build_corpus
+from benchmarks.stub_models import (
+    build_stub_bert,
+    build_stub_llm,
+    build_stub_sentence_transformer,
+)
+from benchmarks.synthetic_docx import (
+    DEFAULT_PARAGRAPHS,
+    DEFAULT_SEED,
+    DEFAULT_TABLES,
+)
+from benchmarks.timing import BenchmarkResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEATS = 5
+DEFAULT_QUERIES = 50
+DEFAULT_METRIC_PAIRS = 50
+DEFAULT_MAX_SLOWDOWN = 1.2
+DEFAULT_NEW_TOKENS = 32
+STUB_MODEL = 'stub'
+BENCHMARK_GROUPS = ('parsing', 'embeddings', 'vectorstore', 'metrics', 'generation')
+
+
+def run_all(args: argparse.Namespace, workdir: str) -> List[BenchmarkResult]:
+    """Generate the corpus and run all benchmarks.
+
+    Args:
+        args: Parsed command line arguments
+        workdir: Directory for the generated document and stub models
+
+    Returns:
+        List[BenchmarkResult]: Results of all benchmarks
+    """
+    corpus = build_corpus(args, workdir)
+    stub_dir = partial(os.path.join, workdir)
+    embedding_model = args.embedding_model or build_stub_sentence_transformer(stub_dir('embedder'))
+    bert_model = args.bert_model or build_stub_bert(stub_dir('bert'))
+    llm_model = args.llm_model or build_stub_llm(stub_dir('llm'))
+    generation_args = (corpus.prompt, llm_model)
+
+    groups = {
+        'parsing': lambda: preprocessing.bench_parsing(corpus.docx_path, args.repeats),
+        'embeddings': lambda: preprocessing.bench_embeddings(
+            corpus.chunks,
+            corpus.paragraphs,
+            embedding_model,
+            args.repeats,
+            stub_dir('onnx'),
+        ),
+        'vectorstore': lambda: retrieval.bench_vectorstore(
+            corpus.chunks,
+            corpus.queries,
+            embedding_model,
+            args.repeats,
+        ),
+        'metrics': lambda: retrieval.bench_metrics(
+            corpus.queries[: args.metric_pairs],
+            corpus.references,
+            bert_model,
+            args.repeats,
+        ),
+        'generation': lambda: [
+            *generation.bench_generation(*generation_args, args.gguf_model, args.new_tokens, args.repeats),
+            *generation.bench_speculation(*generation_args, args.draft_model, args.new_tokens, args.repeats),
+        ],
+    }
+    timings = []
+    for group in BENCHMARK_GROUPS:
+        if group not in args.skip:
+            logger.info('Running %s benchmarks', group)
+            timings.extend(groups[group]())
+    return timings
+
+
+def run_config(args: argparse.Namespace) -> Dict[str, object]:
+    """Collect the settings of a run saved with its results.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Dict[str, object]: Corpus, model and generation settings
+    """
+    return {
+        'paragraphs': args.paragraphs,
+        'tables': args.tables,
+        'repeats': args.repeats,
+        'seed': args.seed,
+        'embedding_model': args.embedding_model or STUB_MODEL,
+        'bert_model': args.bert_model or STUB_MODEL,
+        'llm_model': args.llm_model or STUB_MODEL,
+        'gguf_model': args.gguf_model,
+        'draft_model': args.draft_model,
+        'new_tokens': args.new_tokens,
+        'skipped': args.skip,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Run offline benchmarks of the document QA pipeline')
+    parser.add_argument('--output', help='Path of the JSON results file')
+    parser.add_argument('--compare', help='Path of a baseline JSON results file')
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument(
+        '--skip',
+        nargs='*',
+        choices=BENCHMARK_GROUPS,
+        default=[],
+        help='Benchmark groups to skip',
+    )
+    _add_corpus_arguments(parser.add_argument_group('corpus'))
+    _add_model_arguments(parser.add_argument_group('models'))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmarks, save results and compare them with a baseline.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+
+    Returns:
+        int: Exit code, 1 if a benchmark regressed
+    """
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        timings = run_all(args, workdir)
+
+    output_path = args.output or report.default_report_path()
+    report.save_results(timings, run_config(args), output_path)
+    for timing in timings:
+        logger.info('%-40s median %8.4fs  %10.1f items/s', timing.name, timing.median_s, timing.items_per_s)
+    logger.info('Results saved to %s', output_path)
+
+    regressions = []
+    if args.compare:
+        baseline = report.load_medians(args.compare)
+        regressions = report.compare_results(timings, baseline, args.max_slowdown)
+    if regressions:
+        logger.warning('Slower than baseline by more than x%.2f: %s', args.max_slowdown, ', '.join(regressions))
+    return 1 if regressions else 0
+
+
+def _add_corpus_arguments(group: argparse._ArgumentGroup) -> None:
+    """Add options of the synthetic corpus.
+
+    Args:
+        group: Argument group to extend
+    """
+    group.add_argument('--paragraphs', type=int, default=DEFAULT_PARAGRAPHS)
+    group.add_argument('--tables', type=int, default=DEFAULT_TABLES)
+    group.add_argument('--queries', type=int, default=DEFAULT_QUERIES)
+    group.add_argument('--metric-pairs', type=int, default=DEFAULT_METRIC_PAIRS)
+    group.add_argument('--seed', type=int, default=DEFAULT_SEED)
+
+
+def _add_model_arguments(group: argparse._ArgumentGroup) -> None:
+    """Add options of the benchmarked models.
+
+    Args:
+        group: Argument group to extend
+    """
+    group.add_argument('--embedding-model', help='SentenceTransformer model instead of the stub')
+    group.add_argument('--bert-model', help='BERT model for BERTScore instead of the stub')
+    group.add_argument('--llm-model', help='HuggingFace causal LM for generation instead of the stub')
+    group.add_argument('--gguf-model', help='GGUF model file to benchmark the llama.cpp backend')
+    group.add_argument('--draft-model', help='Draft model for speculative decoding with the --llm-model tokenizer')
+    group.add_argument('--new-tokens', type=int, default=DEFAULT_NEW_TOKENS, help='Tokens generated per run')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Tiny randomly initialized models for offline benchmarks."""
+
+import os
+import string
+from typing import List
+
+import torch
+from sentence_transformers import SentenceTransformer
+from sentence_transformers import models as st_models
+from tokenizers import Tokenizer, decoders
+from tokenizers import models as tokenizer_models
+from tokenizers import normalizers, pre_tokenizers, processors
+from transformers import (
+    BertConfig,
+    BertModel,
+    LlamaConfig,
+    LlamaForCausalLM,
+    PreTrainedTokenizerFast,
+)
+
+from benchmarks.synthetic_docx import COLUMN_NAMES, RUSSIAN_WORDS
+
+PAD_TOKEN = '[PAD]'
+UNK_TOKEN = '[UNK]'
+CLS_TOKEN = '[CLS]'
+SEP_TOKEN = '[SEP]'
+MASK_TOKEN = '[MASK]'
+BERT_SPECIAL_TOKENS = (PAD_TOKEN, UNK_TOKEN, CLS_TOKEN, SEP_TOKEN, MASK_TOKEN)
+CYRILLIC_LETTERS = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+# Every character gets a token, so no text maps to the unknown token
+VOCAB_CHARACTERS = ''.join(
+    (
+        CYRILLIC_LETTERS,
+        CYRILLIC_LETTERS.upper(),
+        string.ascii_letters,
+        string.digits,
+        string.punctuation,
+        '—«»№',
+    ),
+)
+STUB_HIDDEN_SIZE = 128
+STUB_LAYERS = 2
+STUB_HEADS = 4
+STUB_MAX_POSITIONS = 512
+STUB_LLM_MAX_POSITIONS = 4096
+RANDOM_SEED = 0
+
+
+def _build_vocab() -> List[str]:
+    """Build a WordPiece vocabulary that covers any Russian or ASCII text.
+
+    Returns:
+        List[str]: Vocabulary tokens
+    """
+    column_words = ' '.join(COLUMN_NAMES).split()
+    words = {word.lower() for word in (*RUSSIAN_WORDS, *column_words)}
+    pieces = [f'##{character}' for character in VOCAB_CHARACTERS]
+    return [*BERT_SPECIAL_TOKENS, *VOCAB_CHARACTERS, *pieces, *sorted(words)]
+
+
+def build_stub_tokenizer(model_dir: str) -> PreTrainedTokenizerFast:
+    """Create and save a WordPiece tokenizer without downloads.
+
+    Args:
+        model_dir: Directory to save the tokenizer to
+
+    Returns:
+        PreTrainedTokenizerFast: Tokenizer
+    """
+    vocab = {token: index for index, token in enumerate(_build_vocab())}
+    backend = Tokenizer(tokenizer_models.WordPiece(vocab, unk_token=UNK_TOKEN))
+    backend.normalizer = normalizers.BertNormalizer(lowercase=True, strip_accents=False)
+    backend.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    separator = (SEP_TOKEN, vocab[SEP_TOKEN])
+    classifier = (CLS_TOKEN, vocab[CLS_TOKEN])
+    backend.post_processor = processors.BertProcessing(separator, classifier)
+    backend.decoder = decoders.WordPiece()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        pad_token=PAD_TOKEN,
+        unk_token=UNK_TOKEN,
+        cls_token=CLS_TOKEN,
+        sep_token=SEP_TOKEN,
+        mask_token=MASK_TOKEN,
+    )
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer.save_pretrained(model_dir)
+    return tokenizer
+
+
+def build_stub_bert(model_dir: str) -> str:
+    """Create and save a tiny BERT encoder usable as a HuggingFace model path.
+
+    Args:
+        model_dir: Directory to save the model to
+
+    Returns:
+        str: Path to the saved model
+    """
+    tokenizer = build_stub_tokenizer(model_dir)
+    torch.manual_seed(RANDOM_SEED)
+    config = BertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=STUB_HIDDEN_SIZE,
+        intermediate_size=STUB_HIDDEN_SIZE * 4,
+        num_hidden_layers=STUB_LAYERS,
+        num_attention_heads=STUB_HEADS,
+        max_position_embeddings=STUB_MAX_POSITIONS,
+    )
+    BertModel(config).save_pretrained(model_dir)
+    return model_dir
+
+
+def build_stub_sentence_transformer(model_dir: str, dense_features: int = 0) -> str:
+    """Create and save a tiny mean-pooling SentenceTransformer.
+
+    Args:
+        model_dir: Directory to save the model to
+        dense_features: Output size of a Dense and Normalize head after the
+            pooling, like in distiluse and LaBSE models. 0 adds no head
+
+    Returns:
+        str: Path usable as ``model_name`` of TransformerEmbedder
+    """
+    bert_dir = build_stub_bert(os.path.join(model_dir, 'bert'))
+    transformer = st_models.Transformer(bert_dir, max_seq_length=STUB_MAX_POSITIONS)
+    hidden_size = transformer.get_word_embedding_dimension()
+    modules = [transformer, st_models.Pooling(hidden_size, pooling_mode='mean')]
+    if dense_features:
+        modules.append(st_models.Dense(hidden_size, dense_features))
+        modules.append(st_models.Normalize())
+    sentence_model_dir = os.path.join(model_dir, 'sentence_transformer')
+    SentenceTransformer(modules=modules, device='cpu').save(sentence_model_dir)
+    return sentence_model_dir
+
+
+def build_stub_llm(model_dir: str) -> str:
+    """Create and save a tiny Llama causal LM with the stub tokenizer.
+
+    Args:
+        model_dir: Directory to save the model to
+
+    Returns:
+        str: Path usable with ``AutoModelForCausalLM.from_pretrained``
+    """
+    tokenizer = build_stub_tokenizer(model_dir)
+    torch.manual_seed(RANDOM_SEED)
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=STUB_HIDDEN_SIZE,
+        intermediate_size=STUB_HIDDEN_SIZE * 2,
+        num_hidden_layers=STUB_LAYERS,
+        num_attention_heads=STUB_HEADS,
+        num_key_value_heads=STUB_HEADS,
+        max_position_embeddings=STUB_LLM_MAX_POSITIONS,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.cls_token_id,
+        eos_token_id=tokenizer.sep_token_id,
+    )
+    LlamaForCausalLM(config).save_pretrained(model_dir)
+    return model_dir
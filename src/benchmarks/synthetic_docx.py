@@ -0,0 +1,194 @@
+"""Synthetic Russian DOCX corpus generator for benchmarks."""
+
+import argparse
+import os
+import random
+from typing import List, Sequence
+
+import docx
+from docx.document import Document
+
+DEFAULT_PARAGRAPHS = 200
+DEFAULT_TABLES = 20
+DEFAULT_TABLE_ROWS = 10
+DEFAULT_TABLE_COLUMNS = 4
+DEFAULT_SEED = 42
+SENTENCES_PER_PARAGRAPH = (2, 6)
+WORDS_PER_SENTENCE = (6, 16)
+MAX_CELL_NUMBER = 1000
+
+RUSSIAN_WORDS = tuple(
+    (
+        'система изделие комплект программное обеспечение уровень оператор параметр технологический должна '
+        'обеспечивать работы выполнение срок мощность служба контроль измерение данные передача сервер модуль '
+        'устройство требование эксплуатация документация лицензия монтаж сборка запасные части инструмент '
+        'принадлежности метрологически значимое визуализация отсутствие возможность влияние характеристика '
+        'назначение состав объект условия температура давление расход аварийный сигнал резервирование питание '
+        'интерфейс протокол архив журнал'
+    ).split(),
+)
+COLUMN_NAMES = (
+    'Наименование',
+    'Значение',
+    'Единица измерения',
+    'Срок выполнения',
+    'Ответственный',
+    'Количество',
+    'Примечание',
+    'Стоимость',
+    'Этап',
+    'Статус',
+)
+
+
+def make_sentence(rng: random.Random) -> str:
+    """Create a random Russian sentence.
+
+    Args:
+        rng: Random number generator
+
+    Returns:
+        str: Sentence ending with a period
+    """
+    words = rng.choices(RUSSIAN_WORDS, k=rng.randint(*WORDS_PER_SENTENCE))
+    return '{0}.'.format(' '.join(words).capitalize())
+
+
+def make_paragraph(rng: random.Random) -> str:
+    """Create a random paragraph.
+
+    Args:
+        rng: Random number generator
+
+    Returns:
+        str: Paragraph text
+    """
+    sentence_count = rng.randint(*SENTENCES_PER_PARAGRAPH)
+    return ' '.join(make_sentence(rng) for _ in range(sentence_count))
+
+
+def make_table_rows(rng: random.Random, rows: int, columns: int) -> List[List[str]]:
+    """Create table content with a header row.
+
+    Args:
+        rng: Random number generator
+        rows: Number of data rows
+        columns: Number of columns
+
+    Returns:
+        List[List[str]]: Header row followed by data rows
+    """
+    column_count = min(columns, len(COLUMN_NAMES))
+    header = rng.sample(COLUMN_NAMES, k=column_count)
+    body = []
+    for _ in range(rows):
+        row = []
+        for _ in header:
+            number = str(rng.randint(1, MAX_CELL_NUMBER))
+            word = rng.choice(RUSSIAN_WORDS)
+            row.append(rng.choice((number, word)))
+        body.append(row)
+    return [header, *body]
+
+
+def _table_positions(rng: random.Random, paragraphs: int, tables: int) -> Sequence[int]:
+    """Choose after which paragraphs tables are inserted.
+
+    Args:
+        rng: Random number generator
+        paragraphs: Number of paragraphs
+        tables: Number of tables
+
+    Returns:
+        Sequence[int]: Sorted paragraph indices, one per table
+    """
+    candidates = range(max(paragraphs, 1))
+    return sorted(rng.choices(candidates, k=tables))
+
+
+def _add_table(document: Document, rng: random.Random, table_number: int, rows: int, columns: int) -> None:
+    """Add a random table with its caption.
+
+    Args:
+        document: Document to extend
+        rng: Random number generator
+        table_number: 1-based number of the table in the caption
+        rows: Number of data rows
+        columns: Number of columns
+    """
+    caption = make_sentence(rng)
+    document.add_paragraph('Таблица {0} — {1}'.format(table_number, caption))
+    table_rows = make_table_rows(rng, rows, columns)
+    column_count = len(table_rows[0])
+    table = document.add_table(rows=len(table_rows), cols=column_count)
+    for row, row_values in zip(table.rows, table_rows):
+        for cell, cell_value in zip(row.cells, row_values):
+            cell.text = cell_value
+
+
+def generate_docx(
+    output_path: str,
+    paragraphs: int = DEFAULT_PARAGRAPHS,
+    tables: int = DEFAULT_TABLES,
+    table_rows: int = DEFAULT_TABLE_ROWS,
+    table_columns: int = DEFAULT_TABLE_COLUMNS,
+    seed: int = DEFAULT_SEED,
+) -> str:
+    """Generate a synthetic Russian DOCX document.
+
+    Every table is preceded by a sentence describing it, like in real
+    technical specifications.
+
+    Args:
+        output_path: Path of the DOCX file to write
+        paragraphs: Number of text paragraphs
+        tables: Number of tables
+        table_rows: Number of data rows per table
+        table_columns: Number of columns per table
+        seed: Random seed for reproducible documents
+
+    Returns:
+        str: Path to the written document
+    """
+    rng = random.Random(seed)
+    document = docx.Document()
+    positions = list(_table_positions(rng, paragraphs, tables))
+    table_number = 0
+
+    for paragraph_idx in range(paragraphs):
+        document.add_paragraph(make_paragraph(rng))
+        while positions and positions[0] == paragraph_idx:
+            positions.pop(0)
+            table_number += 1
+            _add_table(document, rng, table_number, table_rows, table_columns)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    document.save(output_path)
+    return output_path
+
+
+def main() -> None:
+    """Generate a synthetic DOCX file from command line arguments."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic Russian DOCX document')
+    parser.add_argument('output_path', help='Path of the DOCX file to write')
+    parser.add_argument('--paragraphs', type=int, default=DEFAULT_PARAGRAPHS)
+    parser.add_argument('--tables', type=int, default=DEFAULT_TABLES)
+    parser.add_argument('--table-rows', type=int, default=DEFAULT_TABLE_ROWS)
+    parser.add_argument('--table-columns', type=int, default=DEFAULT_TABLE_COLUMNS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    generate_docx(
+        args.output_path,
+        paragraphs=args.paragraphs,
+        tables=args.tables,
+        table_rows=args.table_rows,
+        table_columns=args.table_columns,
+        seed=args.seed,
+    )
+
+
+if __name__ == '__main__':
+    main()
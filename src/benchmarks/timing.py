@@ -0,0 +1,68 @@
+"""Timing helpers for benchmarks."""
+
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional, TypeVar
+
+ResultT = TypeVar('ResultT')
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of a single benchmark."""
+
+    name: str
+    median_s: float
+    min_s: float
+    repeats: int
+    item_count: int
+    items_per_s: float
+
+    def as_dict(self) -> Dict[str, float]:
+        """Convert result to a JSON-serializable dictionary.
+
+        Returns:
+            Dict[str, float]: Result fields
+        """
+        return asdict(self)
+
+
+def measure(
+    name: str,
+    func: Callable[[], ResultT],
+    repeats: int,
+    item_count: Optional[int] = None,
+    warmup: int = 1,
+) -> BenchmarkResult:
+    """Measure wall-clock time of a function.
+
+    Args:
+        name: Benchmark name
+        func: Function to call without arguments
+        repeats: Number of timed calls
+        item_count: Number of processed items per call, e.g. chunks or pairs
+        warmup: Number of untimed calls before measuring
+
+    Returns:
+        BenchmarkResult: Median and minimum time of the calls
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    median = statistics.median(durations)
+    item_count = item_count or 1
+    return BenchmarkResult(
+        name=name,
+        median_s=median,
+        min_s=min(durations),
+        repeats=repeats,
+        item_count=item_count,
+        items_per_s=item_count / median if median > 0 else float('inf'),
+    )
@@ -5,24 +5,32 @@ from typing import List, Optional, Union
 import torch
 from transformers import AutoModel, AutoTokenizer
 
+from metrics.result_cache import MetricResultCache, config_key, get_or_compute
+
 
 class BERTScoreMetric:
     """BERTScore metric for semantic similarity evaluation."""
 
     _default_model = 'DeepPavlov/rubert-base-cased'
     _max_sequence_length = 512
+    # Metric name of the scores in the result cache
+    cache_metric = 'bert_score'
 
     def __init__(
         self,
         model_name: str = _default_model,
         device: Optional[str] = None,
+        cache: Optional[MetricResultCache] = None,
     ):
         """Initialize BERTScore metric.
 
         Args:
             model_name: Name of the BERT model to use
             device: Device to use for computation. Defaults to CUDA if available, else CPU
+            cache: Persistent cache of per-pair scores
         """
+        self.cache = cache
+        self.cache_config = config_key({'model': model_name})
         self._cached_device: Optional[str] = None
         self.device = device or self._get_default_device()
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -49,7 +57,7 @@ class BERTScoreMetric:
         """
         # Handle single strings
         if isinstance(candidates, str) and isinstance(references, str):
-            return self._compute_single_score(candidates, references)
+            return self._compute_scores([candidates], [references])[0]
 
         # Handle lists of strings
         if not isinstance(candidates, list) or not isinstance(references, list):
@@ -58,24 +66,44 @@ class BERTScoreMetric:
         if len(candidates) != len(references):
             raise ValueError('Candidates and references must have the same length')
 
-        computed_scores = []
-        for cand, ref in zip(candidates, references):
-            computed_scores.append(self._compute_single_score(cand, ref))
-        return computed_scores
+        return self._compute_scores(candidates, references)
+
+    def embed_texts(self, texts: Union[str, List[str]]) -> torch.Tensor:
+        """Get BERT embeddings for text or several texts in one forward pass.
 
-    def _compute_single_score(self, candidate: str, reference: str) -> float:
-        """Compute BERTScore for a single pair of texts.
+        Embeddings can be computed once, e.g. for a reference shared by
+        several candidates, and scored with ``score_embeddings``.
 
         Args:
-            candidate: Candidate text
-            reference: Reference text
+            texts: Input text or texts
 
         Returns:
-            BERTScore between candidate and reference
+            Text embeddings with one row per text
         """
-        cand_embeddings = self._get_embeddings(candidate)
-        ref_embeddings = self._get_embeddings(reference)
+        inputs = self.tokenizer(
+            texts,
+            return_tensors='pt',
+            padding=True,
+            truncation=True,
+            max_length=self._max_sequence_length,
+        ).to(self.device)
+
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            embeddings = outputs.last_hidden_state.select(dim=1, index=0)
+
+        return embeddings
+
+    def score_embeddings(self, cand_embeddings: torch.Tensor, ref_embeddings: torch.Tensor) -> float:
+        """Compute BERTScore from precomputed embeddings.
+
+        Args:
+            cand_embeddings: Candidate embeddings
+            ref_embeddings: Reference embeddings
 
+        Returns:
+            BERTScore between candidate and reference
+        """
         similarity = torch.nn.functional.cosine_similarity(
             cand_embeddings,
             ref_embeddings,
@@ -83,28 +111,41 @@ class BERTScoreMetric:
 
         return float(similarity.mean().item())
 
-    def _get_embeddings(self, text: str) -> torch.Tensor:
-        """Get BERT embeddings for text.
+    def _compute_scores(self, candidates: List[str], references: List[str]) -> List[float]:
+        """Compute BERTScores of text pairs, reusing cached scores.
 
         Args:
-            text: Input text
+            candidates: Candidate texts
+            references: Reference texts
 
         Returns:
-            Text embeddings
+            BERTScores in pair order
         """
-        inputs = self.tokenizer(
-            text,
-            return_tensors='pt',
-            padding=True,
-            truncation=True,
-            max_length=self._max_sequence_length,
-        ).to(self.device)
+        return get_or_compute(
+            self.cache,
+            self.cache_metric,
+            self.cache_config,
+            candidates,
+            references,
+            self._compute_pair_scores,
+        )
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            embeddings = outputs.last_hidden_state[:, 0, :]
+    def _compute_pair_scores(self, candidates: List[str], references: List[str]) -> List[float]:
+        """Compute BERTScores of text pairs.
 
-        return embeddings
+        Args:
+            candidates: Candidate texts
+            references: Reference texts
+
+        Returns:
+            BERTScores in pair order
+        """
+        computed_scores = []
+        for cand, ref in zip(candidates, references):
+            cand_embeddings = self.embed_texts(cand)
+            ref_embeddings = self.embed_texts(ref)
+            computed_scores.append(self.score_embeddings(cand_embeddings, ref_embeddings))
+        return computed_scores
 
     def _get_default_device(self) -> str:
         """Get default device for computation.
@@ -5,6 +5,7 @@ from typing import List, Optional, Sequence, Union
 import numpy as np
 
 from metrics.bert_score import BERTScoreMetric
+from metrics.result_cache import MetricResultCache
 from metrics.retrieval_metrics import RetrievalMetrics
 from metrics.rouge_evaluator import RougeEvaluator
 from metrics.types import RelevanceLists, RetrievalScores, TextSimilarityScores
@@ -17,15 +18,19 @@ class Evaluator:
         self,
         bert_model_name: str = 'DeepPavlov/rubert-base-cased',
         rouge_types: Optional[Sequence[int]] = None,
+        cache_path: Optional[str] = None,
     ) -> None:
         """Initialize evaluator with all metrics.
 
         Args:
             bert_model_name: Name of the BERT model for BERTScore
             rouge_types: N-gram sizes for ROUGE metric. Defaults to (1, 2)
+            cache_path: SQLite file caching per-pair BERTScore and ROUGE results
+                between runs. Results are not cached if omitted
         """
-        self.bert_score = BERTScoreMetric(model_name=bert_model_name)
-        self.rouge = RougeEvaluator(rouge_types=rouge_types)
+        self.cache = MetricResultCache(cache_path) if cache_path else None
+        self.bert_score = BERTScoreMetric(model_name=bert_model_name, cache=self.cache)
+        self.rouge = RougeEvaluator(rouge_types=rouge_types, cache=self.cache)
         self.retrieval_metrics = RetrievalMetrics()
 
     def evaluate_text_similarity(
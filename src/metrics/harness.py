@@ -0,0 +1,360 @@
+"""Resumable evaluation of bot answers against reference answers.
+
+Run ``python -m metrics.harness dataset/qa_pairs.json --output-dir notebooks/results``
+from ``src``. All bots of a batch of QA pairs are scored in one pass: every
+reference is tokenized and embedded once and the embeddings of the references
+and answers come from a single BERT forward pass. With ``--cache`` the
+per-answer BERTScore and ROUGE results are kept in a ``MetricResultCache``
+shared with ``Evaluator``, so only new answers and references are scored.
+Scores of every pair are appended to a checkpoint file, so an interrupted run
+continues where it stopped. The summary files use the layout of
+``notebooks/metrics_eval.ipynb``.
+"""
+
+import argparse
+import json
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from metrics.evaluator import Evaluator
+from metrics.harness_report import BERT_SCORE_COLUMN, write_results
+from metrics.qa_pairs import ENCODING, QAItem, iter_qa_pairs
+from metrics.result_cache import get_or_compute
+from metrics.types import (
+    BotScores,
+    CheckpointRecord,
+    CheckpointRecords,
+    RawRougeScores,
+    RawRougeScoresList,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'checkpoint.jsonl'
+DEFAULT_BERT_MODEL = 'DeepPavlov/rubert-base-cased'
+DEFAULT_BATCH_SIZE = 4
+DEFAULT_WORKERS = 1
+DEFAULT_ROUGE_TYPES = (1, 2)
+# Batches scored or waiting for scoring per worker thread
+BATCHES_PER_WORKER = 2
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+BatchRecords = List[CheckpointRecord]
+# BERTScore and raw ROUGE scores of an answer
+AnswerScores = Tuple[float, RawRougeScores]
+
+
+class EvaluationHarness:
+    """Scores QA pairs in batches and checkpoints the results."""
+
+    def __init__(
+        self,
+        evaluator: Evaluator,
+        config_key: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        """Initialize harness.
+
+        Args:
+            evaluator: Evaluator providing BERTScore, ROUGE and the optional result cache
+            config_key: Metric configuration; checkpoints of other configurations are ignored
+            batch_size: Number of QA pairs embedded in one forward pass
+            workers: Number of batches scored concurrently
+        """
+        self.evaluator = evaluator
+        self.config_key = config_key
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def score_batch(self, qa_items: Sequence[QAItem]) -> BatchRecords:
+        """Score all answers of several QA pairs.
+
+        Answers with results in the evaluator cache are not scored again.
+
+        Args:
+            qa_items: QA pairs
+
+        Returns:
+            BatchRecords: Checkpoint records, one per pair
+        """
+        answers: List[str] = []
+        references: List[str] = []
+        for pair_item in qa_items:
+            item_answers = list(pair_item.scored_answers().values())
+            answers.extend(item_answers)
+            references.extend(pair_item.reference for _ in item_answers)
+
+        cache = self.evaluator.cache
+        bert_scores = get_or_compute(
+            cache,
+            self.evaluator.bert_score.cache_metric,
+            self.evaluator.bert_score.cache_config,
+            answers,
+            references,
+            self._compute_bert_scores,
+        )
+        rouge_scores = get_or_compute(
+            cache,
+            self.evaluator.rouge.cache_metric,
+            self.evaluator.rouge.cache_config,
+            answers,
+            references,
+            self._compute_rouge_scores,
+        )
+        answer_scores = zip(bert_scores, rouge_scores)
+        return [self._item_record(qa_item, answer_scores) for qa_item in qa_items]
+
+    def run(self, qa_items: Iterable[QAItem], checkpoint_path: str) -> CheckpointRecords:
+        """Score QA pairs that are not in the checkpoint yet.
+
+        Args:
+            qa_items: QA pairs
+            checkpoint_path: Path to the checkpoint file
+
+        Returns:
+            CheckpointRecords: Records of all pairs by index
+        """
+        records = load_checkpoint(checkpoint_path, self.config_key)
+        pending = (qa_item for qa_item in qa_items if not _is_scored(qa_item, records))
+        batches = _batched(pending, self.batch_size)
+
+        checkpoint = Path(checkpoint_path)
+        _terminate_last_line(checkpoint)
+        with checkpoint.open('a', encoding=ENCODING) as checkpoint_file:
+            for batch_records in self._map_batches(batches):
+                for record in batch_records:
+                    line = json.dumps(record, ensure_ascii=False)
+                    checkpoint_file.write(f'{line}\n')
+                    records[record['index']] = record
+                checkpoint_file.flush()
+                logger.info('Scored %s QA pairs', len(records))
+        return records
+
+    def _item_record(self, qa_item: QAItem, answer_scores: Iterator[AnswerScores]) -> CheckpointRecord:
+        """Build the checkpoint record of one QA pair.
+
+        Args:
+            qa_item: QA pair
+            answer_scores: Scores of the following answers, consumed for the scored answers of the pair
+
+        Returns:
+            CheckpointRecord: Checkpoint record
+        """
+        scores: Dict[str, Optional[BotScores]] = dict.fromkeys(map(str, qa_item.answers))
+        for bot in qa_item.scored_answers():
+            answer_bert_score, answer_rouge_scores = next(answer_scores)
+            bot_scores = {BERT_SCORE_COLUMN: answer_bert_score}
+            for name, rouge_score in answer_rouge_scores.items():
+                bot_scores[name.upper()] = rouge_score['f1']
+            scores[str(bot)] = bot_scores
+        return {
+            'index': qa_item.index,
+            'key': qa_item.key,
+            'config': self.config_key,
+            'question': qa_item.question,
+            'scores': scores,
+        }
+
+    def _compute_bert_scores(self, answers: List[str], references: List[str]) -> List[float]:
+        """Compute BERTScores of answers with a single BERT forward pass.
+
+        Args:
+            answers: Answers
+            references: Reference of every answer
+
+        Returns:
+            List[float]: BERTScore of every answer
+        """
+        if not answers:
+            return []
+        texts = list(dict.fromkeys([*references, *answers]))
+        embeddings = self.evaluator.bert_score.embed_texts(texts)
+        text_embeddings = dict(zip(texts, embeddings.split(1)))
+        computed_scores = []
+        for answer, reference in zip(answers, references):
+            answer_embedding = text_embeddings[answer]
+            reference_embedding = text_embeddings[reference]
+            computed_scores.append(self.evaluator.bert_score.score_embeddings(answer_embedding, reference_embedding))
+        return computed_scores
+
+    def _compute_rouge_scores(self, answers: List[str], references: List[str]) -> RawRougeScoresList:
+        """Compute ROUGE scores of answers, tokenizing every reference once.
+
+        Args:
+            answers: Answers
+            references: Reference of every answer
+
+        Returns:
+            RawRougeScoresList: ROUGE scores of every answer
+        """
+        rouge = self.evaluator.rouge
+        unique_references = dict.fromkeys(references)
+        reference_tokens = {reference: rouge.rouge.tokenize(reference) for reference in unique_references}
+        return [
+            rouge.rouge.compute_token_scores(
+                rouge.rouge.tokenize(answer),
+                reference_tokens[reference],
+                rouge.rouge_types,
+            )
+            for answer, reference in zip(answers, references)
+        ]
+
+    def _map_batches(self, batches: Iterable[List[QAItem]]) -> Iterator[BatchRecords]:
+        """Score batches on worker threads keeping their order.
+
+        At most two batches per worker are in flight, so the input is read lazily.
+
+        Args:
+            batches: Batches of QA pairs
+
+        Yields:
+            BatchRecords: Records of each batch
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight: Deque[Future[BatchRecords]] = deque()
+            for batch in batches:
+                in_flight.append(executor.submit(self.score_batch, batch))
+                if len(in_flight) >= self.workers * BATCHES_PER_WORKER:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+
+def _is_scored(qa_item: QAItem, records: CheckpointRecords) -> bool:
+    """Check that the checkpoint has scores of the pair with the same content.
+
+    Args:
+        qa_item: QA pair
+        records: Checkpoint records by pair index
+
+    Returns:
+        bool: True if the pair does not need scoring
+    """
+    record = records.get(qa_item.index)
+    return record is not None and record['key'] == qa_item.key
+
+
+def _batched(qa_items: Iterable[QAItem], batch_size: int) -> Iterator[List[QAItem]]:
+    """Group QA pairs into lists.
+
+    Args:
+        qa_items: QA pairs to group
+        batch_size: Maximum group size
+
+    Yields:
+        List[QAItem]: Groups of QA pairs
+    """
+    batch: List[QAItem] = []
+    for qa_item in qa_items:
+        batch.append(qa_item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_checkpoint(checkpoint_path: str, config_key: str) -> CheckpointRecords:
+    """Load scored pairs of the same metric configuration.
+
+    Args:
+        checkpoint_path: Path to the checkpoint file
+        config_key: Metric configuration of the current run
+
+    Returns:
+        CheckpointRecords: Records by pair index; later records override earlier ones
+    """
+    records: CheckpointRecords = {}
+    path = Path(checkpoint_path)
+    if not path.exists():
+        return records
+    with path.open('r', encoding=ENCODING) as checkpoint_file:
+        for line in checkpoint_file:
+            # A run killed mid-write leaves a truncated last line
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('config') == config_key:
+                records[record['index']] = record
+    return records
+
+
+def _terminate_last_line(path: Path) -> None:
+    """End the line left truncated by an interrupted run.
+
+    New records are appended on their own line instead of being glued to the
+    truncated one.
+
+    Args:
+        path: Path to the checkpoint file
+    """
+    if path.exists() and not path.read_bytes().endswith(b'\n'):
+        with path.open('ab') as checkpoint_file:
+            checkpoint_file.write(b'\n')
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Evaluate bot answers against reference answers',
+    )
+    parser.add_argument('pairs_path', help='QA pairs in the dataset/qa_pairs.json format or JSONL')
+    parser.add_argument('--output-dir', default='results', help='Directory for result tables and the checkpoint')
+    parser.add_argument('--bert-model', default=DEFAULT_BERT_MODEL)
+    parser.add_argument('--rouge-types', type=int, nargs='+', default=DEFAULT_ROUGE_TYPES)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--cache', help='SQLite file caching per-answer BERTScore and ROUGE results between runs')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Evaluate QA pairs, resuming from the checkpoint in the output directory.
+
+    Args:
+        argv: Arguments to parse instead of ``sys.argv``
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    args = parse_args(argv)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    metric_config = {'bert_model': args.bert_model, 'rouge_types': args.rouge_types}
+    evaluator = Evaluator(args.bert_model, args.rouge_types, args.cache)
+    harness = EvaluationHarness(
+        evaluator,
+        config_key=json.dumps(metric_config),
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    qa_items = iter_qa_pairs(args.pairs_path)
+    records = harness.run(qa_items, str(output_dir / CHECKPOINT_FILE))
+    if evaluator.cache is not None:
+        evaluator.cache.close()
+    write_results(records, args.pairs_path, args.output_dir)
+    logger.info('Results saved to %s', args.output_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Result tables and summary of the evaluation harness.
+
+The files follow the layout of ``notebooks/results`` produced by
+``notebooks/metrics_eval.ipynb``.
+"""
+
+import operator
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import pandas as pd
+
+from metrics.qa_pairs import ENCODING, QUESTION_KEY, QAItem, iter_qa_pairs
+from metrics.retrieval_metrics import RetrievalMetrics
+from metrics.types import BotScores, CheckpointRecords
+
+BERT_SCORE_COLUMN = 'BERTScore'
+MRR_COLUMN = 'MRR'
+NDCG_COLUMN = 'NDCG'
+# Weights of BERTScore, ROUGE-1 and ROUGE-2 in the relevance used for MRR and NDCG
+RELEVANCE_WEIGHTS: Mapping[str, float] = MappingProxyType(
+    {
+        BERT_SCORE_COLUMN: 0.4,
+        'ROUGE-1': 0.3,
+        'ROUGE-2': 0.3,
+    },
+)
+SEPARATOR_WIDTH = 80
+SUBSEPARATOR_WIDTH = 40
+SEPARATOR = '=' * SEPARATOR_WIDTH
+SUBSEPARATOR = '-' * SUBSEPARATOR_WIDTH
+
+BotTables = Dict[int, pd.DataFrame]
+BotRetrieval = Dict[int, Dict[str, float]]
+TableRow = Dict[str, Union[str, float]]
+
+
+def compute_relevance(scores: Optional[BotScores]) -> float:
+    """Combine similarity scores into a relevance for retrieval metrics.
+
+    Args:
+        scores: BERTScore and ROUGE F1 scores of an answer, None if it was not scored
+
+    Returns:
+        float: Weighted relevance
+    """
+    if not scores:
+        return 0
+    column_scores = (scores.get(column, 0) for column in RELEVANCE_WEIGHTS)
+    return sum(map(operator.mul, column_scores, RELEVANCE_WEIGHTS.values()))
+
+
+def build_bot_tables(records: CheckpointRecords) -> BotTables:
+    """Build per-bot score tables in pair order.
+
+    Args:
+        records: Checkpoint records by pair index
+
+    Returns:
+        BotTables: Tables with question and metric columns, indexed by pair
+        index, by bot number
+    """
+    rows: Dict[int, Dict[int, TableRow]] = {}
+    for index in sorted(records):
+        record = records[index]
+        for bot_key, bot_scores in record['scores'].items():
+            pair_rows = rows.setdefault(int(bot_key), {})
+            if bot_scores is not None:
+                row: TableRow = {QUESTION_KEY: record['question']}
+                row.update(bot_scores)
+                pair_rows[index] = row
+    bot_tables: BotTables = {}
+    for bot, bot_rows in sorted(rows.items()):
+        bot_tables[bot] = pd.DataFrame.from_dict(bot_rows, orient='index')
+    return bot_tables
+
+
+def compute_retrieval(records: CheckpointRecords, bots: Iterable[int]) -> BotRetrieval:
+    """Compute MRR and NDCG of every bot from answer relevances.
+
+    Args:
+        records: Checkpoint records by pair index
+        bots: Bot numbers
+
+    Returns:
+        BotRetrieval: MRR and NDCG by bot number
+    """
+    retrieval_metrics = RetrievalMetrics()
+    ordered_records = [records[index] for index in sorted(records)]
+    retrieval = {}
+    for bot in bots:
+        bot_key = str(bot)
+        bot_scores = (record['scores'].get(bot_key) for record in ordered_records)
+        relevance_lists = [[compute_relevance(scores)] for scores in bot_scores]
+        retrieval[bot] = {
+            MRR_COLUMN: retrieval_metrics.compute_mrr(relevance_lists),
+            NDCG_COLUMN: retrieval_metrics.compute_ndcg(relevance_lists),
+        }
+    return retrieval
+
+
+def write_results(records: CheckpointRecords, pairs_path: str, output_dir: str) -> None:
+    """Write metric tables and the summary in the ``notebooks/results`` format.
+
+    Args:
+        records: Checkpoint records by pair index
+        pairs_path: Path to the QA pairs file, reread for best answers
+        output_dir: Directory for the result files
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    bot_tables = build_bot_tables(records)
+    retrieval = compute_retrieval(records, bot_tables)
+
+    for bot, bot_table in bot_tables.items():
+        bot_table.to_csv(output_path / f'bot{bot}_metrics.csv', index=False)
+
+    metric_names = [MRR_COLUMN, NDCG_COLUMN]
+    retrieval_table = pd.DataFrame({'Metric': metric_names})
+    for bot, bot_retrieval in retrieval.items():
+        retrieval_table[f'Bot {bot}'] = [bot_retrieval[name] for name in metric_names]
+    retrieval_table.to_csv(output_path / 'retrieval_metrics.csv', index=False)
+
+    summary = format_summary(bot_tables, retrieval, pairs_path)
+    (output_path / 'summary.txt').write_text(summary, encoding=ENCODING)
+
+
+def format_summary(bot_tables: BotTables, retrieval: BotRetrieval, pairs_path: str) -> str:
+    """Format summary statistics, retrieval metrics and best answers.
+
+    Args:
+        bot_tables: Per-bot score tables
+        retrieval: MRR and NDCG by bot number
+        pairs_path: Path to the QA pairs file
+
+    Returns:
+        str: Summary text
+    """
+    first_table = next(iter(bot_tables.values()))
+    metric_columns = [column for column in first_table.columns if column != QUESTION_KEY]
+    lines: List[str] = []
+    for bot, bot_table in bot_tables.items():
+        statistics = bot_table[metric_columns].describe().to_string()
+        lines.extend((f'Bot {bot} Summary Statistics:', f'{statistics}\n'))
+
+    lines.extend(_format_retrieval(retrieval))
+    lines.extend(('\n\nBest Answers Analysis:', SEPARATOR))
+
+    questions = {qa_item.index: qa_item for qa_item in iter_qa_pairs(pairs_path)}
+    for metric in metric_columns:
+        lines.extend((f'\nBest answers by {metric}:', SUBSEPARATOR))
+        lines.extend(_format_best_answers(bot_tables, metric, questions))
+        lines.append(f'\n{SEPARATOR}')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def _format_retrieval(retrieval: BotRetrieval) -> List[str]:
+    """Format MRR and NDCG of every bot.
+
+    Args:
+        retrieval: MRR and NDCG by bot number
+
+    Returns:
+        List[str]: Summary lines
+    """
+    lines = ['Retrieval Metrics:']
+    for bot, bot_retrieval in retrieval.items():
+        mrr = bot_retrieval[MRR_COLUMN]
+        ndcg = bot_retrieval[NDCG_COLUMN]
+        lines.append(f'Bot {bot} - MRR: {mrr:.3f}, NDCG: {ndcg:.3f}')
+    return lines
+
+
+def _format_best_answers(
+    bot_tables: BotTables,
+    metric: str,
+    questions: Dict[int, QAItem],
+) -> List[str]:
+    """Format the best answer of every bot by a metric.
+
+    Args:
+        bot_tables: Per-bot score tables indexed by pair index
+        metric: Metric column
+        questions: QA pairs by pair index
+
+    Returns:
+        List[str]: Summary lines
+    """
+    lines: List[str] = []
+    for bot, bot_table in bot_tables.items():
+        if bot_table.empty:
+            continue
+        best_index = bot_table[metric].idxmax()
+        best_score = bot_table.at[best_index, metric]
+        qa_item = questions[best_index]
+        lines.extend(
+            (
+                f'\nBot {bot} best ({metric}: {best_score:.3f}):',
+                f'Question: {qa_item.question}',
+                f'Answer: {qa_item.answers[bot]}',
+                f'Reference: {qa_item.reference}',
+            ),
+        )
+    return lines
@@ -0,0 +1,90 @@
+"""QA pairs with answers of several bots read from the dataset files."""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+REFERENCE_KEY = 'reference_answer'
+QUESTION_KEY = 'question'
+PAIRS_KEY = 'qa_pairs'
+BOT_ANSWER_PATTERN = re.compile(r'^bot(\d+)_answer$')
+ENCODING = 'utf-8'
+
+QARecord = Dict[str, str]
+
+
+@dataclass
+class QAItem:
+    """QA pair with answers of all bots."""
+
+    index: int
+    question: str
+    reference: str
+    # Answers by bot number in ascending order
+    answers: Dict[int, str]
+
+    @property
+    def key(self) -> str:
+        """Get a content hash identifying the pair.
+
+        Returns:
+            str: Hex digest of the question, reference and answers
+        """
+        fields = [self.question, self.reference, self.answers]
+        serialized = json.dumps(fields, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(serialized.encode(ENCODING)).hexdigest()
+
+    def scored_answers(self) -> Dict[int, str]:
+        """Get answers that are compared with the reference.
+
+        Returns:
+            Dict[int, str]: Non-empty answers by bot number; none without a reference
+        """
+        if not self.reference:
+            return {}
+        return {bot: answer for bot, answer in self.answers.items() if answer}
+
+
+def iter_qa_pairs(path: str) -> Iterator[QAItem]:
+    """Read QA pairs one by one.
+
+    ``.jsonl`` files with one pair per line are streamed; ``.json`` files in
+    the ``dataset/qa_pairs.json`` layout are loaded as a whole.
+
+    Args:
+        path: Path to the QA pairs file
+
+    Yields:
+        QAItem: QA pairs in file order
+    """
+    with Path(path).open('r', encoding=ENCODING) as pairs_file:
+        records: Iterable[QARecord]
+        if path.endswith('.jsonl'):
+            records = (json.loads(line) for line in pairs_file if line.strip())
+        else:
+            records = json.load(pairs_file)[PAIRS_KEY]
+        for index, record in enumerate(records):
+            yield _to_item(index, record)
+
+
+def _to_item(index: int, record: QARecord) -> QAItem:
+    """Convert a QA pair record to an item.
+
+    Args:
+        index: Position of the pair in the file
+        record: QA pair record
+
+    Returns:
+        QAItem: QA pair with bot answers keyed by bot number
+    """
+    answers = {}
+    for field, answer in record.items():
+        match = BOT_ANSWER_PATTERN.match(field)
+        if match:
+            answers[int(match.group(1))] = answer or ''
+    reference = record.get(REFERENCE_KEY) or ''
+    sorted_answers = dict(sorted(answers.items()))
+    return QAItem(index, record[QUESTION_KEY], reference, sorted_answers)
@@ -0,0 +1,222 @@
+"""Persistent cache of per-pair metric results."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+ResultT = TypeVar('ResultT')
+Texts = List[str]
+# Computes results of lists of candidates and references
+PairScorer = Callable[[Texts, Texts], List[ResultT]]
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS metric_results (
+    metric TEXT NOT NULL,
+    config TEXT NOT NULL,
+    candidate_hash TEXT NOT NULL,
+    reference_hash TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (metric, config, candidate_hash, reference_hash)
+)
+"""
+SELECT_SQL = """
+SELECT result FROM metric_results
+WHERE metric = ? AND config = ? AND candidate_hash = ? AND reference_hash = ?
+"""
+INSERT_SQL = 'INSERT OR REPLACE INTO metric_results VALUES (?, ?, ?, ?, ?)'
+
+
+def text_hash(text: str) -> str:
+    """Hash text for use in cache keys.
+
+    Args:
+        text: Input text
+
+    Returns:
+        str: SHA-256 hex digest of the UTF-8 text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def config_key(config: Mapping[str, object]) -> str:
+    """Serialize metric configuration for use in cache keys.
+
+    Args:
+        config: Metric configuration, e.g. model name or ROUGE n-gram sizes
+
+    Returns:
+        str: Canonical JSON of the configuration
+    """
+    return json.dumps(config, sort_keys=True, ensure_ascii=False)
+
+
+class MetricResultCache:
+    """SQLite cache of metric results keyed by metric, config and text hashes.
+
+    Results are stored per candidate/reference pair, so re-evaluation
+    after adding a bot or QA pairs only computes the new pairs.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open or create the cache database.
+
+        Args:
+            path: Path to the SQLite file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(CREATE_TABLE_SQL)
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        """Count cached results.
+
+        Returns:
+            int: Number of cached pair results
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM metric_results').fetchone()[0]
+
+    def get(self, metric: str, config: str, candidate: str, reference: str) -> object:
+        """Get a cached result.
+
+        Args:
+            metric: Metric name
+            config: Serialized metric configuration
+            candidate: Candidate text
+            reference: Reference text
+
+        Returns:
+            object: Cached result or None if the pair was not evaluated
+        """
+        with self._lock:
+            row = self._connection.execute(
+                SELECT_SQL,
+                (metric, config, text_hash(candidate), text_hash(reference)),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_many(
+        self,
+        metric: str,
+        config: str,
+        candidates: Sequence[str],
+        references: Sequence[str],
+        pair_results: Sequence[object],
+    ) -> None:
+        """Store results of several pairs in one transaction.
+
+        Args:
+            metric: Metric name
+            config: Serialized metric configuration
+            candidates: Candidate texts
+            references: Reference texts
+            pair_results: JSON-serializable results of the pairs
+        """
+        rows = []
+        for candidate, reference, pair_result in zip(candidates, references, pair_results):
+            key = (metric, config, text_hash(candidate), text_hash(reference))
+            rows.append((*key, json.dumps(pair_result)))
+        with self._lock:
+            self._connection.executemany(INSERT_SQL, rows)
+            self._connection.commit()
+
+    def get_or_compute(
+        self,
+        metric: str,
+        config: str,
+        candidates: Sequence[str],
+        references: Sequence[str],
+        compute: PairScorer[ResultT],
+    ) -> List[ResultT]:
+        """Get results of all pairs, computing and storing the missing ones.
+
+        Args:
+            metric: Metric name
+            config: Serialized metric configuration
+            candidates: Candidate texts
+            references: Reference texts
+            compute: Computes results for lists of candidates and references
+
+        Returns:
+            List[ResultT]: Results in pair order
+        """
+        found = self._get_found(metric, config, candidates, references)
+        pair_indexes = range(len(candidates))
+        missing = [index for index in pair_indexes if index not in found]
+        if missing:
+            missing_candidates = [candidates[index] for index in missing]
+            missing_references = [references[index] for index in missing]
+            computed = compute(missing_candidates, missing_references)
+            self.put_many(metric, config, missing_candidates, missing_references, computed)
+            found.update(zip(missing, computed))
+        pair_results = [found[index] for index in pair_indexes]
+        return cast(List[ResultT], pair_results)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _get_found(
+        self,
+        metric: str,
+        config: str,
+        candidates: Sequence[str],
+        references: Sequence[str],
+    ) -> Dict[int, object]:
+        """Get cached results of the pairs that were evaluated.
+
+        Args:
+            metric: Metric name
+            config: Serialized metric configuration
+            candidates: Candidate texts
+            references: Reference texts
+
+        Returns:
+            Dict[int, object]: Cached results by pair position
+        """
+        found = {}
+        for index, candidate in enumerate(candidates):
+            pair_result = self.get(metric, config, candidate, references[index])
+            if pair_result is not None:
+                found[index] = pair_result
+        return found
+
+
+def get_or_compute(
+    cache: Optional[MetricResultCache],
+    metric: str,
+    config: str,
+    candidates: List[str],
+    references: List[str],
+    compute: PairScorer[ResultT],
+) -> List[ResultT]:
+    """Get results of all pairs from an optional cache.
+
+    Args:
+        cache: Result cache; results are always computed without one
+        metric: Metric name
+        config: Serialized metric configuration
+        candidates: Candidate texts
+        references: Reference texts
+        compute: Computes results for lists of candidates and references
+
+    Returns:
+        List[ResultT]: Results in pair order
+    """
+    if cache is None:
+        return compute(candidates, references)
+    return cache.get_or_compute(metric, config, candidates, references, compute)
@@ -30,11 +30,40 @@ class RougeMetric:
         Returns:
             Dictionary with ROUGE scores for each n-gram size
         """
-        used_rouge_types = list(self._default_ngram_sizes) if rouge_types is None else rouge_types
+        return self.compute_token_scores(
+            self.tokenize(candidate),
+            self.tokenize(reference),
+            rouge_types,
+        )
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize text the same way as ``compute_scores`` does.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of tokens
+        """
+        return self._scorer.tokenize(text)
+
+    def compute_token_scores(
+        self,
+        candidate_tokens: List[str],
+        reference_tokens: List[str],
+        rouge_types: Optional[List[int]] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Compute ROUGE scores for already tokenized texts.
 
-        candidate_tokens = self._scorer.tokenize(candidate)
-        reference_tokens = self._scorer.tokenize(reference)
+        Args:
+            candidate_tokens: Tokenized candidate text
+            reference_tokens: Tokenized reference text
+            rouge_types: List of n-gram sizes to compute. Defaults to [1, 2]
 
+        Returns:
+            Dictionary with ROUGE scores for each n-gram size
+        """
+        used_rouge_types = list(self._default_ngram_sizes) if rouge_types is None else rouge_types
         return self._compute_scores_for_types(
             candidate_tokens,
             reference_tokens,
@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Sequence
 
 import numpy as np
 
+from metrics.result_cache import MetricResultCache, config_key, get_or_compute
 from metrics.rouge import RougeMetric
 from metrics.types import RawRougeScoresList, RougeScores
 
@@ -12,15 +13,24 @@ class RougeEvaluator:
     """ROUGE evaluation functionality."""
 
     _default_rouge_types = (1, 2)
+    # Metric name of the scores in the result cache
+    cache_metric = 'rouge'
 
-    def __init__(self, rouge_types: Optional[Sequence[int]] = None) -> None:
+    def __init__(
+        self,
+        rouge_types: Optional[Sequence[int]] = None,
+        cache: Optional[MetricResultCache] = None,
+    ) -> None:
         """Initialize ROUGE evaluator.
 
         Args:
             rouge_types: N-gram sizes for ROUGE metric. Defaults to (1, 2)
+            cache: Persistent cache of per-pair scores
         """
         self.rouge = RougeMetric()
         self.rouge_types = list(rouge_types or self._default_rouge_types)
+        self.cache = cache
+        self.cache_config = config_key({'rouge_types': self.rouge_types})
 
     def compute_single_scores(
         self,
@@ -36,11 +46,7 @@ class RougeEvaluator:
         Returns:
             Dictionary with ROUGE scores for each n-gram size
         """
-        raw_scores = self.rouge.compute_scores(
-            candidate,
-            reference,
-            self.rouge_types,
-        )
+        raw_scores = self._compute_raw_scores([candidate], [reference])[0]
         rouge_scores: Dict[str, RougeScores] = {}
 
         for rouge_type, scores in raw_scores.items():
@@ -66,10 +72,7 @@ class RougeEvaluator:
         Returns:
             Dictionary with averaged ROUGE scores for each n-gram size
         """
-        # Compute scores for each pair
-        all_scores = []
-        for cand, ref in zip(candidates, references):
-            all_scores.append(self.rouge.compute_scores(cand, ref, self.rouge_types))
+        all_scores = self._compute_raw_scores(candidates, references)
 
         # Calculate averages for each ROUGE type
         avg_rouge: Dict[str, RougeScores] = {}
@@ -82,6 +85,40 @@ class RougeEvaluator:
 
         return avg_rouge
 
+    def _compute_raw_scores(self, candidates: List[str], references: List[str]) -> RawRougeScoresList:
+        """Compute ROUGE scores of text pairs, reusing cached scores.
+
+        Args:
+            candidates: List of candidate texts
+            references: List of reference texts
+
+        Returns:
+            ROUGE scores of each pair
+        """
+        return get_or_compute(
+            self.cache,
+            self.cache_metric,
+            self.cache_config,
+            candidates,
+            references,
+            self._compute_pair_scores,
+        )
+
+    def _compute_pair_scores(self, candidates: List[str], references: List[str]) -> RawRougeScoresList:
+        """Compute ROUGE scores of text pairs.
+
+        Args:
+            candidates: List of candidate texts
+            references: List of reference texts
+
+        Returns:
+            ROUGE scores of each pair
+        """
+        all_scores = []
+        for cand, ref in zip(candidates, references):
+            all_scores.append(self.rouge.compute_scores(cand, ref, self.rouge_types))
+        return all_scores
+
     def _compute_averages(
         self,
         all_scores: RawRougeScoresList,
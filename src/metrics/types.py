@@ -1,6 +1,6 @@
 """Type definitions for metrics."""
 
-from typing import Dict, List, TypedDict, Union
+from typing import Dict, List, Optional, TypedDict, Union
 
 Number = Union[int, float]
 RelevanceList = List[Number]
@@ -9,6 +9,9 @@ RelevanceLists = List[RelevanceList]
 RawRougeScores = Dict[str, Dict[str, float]]
 RawRougeScoresList = List[RawRougeScores]
 
+# BERTScore and ROUGE F1 of an answer by metric column
+BotScores = Dict[str, float]
+
 
 class RougeScores(TypedDict):
     """Type for ROUGE scores."""
@@ -30,3 +33,17 @@ class RetrievalScores(TypedDict):
 
     mrr: float
     ndcg: float
+
+
+class CheckpointRecord(TypedDict):
+    """Type for scores of a QA pair saved by the evaluation harness."""
+
+    index: int
+    key: str
+    config: str
+    question: str
+    # Scores by bot number; None for answers that were not scored
+    scores: Dict[str, Optional[BotScores]]
+
+
+CheckpointRecords = Dict[int, CheckpointRecord]
@@ -0,0 +1 @@
+"""Tracing and operational telemetry for the QA pipelines."""
@@ -0,0 +1,276 @@
+"""Tracing of LangChain chains, retrievers, LLM calls and embeddings."""
+
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from observability.tracing import AttributeValue, Span, span, tracer
+
+
+class RunSpanHandler(BaseCallbackHandler):
+    """Keeps a span of every running LangChain run, closing failed runs."""
+
+    def __init__(self) -> None:
+        """Initialize handler without open runs."""
+        self._runs: Dict[UUID, Span] = {}
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: object) -> None:
+        """Close a failed chain span.
+
+        Args:
+            error: Raised exception
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        self._end(run_id, error=type(error).__name__)
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: object) -> None:
+        """Close a failed search span.
+
+        Args:
+            error: Raised exception
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        self._end(run_id, error=type(error).__name__)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: object) -> None:
+        """Close a failed generation span.
+
+        Args:
+            error: Raised exception
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        self._end(run_id, error=type(error).__name__)
+
+    def _start(self, name: str, run_id: UUID, parent_run_id: Optional[UUID], **attributes: AttributeValue) -> None:
+        """Open a span for a run.
+
+        Args:
+            name: Span name
+            run_id: Run identifier
+            parent_run_id: Identifier of the enclosing run
+            attributes: Initial span attributes
+        """
+        if tracer.enabled:
+            parent = self._runs.get(parent_run_id) if parent_run_id else None
+            run_span = tracer.start_span(name, parent=parent, attributes=attributes)
+            self._runs[run_id] = run_span
+
+    def _end(self, run_id: UUID, **attributes: AttributeValue) -> None:
+        """Close the span of a run.
+
+        Args:
+            run_id: Run identifier
+            attributes: Final span attributes
+        """
+        run_span = self._runs.pop(run_id, None)
+        if run_span is not None:
+            run_span.attributes.update(attributes)
+            run_span.end()
+
+
+class TracingCallbackHandler(RunSpanHandler):
+    """Records a span for every chain, retriever and LLM run.
+
+    Spans are nested by LangChain run ids, so the time between a
+    retriever span and the LLM span inside a chain is the prompt
+    building time.
+    """
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, object],
+        inputs: Dict[str, object],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: object,
+    ) -> None:
+        """Open a chain span.
+
+        Args:
+            serialized: Serialized chain
+            inputs: Chain inputs
+            run_id: Run identifier
+            parent_run_id: Identifier of the enclosing run
+            kwargs: Other callback arguments
+        """
+        serialized_name = serialized.get('name') if serialized else None
+        name = kwargs.get('name') or serialized_name or 'chain'
+        self._start(f'chain:{name}', run_id, parent_run_id)
+
+    def on_chain_end(self, outputs: Dict[str, object], *, run_id: UUID, **kwargs: object) -> None:
+        """Close a chain span.
+
+        Args:
+            outputs: Chain outputs
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        self._end(run_id)
+
+    def on_retriever_start(
+        self,
+        serialized: Dict[str, object],
+        query: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: object,
+    ) -> None:
+        """Open a search span.
+
+        Args:
+            serialized: Serialized retriever
+            query: Search query
+            run_id: Run identifier
+            parent_run_id: Identifier of the enclosing run
+            kwargs: Other callback arguments
+        """
+        self._start('search', run_id, parent_run_id, query_chars=len(query))
+
+    def on_retriever_end(self, documents: Sequence[Document], *, run_id: UUID, **kwargs: object) -> None:
+        """Close a search span.
+
+        Args:
+            documents: Retrieved documents
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        self._end(run_id, k=len(documents))
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, object],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: object,
+    ) -> None:
+        """Open a generation span.
+
+        Args:
+            serialized: Serialized LLM
+            prompts: Prompts sent to the LLM
+            run_id: Run identifier
+            parent_run_id: Identifier of the enclosing run
+            kwargs: Other callback arguments
+        """
+        prompt_chars = sum(map(len, prompts))
+        self._start('generate', run_id, parent_run_id, prompt_chars=prompt_chars)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, object],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: object,
+    ) -> None:
+        """Open a generation span for a chat model.
+
+        Args:
+            serialized: Serialized chat model
+            messages: Messages sent to the model
+            run_id: Run identifier
+            parent_run_id: Identifier of the enclosing run
+            kwargs: Other callback arguments
+        """
+        message_count = sum(map(len, messages))
+        self._start('generate', run_id, parent_run_id, messages=message_count)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: object) -> None:
+        """Close a generation span with token usage when the LLM reports it.
+
+        Args:
+            response: LLM result
+            run_id: Run identifier
+            kwargs: Other callback arguments
+        """
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        token_counts: Dict[str, int] = {}
+        for key, usage_value in usage.items():
+            if isinstance(usage_value, int):
+                token_counts[key] = usage_value
+        self._end(run_id, **token_counts)
+
+
+class TracedEmbeddings(Embeddings):
+    """Embeddings wrapper that traces document and query embedding."""
+
+    def __init__(self, embeddings: Embeddings):
+        """Wrap an embeddings model.
+
+        Args:
+            embeddings: Embeddings model to trace
+        """
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents inside an ``embed_documents`` span.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: Embedding vectors
+        """
+        with span('embed_documents', texts=len(texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query inside an ``embed_query`` span.
+
+        Args:
+            text: Query text
+
+        Returns:
+            List[float]: Embedding vector
+        """
+        with span('embed_query', query_chars=len(text)):
+            return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents asynchronously inside an ``embed_documents`` span.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: Embedding vectors
+        """
+        with span('embed_documents', texts=len(texts)):
+            return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a query asynchronously inside an ``embed_query`` span.
+
+        Args:
+            text: Query text
+
+        Returns:
+            List[float]: Embedding vector
+        """
+        with span('embed_query', query_chars=len(text)):
+            return await self.embeddings.aembed_query(text)
+
+
+tracing_handler = TracingCallbackHandler()
+
+
+def tracing_callbacks() -> List[BaseCallbackHandler]:
+    """Get callbacks to pass to a chain call.
+
+    Returns:
+        List[BaseCallbackHandler]: Tracing handler or nothing if tracing is disabled
+    """
+    return [tracing_handler] if tracer.enabled else []
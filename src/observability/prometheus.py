@@ -0,0 +1,380 @@
+"""Counters, gauges and histograms in the Prometheus text format.
+
+Metrics are plain Python objects updated under a per-metric lock, so an
+update costs a few hundred nanoseconds. Bind labels once with ``labels``
+outside hot loops.
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+# Label value characters escaped in the text format
+LABEL_ESCAPES = str.maketrans({'\\': r'\\', '"': r'\"', '\n': r'\n'})
+
+LabelValues = tuple[str, ...]
+MetricType = TypeVar('MetricType', bound='Metric')
+
+
+def _format_labels(names: Sequence[str], label_values: Sequence[str]) -> str:
+    """Format label pairs.
+
+    Args:
+        names: Label names
+        label_values: Label values
+
+    Returns:
+        str: ``{name="value",...}`` or an empty string without labels
+    """
+    if not names:
+        return ''
+    escaped = [str(label_value).translate(LABEL_ESCAPES) for label_value in label_values]
+    pairs = ','.join(map('{0}="{1}"'.format, names, escaped))
+    return f'{{{pairs}}}'
+
+
+class Metric(ABC):
+    """Base class of metrics with optional labels."""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            label_names: Names of the labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[LabelValues, 'Metric'] = {}
+        self._lock = threading.Lock()
+
+    def labels(self: MetricType, **label_values: str) -> MetricType:
+        """Get the child metric for label values.
+
+        Args:
+            label_values: Value of every label
+
+        Returns:
+            MetricType: Child metric of the same type to update
+
+        Raises:
+            ValueError: If label names do not match
+        """
+        if set(label_values) != set(self.label_names):
+            raise ValueError(f'Expected labels {self.label_names} for {self.name}')
+        key = tuple(label_values[name] for name in self.label_names)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return cast(MetricType, child)
+
+    def render(self) -> List[str]:
+        """Render the metric in the text format.
+
+        Returns:
+            List[str]: Exposition lines
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}',
+        ]
+        samples: List[tuple[LabelValues, Metric]] = [((), self)]
+        if self.label_names:
+            # Request threads add children while the registry is scraped
+            with self._lock:
+                samples = list(self._children.items())
+        for label_values, child in sorted(samples, key=itemgetter(0)):
+            lines.extend(child.samples(self.name, self.label_names, label_values))
+        return lines
+
+    @abstractmethod
+    def samples(self, name: str, label_names: Sequence[str], label_values: LabelValues) -> List[str]:
+        """Render samples of a single child.
+
+        Args:
+            name: Metric name
+            label_names: Label names
+            label_values: Label values of the child
+
+        Returns:
+            List[str]: Sample lines
+        """
+
+    def _new_child(self: MetricType) -> MetricType:
+        """Create an unlabeled metric of the same type.
+
+        Returns:
+            MetricType: Child metric
+        """
+        return type(self)(self.name, self.documentation)
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """Initialize counter at zero.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            label_names: Names of the labels
+        """
+        super().__init__(name, documentation, label_names)
+        self.metric_value: float = 0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+        """
+        with self._lock:
+            self.metric_value += amount
+
+    def samples(self, name: str, label_names: Sequence[str], label_values: LabelValues) -> List[str]:
+        """Render the counter value.
+
+        Args:
+            name: Metric name
+            label_names: Label names
+            label_values: Label values of the child
+
+        Returns:
+            List[str]: Sample lines
+        """
+        return [f'{name}{_format_labels(label_names, label_values)} {self.metric_value}']
+
+
+class Gauge(Metric):
+    """Value that goes up and down or is read from a function on scrape."""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """Initialize gauge at zero.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            label_names: Names of the labels
+        """
+        super().__init__(name, documentation, label_names)
+        self.metric_value: float = 0
+        self._value_function: Optional[Callable[[], float]] = None
+
+    def set(self, metric_value: float) -> None:
+        """Set the gauge.
+
+        Args:
+            metric_value: New value
+        """
+        self.metric_value = metric_value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the gauge.
+
+        Args:
+            amount: Increment
+        """
+        with self._lock:
+            self.metric_value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the gauge.
+
+        Args:
+            amount: Decrement
+        """
+        with self._lock:
+            self.metric_value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the gauge with a function on every scrape.
+
+        Args:
+            function: Function returning the current value
+        """
+        self._value_function = function
+
+    @contextmanager
+    def track_in_progress(self) -> Iterator[None]:
+        """Count the enclosed block as in progress.
+
+        Yields:
+            None: Control while the block runs
+        """
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def samples(self, name: str, label_names: Sequence[str], label_values: LabelValues) -> List[str]:
+        """Render the gauge value.
+
+        Args:
+            name: Metric name
+            label_names: Label names
+            label_values: Label values of the child
+
+        Returns:
+            List[str]: Sample lines
+        """
+        metric_value = self._value_function() if self._value_function else self.metric_value
+        return [f'{name}{_format_labels(label_names, label_values)} {metric_value}']
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """Initialize empty histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            label_names: Names of the labels
+            buckets: Sorted upper bounds of the buckets
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # The last bucket counts observations above every bound
+        bucket_number = len(self.buckets) + 1
+        self.bucket_counts = [0 for _ in range(bucket_number)]
+        self.observation_sum: float = 0
+
+    def observe(self, observation: float) -> None:
+        """Record an observation.
+
+        Args:
+            observation: Observed value
+        """
+        index = bisect.bisect_left(self.buckets, observation)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.observation_sum += observation
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds.
+
+        Yields:
+            None: Control while the block runs
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name: str, label_names: Sequence[str], label_values: LabelValues) -> List[str]:
+        """Render cumulative buckets, sum and count.
+
+        Args:
+            name: Metric name
+            label_names: Label names
+            label_values: Label values of the child
+
+        Returns:
+            List[str]: Sample lines
+        """
+        bucket_label_names = (*label_names, 'le')
+        lines = []
+        cumulative = 0
+        bound_labels = (*map(str, self.buckets), '+Inf')
+        for bound_label, bucket_count in zip(bound_labels, self.bucket_counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels(bucket_label_names, (*label_values, bound_label))
+            lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+        labels = _format_labels(label_names, label_values)
+        lines.append(f'{name}_sum{labels} {self.observation_sum}')
+        lines.append(f'{name}_count{labels} {cumulative}')
+        return lines
+
+    def _new_child(self) -> 'Histogram':
+        """Create an unlabeled histogram with the same buckets.
+
+        Returns:
+            Histogram: Child histogram
+        """
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: MetricType) -> MetricType:
+        """Add a metric to the registry.
+
+        Args:
+            metric: Metric to add
+
+        Returns:
+            MetricType: Registered metric of the same type
+
+        Raises:
+            ValueError: If a metric with the same name exists
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format.
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join([*lines, ''])
@@ -0,0 +1,148 @@
+"""Operational metrics of the QA bots and their HTTP endpoint.
+
+``serve_metrics`` exposes the registry on ``http://<host>:<port>/metrics``;
+the port can also come from the ``METRICS_PORT`` environment variable.
+"""
+
+import logging
+import os
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from observability.prometheus import Counter, Gauge, Histogram, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT_ENV = 'METRICS_PORT'
+METRICS_HOST = '127.0.0.1'
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+THROUGHPUT_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0)
+MODEL_LABELS = ('model',)
+CACHE_LABELS = ('cache',)
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.register(
+    Histogram('qa_stage_latency_seconds', 'Latency of QA pipeline stages', ('bot', 'stage')),
+)
+GENERATION_SPEED = registry.register(
+    Histogram(
+        'qa_generation_tokens_per_second',
+        'Generated tokens per second of a single answer',
+        MODEL_LABELS,
+        buckets=THROUGHPUT_BUCKETS,
+    ),
+)
+GENERATED_TOKENS = registry.register(Counter('qa_generated_tokens_total', 'Generated tokens', MODEL_LABELS))
+DRAFT_ACCEPTED_TOKENS = registry.register(
+    Counter('qa_draft_accepted_tokens_total', 'Generated tokens accepted from speculative drafts', MODEL_LABELS),
+)
+CACHE_REQUESTS = registry.register(Counter('qa_cache_requests_total', 'Cache lookups', CACHE_LABELS))
+CACHE_HITS = registry.register(Counter('qa_cache_hits_total', 'Cache lookups served from the cache', CACHE_LABELS))
+INDEX_SIZE = registry.register(Gauge('qa_index_chunks', 'Number of chunks in the vector index', ('bot',)))
+QUEUE_DEPTH = registry.register(Gauge('qa_queue_depth', 'Requests waiting or in progress', ('bot', 'queue')))
+MODEL_MEMORY = registry.register(Gauge('qa_model_memory_bytes', 'Memory used by model weights', MODEL_LABELS))
+
+
+def record_cache_lookup(cache: str, hits: int, requests: int = 1) -> None:
+    """Count cache lookups and hits.
+
+    Args:
+        cache: Cache name
+        hits: Number of lookups served from the cache
+        requests: Total number of lookups
+    """
+    CACHE_REQUESTS.labels(cache=cache).inc(requests)
+    if hits:
+        CACHE_HITS.labels(cache=cache).inc(hits)
+
+
+def record_generation(model: str, new_tokens: int, elapsed: float) -> None:
+    """Count generated tokens and observe the generation speed.
+
+    Args:
+        model: Model name
+        new_tokens: Number of generated tokens
+        elapsed: Generation time in seconds
+    """
+    GENERATED_TOKENS.labels(model=model).inc(new_tokens)
+    if elapsed > 0:
+        GENERATION_SPEED.labels(model=model).observe(new_tokens / elapsed)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry on the metrics path."""
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Respond with the exposition text."""
+        if self.path.split('?')[0] != METRICS_PATH:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, message_format: str, *args) -> None:
+        """Log requests at debug level instead of stderr.
+
+        Args:
+            message_format: Message format
+            args: Message arguments
+        """
+        logger.debug(message_format, *args)
+
+
+class MetricsServer:
+    """Metrics endpoint started at most once per process."""
+
+    def __init__(self) -> None:
+        """Initialize without a running server."""
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    def start(self, port: int, host: str) -> ThreadingHTTPServer:
+        """Start the endpoint in a daemon thread unless it is running.
+
+        Args:
+            port: Port to listen on, 0 for a free port
+            host: Interface to bind
+
+        Returns:
+            ThreadingHTTPServer: Running server
+        """
+        with self._lock:
+            if self.server is None:
+                self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                serve_thread = threading.Thread(
+                    target=self.server.serve_forever,
+                    name='metrics-server',
+                    daemon=True,
+                )
+                serve_thread.start()
+                logger.info('Serving metrics on http://%s:%s%s', host, self.server.server_port, METRICS_PATH)
+            return self.server
+
+
+metrics_server = MetricsServer()
+
+
+def serve_metrics(port: Optional[int] = None, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Start the metrics endpoint in a daemon thread once per process.
+
+    Args:
+        port: Port to listen on, defaults to the ``METRICS_PORT`` environment variable
+        host: Interface to bind
+
+    Returns:
+        Optional[ThreadingHTTPServer]: Running server or None if no port is configured
+    """
+    port_setting = os.getenv(METRICS_PORT_ENV) if port is None else port
+    if port_setting is None:
+        return metrics_server.server
+    return metrics_server.start(int(port_setting), host)
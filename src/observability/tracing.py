@@ -0,0 +1,371 @@
+"""Lightweight nested tracing spans with JSONL and Chrome trace export.
+
+Tracing is disabled by default and every ``span`` call then returns a shared
+no-op span. Set the ``TRACE_FILE`` environment variable or call
+``enable_tracing`` to record spans: a ``.jsonl`` path gets one span per line as
+spans finish, any other path gets a Chrome trace (open it in
+``chrome://tracing`` or Perfetto) written at exit. Chrome traces and in-memory
+tracing keep only the last ``MAX_MEMORY_SPANS`` spans, so use JSONL to trace
+long-running services.
+"""
+
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    ParamSpec,
+    TextIO,
+    TypeVar,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE_ENV = 'TRACE_FILE'
+JSONL_EXTENSION = '.jsonl'
+NS_PER_US = 1000
+# Spans kept for Chrome trace export, older spans are dropped
+MAX_MEMORY_SPANS = 100_000
+
+AttributeValue = Union[str, int, float, bool, None]
+SpanAttributes = Dict[str, AttributeValue]
+SpanToken = contextvars.Token[Optional['Span']]
+ParamsT = ParamSpec('ParamsT')
+ReturnT = TypeVar('ReturnT')
+TracedFunc = Callable[ParamsT, ReturnT]
+TracingDecorator = Callable[
+    [TracedFunc[ParamsT, ReturnT]],
+    TracedFunc[ParamsT, ReturnT],
+]
+
+
+class Span:
+    """Timed operation with attributes and a parent span."""
+
+    __slots__ = (
+        'name',
+        'span_id',
+        'parent_id',
+        'start_ns',
+        'thread_id',
+        'attributes',
+        '_end_ns',
+        '_tracer',
+        '_token',
+    )
+
+    def __init__(self, tracer: 'Tracer', name: str, parent_id: Optional[int], attributes: SpanAttributes):
+        """Start a span.
+
+        Args:
+            tracer: Tracer recording the span
+            name: Operation name
+            parent_id: Identifier of the enclosing span
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.span_id = next(tracer.span_ids)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self._end_ns: Optional[int] = None
+        self._tracer = tracer
+        self._token: Optional[SpanToken] = None
+
+    def __enter__(self) -> 'Span':
+        """Make the span current for nested spans.
+
+        Returns:
+            Span: This span
+        """
+        self._token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Finish the span and restore the enclosing one.
+
+        Args:
+            exc_type: Exception type raised inside the span
+            exc_value: Exception raised inside the span
+            traceback: Traceback of the exception
+        """
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        if self._token is not None:
+            current_span.reset(self._token)
+        self.end()
+
+    @property
+    def duration_ns(self) -> int:
+        """Get span duration.
+
+        Returns:
+            int: Duration in nanoseconds, up to now for unfinished spans
+        """
+        return (self._end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def set_attribute(self, key: str, attribute_value: AttributeValue) -> None:
+        """Set a span attribute.
+
+        Args:
+            key: Attribute name
+            attribute_value: Attribute value
+        """
+        self.attributes[key] = attribute_value
+
+    def end(self) -> None:
+        """Finish the span and pass it to the tracer."""
+        if self._end_ns is None:
+            self._end_ns = time.perf_counter_ns()
+            self._tracer.record(self)
+
+    def as_json_line(self) -> str:
+        """Serialize the span as a line of a JSONL trace.
+
+        Returns:
+            str: JSON object of the span fields followed by a newline
+        """
+        record = json.dumps(
+            {
+                'name': self.name,
+                'span_id': self.span_id,
+                'parent_id': self.parent_id,
+                'start_ns': self.start_ns,
+                'duration_ns': self.duration_ns,
+                'thread_id': self.thread_id,
+                'attributes': self.attributes,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+        return f'{record}\n'
+
+
+class NoopSpan:
+    """Span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> 'NoopSpan':
+        """Enter the span.
+
+        Returns:
+            NoopSpan: This span
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Exit the span.
+
+        Args:
+            exc_type: Exception type raised inside the span
+            exc_value: Exception raised inside the span
+            traceback: Traceback of the exception
+        """
+
+    def set_attribute(self, key: str, attribute_value: AttributeValue) -> None:
+        """Ignore an attribute.
+
+        Args:
+            key: Attribute name
+            attribute_value: Attribute value
+        """
+
+    def end(self) -> None:
+        """Do nothing."""
+
+
+NOOP_SPAN = NoopSpan()
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """Collects finished spans and writes them to a trace file."""
+
+    def __init__(self, max_spans: int = MAX_MEMORY_SPANS) -> None:
+        """Initialize a disabled tracer.
+
+        Args:
+            max_spans: Number of most recent spans kept in memory
+        """
+        self.enabled = False
+        self.output_path: Optional[str] = None
+        self.span_ids = itertools.count(1)
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._stream: Optional[TextIO] = None
+        self._dropped_warned = False
+        self._start_ns = time.perf_counter_ns()
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        attributes: Optional[SpanAttributes] = None,
+    ) -> Span:
+        """Start a span that is finished explicitly with ``end``.
+
+        Args:
+            name: Operation name
+            parent: Enclosing span, defaults to the current span
+            attributes: Initial attributes
+
+        Returns:
+            Span: Started span
+        """
+        parent = parent or current_span.get()
+        parent_id = parent.span_id if parent else None
+        return Span(self, name, parent_id, attributes or {})
+
+    def record(self, finished_span: Span) -> None:
+        """Store a finished span or stream it to the JSONL file.
+
+        Args:
+            finished_span: Finished span
+        """
+        with self._lock:
+            if self._stream is not None:
+                self._stream.write(finished_span.as_json_line())
+                self._stream.flush()
+                return
+            is_full = len(self.spans) == self.spans.maxlen
+            if is_full and not self._dropped_warned:
+                self._dropped_warned = True
+                logger.warning('Keeping only the last %s spans in memory, trace to a .jsonl file', self.spans.maxlen)
+            self.spans.append(finished_span)
+
+    def enable(self, output_path: Optional[str] = None) -> None:
+        """Start recording spans.
+
+        Args:
+            output_path: Trace file; spans are kept in memory if omitted
+        """
+        self.disable()
+        self.output_path = output_path
+        if output_path and output_path.endswith(JSONL_EXTENSION):
+            self._stream = Path(output_path).open('a', encoding='utf-8')
+        self.enabled = True
+        self._dropped_warned = False
+        logger.info('Tracing enabled, output: %s', output_path or 'memory')
+
+    def disable(self) -> None:
+        """Stop recording spans and write the trace file."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+            elif self.output_path:
+                self.export_chrome_trace(self.output_path)
+
+    def export_chrome_trace(self, output_path: str) -> None:
+        """Write collected spans in the Chrome trace event format.
+
+        Args:
+            output_path: Path of the JSON file
+        """
+        events = [
+            {
+                'name': finished_span.name,
+                'ph': 'X',
+                'ts': (finished_span.start_ns - self._start_ns) / NS_PER_US,
+                'dur': finished_span.duration_ns / NS_PER_US,
+                'pid': os.getpid(),
+                'tid': finished_span.thread_id,
+                'args': finished_span.attributes,
+            }
+            for finished_span in self.spans
+        ]
+        with open(output_path, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': events}, trace_file, ensure_ascii=False, default=str)
+
+    def export_jsonl(self, output_path: str) -> None:
+        """Write collected spans as JSON lines.
+
+        Args:
+            output_path: Path of the JSONL file
+        """
+        with open(output_path, 'w', encoding='utf-8') as trace_file:
+            for finished_span in self.spans:
+                trace_file.write(finished_span.as_json_line())
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes: AttributeValue) -> Union[Span, NoopSpan]:
+    """Create a span to use as a context manager.
+
+    Args:
+        name: Operation name
+        attributes: Initial attributes
+
+    Returns:
+        Union[Span, NoopSpan]: Recording span or a no-op span if tracing is disabled
+    """
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return tracer.start_span(name, attributes=attributes)
+
+
+def traced(name: Optional[str] = None) -> TracingDecorator[ParamsT, ReturnT]:
+    """Trace every call of a function.
+
+    Args:
+        name: Span name, defaults to the qualified function name
+
+    Returns:
+        TracingDecorator: Decorator keeping the signature of the function
+    """
+
+    def decorator(func: TracedFunc[ParamsT, ReturnT]) -> TracedFunc[ParamsT, ReturnT]:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: ParamsT.args, **kwargs: ParamsT.kwargs) -> ReturnT:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable_tracing(output_path: Optional[str] = None) -> Tracer:
+    """Enable tracing and write the trace file at exit.
+
+    Args:
+        output_path: Trace file, ``.jsonl`` for JSON lines, otherwise Chrome trace JSON
+
+    Returns:
+        Tracer: Global tracer
+    """
+    tracer.enable(output_path)
+    return tracer
+
+
+def disable_tracing() -> None:
+    """Disable tracing and write the trace file."""
+    tracer.disable()
+
+
+atexit.register(disable_tracing)
+if os.getenv(TRACE_FILE_ENV):
+    enable_tracing(os.environ[TRACE_FILE_ENV])
@@ -1,25 +1,65 @@
+import asyncio
+import logging
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+
 import urllib3
-from chromadb.config import Settings
 from dtt import DocumentProcessor
+from ingestion import BatchedEmbeddings
 from langchain.chains import RetrievalQA
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.chat_models import GigaChat
 from langchain_community.document_loaders import TextLoader
 from langchain_community.embeddings import GigaChatEmbeddings
-from langchain_community.vectorstores import Chroma
+from persistent_db import (
+    CHROMA_DIR,
+    build_collection,
+    collection_name,
+    create_client,
+    document_fingerprint,
+    load_collection,
+)
+
+from observability.langchain_tracing import TracedEmbeddings, tracing_callbacks
+from observability.telemetry import (
+    INDEX_SIZE,
+    QUEUE_DEPTH,
+    STAGE_LATENCY,
+    record_cache_lookup,
+    serve_metrics,
+)
+from observability.tracing import span
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 400
+
+BOT_NAME = 'serverless'
+ANSWER_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='get_answer')
+SUMMARY_WAIT_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='wait_summary')
+QA_CHAIN_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='qa_chain')
+SUMMARY_LATENCY = STAGE_LATENCY.labels(bot=BOT_NAME, stage='summarize')
+ANSWERS_IN_PROGRESS = QUEUE_DEPTH.labels(bot=BOT_NAME, queue='in_progress')
+PENDING_SUMMARIES = QUEUE_DEPTH.labels(bot=BOT_NAME, queue='summaries')
+
 
 class ChatBot:
     """A chat bot that processes a DOCX file, converts it to text, and uses it
     to answer questions."""
 
-    def __init__(self, docx_file_path):
+    def __init__(self, docx_file_path, persist_directory=CHROMA_DIR):
         """Initializes the ChatBot with a DOCX file path.
 
+        The embedded chunks are stored in a persistent Chroma collection
+        keyed by the DOCX content hash and chunking parameters, so a
+        restart for the same document skips processing and embedding.
+
         Args:
             docx_file_path (str): The file path of the DOCX document to process.
+            persist_directory (str): Directory of the persistent Chroma database.
         """
         self.text_file_path = docx_file_path[:-5] + 'Intxt.txt'
         self.auth_key = (
@@ -35,45 +75,30 @@ class ChatBot:
             streaming=True,
         )
 
-        # Process the DOCX file
-        converter = DocumentProcessor(docx_file_path, self.giga_chat_simple)
-        converter.save_to_txt(self.text_file_path)
-        table_names = converter.get_table_titles()
-
-        # Load and split text documents
-        self.loader = TextLoader(self.text_file_path, encoding='utf-8')
-        self.documents = self.loader.load()
-        chunk_size = 2000
-        chunk_overlap = 400
-
-        while chunk_size > 100:
-            try:
-                self.text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=chunk_size,
-                    chunk_overlap=chunk_overlap,
-                )
-
-                self.documents = self.text_splitter.split_documents(self.documents)
-
-                # Create embeddings for the documents
-                self.embeddings = GigaChatEmbeddings(credentials=self.auth_key, verify_ssl_certs=False)
+        # Create embeddings for the documents; oversized batches are split by the ingestion stage
+        giga_embeddings = GigaChatEmbeddings(credentials=self.auth_key, verify_ssl_certs=False)
+        self.embeddings = TracedEmbeddings(BatchedEmbeddings(giga_embeddings))
 
-                # Create a database from the documents
-                self.db = Chroma.from_documents(
-                    self.documents,
-                    self.embeddings,
-                    client_settings=Settings(anonymized_telemetry=False),
-                )
-
-                break
-
-            except Exception as e:
-                if '"status":413' in str(e):
-                    chunk_size = int(chunk_size * 0.9)
-                    chunk_overlap = int(chunk_overlap * 0.9)
-                else:
-                    print(e)
-                    break
+        # Reuse the database built earlier for the same document and chunking parameters
+        self.fingerprint = document_fingerprint(
+            docx_file_path,
+            CHUNK_SIZE,
+            CHUNK_OVERLAP,
+            getattr(giga_embeddings, 'model', ''),
+        )
+        with span('load_index') as index_span:
+            chroma_client = create_client(persist_directory)
+            self.db = load_collection(chroma_client, self.fingerprint, self.embeddings)
+            index_span.set_attribute('reused', self.db is not None)
+            record_cache_lookup('chroma_collection', hits=int(self.db is not None))
+            # Chunks are only loaded when the collection is built
+            self.documents = []
+            if self.db is None:
+                self.documents = self.load_documents(docx_file_path)
+                with span('build_collection', chunks=len(self.documents)):
+                    self.db = build_collection(chroma_client, self.fingerprint, self.documents, self.embeddings)
+        INDEX_SIZE.labels(bot=BOT_NAME).set(chroma_client.get_collection(collection_name(self.fingerprint)).count())
+        serve_metrics()
 
         # Initialize GigaChat for question answering
         self.giga_chat = GigaChat(
@@ -102,45 +127,189 @@ class ChatBot:
             'presented in a traditional table format, accounting for potential merged cells and contextual titles.'
         )
         self.message_history = []
+        self._pending_summary = None
+        self._summary_executor = ThreadPoolExecutor(max_workers=1)
+        self.inappropriate_request_message = (
+            'Ваш запрос неуместен для этого события. Пожалуйста, переформулируйте его, и я сделаю вид, что не услышал.'
+        )
         self.response_blacklist = (
             'Что-то в вашем вопросе меня смущает. Может, поговорим на другую тему? '
             'Как у нейросетевой языковой модели у меня не может быть настроения, но почему-то я совсем не хочу говорить на эту тему. '
             'Не люблю менять тему разговора, но вот сейчас тот самый случай.'
         )
 
+    def __enter__(self):
+        """Use the chat bot as a context manager.
+
+        Returns:
+            ChatBot: This chat bot
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback_value):
+        """Stop the summary thread.
+
+        Args:
+            exc_type: Exception type raised inside the block
+            exc_value: Exception raised inside the block
+            traceback_value: Traceback of the exception
+        """
+        self.close()
+
+    def close(self):
+        """Wait for the pending summary and stop the summary thread."""
+        self._summary_executor.shutdown(wait=True)
+
+    def load_documents(self, docx_file_path):
+        """Convert the DOCX file to text and split it into chunks.
+
+        Args:
+            docx_file_path (str): The file path of the DOCX document to process.
+
+        Returns:
+            list: Split documents.
+        """
+        with span('load_documents') as load_span:
+            converter = DocumentProcessor(docx_file_path, self.giga_chat_simple)
+            converter.save_to_txt(self.text_file_path)
+
+            self.loader = TextLoader(self.text_file_path, encoding='utf-8')
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=CHUNK_SIZE,
+                chunk_overlap=CHUNK_OVERLAP,
+            )
+            documents = self.text_splitter.split_documents(self.loader.load())
+            load_span.set_attribute('chunks', len(documents))
+        return documents
+
     def get_answer(self, user_input):
         """Processes the user's query and returns an answer.
 
+        The answer is returned as soon as the QA chain produces it; the
+        summary for the dialog history is generated in the background
+        and collected when the next question is asked.
+
         :param user_input: A string containing the user's question.
         :return: A string with the chatbot's answer or an error message
             if the request is inappropriate.
         """
+        with span('get_answer', question_chars=len(user_input)), ANSWER_LATENCY.time():
+            with ANSWERS_IN_PROGRESS.track_in_progress():
+                pending = self._take_pending_summary()
+                if pending is not None:
+                    with span('wait_summary'), SUMMARY_WAIT_LATENCY.time():
+                        futures.wait([pending[1]])
+                    self._record_summary(*pending)
+
+                recent_context = self._start_turn(user_input)
+
+                # Get the answer from the question-answer chain
+                with QA_CHAIN_LATENCY.time():
+                    answer = self.qa_chain.invoke({'query': recent_context}, config={'callbacks': tracing_callbacks()})
+                return self._finish_turn(answer['result'])
+
+    async def aget_answer(self, user_input):
+        """Asynchronously processes the user's query and returns an answer.
+
+        :param user_input: A string containing the user's question.
+        :return: A string with the chatbot's answer or an error message
+            if the request is inappropriate.
+        """
+        with span('get_answer', question_chars=len(user_input)), ANSWER_LATENCY.time():
+            with ANSWERS_IN_PROGRESS.track_in_progress():
+                pending = self._take_pending_summary()
+                if pending is not None:
+                    with span('wait_summary'), SUMMARY_WAIT_LATENCY.time():
+                        await asyncio.wait([asyncio.wrap_future(pending[1])])
+                    self._record_summary(*pending)
+
+                recent_context = self._start_turn(user_input)
+
+                # Get the answer from the question-answer chain
+                with QA_CHAIN_LATENCY.time():
+                    answer = await self.qa_chain.ainvoke(
+                        {'query': recent_context},
+                        config={'callbacks': tracing_callbacks()},
+                    )
+                return self._finish_turn(answer['result'])
+
+    def _start_turn(self, user_input):
+        """Add the question to the dialog history and build the QA query.
+
+        :param user_input: A string containing the user's question.
+        :return: Query with the document context and recent history.
+        """
         # Append a question mark to the user's input for better context
         user_input_with_question_mark = user_input + '?'
         self.message_history.append('Question: ' + user_input_with_question_mark)
 
         # Gather recent context from the document and message history
-        recent_context = self.docx_context + '\n'.join(self.message_history[-4:])
+        return self.docx_context + '\n'.join(self.message_history[-4:])
 
-        # Get the answer from the question-answer chain
-        answer = self.qa_chain.invoke({'query': recent_context})
-        full_answer = answer['result']
-
-        # Shorten the answer for storage in message history
-        shortened_answer = self.giga_chat_simple.invoke(
-            'Summarize this message into one concise sentence for dialog history, preserving its main point: '
-            + full_answer,
-        )
+    def _finish_turn(self, full_answer):
+        """Check the answer and start its summarization in the background.
 
+        :param full_answer: Answer produced by the QA chain.
+        :return: The answer or an error message if the request is
+            inappropriate.
+        """
         # Check if the answer is in the blacklist
-        if full_answer in self.response_blacklist or shortened_answer.content in self.response_blacklist:
+        if full_answer in self.response_blacklist:
             self.message_history.pop()
-            return 'Ваш запрос неуместен для этого события. Пожалуйста, переформулируйте его, и я сделаю вид, что не услышал.'
+            return self.inappropriate_request_message
 
-        # Add the shortened answer to the message history
-        self.message_history.append('Chatbot AI: ' + shortened_answer.content)
+        # Shorten the answer for storage in message history without blocking the user
+        PENDING_SUMMARIES.inc()
+        self._pending_summary = (full_answer, self._summary_executor.submit(self._summarize, full_answer))
         return full_answer
 
+    def _summarize(self, full_answer):
+        """Shorten an answer for storage in the dialog history.
+
+        :param full_answer: Answer produced by the QA chain.
+        :return: One-sentence summary of the answer.
+        """
+        try:
+            with span('summarize', answer_chars=len(full_answer)), SUMMARY_LATENCY.time():
+                shortened_answer = self.giga_chat_simple.invoke(
+                    'Summarize this message into one concise sentence for dialog history, preserving its main point: '
+                    + full_answer,
+                )
+        finally:
+            PENDING_SUMMARIES.dec()
+        return shortened_answer.content
+
+    def _take_pending_summary(self):
+        """Detach the pending summary so it is collected only once.
+
+        :return: The previous answer and its summary future, or None.
+        """
+        pending, self._pending_summary = self._pending_summary, None
+        return pending
+
+    def _record_summary(self, full_answer, summary_future):
+        """Add a finished summary to the dialog history.
+
+        A failed summary does not fail the next question: the full answer
+        is stored instead.
+
+        :param full_answer: The previous answer.
+        :param summary_future: Finished future of its summary.
+        """
+        try:
+            summary = summary_future.result()
+        except Exception as error:
+            logger.warning('Failed to summarize the previous answer, storing it in full: %s', error)
+            summary = full_answer
+
+        # The answer was already shown, so a blacklisted summary only drops the turn from history
+        if summary in self.response_blacklist:
+            self.message_history.pop()
+            return
+
+        # Add the shortened answer to the message history
+        self.message_history.append('Chatbot AI: ' + summary)
+
     def notebook_demo(self):
         """Provides an interactive demo interface for Jupyter notebooks.
 
@@ -1,16 +1,60 @@
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import docx
 
+from observability.telemetry import record_cache_lookup
+from observability.tracing import span
+
+TITLE_PROMPT = 'Преобразуй описание перед таблицей "{0}" в название самой таблицы. Без лишних символов и слова Таблица'
+TITLE_CACHE_FILE = 'table_titles_cache.json'
+MAX_CONCURRENT_TITLES = 8
+
+
+def run_coroutine(coroutine):
+    """Run a coroutine to completion from synchronous code.
+
+    Works both in plain scripts and inside an already running event loop
+    (e.g. Jupyter), where the coroutine is executed in a helper thread.
+
+    :param coroutine: Coroutine to run.
+    :return: Result of the coroutine.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
 
 class DocumentProcessor:
-    def __init__(self, file_path, llm):
+    def __init__(self, file_path, llm, title_cache_path=None, max_concurrency=MAX_CONCURRENT_TITLES):
         """Initialize the DocumentProcessor with a DOCX file and a language
         model.
 
         :param file_path: Path to the DOCX file.
         :param llm: Language model used for generating table titles.
+        :param title_cache_path: Path to the JSON file with table titles
+            cached by the hash of the preceding sentence, title prompt
+            and model. Defaults to a file next to the DOCX.
+        :param max_concurrency: Maximum number of simultaneous title
+            requests to the language model.
         """
         self.doc = docx.Document(file_path)
         self.llm = llm
+        # Titles of another model are not reused
+        self.llm_model = getattr(llm, 'model', type(llm).__name__)
+        self.title_cache_path = title_cache_path or os.path.join(
+            os.path.dirname(os.path.abspath(file_path)),
+            TITLE_CACHE_FILE,
+        )
+        self.max_concurrency = max_concurrency
+        self._content = None
 
     def find_last_sentence(self, text_list):
         """Find the last non-empty sentence in a list of text elements.
@@ -30,11 +74,25 @@ class DocumentProcessor:
         """Process the content of the document, extracting paragraphs and
         tables.
 
+        The document is processed once; later calls return the memoized
+        result.
+
+        :return: A tuple containing processed text and a list of table
+            titles.
+        """
+        if self._content is None:
+            self._content = self._build_content()
+        return self._content
+
+    def _build_content(self):
+        """Walk the document body and generate all table titles in one
+        concurrent batch.
+
         :return: A tuple containing processed text and a list of table
             titles.
         """
         processed_text = []
-        table_titles = []
+        tables = []
 
         for element in self.doc.element.body:
             if element.tag.endswith('p'):
@@ -42,21 +100,89 @@ class DocumentProcessor:
                 processed_text.append(paragraph.text)
             elif element.tag.endswith('tbl'):
                 last_sentence = self.find_last_sentence(processed_text)
-                title = self.llm.invoke(
-                    f'Преобразуй описание перед таблицей "{last_sentence}" в название самой таблицы. Без лишних символов и слова Таблица',
-                ).content
-                table_titles.append(title)
-                processed_text.append(f'TABLE_TITLE {title}')
-
+                # Title placeholder is filled in after all titles are generated
+                processed_text.append(None)
                 table = docx.table.Table(element, self.doc)
                 table_data = []
                 for row in table.rows:
                     row_data = [cell.text.strip() for cell in row.cells]
                     table_data.append(row_data)
                 processed_text.append(f'TABLE_START {table_data} TABLE_END')
+                tables.append((len(processed_text) - 2, last_sentence))
+
+        with span('generate_titles', tables=len(tables)):
+            table_titles = self.generate_titles([sentence for _, sentence in tables])
+        for (title_index, _), title in zip(tables, table_titles):
+            processed_text[title_index] = f'TABLE_TITLE {title}'
 
         return processed_text, table_titles
 
+    def generate_titles(self, sentences):
+        """Generate table titles for the sentences preceding the tables.
+
+        Titles are looked up in the on-disk cache first; the missing
+        ones are requested concurrently and added to the cache.
+
+        :param sentences: List of sentences preceding the tables.
+        :return: List of table titles in the same order.
+        """
+        cache = self._load_title_cache()
+        missing = {self._sentence_key(sentence): sentence for sentence in sentences}
+        unique_count = len(missing)
+        missing = {key: sentence for key, sentence in missing.items() if key not in cache}
+        record_cache_lookup('table_titles', hits=unique_count - len(missing), requests=unique_count)
+
+        if missing:
+            titles = run_coroutine(self._request_titles(list(missing.values())))
+            cache.update(zip(missing.keys(), titles))
+            self._save_title_cache(cache)
+
+        return [cache[self._sentence_key(sentence)] for sentence in sentences]
+
+    async def _request_titles(self, sentences):
+        """Request titles from the language model with bounded concurrency.
+
+        :param sentences: List of unique sentences preceding the tables.
+        :return: List of generated titles in the same order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def request_title(sentence):
+            async with semaphore:
+                response = await self.llm.ainvoke(TITLE_PROMPT.format(sentence))
+            return response.content
+
+        return await asyncio.gather(*(request_title(sentence) for sentence in sentences))
+
+    def _sentence_key(self, sentence):
+        """Get the cache key of a preceding sentence.
+
+        :param sentence: Sentence preceding a table.
+        :return: Hex digest of the sentence, title prompt and model.
+        """
+        key_source = json.dumps([TITLE_PROMPT, self.llm_model, sentence], ensure_ascii=False)
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def _load_title_cache(self):
+        """Load cached table titles.
+
+        :return: Dictionary mapping sentence keys to titles.
+        """
+        if not os.path.exists(self.title_cache_path):
+            return {}
+        with open(self.title_cache_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save_title_cache(self, cache):
+        """Save table titles to the cache file atomically.
+
+        :param cache: Dictionary mapping sentence keys to titles.
+        """
+        temp_path = f'{self.title_cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(cache, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.title_cache_path)
+
     def save_to_txt(self, output_file_path):
         """Save processed document content to a text file.
 
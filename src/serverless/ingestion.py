@@ -0,0 +1,244 @@
+import asyncio
+import random
+import re
+
+from dtt import run_coroutine
+from langchain_core.embeddings import Embeddings
+
+from observability.tracing import span
+
+PAYLOAD_TOO_LARGE = 413
+RETRYABLE_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+MAX_BATCH_BYTES = 64 * 1024
+MAX_BATCH_SIZE = 64
+MAX_CONCURRENT_BATCHES = 4
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MIN_SPLIT_CHARS = 50
+
+
+class PayloadTooLargeError(ValueError):
+    """Raised when a single text cannot be embedded even after splitting."""
+
+
+def get_error_status(error):
+    """Extract an HTTP status code from an embeddings client error.
+
+    :param error: Exception raised by the embeddings client.
+    :return: HTTP status code or None if it cannot be determined.
+    """
+    for source in (error, getattr(error, 'response', None)):
+        status = getattr(source, 'status_code', None) or getattr(source, 'code', None)
+        if isinstance(status, int):
+            return status
+    match = re.search(r'"status"\s*:\s*(\d{3})', str(error))
+    return int(match.group(1)) if match else None
+
+
+def batch_by_payload(texts, max_batch_bytes=MAX_BATCH_BYTES, max_batch_size=MAX_BATCH_SIZE):
+    """Group texts into batches limited by encoded payload size.
+
+    :param texts: List of texts to embed.
+    :param max_batch_bytes: Maximum total UTF-8 size of a batch.
+    :param max_batch_size: Maximum number of texts in a batch.
+    :return: List of batches, each a list of indices into ``texts``.
+    """
+    batches = []
+    current, current_bytes = [], 0
+    for index, text in enumerate(texts):
+        text_bytes = len(text.encode('utf-8'))
+        if current and (current_bytes + text_bytes > max_batch_bytes or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(index)
+        current_bytes += text_bytes
+    if current:
+        batches.append(current)
+    return batches
+
+
+def split_text(text):
+    """Split a text into two halves at the whitespace nearest to its middle.
+
+    :param text: Text to split.
+    :return: Tuple of two non-empty parts.
+    """
+    middle = len(text) // 2
+    left, right = text.rfind(' ', 0, middle), text.find(' ', middle)
+    candidates = [position for position in (left, right) if position > 0]
+    cut = min(candidates, key=lambda position: abs(position - middle)) if candidates else middle
+    return text[:cut], text[cut:]
+
+
+def mean_vector(vectors):
+    """Average several embedding vectors.
+
+    :param vectors: List of equally sized vectors.
+    :return: Element-wise mean vector.
+    """
+    return [sum(values) / len(vectors) for values in zip(*vectors)]
+
+
+class EmbeddingIngestor:
+    """Embeds many texts through a remote embeddings API.
+
+    Texts are batched by payload size, batches are embedded
+    concurrently, transient errors are retried with exponential backoff
+    and only the batch rejected with HTTP 413 is split further.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        max_batch_bytes=MAX_BATCH_BYTES,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_concurrency=MAX_CONCURRENT_BATCHES,
+        max_retries=MAX_RETRIES,
+        backoff_seconds=BACKOFF_SECONDS,
+    ):
+        """Initialize the ingestor.
+
+        :param embeddings: LangChain embeddings client.
+        :param max_batch_bytes: Maximum total UTF-8 size of a batch.
+        :param max_batch_size: Maximum number of texts in a batch.
+        :param max_concurrency: Maximum number of batches in flight.
+        :param max_retries: Retries of a batch on transient errors.
+        :param backoff_seconds: Base delay of the exponential backoff.
+        """
+        self.embeddings = embeddings
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.requests = 0
+        self.splits = 0
+
+    def embed(self, texts):
+        """Embed texts synchronously.
+
+        :param texts: List of texts to embed.
+        :return: List of embedding vectors in the order of ``texts``.
+        """
+        return run_coroutine(self.aembed(texts))
+
+    async def aembed(self, texts):
+        """Embed texts concurrently in payload-limited batches.
+
+        :param texts: List of texts to embed.
+        :return: List of embedding vectors in the order of ``texts``.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = batch_by_payload(texts, self.max_batch_bytes, self.max_batch_size)
+        with span('embed_batches', texts=len(texts), batches=len(batches)):
+            results = await asyncio.gather(
+                *(self._embed_batch([texts[index] for index in batch], semaphore) for batch in batches),
+            )
+
+        vectors = [None] * len(texts)
+        for batch, batch_vectors in zip(batches, results):
+            for index, vector in zip(batch, batch_vectors):
+                vectors[index] = vector
+        return vectors
+
+    async def _embed_batch(self, texts, semaphore):
+        """Embed one batch, splitting it if the API rejects its size.
+
+        :param texts: Texts of the batch.
+        :param semaphore: Semaphore limiting concurrent requests.
+        :return: List of embedding vectors for the batch.
+        """
+        try:
+            async with semaphore:
+                return await self._request_with_retries(texts)
+        except Exception as error:
+            if get_error_status(error) != PAYLOAD_TOO_LARGE:
+                raise
+            self.splits += 1
+
+        if len(texts) == 1:
+            return [await self._embed_oversized_text(texts[0], semaphore)]
+
+        middle = len(texts) // 2
+        left, right = await asyncio.gather(
+            self._embed_batch(texts[:middle], semaphore),
+            self._embed_batch(texts[middle:], semaphore),
+        )
+        return left + right
+
+    async def _embed_oversized_text(self, text, semaphore):
+        """Embed a text that is too large on its own as the mean of its halves.
+
+        :param text: Text rejected by the API.
+        :param semaphore: Semaphore limiting concurrent requests.
+        :return: Embedding vector of the text.
+        """
+        if len(text) < MIN_SPLIT_CHARS:
+            raise PayloadTooLargeError(f'Text of {len(text)} chars is rejected by the embeddings API')
+
+        parts = await self._embed_batch(list(split_text(text)), semaphore)
+        return mean_vector(parts)
+
+    async def _request_with_retries(self, texts):
+        """Send a batch to the API, retrying transient failures.
+
+        :param texts: Texts of the batch.
+        :return: List of embedding vectors for the batch.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.requests += 1
+                return await self.embeddings.aembed_documents(texts)
+            except Exception as error:
+                if attempt == self.max_retries or not self._is_retryable(error):
+                    raise
+            delay = self.backoff_seconds * 2**attempt
+            await asyncio.sleep(delay + random.uniform(0, self.backoff_seconds))
+
+    def _is_retryable(self, error):
+        """Check whether an error is transient.
+
+        :param error: Exception raised by the embeddings client.
+        :return: True if the request should be retried.
+        """
+        status = get_error_status(error)
+        if status is None:
+            return isinstance(error, (ConnectionError, TimeoutError))
+        return status in RETRYABLE_STATUSES
+
+
+class BatchedEmbeddings(Embeddings):
+    """LangChain embeddings that ingest documents through EmbeddingIngestor."""
+
+    def __init__(self, embeddings, **ingestor_kwargs):
+        """Wrap an embeddings client.
+
+        :param embeddings: LangChain embeddings client.
+        :param ingestor_kwargs: Arguments passed to EmbeddingIngestor.
+        """
+        self.embeddings = embeddings
+        self.ingestor = EmbeddingIngestor(embeddings, **ingestor_kwargs)
+
+    def embed_documents(self, texts):
+        """Embed documents in payload-limited concurrent batches.
+
+        :param texts: List of texts to embed.
+        :return: List of embedding vectors.
+        """
+        return self.ingestor.embed(texts)
+
+    async def aembed_documents(self, texts):
+        """Embed documents in payload-limited concurrent batches.
+
+        :param texts: List of texts to embed.
+        :return: List of embedding vectors.
+        """
+        return await self.ingestor.aembed(texts)
+
+    def embed_query(self, text):
+        """Embed a search query.
+
+        :param text: Query text.
+        :return: Embedding vector.
+        """
+        return self.embeddings.embed_query(text)
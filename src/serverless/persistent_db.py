@@ -0,0 +1,95 @@
+import hashlib
+import logging
+
+import chromadb
+from chromadb.config import Settings
+from langchain_community.vectorstores import Chroma
+
+logger = logging.getLogger(__name__)
+
+CHROMA_DIR = './chroma_db'
+COLLECTION_PREFIX = 'docx_'
+FINGERPRINT_LENGTH = 40
+READ_BLOCK_SIZE = 1 << 20
+
+
+def document_fingerprint(docx_file_path, chunk_size, chunk_overlap, embeddings_model=''):
+    """Compute a fingerprint of a DOCX file and the indexing parameters.
+
+    :param docx_file_path: Path to the DOCX file.
+    :param chunk_size: Chunk size used by the text splitter.
+    :param chunk_overlap: Chunk overlap used by the text splitter.
+    :param embeddings_model: Name of the embeddings model.
+    :return: Hex digest identifying the indexed content.
+    """
+    digest = hashlib.sha256()
+    with open(docx_file_path, 'rb') as docx_file:
+        for block in iter(lambda: docx_file.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    digest.update(f'|{chunk_size}|{chunk_overlap}|{embeddings_model}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def create_client(persist_directory=CHROMA_DIR):
+    """Create a Chroma client that stores collections on disk.
+
+    :param persist_directory: Directory of the Chroma database.
+    :return: Persistent Chroma client.
+    """
+    return chromadb.PersistentClient(path=persist_directory, settings=Settings(anonymized_telemetry=False))
+
+
+def collection_name(fingerprint):
+    """Get the collection name for a document fingerprint.
+
+    :param fingerprint: Document fingerprint.
+    :return: Chroma collection name.
+    """
+    return COLLECTION_PREFIX + fingerprint[:FINGERPRINT_LENGTH]
+
+
+def load_collection(client, fingerprint, embeddings):
+    """Open a complete collection built earlier for the same fingerprint.
+
+    Collections left incomplete by an interrupted build are removed.
+
+    :param client: Persistent Chroma client.
+    :param fingerprint: Document fingerprint.
+    :param embeddings: Embeddings used for queries.
+    :return: Chroma vector store or None if there is nothing to reuse.
+    """
+    name = collection_name(fingerprint)
+    try:
+        collection = client.get_collection(name)
+    except Exception:
+        return None
+
+    if not (collection.metadata or {}).get('complete'):
+        logger.info('Removing incomplete collection %s', name)
+        client.delete_collection(name)
+        return None
+
+    logger.info('Reusing collection %s with %s chunks', name, collection.count())
+    return Chroma(client=client, collection_name=name, embedding_function=embeddings)
+
+
+def build_collection(client, fingerprint, documents, embeddings):
+    """Embed documents into a new persistent collection.
+
+    :param client: Persistent Chroma client.
+    :param fingerprint: Document fingerprint.
+    :param documents: Split documents to index.
+    :param embeddings: Embeddings used for documents and queries.
+    :return: Chroma vector store.
+    """
+    name = collection_name(fingerprint)
+    db = Chroma.from_documents(
+        documents,
+        embeddings,
+        client=client,
+        collection_name=name,
+        collection_metadata={'fingerprint': fingerprint},
+    )
+    # Mark the collection as reusable only after all chunks were added
+    client.get_collection(name).modify(metadata={'fingerprint': fingerprint, 'complete': True})
+    return db
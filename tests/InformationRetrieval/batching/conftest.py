@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def mixed_length_texts(cycled_text):
+    lengths = (3, 60, 5, 1, 120, 8, 2, 40)
+    return [cycled_text(index, length) for index, length in enumerate(lengths)]
@@ -0,0 +1,52 @@
+import numpy as np
+
+from InformationRetrieval.text_embedder import (
+    TransformerEmbedder,
+    token_budget_batches,
+)
+
+MAX_BATCH_TOKENS = 512
+SHORT_TEXT_COUNT = 100
+SHORT_TEXT_LENGTH = 4
+SHORT_BATCH_TOKENS = 256
+SHORT_BATCH_SIZE = 50
+ENCODER_BATCH_TOKENS = 64
+EMBEDDING_TOLERANCE = 1e-5
+
+
+def test_batches_respect_token_budget():
+    lengths = (10, 500, 12, 3, 250, 11)
+
+    batches = token_budget_batches(lengths, max_batch_tokens=MAX_BATCH_TOKENS)
+
+    batched_indices = sorted(index for batch in batches for index in batch)
+    assert batched_indices == list(range(len(lengths)))
+    assert batches[0] == [1]
+    for batch in batches:
+        longest = max(lengths[index] for index in batch)
+        padded_tokens = longest * len(batch)
+        assert padded_tokens <= MAX_BATCH_TOKENS or len(batch) == 1
+
+
+def test_short_texts_share_a_batch():
+    lengths = np.full(SHORT_TEXT_COUNT, SHORT_TEXT_LENGTH).tolist()
+
+    batches = token_budget_batches(
+        lengths,
+        max_batch_tokens=SHORT_BATCH_TOKENS,
+        max_batch_size=SHORT_BATCH_SIZE,
+    )
+
+    assert [len(batch) for batch in batches] == [SHORT_BATCH_SIZE, SHORT_BATCH_SIZE]
+
+
+def test_budget_batching_keeps_input_order(stub_model_path, mixed_length_texts):
+    fixed_batches = TransformerEmbedder(model_name=stub_model_path, max_batch_tokens=None)
+    budget_batches = TransformerEmbedder(model_name=stub_model_path, max_batch_tokens=ENCODER_BATCH_TOKENS)
+
+    expected = fixed_batches.embed(mixed_length_texts)
+    embeddings = budget_batches.embed(mixed_length_texts)
+
+    assert embeddings.shape == expected.shape
+    assert np.allclose(embeddings, expected, atol=EMBEDDING_TOLERANCE)
+    assert budget_batches.embed([]).shape == (0, budget_batches.embedding_dim)
@@ -0,0 +1,57 @@
+"""Fixtures shared by InformationRetrieval tests."""
+
+import functools
+import itertools
+
+import pytest
+
+from benchmarks.stub_models import build_stub_sentence_transformer
+from InformationRetrieval.text_parser import ParsedText
+
+WORDS = ('изделие', 'сервер', 'мощность', 'срок', 'службы', 'таблица', 'питание')
+
+
+@pytest.fixture(scope='session')
+def stub_model_path(tmp_path_factory) -> str:
+    """Create a tiny offline sentence transformer.
+
+    Returns:
+        str: Path to the model
+    """
+    return build_stub_sentence_transformer(str(tmp_path_factory.mktemp('embedder')))
+
+
+@pytest.fixture(scope='session')
+def words() -> tuple[str, ...]:
+    """Get the vocabulary of generated texts.
+
+    Returns:
+        tuple[str, ...]: Words
+    """
+    return WORDS
+
+
+def _cycled_text(words: tuple[str, ...], start: int, length: int) -> ParsedText:
+    """Build a text cycling through the vocabulary.
+
+    Args:
+        words: Vocabulary
+        start: Position of the first word
+        length: Number of words
+
+    Returns:
+        ParsedText: Text of ``length`` words
+    """
+    vocabulary = itertools.cycle(words)
+    tokens = list(itertools.islice(vocabulary, start, start + length))
+    return ParsedText(tokens=tokens, word_count=length, sentence_count=1, metadata={})
+
+
+@pytest.fixture(scope='session')
+def cycled_text(words) -> functools.partial[ParsedText]:
+    """Get a builder of texts with a given start word and length.
+
+    Returns:
+        functools.partial[ParsedText]: Builder called with the start and length
+    """
+    return functools.partial(_cycled_text, words)
@@ -0,0 +1,21 @@
+import pytest
+
+from InformationRetrieval.embedding_pool import EmbeddingPool
+
+TEXT_COUNT = 40
+# Text lengths cycle through 1, 6, ..., 61 words
+LENGTH_CYCLE = 13
+LENGTH_STEP = 5
+
+
+@pytest.fixture(scope='module')
+def embedding_pool(stub_model_path):
+    with EmbeddingPool(model_name=stub_model_path, num_workers=2, threads_per_worker=1, task_size=8) as pool:
+        yield pool
+
+
+@pytest.fixture
+def parsed_texts(cycled_text):
+    cycle_positions = [index % LENGTH_CYCLE for index in range(TEXT_COUNT)]
+    lengths = [1 + position * LENGTH_STEP for position in cycle_positions]
+    return [cycled_text(index, length) for index, length in enumerate(lengths)]
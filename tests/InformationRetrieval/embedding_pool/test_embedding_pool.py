@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from InformationRetrieval.embedding_pool import EmbeddingPool
+from InformationRetrieval.embedding_worker import plan_workers
+from InformationRetrieval.text_embedder import TransformerEmbedder
+
+EMBEDDING_TOLERANCE = 1e-5
+CPU_COUNT = 32
+
+
+def test_pool_matches_single_process_embedder(embedding_pool, stub_model_path, parsed_texts):
+    expected = TransformerEmbedder(model_name=stub_model_path).embed(parsed_texts)
+
+    embeddings = embedding_pool.embed(parsed_texts)
+
+    assert embeddings.shape == expected.shape
+    assert np.allclose(embeddings, expected, atol=EMBEDDING_TOLERANCE)
+    assert embedding_pool.embed([]).shape == (0, embedding_pool.embedding_dim)
+
+
+def test_threads_are_split_between_workers():
+    assert plan_workers(cpus=CPU_COUNT) == (8, 4)
+    assert plan_workers(num_workers=3, cpus=CPU_COUNT) == (3, 10)
+    assert plan_workers(cpus=2) == (1, 2)
+
+
+def test_closed_pool_rejects_work(stub_model_path, parsed_texts):
+    pool = EmbeddingPool(model_name=stub_model_path, num_workers=1, threads_per_worker=1)
+    workers = list(pool._workers)
+    pool.close()
+
+    assert not any(worker.is_alive() for worker in workers)
+    with pytest.raises(RuntimeError):
+        pool.embed(parsed_texts)
+
+
+def test_worker_load_failure_is_reported(tmp_path):
+    missing_model = str(tmp_path / 'missing')
+    with pytest.raises(RuntimeError, match='Embedding worker failed'):
+        EmbeddingPool(model_name=missing_model, num_workers=1, threads_per_worker=1)
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.stub_models import build_stub_sentence_transformer
+from InformationRetrieval.text_parser import ParsedText
+
+DENSE_FEATURES = 64
+
+SENTENCES = (
+    'состав изделия включает сервер и блок питания',
+    'средний срок службы изделия десять лет',
+    'потребляемая мощность не более двух киловатт',
+)
+
+
+@pytest.fixture(scope='session')
+def dense_model_path(tmp_path_factory):
+    return build_stub_sentence_transformer(str(tmp_path_factory.mktemp('dense_embedder')), DENSE_FEATURES)
+
+
+@pytest.fixture
+def parsed_texts():
+    texts = []
+    for sentence in SENTENCES:
+        tokens = sentence.split()
+        parsed_text = ParsedText(
+            tokens=tokens,
+            word_count=len(tokens),
+            sentence_count=1,
+            metadata={},
+        )
+        texts.append(parsed_text)
+    return texts
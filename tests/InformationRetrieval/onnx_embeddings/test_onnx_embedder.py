@@ -0,0 +1,72 @@
+import json
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from InformationRetrieval.onnx_embedder import (
+    OnnxTransformerEmbedder,
+    RussianOnnxTransformerEmbedder,
+)
+from InformationRetrieval.onnx_export import EMBEDDER_CONFIG_FILE
+from InformationRetrieval.text_embedder import TransformerEmbedder
+
+MIN_COSINE = 0.99
+NORM_TOLERANCE = 1e-5
+
+
+@pytest.mark.parametrize('quantize', [False, True])
+def test_onnx_matches_sentence_transformer(stub_model_path, parsed_texts, tmp_path, quantize):
+    expected = TransformerEmbedder(model_name=stub_model_path).embed(parsed_texts)
+    embedder = OnnxTransformerEmbedder(model_name=stub_model_path, cache_dir=str(tmp_path), quantize=quantize)
+    embedder.max_batch_tokens = 32
+
+    embeddings = embedder.embed(parsed_texts)
+
+    norms = np.linalg.norm(embeddings, axis=1)
+    cosines = np.sum(embeddings * expected, axis=1)
+    assert embeddings.shape == expected.shape
+    assert np.allclose(norms, 1, atol=NORM_TOLERANCE)
+    assert cosines.min() > MIN_COSINE
+
+
+@pytest.mark.parametrize('quantize', [False, True])
+def test_onnx_keeps_dense_and_normalize_modules(dense_model_path, parsed_texts, tmp_path, quantize):
+    expected = TransformerEmbedder(model_name=dense_model_path).embed(parsed_texts)
+    embedder = OnnxTransformerEmbedder(model_name=dense_model_path, cache_dir=str(tmp_path), quantize=quantize)
+
+    embeddings = embedder.embed(parsed_texts)
+
+    cosines = np.sum(embeddings * expected, axis=1)
+    assert embeddings.shape == expected.shape
+    assert cosines.min() > MIN_COSINE
+
+
+def test_encoder_only_export_is_replaced(stub_model_path, tmp_path, monkeypatch):
+    OnnxTransformerEmbedder(model_name=stub_model_path, cache_dir=str(tmp_path))
+    config_path = next(tmp_path.glob(f'*/{EMBEDDER_CONFIG_FILE}'))
+    embedder_config = json.loads(config_path.read_text(encoding='utf-8'))
+    embedder_config.pop('output_name')
+    config_path.write_text(json.dumps(embedder_config), encoding='utf-8')
+    export = Mock()
+    monkeypatch.setattr('InformationRetrieval.onnx_embedder.export_onnx', export)
+
+    OnnxTransformerEmbedder(model_name=stub_model_path, cache_dir=str(tmp_path))
+
+    export.assert_called_once_with(stub_model_path, str(config_path.parent), True)
+
+
+def test_exported_model_is_reused(stub_model_path, parsed_texts, tmp_path, monkeypatch):
+    OnnxTransformerEmbedder(model_name=stub_model_path, cache_dir=str(tmp_path))
+    monkeypatch.setattr('InformationRetrieval.onnx_embedder.export_onnx', pytest.fail)
+
+    embedder = OnnxTransformerEmbedder(model_name=stub_model_path, cache_dir=str(tmp_path))
+
+    embeddings = embedder.embed(parsed_texts[0])
+
+    assert embeddings.shape == (1, embedder.embedding_dim)
+
+
+def test_russian_onnx_rejects_unknown_model():
+    with pytest.raises(ValueError):
+        RussianOnnxTransformerEmbedder(model_type='invalid')
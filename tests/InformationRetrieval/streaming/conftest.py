@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from InformationRetrieval.text_embedder import TextEmbedder
+from InformationRetrieval.text_parser import ParsedText
+
+EMBEDDING_DIM = 4
+TEXT_COUNT = 10
+
+
+class CountingEmbedder(TextEmbedder):
+    """Deterministic embedder that records how many texts it embedded."""
+
+    embedding_dim = EMBEDDING_DIM
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed(self, text):
+        if isinstance(text, ParsedText):
+            text = [text]
+        self.embedded += len(text)
+        first_tokens = [float(chunk.tokens[0]) for chunk in text]
+        columns = np.repeat(first_tokens, EMBEDDING_DIM)
+        return columns.reshape(-1, EMBEDDING_DIM)
+
+
+def _stream_texts():
+    for index in range(TEXT_COUNT):
+        tokens = [str(index)]
+        yield ParsedText(tokens=tokens, word_count=1, sentence_count=1, metadata={})
+
+
+@pytest.fixture
+def embedder():
+    return CountingEmbedder()
+
+
+@pytest.fixture
+def text_stream():
+    return _stream_texts
@@ -0,0 +1,36 @@
+import numpy as np
+
+from InformationRetrieval.embedding_file import (
+    open_embeddings,
+    stored_embedding_rows,
+)
+
+
+def test_embed_iter_yields_fixed_size_blocks(embedder, text_stream):
+    blocks = embedder.embed_iter(text_stream(), block_size=4)
+
+    first_block = next(blocks)
+    assert embedder.embedded == 4
+    assert first_block.dtype == np.float32
+    assert [len(block) for block in blocks] == [4, 2]
+
+
+def test_interrupted_run_resumes_from_file(embedder, text_stream, tmp_path):
+    output_path = str(tmp_path / 'embeddings.f32')
+    blocks = embedder.embed_iter(text_stream(), block_size=3, output_path=output_path)
+    next(blocks)
+    next(blocks)
+    blocks.close()
+    with open(output_path, 'ab') as output_file:
+        output_file.write(b'\0' * 5)
+
+    assert stored_embedding_rows(output_path, embedder.embedding_dim) == 6
+    resumed_blocks = embedder.embed_iter(text_stream(), block_size=3, output_path=output_path)
+    resumed = list(resumed_blocks)
+
+    assert [len(block) for block in resumed] == [3, 1]
+    assert embedder.embedded == 10
+    stored = open_embeddings(output_path, embedder.embedding_dim)
+    assert stored.shape == (10, embedder.embedding_dim)
+    first_column = np.take(stored, 0, axis=1)
+    assert np.array_equal(first_column, np.arange(10))
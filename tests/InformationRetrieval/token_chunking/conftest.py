@@ -0,0 +1,49 @@
+"""Fixtures for token-aware chunking tests."""
+
+import itertools
+
+import pytest
+
+from benchmarks.stub_models import build_stub_tokenizer
+from benchmarks.synthetic_docx import RUSSIAN_WORDS
+from InformationRetrieval.token_counter import TokenCounter
+
+WINDOW_TOKENS = 32
+PARAGRAPH_WORDS = (5, 12, 3, 90, 7, 20, 4)
+
+
+@pytest.fixture(scope='session')
+def stub_tokenizer(tmp_path_factory):
+    """Create an offline WordPiece tokenizer.
+
+    Returns:
+        PreTrainedTokenizerFast: Tokenizer
+    """
+    return build_stub_tokenizer(str(tmp_path_factory.mktemp('tokenizer')))
+
+
+@pytest.fixture
+def token_counter(stub_tokenizer) -> TokenCounter:
+    """Create a counter for a small encoder window.
+
+    Returns:
+        TokenCounter: Counter
+    """
+    return TokenCounter(stub_tokenizer, WINDOW_TOKENS)
+
+
+@pytest.fixture
+def paragraphs() -> list[str]:
+    """Create paragraphs of different lengths, one longer than the window.
+
+    Returns:
+        list[str]: Paragraphs
+    """
+    words = [word.lower() for word in RUSSIAN_WORDS]
+    sentences = []
+    for index, length in enumerate(PARAGRAPH_WORDS):
+        word_cycle = itertools.cycle(words)
+        sentence_words = itertools.islice(word_cycle, index, index + length)
+        sentence = ' '.join(sentence_words)
+        sentences.append(f'{sentence}.')
+    return sentences
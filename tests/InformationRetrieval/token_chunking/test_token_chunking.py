@@ -0,0 +1,106 @@
+"""Tests for chunk sizing by embedding model tokens."""
+
+from unittest.mock import Mock
+
+from InformationRetrieval.text_parser import DocumentChunker, ParsedText
+from InformationRetrieval.token_counter import TokenCounter, TruncationStats
+from RAG.text_processor import chunk_text, process_text_chunks
+
+CHUNK_CHARACTERS = 200
+OVERLAP_CHARACTERS = 50
+LINE_LETTERS = 'абвгдежзик'
+LINE_LENGTHS = (
+    40,
+    70,
+    30,
+    90,
+    20,
+    60,
+    50,
+    80,
+    10,
+    45,
+)
+WINDOW_TOKENS = 32
+CACHED_TEXTS = 2
+STATS_CAPACITY = 30
+STATS_LENGTHS = (10, 40, STATS_CAPACITY)
+
+
+def test_counts_match_tokenizer(token_counter, stub_tokenizer, paragraphs):
+    """Batch counts exclude special tokens and repeat for cached texts."""
+    encodings = [stub_tokenizer(text, add_special_tokens=False) for text in paragraphs]
+    expected = [len(encoding['input_ids']) for encoding in encodings]
+    reversed_paragraphs = list(reversed(paragraphs))
+
+    assert token_counter.count(paragraphs) == expected
+    assert token_counter.count(reversed_paragraphs) == list(reversed(expected))
+    assert token_counter(paragraphs[0]) == expected[0]
+    assert token_counter.capacity == token_counter.max_tokens - 2
+
+
+def test_count_cache_evicts_oldest_texts(stub_tokenizer, paragraphs):
+    """Only the most recently counted texts stay cached."""
+    tokenizer = Mock(wraps=stub_tokenizer)
+    tokenizer.num_special_tokens_to_add.return_value = 2
+    token_counter = TokenCounter(tokenizer, WINDOW_TOKENS, cache_size=CACHED_TEXTS)
+    expected = token_counter.count(paragraphs)
+    recent = paragraphs[-CACHED_TEXTS:]
+
+    assert token_counter.count(recent) == expected[-CACHED_TEXTS:]
+    assert tokenizer.call_count == 1
+    assert token_counter(paragraphs[0]) == expected[0]
+    assert tokenizer.call_count == 2
+
+
+def test_truncation_stats():
+    """Tokens above the capacity are counted as lost."""
+    stats = TruncationStats()
+    stats.add(STATS_LENGTHS, capacity=STATS_CAPACITY)
+
+    assert stats.truncated_texts == 1
+    assert stats.lost_tokens == 10
+    assert stats.truncated_share == 1 / len(STATS_LENGTHS)
+    assert stats.lost_share == 10 / sum(STATS_LENGTHS)
+
+
+def test_document_chunker_fills_window(token_counter, paragraphs):
+    """Token-sized chunks never exceed the window and are clipped to it."""
+    text = ' '.join(paragraphs).split()
+    parsed = ParsedText(
+        tokens=text,
+        word_count=len(text),
+        sentence_count=len(paragraphs),
+        metadata={},
+    )
+    chunker = DocumentChunker(chunk_overlap=4, token_counter=token_counter)
+    parsed_chunks = chunker.create_chunks(parsed)
+    chunks = [' '.join(chunk.tokens) for chunk in parsed_chunks]
+
+    assert chunker.chunk_size == token_counter.capacity
+    assert max(token_counter.count(chunks)) <= token_counter.capacity
+    assert token_counter.stats.texts == len(chunks)
+    assert not token_counter.stats.truncated_texts
+
+
+def test_process_text_chunks_keeps_all_words(token_counter, paragraphs):
+    """Long paragraphs are split instead of truncated."""
+    document = {'paragraphs': paragraphs, 'tables': [], 'dataframes': []}
+    chunks = process_text_chunks(document, token_counter=token_counter)
+    paragraph_words = set(' '.join(paragraphs).split())
+
+    assert max(token_counter.count(chunks)) <= token_counter.capacity
+    assert not token_counter.stats.truncated_texts
+    assert paragraph_words <= set(' '.join(chunks).split())
+
+
+def test_character_overlap_fits_chunk_size():
+    """Overlapping lines never push a chunk over its size."""
+    line_specs = zip(LINE_LETTERS, LINE_LENGTHS)
+    lines = [letter * length for letter, length in line_specs]
+    chunks = chunk_text(lines, chunk_size=CHUNK_CHARACTERS, overlap_size=OVERLAP_CHARACTERS)
+    chunk_sizes = [len(chunk.replace(' ', '')) for chunk in chunks]
+
+    assert len(chunks) > 1
+    assert max(chunk_sizes) <= CHUNK_CHARACTERS
+    assert chunks[1].startswith(lines[2])
@@ -0,0 +1,67 @@
+"""Fixtures with a local stand-in for the LlamaParse service."""
+
+import asyncio
+from typing import List
+
+import pytest
+from llama_index.core import Document
+
+PAGES_PER_FILE = 3
+SOURCE_FILE_COUNT = 6
+# Upload time, long enough for concurrent uploads to overlap
+UPLOAD_SECONDS = 0.01
+
+
+class StandInParser:
+    """Offline parser with the async loader interface of LlamaParse."""
+
+    def __init__(self):
+        self.uploads: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aload_data(self, file_path: str) -> List[Document]:
+        self.uploads.append(file_path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(UPLOAD_SECONDS)
+        self.in_flight -= 1
+        with open(file_path, 'r', encoding='utf-8') as source_file:
+            source_text = source_file.read()
+        return [Document(text=f'{source_text} page {page}') for page in range(PAGES_PER_FILE)]
+
+
+@pytest.fixture
+def stand_in_parser() -> StandInParser:
+    """Create a stand-in parser.
+
+    Returns:
+        StandInParser: Parser recording uploads
+    """
+    return StandInParser()
+
+
+@pytest.fixture
+def source_files(tmp_path) -> List[str]:
+    """Create small source documents.
+
+    Returns:
+        List[str]: Paths to the documents
+    """
+    paths = []
+    for index in range(SOURCE_FILE_COUNT):
+        path = tmp_path / f'doc{index}.docx'
+        path.write_text(f'document {index}', encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test inside a temporary working directory.
+
+    Returns:
+        Path: Working directory
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,55 @@
+"""Tests for cached and concurrent LlamaParse conversions."""
+
+import os
+
+from Parsers.llama_parser import MARKDOWN_RESULT, TEXT_RESULT, parse_files
+
+MAX_CONCURRENCY = 2
+PAGES_PER_FILE = 3
+
+
+def test_outputs_are_unique_and_paged(workdir, stand_in_parser, source_files):
+    """Test that every document gets its own output with all pages."""
+    output_paths = parse_files(source_files, TEXT_RESULT, parser=stand_in_parser)
+
+    assert len(set(output_paths)) == len(source_files)
+    with open(output_paths[0], 'r', encoding='utf-8') as output_file:
+        output_text = output_file.read()
+    assert output_text.count('### Page') == PAGES_PER_FILE
+    assert 'document 0 page 0' in output_text
+
+
+def test_concurrency_is_bounded(workdir, stand_in_parser, source_files):
+    """Test that no more than the allowed number of uploads run at once."""
+    parse_files(source_files, MARKDOWN_RESULT, parser=stand_in_parser, max_concurrency=MAX_CONCURRENCY)
+    assert stand_in_parser.max_in_flight == MAX_CONCURRENCY
+
+
+def test_cache_skips_repeated_uploads(workdir, stand_in_parser, source_files):
+    """Test that a second parse of the same content is read from the cache."""
+    first_outputs = parse_files(source_files, TEXT_RESULT, parser=stand_in_parser)
+    second_outputs = parse_files(source_files, TEXT_RESULT, parser=stand_in_parser)
+
+    assert first_outputs == second_outputs
+    assert len(stand_in_parser.uploads) == len(source_files)
+
+
+def test_cache_key_depends_on_result_type(workdir, stand_in_parser, source_files):
+    """Test that markdown and text results are cached separately."""
+    source_file = source_files[0]
+    markdown_path = parse_files([source_file], MARKDOWN_RESULT, parser=stand_in_parser)[0]
+    text_path = parse_files([source_file], TEXT_RESULT, parser=stand_in_parser)[0]
+
+    assert markdown_path.endswith('.md')
+    assert text_path.endswith('.txt')
+    assert len(stand_in_parser.uploads) == 2
+
+
+def test_duplicate_files_are_parsed_once(workdir, stand_in_parser, source_files):
+    """Test that identical content in a batch is uploaded once."""
+    duplicates = [source_files[0], source_files[0]]
+    output_paths = parse_files(duplicates, TEXT_RESULT, parser=stand_in_parser)
+
+    assert output_paths[0] == output_paths[1]
+    assert os.path.exists(output_paths[0])
+    assert len(stand_in_parser.uploads) == 1
@@ -0,0 +1,36 @@
+"""Fixtures for deduplication tests."""
+
+import random
+from functools import partial
+from typing import Callable, List
+
+import pytest
+
+VOCABULARY_SIZE = 500
+CHUNK_WORDS = 60
+RANDOM_SEED = 0
+
+
+def _random_chunks(count: int) -> List[str]:
+    """Generate chunks of random words that share almost no 3-grams.
+
+    Args:
+        count: Number of chunks
+
+    Returns:
+        List[str]: Chunk texts
+    """
+    rng = random.Random(RANDOM_SEED)
+    words = [f'word{index}' for index in range(VOCABULARY_SIZE)]
+    draw_words = partial(rng.choices, words, k=CHUNK_WORDS)
+    return [' '.join(draw_words()) for _ in range(count)]
+
+
+@pytest.fixture
+def make_chunks() -> Callable[[int], List[str]]:
+    """Create a generator of random chunks.
+
+    Returns:
+        Callable[[int], List[str]]: Function returning the given number of chunks
+    """
+    return _random_chunks
@@ -0,0 +1,80 @@
+"""Tests for near-duplicate chunk elimination."""
+
+import numpy as np
+
+from RAG.dedup import (
+    assign_representatives,
+    candidate_pairs,
+    deduplicate_chunks,
+)
+from RAG.minhash import minhash_signatures
+
+DISTINCT_CHUNKS = 50
+DUPLICATED_CHUNKS = 10
+UNRELATED_CHUNKS = 200
+WINDOW_WORDS = 30
+WINDOW_STEP = 2
+MIN_KEPT_WINDOWS = 3
+
+
+def test_near_duplicates_are_removed(make_chunks):
+    """Test that chunks differing in one trailing word are merged."""
+    distinct = make_chunks(DISTINCT_CHUNKS)
+    near_duplicates = [f'{chunk} конец' for chunk in distinct[:DUPLICATED_CHUNKS]]
+    chunks = distinct + near_duplicates
+    unique_chunks = deduplicate_chunks(chunks)
+
+    assert unique_chunks.chunks == distinct
+    assert unique_chunks.removed == DUPLICATED_CHUNKS
+    assert unique_chunks.shrink_ratio == DUPLICATED_CHUNKS / len(chunks)
+
+
+def test_back_references_to_first_occurrence(make_chunks):
+    """Test that every input chunk maps to the kept chunk of its cluster."""
+    first, second, third = make_chunks(3)
+    unique_chunks = deduplicate_chunks([second, first, second, third, first])
+
+    assert unique_chunks.chunks == [second, first, third]
+    assert unique_chunks.representative.tolist() == [0, 1, 0, 2, 1]
+    expected_ids = [[0, 2], [1, 4], [3]]
+    assert unique_chunks.metadatas() == [{'chunk_ids': ids} for ids in expected_ids]
+
+
+def test_unrelated_chunks_are_not_candidates(make_chunks):
+    """Test that random chunks do not share any band."""
+    signatures = minhash_signatures(make_chunks(UNRELATED_CHUNKS))
+    assert not len(candidate_pairs(signatures))
+
+
+def test_chains_are_not_merged_transitively():
+    """Test that a chunk duplicating only a dropped chunk is kept."""
+    pairs = np.array(
+        [
+            [4, 5],
+            [3, 4],
+            [0, 1],
+            [0, 2],
+        ],
+    )
+    representative = assign_representatives(6, pairs)
+    expected = [0, 0, 0, 3, 3, 5]
+    assert representative.tolist() == expected
+
+
+def test_overlapping_windows_are_kept(make_chunks):
+    """Test that sliding windows are not collapsed into the first window."""
+    words = make_chunks(1)[0].split()
+    starts = range(0, WINDOW_WORDS, WINDOW_STEP)
+    word_windows = (words[start : start + WINDOW_WORDS] for start in starts)
+    windows = [' '.join(window) for window in word_windows]
+    unique_chunks = deduplicate_chunks(windows)
+
+    assert len(unique_chunks.chunks) > MIN_KEPT_WINDOWS
+    assert unique_chunks.representative[-1] != 0
+
+
+def test_empty_input():
+    """Test that deduplicating nothing returns nothing."""
+    unique_chunks = deduplicate_chunks([])
+    assert not unique_chunks.chunks
+    assert unique_chunks.shrink_ratio == 0
@@ -0,0 +1,21 @@
+"""Tests for MinHash signatures."""
+
+import numpy as np
+
+from RAG.minhash import NUM_PERMUTATIONS, minhash_signatures, shingle_hashes
+
+
+def test_equal_shingles_give_equal_signatures():
+    """Test that MinHash signatures depend only on the shingles."""
+    chunks = ['Один два три четыре', 'один  два три ЧЕТЫРЕ', 'пять шесть семь восемь']
+    signatures = minhash_signatures(chunks)
+
+    assert signatures.shape == (len(chunks), NUM_PERMUTATIONS)
+    assert np.array_equal(signatures[0], signatures[1])
+    assert not np.array_equal(signatures[0], signatures[2])
+
+
+def test_short_texts_are_hashed_whole():
+    """Test that a text shorter than a shingle gives one hash."""
+    assert len(shingle_hashes('один два')) == 1
+    assert len(shingle_hashes('один два три четыре пять')) == 3
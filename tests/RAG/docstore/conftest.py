@@ -0,0 +1,16 @@
+"""Fixtures for chunk store tests."""
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+EMBEDDING_SIZE = 32
+
+
+@pytest.fixture
+def embeddings() -> DeterministicFakeEmbedding:
+    """Create offline embeddings that depend only on the text.
+
+    Returns:
+        DeterministicFakeEmbedding: Embeddings
+    """
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
@@ -0,0 +1,102 @@
+"""Tests for the memory-mapped chunk store."""
+
+import pickle
+
+import pytest
+from langchain import vectorstores
+from langchain.docstore.document import Document
+
+from RAG.batch_pipeline import retrieve_contexts
+from RAG.mmap_docstore import MmapDocstore, build_vectorstore
+
+CHUNKS = (
+    'Напряжение питания комплекса 220 В',
+    'Масса шкафа управления 120 кг',
+    '',
+    'Срок службы изделия 10 лет',
+)
+CHUNK_IDS_KEY = 'chunk_ids'
+SOURCE_KEY = 'source'
+TABLE_SOURCE = 'table'
+MAX_PICKLE_BYTES = 200
+
+
+@pytest.fixture
+def docstore(tmp_path) -> MmapDocstore:
+    """Create a store with texts and metadata columns.
+
+    Returns:
+        MmapDocstore: Store
+    """
+    store = MmapDocstore.create(str(tmp_path / 'docstore'))
+    first_ids = store.next_ids(2)
+    first_metadatas = [{CHUNK_IDS_KEY: [index]} for index in range(2)]
+    store.add(
+        {
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(first_ids, CHUNKS[:2], first_metadatas)
+        },
+    )
+    table_ids = store.next_ids(2)
+    store.add(
+        {
+            doc_id: Document(page_content=text, metadata={SOURCE_KEY: TABLE_SOURCE})
+            for doc_id, text in zip(table_ids, CHUNKS[2:])
+        },
+    )
+    return store
+
+
+def test_documents_round_trip(docstore):
+    """Texts and metadata are read back."""
+    first_document = Document(
+        page_content=CHUNKS[0],
+        metadata={CHUNK_IDS_KEY: [0]},
+    )
+
+    assert len(docstore.texts) == len(CHUNKS)
+    assert docstore.search('0') == first_document
+    assert docstore.search('2').page_content == ''
+    assert docstore.search('4') == 'ID 4 not found.'
+
+
+def test_new_columns_are_backfilled(docstore):
+    """Rows stored before a metadata key appeared read as missing the key."""
+    assert docstore.search('3').metadata == {SOURCE_KEY: TABLE_SOURCE}
+    assert docstore.metadata.column(SOURCE_KEY) == [None, None, TABLE_SOURCE, TABLE_SOURCE]
+
+
+def test_reopened_store_reads_files(docstore):
+    """Reopened and unpickled stores see all documents."""
+    reopened = MmapDocstore(docstore.directory)
+    pickled = pickle.dumps(docstore)
+    unpickled = pickle.loads(pickled)
+
+    assert sorted(reopened.metadata.names) == [CHUNK_IDS_KEY, SOURCE_KEY]
+    assert reopened.search('1').page_content == CHUNKS[1]
+    assert unpickled.search('3').page_content == CHUNKS[3]
+    assert len(pickled) < MAX_PICKLE_BYTES
+
+
+def test_ids_must_be_row_numbers(docstore):
+    """Documents are only appended in row order."""
+    with pytest.raises(ValueError, match='consecutive row numbers'):
+        docstore.add({'0': Document(page_content='повтор')})
+
+
+def test_retriever_reads_top_k_from_store(tmp_path, embeddings):
+    """FAISS over the store returns the same documents as in memory."""
+    chunks = [chunk for chunk in CHUNKS if chunk]
+    chunk_indices = range(len(chunks))
+    metadatas = [{CHUNK_IDS_KEY: [index]} for index in chunk_indices]
+    in_memory = vectorstores.FAISS.from_texts(chunks, embeddings, metadatas=metadatas)
+    docstore_dir = str(tmp_path / 'docstore')
+    mapped = build_vectorstore(chunks, embeddings, metadatas, docstore_dir)
+
+    query = 'какое напряжение питания'
+    mapped_documents = mapped.similarity_search(query, k=2)
+    in_memory_documents = in_memory.similarity_search(query, k=2)
+    assert isinstance(mapped.docstore, MmapDocstore)
+    assert mapped_documents == in_memory_documents
+    mapped_contexts = retrieve_contexts(mapped.as_retriever(), [query])
+    assert mapped_contexts == retrieve_contexts(in_memory.as_retriever(), [query])
@@ -0,0 +1,89 @@
+"""Fixtures for FAQ index tests."""
+
+import json
+import zlib
+from typing import List
+
+import numpy as np
+import pytest
+from langchain.embeddings.base import Embeddings
+
+EMBEDDING_SIZE = 64
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Embeds texts as hashed word counts, so shared words are similar."""
+
+    def __init__(self):
+        """Initialize call counters."""
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: Word count vectors
+        """
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query and count the call.
+
+        Args:
+            text: Query text
+
+        Returns:
+            List[float]: Word count vector
+        """
+        self.query_calls += 1
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        """Count hashed words.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            List[float]: Word count vector
+        """
+        vector = np.zeros(EMBEDDING_SIZE)
+        for word in text.lower().split():
+            bucket = zlib.crc32(word.encode('utf-8')) % EMBEDDING_SIZE
+            vector[bucket] += 1
+        return vector.tolist()
+
+
+@pytest.fixture
+def embeddings() -> BagOfWordsEmbeddings:
+    """Create deterministic embeddings.
+
+    Returns:
+        BagOfWordsEmbeddings: Embeddings model
+    """
+    return BagOfWordsEmbeddings()
+
+
+@pytest.fixture
+def qa_pairs_path(tmp_path) -> str:
+    """Write QA pairs in the dataset/qa_pairs.json layout.
+
+    Returns:
+        str: Path to the QA pairs file
+    """
+    pairs = [
+        {
+            'question': 'назови состав изделия пак углеводороды',
+            'reference_answer': 'ПАК АИС в сборе и комплект ЗИП',
+            'bot1_answer': 'ответ',
+        },
+        {'question': 'какое напряжение питания комплекса', 'reference_answer': '220 В'},
+        {'question': 'вопрос без эталонного ответа', 'reference_answer': ''},
+    ]
+    path = tmp_path / 'qa_pairs.json'
+    pairs_json = json.dumps({'qa_pairs': pairs}, ensure_ascii=False)
+    path.write_text(pairs_json, encoding='utf-8')
+    return str(path)
@@ -0,0 +1,54 @@
+"""Tests for the FAQ answer index."""
+
+import pytest
+
+from RAG.faq_index import FAQIndex
+from RAG.llama_solo import process_query
+
+SIMILARITY_THRESHOLD = 0.8
+
+
+class FailingChain:
+    """QA chain that must not be called."""
+
+    def run(self, *args, **kwargs):
+        """Fail the test.
+
+        Raises:
+            AssertionError: Always
+        """
+        raise AssertionError('QA chain called for a FAQ question')
+
+
+@pytest.fixture
+def faq_index(qa_pairs_path, embeddings) -> FAQIndex:
+    """Create the FAQ index of the test pairs.
+
+    Returns:
+        FAQIndex: Index
+    """
+    return FAQIndex.from_qa_pairs(qa_pairs_path, embeddings, threshold=SIMILARITY_THRESHOLD)
+
+
+def test_pairs_without_answers_are_skipped(faq_index):
+    """Test that only pairs with a reference answer are indexed."""
+    assert len(faq_index) == 2
+
+
+def test_exact_question_skips_embedding(faq_index, embeddings):
+    """Test that a question differing in case and spaces needs no embedding."""
+    assert faq_index.lookup('  Какое напряжение   питания комплекса ') == '220 В'
+    assert embeddings.query_calls == 0
+
+
+def test_similar_question_matches(faq_index):
+    """Test that a paraphrase above the threshold gets the curated answer."""
+    assert faq_index.lookup('назови пожалуйста состав изделия пак углеводороды') == 'ПАК АИС в сборе и комплект ЗИП'
+    assert faq_index.lookup('сколько весит шкаф управления') is None
+
+
+def test_process_query_answers_faq_without_llm(faq_index):
+    """Test that process_query returns the curated answer before retrieval."""
+    answer = process_query('какое напряжение питания комплекса', FailingChain(), {'dataframes': []}, faq_index)
+
+    assert answer == '220 В'
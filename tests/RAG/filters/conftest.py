@@ -0,0 +1,86 @@
+"""Fixtures for metadata filter tests."""
+
+from typing import List
+
+import pandas as pd
+import pytest
+from langchain import vectorstores
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from RAG.metadata_filter import MetadataBitmaps
+from RAG.text_processor import process_text_chunks_with_metadata
+
+EMBEDDING_SIZE = 16
+PARAGRAPHS = 30
+TABLE_ROWS = 80
+STOCK_COLUMNS = ('Наименование', 'Количество')
+POWER_COLUMNS = ('Устройство', 'Напряжение')
+PARAGRAPH_TEMPLATE = 'Абзац {0} о напряжении питания шкафа номер {0}.'
+
+
+def _stock_row(index: int) -> List[str]:
+    """Create a row of the stock table.
+
+    Args:
+        index: Row index
+
+    Returns:
+        List[str]: Row cells
+    """
+    return [f'изделие {index}', str(index * 10)]
+
+
+@pytest.fixture
+def embeddings() -> DeterministicFakeEmbedding:
+    """Create offline embeddings that depend only on the text.
+
+    Returns:
+        DeterministicFakeEmbedding: Embeddings
+    """
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+@pytest.fixture
+def doc_data() -> dict:
+    """Create a document with paragraphs and two tables.
+
+    Returns:
+        dict: Document data
+    """
+    paragraphs = [PARAGRAPH_TEMPLATE.format(index) for index in range(PARAGRAPHS)]
+    stock_rows = [_stock_row(index) for index in range(TABLE_ROWS)]
+    stock = pd.DataFrame(stock_rows, columns=list(STOCK_COLUMNS))
+    power_rows = [['шкаф', '220 В'], ['сервер', '12 В']]
+    power = pd.DataFrame(power_rows, columns=list(POWER_COLUMNS))
+    return {'paragraphs': paragraphs, 'tables': [], 'dataframes': [stock, power]}
+
+
+@pytest.fixture
+def chunks(doc_data) -> tuple:
+    """Chunk the document, the first table spans several chunks.
+
+    Returns:
+        tuple: Chunk texts and metadata
+    """
+    return process_text_chunks_with_metadata(doc_data, 'manual.docx')
+
+
+@pytest.fixture
+def vectorstore(chunks, embeddings) -> vectorstores.FAISS:
+    """Index the chunks.
+
+    Returns:
+        FAISS: Vector store
+    """
+    texts, metadatas = chunks
+    return vectorstores.FAISS.from_texts(texts, embeddings, metadatas=metadatas)
+
+
+@pytest.fixture
+def bitmaps(chunks) -> MetadataBitmaps:
+    """Precompute bitmaps of the chunk metadata.
+
+    Returns:
+        MetadataBitmaps: Bitmaps
+    """
+    return MetadataBitmaps(chunks[1])
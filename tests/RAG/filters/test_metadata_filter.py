@@ -0,0 +1,152 @@
+"""Tests for metadata-filtered retrieval."""
+
+import collections
+from typing import Tuple
+
+import numpy as np
+import pytest
+from langchain.docstore.document import Document
+
+from RAG.chunk_filter import (
+    FIRST_ROW_KEY,
+    LAST_ROW_KEY,
+    PARAGRAPH_SOURCE,
+    SOURCE_KEY,
+    TABLE_KEY,
+    ChunkFilter,
+)
+from RAG.dedup import deduplicate_chunks
+from RAG.metadata_filter import (
+    FilteredRetriever,
+    MetadataBitmaps,
+    filtered_search,
+)
+from RAG.table_formatter import TABLE_SOURCE
+from RAG.text_processor import process_text_chunks
+
+QUERY = 'напряжение питания шкафа'
+DOC_ID = 'manual.docx'
+OTHER_DOC_ID = 'other.docx'
+TOP_K = 3
+PARAGRAPH_CHUNKS = 4
+TABLE_CHUNKS = 5
+ALL_ROWS = list(range(PARAGRAPH_CHUNKS + TABLE_CHUNKS))
+SCORE_TOLERANCE = 1e-5
+DUPLICATE = 'шкаф питания номер один стоит слева'
+OVERLAPPING_ROWS = ChunkFilter.tables(table=1, rows=(35, 45))
+
+
+def _in_first_table(hit: Tuple[Document, float]) -> bool:
+    """Check that a search hit is a chunk of the first table.
+
+    Args:
+        hit: Chunk and its score
+
+    Returns:
+        bool: Whether the chunk holds rows of table 1
+    """
+    document, _ = hit
+    return document.metadata.get(TABLE_KEY) == 1
+
+
+def test_chunk_metadata(doc_data, chunks):
+    """Every chunk gets its document, source type and table rows."""
+    texts, metadatas = chunks
+    sources = [metadata[SOURCE_KEY] for metadata in metadatas]
+    source_counts = {PARAGRAPH_SOURCE: PARAGRAPH_CHUNKS, TABLE_SOURCE: TABLE_CHUNKS}
+    second_table_chunk = {
+        SOURCE_KEY: TABLE_SOURCE,
+        TABLE_KEY: 1,
+        FIRST_ROW_KEY: 21,
+        LAST_ROW_KEY: 40,
+        'doc_id': DOC_ID,
+    }
+
+    assert texts == process_text_chunks(doc_data)
+    assert {metadata['doc_id'] for metadata in metadatas} == {DOC_ID}
+    assert sources == sorted(sources)
+    assert collections.Counter(sources) == source_counts
+    assert metadatas[5] == second_table_chunk
+
+
+@pytest.mark.parametrize(
+    ('chunk_filter', 'rows'),
+    [
+        (ChunkFilter(), ALL_ROWS),
+        (ChunkFilter(source=PARAGRAPH_SOURCE), [0, 1, 2, 3]),
+        (ChunkFilter.tables(), [4, 5, 6, 7, 8]),
+        (ChunkFilter.tables(table=2), [8]),
+        (OVERLAPPING_ROWS, [5, 6]),
+        (ChunkFilter.document(DOC_ID), ALL_ROWS),
+        (ChunkFilter(doc_ids=(OTHER_DOC_ID,)), []),
+        (ChunkFilter.tables(table=3), []),
+    ],
+)
+def test_compile_filters(bitmaps, chunk_filter, rows):
+    """Filters compile to bitmaps of the matching rows."""
+    bitmap = bitmaps.compile(chunk_filter)
+    mask = np.unpackbits(bitmap, count=bitmaps.size, bitorder='little')
+
+    assert np.flatnonzero(mask).tolist() == rows
+    assert bitmaps.count(chunk_filter) == len(rows)
+    assert bitmaps.compile(chunk_filter) is bitmap
+
+
+def test_filtered_search_scans_only_matching_rows(vectorstore, bitmaps, embeddings, chunks):
+    """A filtered search finds matching chunks outside the global top-k."""
+    bitmap = bitmaps.compile(ChunkFilter.tables(table=1))
+    unfiltered = vectorstore.similarity_search_with_score(QUERY, k=TOP_K)
+    hits = filtered_search(vectorstore, [embeddings.embed_query(QUERY)], TOP_K, bitmap)
+    hits = hits[0]
+
+    ranked = vectorstore.similarity_search_with_score(QUERY, k=len(chunks[0]))
+    matching = list(filter(_in_first_table, ranked))[:TOP_K]
+    hit_documents, hit_scores = zip(*hits)
+    matching_documents, matching_scores = zip(*matching)
+    assert hit_documents == matching_documents
+    assert hit_scores == pytest.approx(matching_scores, rel=SCORE_TOLERANCE)
+    assert [document for document, _ in unfiltered] != list(hit_documents)
+
+
+def test_empty_filter_returns_nothing(vectorstore, bitmaps, embeddings):
+    """A filter matching no chunk skips the search."""
+    bitmap = bitmaps.compile(ChunkFilter(doc_ids=(OTHER_DOC_ID,)))
+    vector = embeddings.embed_query(QUERY)
+
+    assert filtered_search(vectorstore, [vector], TOP_K, bitmap) == [[]]
+
+
+def test_retriever_applies_filter(vectorstore, bitmaps):
+    """Without a filter the retriever behaves like ``as_retriever``."""
+    retriever = FilteredRetriever(
+        vectorstore=vectorstore,
+        search_kwargs={'k': TOP_K},
+        bitmaps=bitmaps,
+    )
+    assert retriever.invoke(QUERY) == vectorstore.similarity_search(QUERY, k=TOP_K)
+
+    retriever.chunk_filter = ChunkFilter.tables(table=2)
+    documents = retriever.invoke(QUERY)
+    assert [document.metadata[TABLE_KEY] for document in documents] == [2]
+
+
+def test_filters_find_merged_duplicates():
+    """A kept chunk matches the tables and rows of its merged chunks."""
+    metadatas = [
+        {SOURCE_KEY: TABLE_SOURCE, TABLE_KEY: 1, FIRST_ROW_KEY: 1, LAST_ROW_KEY: 20},
+        {SOURCE_KEY: PARAGRAPH_SOURCE},
+        {SOURCE_KEY: TABLE_SOURCE, TABLE_KEY: 2, FIRST_ROW_KEY: 21, LAST_ROW_KEY: 40},
+    ]
+    unique_chunks = deduplicate_chunks([DUPLICATE, 'таблица', DUPLICATE])
+    bitmaps = MetadataBitmaps(metadatas, unique_chunks.representative)
+    filter_counts = [
+        bitmaps.count(ChunkFilter.tables(table=2)),
+        bitmaps.count(ChunkFilter.tables(table=2, rows=(30, 35))),
+        bitmaps.count(ChunkFilter.tables(rows=(41, 50))),
+        bitmaps.count(ChunkFilter(source=PARAGRAPH_SOURCE)),
+    ]
+
+    kept_metadata = unique_chunks.metadatas(metadatas)[0]
+    assert kept_metadata == {**metadatas[0], 'chunk_ids': [0, 2]}
+    assert bitmaps.size == 2
+    assert filter_counts == [1, 1, 0, 1]
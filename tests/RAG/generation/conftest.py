@@ -0,0 +1,86 @@
+"""Fixtures for generation tests with a tiny offline causal LM."""
+
+import pytest
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+SPECIAL_TOKENS = ('[PAD]', '[UNK]', '<s>', '</s>')
+TINY_VOCAB_WORDS = 200
+TINY_HIDDEN_SIZE = 64
+TINY_LAYERS = 2
+TINY_HEADS = 4
+TINY_MAX_POSITIONS = 2048
+RANDOM_SEED = 0
+# Words of static instructions, long enough to be worth caching
+INSTRUCTION_WORDS = 300
+
+
+@pytest.fixture(scope='session')
+def tiny_tokenizer() -> PreTrainedTokenizerFast:
+    """Create a whitespace word-level tokenizer without downloads.
+
+    Returns:
+        PreTrainedTokenizerFast: Tokenizer over words ``w0`` ... ``w199``
+    """
+    word_tokens = [f'w{index}' for index in range(TINY_VOCAB_WORDS)]
+    words = list(SPECIAL_TOKENS) + word_tokens
+    vocab = {word: index for index, word in enumerate(words)}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token='[UNK]'))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    backend.decoder = decoders.WordPiece()
+    return PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        pad_token='[PAD]',
+        unk_token='[UNK]',
+        bos_token='<s>',
+        eos_token='</s>',
+    )
+
+
+@pytest.fixture(scope='session')
+def tiny_model(tiny_tokenizer) -> LlamaForCausalLM:
+    """Create a randomly initialized tiny Llama model.
+
+    Returns:
+        LlamaForCausalLM: Model in eval mode
+    """
+    torch.manual_seed(RANDOM_SEED)
+    config = LlamaConfig(
+        vocab_size=len(tiny_tokenizer),
+        hidden_size=TINY_HIDDEN_SIZE,
+        intermediate_size=TINY_HIDDEN_SIZE * 2,
+        num_hidden_layers=TINY_LAYERS,
+        num_attention_heads=TINY_HEADS,
+        num_key_value_heads=TINY_HEADS,
+        max_position_embeddings=TINY_MAX_POSITIONS,
+        pad_token_id=tiny_tokenizer.pad_token_id,
+        bos_token_id=tiny_tokenizer.bos_token_id,
+        eos_token_id=tiny_tokenizer.eos_token_id,
+    )
+    return LlamaForCausalLM(config).eval()
+
+
+@pytest.fixture(scope='session')
+def tiny_model_dir(tiny_tokenizer, tiny_model, tmp_path_factory) -> str:
+    """Save the tiny model and tokenizer as a HuggingFace model directory.
+
+    Returns:
+        str: Path usable as a model name
+    """
+    model_dir = str(tmp_path_factory.mktemp('tiny_llm'))
+    tiny_tokenizer.save_pretrained(model_dir)
+    tiny_model.save_pretrained(model_dir)
+    return model_dir
+
+
+@pytest.fixture
+def prompt_template() -> str:
+    """Create a prompt template with a long static prefix.
+
+    Returns:
+        str: Template with context and question placeholders
+    """
+    word_ids = (index % TINY_VOCAB_WORDS for index in range(INSTRUCTION_WORDS))
+    instructions = ' '.join(f'w{word_id}' for word_id in word_ids)
+    return '\n'.join((instructions, 'w1 w2', '{context}', 'w3 {question}', 'w4'))
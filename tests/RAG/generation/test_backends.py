@@ -0,0 +1,67 @@
+"""Tests for generation backend selection and loading."""
+
+from unittest.mock import Mock
+
+import pytest
+import torch
+from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
+
+from RAG import model as rag_model
+
+PROMPT = 'w1 w2 w3 w4'
+MAX_NEW_TOKENS = 4
+
+
+def test_auto_backend_follows_hardware(monkeypatch):
+    """Test that 'auto' picks the GPU backend only when CUDA is available."""
+    monkeypatch.setattr(torch.cuda, 'is_available', Mock(return_value=False))
+    assert rag_model.resolve_backend('auto') == rag_model.BACKEND_CPU_BF16
+
+    monkeypatch.setattr(torch.cuda, 'is_available', Mock(return_value=True))
+    assert rag_model.resolve_backend('auto') == rag_model.BACKEND_CUDA_NF4
+
+
+def test_unknown_backend_is_rejected():
+    """Test that a typo in the backend name fails early."""
+    with pytest.raises(ValueError, match='Unknown generation backend'):
+        rag_model.resolve_backend('cpu_fp8')
+
+
+def test_gguf_backend_requires_model_path():
+    """Test that the gguf backend needs a configured model file."""
+    with pytest.raises(ValueError, match='gguf_path'):
+        rag_model.get_llm(rag_model.BACKEND_GGUF)
+
+
+@pytest.mark.parametrize('backend', [rag_model.BACKEND_CPU_BF16, rag_model.BACKEND_CPU_INT8])
+def test_cpu_backends_generate(backend, tiny_model_dir):
+    """Test that CPU backends load the model and generate text."""
+    tokenizer, model, _ = rag_model.get_model_pipeline(backend, model_name=tiny_model_dir)
+    input_ids = tokenizer(PROMPT, return_tensors='pt').input_ids
+    with torch.no_grad():
+        output_ids = model.generate(
+            input_ids,
+            max_new_tokens=MAX_NEW_TOKENS,
+            min_new_tokens=MAX_NEW_TOKENS,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id,
+        )
+
+    prompt_length = input_ids.shape[-1]
+    assert output_ids.shape[-1] == prompt_length + MAX_NEW_TOKENS
+    if backend == rag_model.BACKEND_CPU_INT8:
+        modules = list(model.modules())
+        assert any(isinstance(module, QuantizedLinear) for module in modules)
+        float_linear = torch.nn.Linear
+        assert not any(isinstance(module, float_linear) for module in modules)
+    else:
+        assert model.dtype == torch.bfloat16
+
+
+def test_prefix_cached_llm_runs_on_int8(tiny_model_dir):
+    """Test that prefix caching works with dynamically quantized weights."""
+    tokenizer, model, _ = rag_model.get_model_pipeline(rag_model.BACKEND_CPU_INT8, model_name=tiny_model_dir)
+    llm = rag_model.create_prefix_cached_llm(tokenizer, model, ['w1 w2 {question}'])
+    llm.generator.max_new_tokens = MAX_NEW_TOKENS
+
+    assert isinstance(llm.invoke('w1 w2 w3'), str)
@@ -0,0 +1,126 @@
+"""Tests for batched offline answering."""
+
+import pandas as pd
+import pytest
+from langchain import chains, prompts, vectorstores
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from RAG.batch_pipeline import answer_questions, retrieve_contexts
+from RAG.chunk_filter import ChunkFilter
+from RAG.config import PROMPT_PARTS
+from RAG.llama_solo import process_query
+from RAG.metadata_filter import FilteredRetriever, MetadataBitmaps
+from RAG.prefix_cache import create_prefix_cached_llm
+from RAG.text_processor import process_text_chunks_with_metadata
+
+EMBEDDING_SIZE = 16
+TOP_K = 2
+MAX_NEW_TOKENS = 5
+BATCH_SIZE = 2
+CHUNKS = ('w10 w11 w12', 'w20 w21', 'w30 w31 w32 w33', 'w40', 'w50 w51 w52 w53 w54 w55')
+QUESTIONS = ('w10 w12', 'w33', 'w50 w51 w52 w53 w54', 'w21 w40 w99')
+
+
+@pytest.fixture
+def qa_chain(tiny_tokenizer, tiny_model):
+    """Create a QA chain like ``create_qa_chain`` on the tiny model.
+
+    Returns:
+        chains.RetrievalQA: QA chain
+    """
+    embeddings = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    vectorstore = vectorstores.FAISS.from_texts(list(CHUNKS), embeddings)
+    template = '\n'.join(PROMPT_PARTS)
+    prompt = prompts.PromptTemplate(input_variables=['context', 'question'], template=template)
+    llm = create_prefix_cached_llm(tiny_tokenizer, tiny_model, [prompt.template])
+    llm.generator.max_new_tokens = MAX_NEW_TOKENS
+    return chains.RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=vectorstore.as_retriever(search_kwargs={'k': TOP_K}),
+        chain_type_kwargs={'prompt': prompt},
+    )
+
+
+@pytest.fixture
+def doc_data():
+    """Create document data with one table.
+
+    Returns:
+        dict: Document data with dataframes
+    """
+    return {'dataframes': [pd.DataFrame({'Цена': ['100', '200']})]}
+
+
+@pytest.fixture
+def table_chain(qa_chain, doc_data):
+    """Create a QA chain over the chunks and table like ``create_qa_chain``.
+
+    Returns:
+        chains.RetrievalQA: QA chain with a ``FilteredRetriever``
+    """
+    document = {'paragraphs': list(CHUNKS), 'tables': [], **doc_data}
+    texts, metadatas = process_text_chunks_with_metadata(document)
+    vectorstore = vectorstores.FAISS.from_texts(
+        texts,
+        DeterministicFakeEmbedding(size=EMBEDDING_SIZE),
+        metadatas=metadatas,
+    )
+    return chains.RetrievalQA(
+        combine_documents_chain=qa_chain.combine_documents_chain,
+        retriever=FilteredRetriever(
+            vectorstore=vectorstore,
+            search_kwargs={'k': TOP_K},
+            bitmaps=MetadataBitmaps(metadatas),
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    ('chain_name', 'chunk_filter'),
+    [('qa_chain', None), ('table_chain', None), ('table_chain', ChunkFilter.tables())],
+)
+def test_batched_retrieval_matches_single_queries(request, chain_name, chunk_filter):
+    """Test that batched retrieval finds the chunks of filtered single
+    searches."""
+    retriever = request.getfixturevalue(chain_name).retriever
+    if chunk_filter is not None:
+        retriever.chunk_filter = chunk_filter
+    contexts = retrieve_contexts(retriever, QUESTIONS)
+
+    for question, context in zip(QUESTIONS, contexts):
+        documents = retriever.invoke(question)
+        assert context == '\n\n'.join(document.page_content for document in documents)
+
+
+@pytest.mark.parametrize(
+    ('chain_name', 'chunk_filter'),
+    [('qa_chain', None), ('table_chain', ChunkFilter.tables())],
+)
+def test_batched_answers_match_chain(request, doc_data, chain_name, chunk_filter):
+    """Test that batched decoding gives the answers of the chain one by one."""
+    chain = request.getfixturevalue(chain_name)
+    if chunk_filter is not None:
+        chain.retriever.chunk_filter = chunk_filter
+    answers = answer_questions(QUESTIONS, chain, doc_data, batch_size=BATCH_SIZE)
+
+    assert answers == [chain.run(question).strip() for question in QUESTIONS]
+
+
+def test_table_cell_questions_use_tables(qa_chain, doc_data):
+    """Test that table cell questions skip retrieval and generation."""
+    cell_question = "таблица 1 строка 2 столбец 'Цена'"
+    answers = answer_questions([cell_question, QUESTIONS[0]], qa_chain, doc_data)
+
+    chain_answer = qa_chain.run(QUESTIONS[0]).strip()
+    assert answers == ['200', chain_answer]
+
+
+def test_unknown_column_matches_online_answer(table_chain, doc_data):
+    """Test that an unknown column is answered from the row group as online."""
+    question = "таблица 1 строка 2 столбец 'Стоимость'"
+    questions = [question, QUESTIONS[0]]
+    answers = answer_questions(questions, table_chain, doc_data, batch_size=BATCH_SIZE)
+
+    cell_answer = process_query(question, table_chain, doc_data)
+    chain_answer = table_chain.run(QUESTIONS[0]).strip()
+    assert answers == [cell_answer, chain_answer]
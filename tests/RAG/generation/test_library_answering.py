@@ -0,0 +1,71 @@
+"""Tests for batched answering over a sharded library index."""
+
+import pytest
+from langchain import chains, prompts
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from RAG.batch_pipeline import answer_questions, retrieve_contexts
+from RAG.config import PROMPT_PARTS
+from RAG.prefix_cache import create_prefix_cached_llm
+from RAG.sharded_index import ShardedIndex
+from RAG.sharded_retriever import ShardedRetriever
+
+EMBEDDING_SIZE = 16
+TOP_K = 2
+MAX_NEW_TOKENS = 5
+BATCH_SIZE = 2
+BUCKET_CHUNKS = 4
+LIBRARY = (
+    ('first.docx', ('w10 w11 w12', 'w20 w21', 'w30 w31 w32 w33')),
+    ('second.docx', ('w40', 'w50 w51 w52 w53 w54', 'w60 w61')),
+    ('third.docx', ('w70 w71', 'w80')),
+)
+QUESTIONS = ('w10 w12', 'w33', 'w50 w51 w52 w53 w54', 'w21 w40 w99')
+
+
+@pytest.fixture
+def library_chain(tiny_tokenizer, tiny_model):
+    """Create a QA chain over a sharded library like
+    ``initialize_library_qa_system``.
+
+    Yields:
+        chains.RetrievalQA: QA chain with a ``ShardedRetriever``
+    """
+    index = ShardedIndex(
+        DeterministicFakeEmbedding(size=EMBEDDING_SIZE),
+        bucket_chunks=BUCKET_CHUNKS,
+        workers=2,
+        docstore_dir='',
+    )
+    for doc_id, chunks in LIBRARY:
+        index.add_document(doc_id, list(chunks))
+    template = '\n'.join(PROMPT_PARTS)
+    prompt = prompts.PromptTemplate(input_variables=['context', 'question'], template=template)
+    llm = create_prefix_cached_llm(tiny_tokenizer, tiny_model, [prompt.template])
+    llm.generator.max_new_tokens = MAX_NEW_TOKENS
+    yield chains.RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=ShardedRetriever(index=index, top_k=TOP_K),
+        chain_type_kwargs={'prompt': prompt},
+    )
+    index.close()
+
+
+def test_library_retrieval_matches_single_queries(library_chain):
+    """Test that batched library retrieval finds the chunks of single
+    searches."""
+    retriever = library_chain.retriever
+    contexts = retrieve_contexts(retriever, QUESTIONS)
+
+    for question, context in zip(QUESTIONS, contexts):
+        documents = retriever.invoke(question)
+        assert context == '\n\n'.join(document.page_content for document in documents)
+
+
+def test_batched_library_answers_match_chain(library_chain):
+    """Test that a library chain answers a batch like one question at a
+    time."""
+    doc_data = {'paragraphs': [], 'tables': [], 'dataframes': []}
+    answers = answer_questions(QUESTIONS, library_chain, doc_data, batch_size=BATCH_SIZE)
+
+    assert answers == [library_chain.run(question).strip() for question in QUESTIONS]
@@ -0,0 +1,78 @@
+"""Tests for prompt prefix key/value caching."""
+
+from types import SimpleNamespace
+
+from transformers import GenerationConfig
+
+from RAG.config import MODEL_CONFIG, PROMPT_PARTS
+from RAG.prefix_cache import (
+    PrefixCachedGenerator,
+    PrefixKVCache,
+    create_prefix_cached_llm,
+    sampling_kwargs,
+    split_prompt_template,
+)
+
+MAX_NEW_TOKENS = 6
+CACHE_SIZE = 2
+
+
+def test_split_prompt_template_keeps_instructions():
+    """Test that the static prefix ends right before the context."""
+    prefix, rest = split_prompt_template('\n'.join(PROMPT_PARTS))
+    assert prefix.endswith('Context:\n')
+    assert rest.startswith('{context}')
+    assert '{' not in prefix
+
+
+def test_split_template_without_placeholders():
+    """Test that a template without variables is fully static."""
+    assert split_prompt_template('static') == ('static', '')
+
+
+def test_sampling_follows_model_config():
+    """Test that sampling models get the configured temperature and top-k."""
+    sampling_model = SimpleNamespace(generation_config=GenerationConfig(do_sample=True))
+    greedy_model = SimpleNamespace(generation_config=GenerationConfig())
+
+    assert sampling_kwargs(sampling_model) == {
+        'temperature': MODEL_CONFIG['temperature'],
+        'top_k': MODEL_CONFIG['top_k'],
+    }
+    assert not sampling_kwargs(greedy_model)
+
+
+def test_cached_generation_matches_full_prefill(tiny_tokenizer, tiny_model, prompt_template):
+    """Test that reusing the prefix cache does not change greedy output."""
+    generator = PrefixCachedGenerator(tiny_tokenizer, tiny_model, max_new_tokens=MAX_NEW_TOKENS)
+    generator.add_template(prompt_template)
+    prompt = prompt_template.format(context='w10 w11 w12', question='w13')
+
+    cached_answer = generator.generate(prompt)
+    generator.prefixes.clear()
+    full_answer = generator.generate(prompt)
+
+    assert cached_answer == full_answer
+    assert generator.cache.misses == 1
+
+
+def test_cache_is_reused_across_queries(tiny_tokenizer, tiny_model, prompt_template):
+    """Test that the prefix is prefilled only once for many queries."""
+    llm = create_prefix_cached_llm(tiny_tokenizer, tiny_model, [prompt_template])
+    llm.generator.max_new_tokens = MAX_NEW_TOKENS
+    for question in ('w20', 'w21', 'w22'):
+        llm.invoke(prompt_template.format(context='w5', question=question))
+
+    assert llm.generator.cache.misses == 1
+    assert llm.generator.cache.hits == 3
+
+
+def test_cache_evicts_least_recently_used(tiny_tokenizer, tiny_model):
+    """Test LRU eviction of prefix states."""
+    cache = PrefixKVCache(tiny_tokenizer, tiny_model, max_size=CACHE_SIZE)
+    for prefix in ('w1 w2', 'w3 w4', 'w1 w2', 'w5 w6'):
+        cache.get(prefix)
+
+    assert len(cache) == CACHE_SIZE
+    cache.get('w1 w2')
+    assert cache.hits == 2
@@ -0,0 +1,25 @@
+"""Tests for question lists and answers in the QA pairs layout."""
+
+import json
+
+from RAG.question_file import load_questions, write_answers
+
+BOT_NUMBER = 3
+
+
+def test_answers_use_qa_pairs_layout(tmp_path):
+    """Test that a question list is saved in the qa_pairs.json layout."""
+    questions_path = tmp_path / 'questions.txt'
+    questions_path.write_text('first\n\nsecond\n', encoding='utf-8')
+    output_path = tmp_path / 'answers.json'
+
+    records = load_questions(str(questions_path))
+    write_answers(records, ['a1', 'a2'], BOT_NUMBER, str(output_path))
+    with output_path.open(encoding='utf-8') as output_file:
+        pairs = json.load(output_file)['qa_pairs']
+
+    assert pairs == [
+        {'question': 'first', 'reference_answer': '', 'bot3_answer': 'a1'},
+        {'question': 'second', 'reference_answer': '', 'bot3_answer': 'a2'},
+    ]
+    assert load_questions(str(output_path)) == pairs
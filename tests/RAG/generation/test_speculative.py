@@ -0,0 +1,83 @@
+"""Tests for speculative decoding in the prefix-cached generator."""
+
+import copy
+
+import pytest
+
+from RAG.prefix_cache import PrefixCachedGenerator
+from RAG.speculative import SpeculationStats, speculation_kwargs
+
+MAX_NEW_TOKENS = 12
+PROMPT_LOOKUP_TOKENS = 4
+MIN_SELF_DRAFT_ACCEPTANCE = 0.5
+CONTEXT_WORDS = 40
+# Context words repeat with this period, starting at word w10
+CONTEXT_PERIOD = 7
+FIRST_CONTEXT_WORD = 10
+
+
+@pytest.fixture
+def generator(tiny_tokenizer, tiny_model, prompt_template):
+    """Create a generator with the prompt prefix prefilled.
+
+    Returns:
+        PrefixCachedGenerator: Generator of the tiny model
+    """
+    generator = PrefixCachedGenerator(tiny_tokenizer, tiny_model, max_new_tokens=MAX_NEW_TOKENS)
+    generator.add_template(prompt_template)
+    return generator
+
+
+@pytest.fixture
+def prompt(prompt_template):
+    """Create a prompt whose context repeats, so drafts can be copied from it.
+
+    Returns:
+        str: Full prompt
+    """
+    word_ids = (FIRST_CONTEXT_WORD + index % CONTEXT_PERIOD for index in range(CONTEXT_WORDS))
+    context = ' '.join(f'w{word_id}' for word_id in word_ids)
+    return prompt_template.format(context=context, question='w13')
+
+
+@pytest.mark.parametrize('use_draft_model', [True, False])
+def test_speculation_keeps_greedy_output(generator, tiny_model, prompt, use_draft_model):
+    """Test that drafted tokens are verified and the answer does not change."""
+    expected = generator.generate(prompt)
+    if use_draft_model:
+        generator.enable_speculation(draft_model=copy.deepcopy(tiny_model))
+    else:
+        generator.enable_speculation(prompt_lookup_tokens=PROMPT_LOOKUP_TOKENS)
+
+    assert generator.generate(prompt) == expected
+    stats = generator.speculation_stats
+    assert stats.generated_tokens == MAX_NEW_TOKENS
+    assert 0 < stats.forward_passes <= MAX_NEW_TOKENS
+    assert stats.tokens_per_second > 0
+
+
+def test_identical_draft_is_mostly_accepted(generator, tiny_model, prompt):
+    """Test that a draft equal to the main model saves forward passes."""
+    generator.enable_speculation(draft_model=copy.deepcopy(tiny_model))
+    generator.generate(prompt)
+
+    assert generator.speculation_stats.acceptance_rate >= MIN_SELF_DRAFT_ACCEPTANCE
+
+
+def test_speculation_stats():
+    """Test acceptance rate arithmetic."""
+    stats = SpeculationStats()
+    assert stats.acceptance_rate == 0
+    stats.add(generated_tokens=10, forward_passes=4, elapsed=2)
+    stats.add(generated_tokens=10, forward_passes=6, elapsed=2)
+
+    assert stats.accepted_tokens == 10
+    assert stats.acceptance_rate == pytest.approx(0.5)
+    assert stats.tokens_per_second == pytest.approx(5)
+
+
+def test_drafting_methods_are_exclusive(tiny_model):
+    """Test that only one drafting method can be configured."""
+    assert speculation_kwargs() == {}
+    with pytest.raises(ValueError, match='either'):
+        speculation_kwargs(tiny_model, PROMPT_LOOKUP_TOKENS)
@@ -0,0 +1,74 @@
+"""Fixtures for sharded library index tests."""
+
+import random
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from RAG.sharded_index import ShardedIndex
+
+EMBEDDING_SIZE = 16
+BUCKET_CHUNKS = 16
+CHUNK_WORDS = 8
+RANDOM_SEED = 0
+WORDS = (
+    'напряжение',
+    'масса',
+    'шкаф',
+    'питание',
+    'срок',
+    'служба',
+    'изделие',
+    'сервер',
+    'журнал',
+    'датчик',
+)
+DOCUMENT_SIZES = (
+    ('large.docx', 40),
+    ('small_1.docx', 5),
+    ('small_2.docx', 7),
+    ('small_3.docx', 12),
+)
+
+
+@pytest.fixture
+def embeddings() -> DeterministicFakeEmbedding:
+    """Create offline embeddings that depend only on the text.
+
+    Returns:
+        DeterministicFakeEmbedding: Embeddings
+    """
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+@pytest.fixture
+def library_documents() -> dict[str, list[str]]:
+    """Create documents of different sizes.
+
+    Returns:
+        dict[str, list[str]]: Chunks by document id
+    """
+    rng = random.Random(RANDOM_SEED)
+    documents = {}
+    for doc_id, size in DOCUMENT_SIZES:
+        chunks = []
+        for _ in range(size):
+            words = rng.choices(WORDS, k=CHUNK_WORDS)
+            chunks.append(' '.join([doc_id, *words]))
+        documents[doc_id] = chunks
+    return documents
+
+
+@pytest.fixture
+def library(embeddings, library_documents) -> ShardedIndex:
+    """Index the documents with buckets of 16 chunks.
+
+    Yields:
+        ShardedIndex: Library index
+    """
+    index = ShardedIndex(embeddings, bucket_chunks=BUCKET_CHUNKS, workers=2, docstore_dir='')
+    for doc_id, chunks in library_documents.items():
+        positions = [{'position': position} for position in range(len(chunks))]
+        index.add_document(doc_id, chunks, positions)
+    yield index
+    index.close()
@@ -0,0 +1,83 @@
+"""Tests for the sharded library index."""
+
+import pytest
+from langchain import vectorstores
+
+from RAG.sharded_index import ShardedIndex
+
+QUERY = 'напряжение питания шкаф'
+LARGE_DOC = 'large.docx'
+BUCKET_DOC = 'small_2.docx'
+PROBED_DOC = 'small_3.docx'
+BUCKET_CHUNKS = 16
+TOP_K = 6
+SCORE_TOLERANCE = 1e-5
+
+
+def test_small_documents_share_buckets(library):
+    """Large documents get their own shard and small ones share buckets."""
+    shard_documents = [sorted(shard.documents) for shard in library.shards]
+
+    assert len(library) == 4
+    assert shard_documents == [
+        [LARGE_DOC],
+        ['small_1.docx', BUCKET_DOC],
+        [PROBED_DOC],
+    ]
+    assert library.shards[1].documents[BUCKET_DOC] == (5, 12)
+
+
+def test_fan_out_matches_single_index(library, embeddings, library_documents):
+    """Merged shard results equal a search over one index of all chunks."""
+    library.probe_documents = 0
+    chunks = [chunk for document in library_documents.values() for chunk in document]
+    single = vectorstores.FAISS.from_texts(chunks, embeddings)
+
+    expected = single.similarity_search_with_score(QUERY, k=TOP_K)
+    found = library.similarity_search_with_score(QUERY, TOP_K)
+    expected_scores = [score for _, score in expected]
+    found_scores = [score for _, score in found]
+    found_texts = [document.page_content for document, _ in found]
+    assert found_texts == [document.page_content for document, _ in expected]
+    assert found_scores == pytest.approx(expected_scores, rel=SCORE_TOLERANCE)
+
+
+def test_document_filter_inside_bucket(library):
+    """Restricting to one document of a bucket returns only its chunks."""
+    scored = library.similarity_search_with_score(QUERY, top_k=10, doc_ids=[BUCKET_DOC])
+    found_doc_ids = {document.metadata['doc_id'] for document, _ in scored}
+
+    assert len(scored) == 7
+    assert found_doc_ids == {BUCKET_DOC}
+
+
+def test_centroid_pruning_limits_searched_shards(library, library_documents):
+    """With probing, only the shard of the closest document is searched."""
+    query_chunk = library_documents[PROBED_DOC][0]
+    library.probe_documents = 1
+
+    scored = library.similarity_search_with_score(query_chunk, top_k=3)
+    found_doc_ids = {document.metadata['doc_id'] for document, _ in scored}
+    assert found_doc_ids == {PROBED_DOC}
+    assert scored[0][0].page_content == query_chunk
+
+
+def test_duplicate_document_is_rejected(library):
+    """A document id is indexed only once."""
+    with pytest.raises(ValueError, match='already indexed'):
+        library.add_document(LARGE_DOC, ['повтор'])
+
+
+def test_mmap_shards(tmp_path, embeddings, library_documents):
+    """Shards can keep chunk texts in memory-mapped docstores."""
+    index = ShardedIndex(embeddings, BUCKET_CHUNKS, workers=2, docstore_dir=str(tmp_path))
+    for doc_id, chunks in library_documents.items():
+        index.add_document(doc_id, chunks)
+    scored = index.similarity_search_with_score(QUERY, top_k=100)
+    index.close()
+
+    all_chunks = [chunk for document in library_documents.values() for chunk in document]
+    found_chunks = [document.page_content for document, _ in scored]
+    shard_dirs = [path.name for path in tmp_path.iterdir()]
+    assert sorted(found_chunks) == sorted(all_chunks)
+    assert sorted(shard_dirs) == ['shard_0', 'shard_1', 'shard_2']
@@ -0,0 +1,32 @@
+"""Tests for the LangChain retriever over the sharded library index."""
+
+import gc
+import threading
+
+from RAG.sharded_index import ShardedIndex
+from RAG.sharded_retriever import ShardedRetriever
+
+QUERY = 'напряжение питания шкаф'
+LARGE_DOC = 'large.docx'
+
+
+def test_retriever_returns_documents(library):
+    """The LangChain retriever returns k chunks with their metadata."""
+    retriever = ShardedRetriever(index=library, top_k=3, doc_ids=[LARGE_DOC])
+    documents = retriever.invoke(QUERY)
+
+    assert len(documents) == 3
+    assert all(document.metadata['doc_id'] == LARGE_DOC for document in documents)
+    assert 'position' in documents[0].metadata
+
+
+def test_search_threads_stop_with_retriever(embeddings, library_documents):
+    """Search threads stop when the retriever and its index are collected."""
+    retriever = ShardedRetriever(index=ShardedIndex(embeddings, workers=2, docstore_dir=''))
+    retriever.index.add_document(LARGE_DOC, library_documents[LARGE_DOC])
+    retriever.invoke(QUERY)
+    retriever = None
+    gc.collect()
+
+    thread_names = [thread.name for thread in threading.enumerate()]
+    assert not any(name.startswith('shard-search') for name in thread_names)
@@ -0,0 +1,66 @@
+"""Fixtures for table row-group chunking tests."""
+
+from typing import List
+
+import pandas as pd
+import pytest
+from langchain import vectorstores
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from RAG.metadata_filter import FilteredRetriever, MetadataBitmaps
+from RAG.text_processor import process_text_chunks_with_metadata
+
+ROWS = 20
+EMPTY_ROW = 5
+EMBEDDING_SIZE = 16
+COLUMNS = ('Наименование', 'Количество', 'Единица', 'Место хранения')
+
+
+def _stock_row(index: int) -> List[str]:
+    """Create a row of the stock table.
+
+    Args:
+        index: Row index
+
+    Returns:
+        List[str]: Row cells
+    """
+    return [f'изделие {index}', str(index * 10), 'шт', 'склад']
+
+
+@pytest.fixture
+def table() -> pd.DataFrame:
+    """Create a wide table with an empty row.
+
+    Returns:
+        pd.DataFrame: Table
+    """
+    rows = [_stock_row(index) for index in range(ROWS)]
+    rows[EMPTY_ROW] = ['', None, '', '']
+    return pd.DataFrame(rows, columns=list(COLUMNS))
+
+
+@pytest.fixture
+def doc_data(table) -> dict:
+    """Create a document with the table after a paragraph.
+
+    Returns:
+        dict: Document data
+    """
+    return {'paragraphs': ['Первый абзац.'], 'tables': [], 'dataframes': [table]}
+
+
+@pytest.fixture
+def retriever(doc_data) -> FilteredRetriever:
+    """Index the document chunks with their metadata.
+
+    Returns:
+        FilteredRetriever: Retriever over the indexed chunks
+    """
+    texts, metadatas = process_text_chunks_with_metadata(doc_data)
+    vectorstore = vectorstores.FAISS.from_texts(
+        texts,
+        DeterministicFakeEmbedding(size=EMBEDDING_SIZE),
+        metadatas=metadatas,
+    )
+    return FilteredRetriever(vectorstore=vectorstore, bitmaps=MetadataBitmaps(metadatas))
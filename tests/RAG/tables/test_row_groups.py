@@ -0,0 +1,76 @@
+"""Tests for answering table cell requests from indexed row groups."""
+
+from types import SimpleNamespace
+
+from RAG.llama_solo import process_query
+from RAG.metadata_filter import FilteredRetriever
+from RAG.table_query import MISSING_CELL_ANSWER
+
+ROWS = 20
+REQUESTED_ROW = 7
+
+
+class RowGroupChain:
+    """QA chain recording the documents of its combine documents chain."""
+
+    def __init__(self, retriever: FilteredRetriever):
+        """Initialize recorded documents.
+
+        Args:
+            retriever: Retriever over the indexed chunks
+        """
+        self.documents = []
+        self.retriever = retriever
+        self.combine_documents_chain = SimpleNamespace(run=self.combine)
+
+    def combine(self, input_documents, question, callbacks):
+        """Record documents and answer.
+
+        Args:
+            input_documents: Context documents
+            question: Question
+            callbacks: Chain callbacks
+
+        Returns:
+            str: Answer
+        """
+        self.documents.extend(input_documents)
+        return ' 50 шт '
+
+    def run(self, *args, **kwargs):
+        """Fail the test.
+
+        Raises:
+            AssertionError: Always
+        """
+        raise AssertionError('Retrieval used for a table cell request')
+
+
+def test_row_lookup_by_metadata(retriever):
+    """Test that the row group of a row is the chunk with its row range."""
+    row_group = retriever.table_row_chunks(1, ROWS)
+
+    assert len(row_group) == 1
+    assert row_group[0].metadata['last_row'] == ROWS
+    assert 'Row 20: изделие 19' in row_group[0].page_content
+    assert not retriever.table_row_chunks(1, ROWS + 1)
+    assert not retriever.table_row_chunks(2, 1)
+
+
+def test_unknown_column_uses_row_group(retriever, doc_data):
+    """Test that an inexact column name gets the row group as context."""
+    chain = RowGroupChain(retriever)
+    query = "Что в таблице 1 строке 7 столбец 'Кол-во'?"
+    answer = process_query(query, chain, doc_data)
+
+    assert answer == '50 шт'
+    assert chain.documents == retriever.table_row_chunks(1, REQUESTED_ROW)
+    assert chain.documents[0].metadata['table'] == 1
+    assert 'Row 7: изделие 6' in chain.documents[0].page_content
+
+
+def test_missing_row_keeps_fallback_answer(retriever, doc_data):
+    """Test that a request outside the table is not sent to the LLM."""
+    query = "таблица 1 строка 99 столбец 'Количество'"
+    answer = process_query(query, RowGroupChain(retriever), doc_data)
+    assert answer == MISSING_CELL_ANSWER
@@ -0,0 +1,54 @@
+"""Tests for table row-group chunking."""
+
+from RAG.table_chunker import chunk_table, count_words
+from RAG.text_processor import process_text_chunks
+
+ROWS = 20
+MAX_TOKENS = 40
+HEADER_COLUMNS = ': Наименование | Количество | Единица | Место хранения'
+
+
+def test_header_is_written_once_per_chunk(table):
+    """Test that column names appear only in the header line of every chunk."""
+    chunks = chunk_table(1, table, str.strip, MAX_TOKENS)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        header = chunk.text.split('\n')[0]
+        assert header.startswith('Table 2, Row')
+        assert header.endswith(HEADER_COLUMNS)
+        assert chunk.text.count('Наименование') == 1
+        assert count_words(chunk.text) <= MAX_TOKENS
+
+
+def test_rows_are_written_without_column_names(table):
+    """Test that a row holds only its number and cell values."""
+    first_chunk = chunk_table(1, table, str.strip, MAX_TOKENS)[0]
+    assert first_chunk.text.split('\n')[1] == 'Row 1: изделие 0 | 0 | шт | склад'
+
+
+def test_row_ranges_cover_table(table):
+    """Test that chunks hold consecutive rows and skip empty rows."""
+    chunks = chunk_table(0, table, str.strip, MAX_TOKENS)
+    first_chunk = chunks[0]
+
+    assert first_chunk.first_row == 1
+    assert chunks[-1].last_row == ROWS
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.first_row == previous.last_row + 1
+    row_lines = sum(chunk.text.count('\nRow ') for chunk in chunks)
+    assert row_lines == ROWS - 1
+    assert first_chunk.metadata == {
+        'source': 'table',
+        'table': 1,
+        'first_row': 1,
+        'last_row': first_chunk.last_row,
+    }
+
+
+def test_paragraphs_and_tables_are_separate(doc_data):
+    """Test that paragraphs and table rows never share a chunk."""
+    paragraph, *table_chunks = process_text_chunks(doc_data)
+
+    assert paragraph == 'Первый абзац.'
+    assert all(chunk.startswith('Table 1') for chunk in table_chunks)
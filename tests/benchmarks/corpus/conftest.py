@@ -0,0 +1,26 @@
+"""Fixtures for synthetic corpus tests."""
+
+import pytest
+
+from benchmarks.synthetic_docx import generate_docx
+
+PARAGRAPHS = 30
+TABLES = 4
+TABLE_ROWS = 5
+TABLE_COLUMNS = 3
+
+
+@pytest.fixture
+def synthetic_docx(tmp_path) -> str:
+    """Generate a small synthetic document.
+
+    Returns:
+        str: Path to the document
+    """
+    return generate_docx(
+        str(tmp_path / 'synthetic.docx'),
+        paragraphs=PARAGRAPHS,
+        tables=TABLES,
+        table_rows=TABLE_ROWS,
+        table_columns=TABLE_COLUMNS,
+    )
@@ -0,0 +1,53 @@
+"""Tests for the synthetic DOCX generator and benchmark timing."""
+
+from functools import partial
+
+import docx
+
+from benchmarks.synthetic_docx import generate_docx
+from benchmarks.timing import measure
+from RAG.document_parser import parse_docx
+
+PARAGRAPHS = 30
+TABLES = 4
+TABLE_ROWS = 5
+TABLE_COLUMNS = 3
+REPEATS = 3
+
+
+def test_document_has_requested_structure(synthetic_docx):
+    """Test that the document contains the requested paragraphs and tables."""
+    tables = parse_docx(synthetic_docx)['tables']
+
+    assert len(tables) == TABLES
+    assert set(map(len, tables)) == {TABLE_ROWS + 1}
+    assert set(map(len, tables[0])) == {TABLE_COLUMNS}
+    # Every table is introduced by a caption paragraph
+    assert len(docx.Document(synthetic_docx).paragraphs) == PARAGRAPHS + TABLES
+
+
+def test_generation_is_reproducible(synthetic_docx, tmp_path):
+    """Test that the same seed produces the same text."""
+    other_path = generate_docx(
+        str(tmp_path / 'other.docx'),
+        paragraphs=PARAGRAPHS,
+        tables=TABLES,
+        table_rows=TABLE_ROWS,
+        table_columns=TABLE_COLUMNS,
+    )
+    first_text = [paragraph.text for paragraph in docx.Document(synthetic_docx).paragraphs]
+    second_text = [paragraph.text for paragraph in docx.Document(other_path).paragraphs]
+
+    assert first_text == second_text
+
+
+def test_measure_reports_throughput():
+    """Test that timing results are consistent."""
+    calls = []
+    noop = partial(calls.append, 1)
+    timing = measure('noop', noop, repeats=REPEATS, item_count=10)
+
+    assert len(calls) == REPEATS + 1
+    assert timing.min_s <= timing.median_s
+    assert timing.items_per_s > 0
+    assert timing.as_dict()['name'] == 'noop'
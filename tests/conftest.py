@@ -14,14 +14,14 @@ DEFAULT_CHUNK_SIZE = 500
 DEFAULT_CHUNK_OVERLAP = 100
 DEFAULT_SENTENCE_COUNT = 50
 
+# Add src to Python path before nested conftests import the tested modules
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
 
 def pytest_sessionstart(session):
     """Configure test environment before session starts."""
-    # Add src to Python path
-    src_path = str(Path(__file__).parent.parent / 'src')
-    if src_path not in sys.path:
-        sys.path.insert(0, src_path)
-
     # Configure tokenizer parallelism
     os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
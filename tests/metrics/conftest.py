@@ -0,0 +1,24 @@
+"""Fixtures shared by metrics tests."""
+
+import nltk
+import pytest
+
+from benchmarks.stub_models import build_stub_bert
+
+
+@pytest.fixture(autouse=True)
+def offline_tokenizer(monkeypatch):
+    """Tokenize ROUGE input by whitespace instead of downloaded NLTK data."""
+    monkeypatch.setattr(nltk, 'download', lambda *args, **kwargs: False)
+    monkeypatch.setattr(nltk.data, 'find', lambda *args, **kwargs: None)
+    monkeypatch.setattr(nltk, 'word_tokenize', lambda text: text.split())
+
+
+@pytest.fixture(scope='session')
+def stub_bert_path(tmp_path_factory) -> str:
+    """Create a tiny BERT model.
+
+    Returns:
+        str: Path to the model
+    """
+    return build_stub_bert(str(tmp_path_factory.mktemp('bert')))
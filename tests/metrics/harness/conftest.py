@@ -0,0 +1,91 @@
+"""Fixtures for evaluation harness tests."""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from metrics.evaluator import Evaluator
+from metrics.harness import CHECKPOINT_FILE, EvaluationHarness
+from metrics.harness_report import write_results
+from metrics.qa_pairs import iter_qa_pairs
+
+QA_PAIRS = (
+    {
+        'question': 'Назови состав изделия',
+        'bot1_answer': 'Состав изделия: блок питания и сервер',
+        'bot2_answer': 'Недостаточно информации.',
+        'reference_answer': 'Состав изделия: сервер и блок питания',
+    },
+    {
+        'question': 'Какой срок службы?',
+        'bot1_answer': 'Срок службы десять лет',
+        'bot2_answer': '',
+        'reference_answer': 'Средний срок службы десять лет',
+    },
+    {
+        'question': 'Какая мощность?',
+        'bot1_answer': 'Не более двух киловатт',
+        'bot2_answer': 'Мощность не более двух киловатт',
+        'reference_answer': 'Потребляемая мощность не более двух киловатт',
+    },
+)
+CONFIG_KEY = 'stub'
+
+
+@pytest.fixture
+def evaluator(stub_bert_path) -> Evaluator:
+    """Create an evaluator with the stub BERT model.
+
+    Returns:
+        Evaluator: Evaluator
+    """
+    return Evaluator(bert_model_name=stub_bert_path)
+
+
+@pytest.fixture
+def harness(evaluator) -> EvaluationHarness:
+    """Create a harness scoring two pairs per batch.
+
+    Returns:
+        EvaluationHarness: Harness
+    """
+    return EvaluationHarness(evaluator, config_key=CONFIG_KEY, batch_size=2)
+
+
+@pytest.fixture
+def qa_pairs() -> List[Dict[str, str]]:
+    """Get QA pairs of two bots.
+
+    Returns:
+        List[Dict[str, str]]: QA pair records
+    """
+    return list(QA_PAIRS)
+
+
+@pytest.fixture
+def pairs_path(tmp_path) -> str:
+    """Write QA pairs in the dataset/qa_pairs.json format.
+
+    Returns:
+        str: Path to the QA pairs file
+    """
+    path = tmp_path / 'qa_pairs.json'
+    serialized = json.dumps({'qa_pairs': list(QA_PAIRS)}, ensure_ascii=False)
+    path.write_text(serialized, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def results_dir(harness, pairs_path, tmp_path) -> Path:
+    """Score the QA pairs and write the result files.
+
+    Returns:
+        Path: Directory with the result files
+    """
+    output_dir = tmp_path / 'results'
+    checkpoint_path = tmp_path / CHECKPOINT_FILE
+    records = harness.run(iter_qa_pairs(pairs_path), str(checkpoint_path))
+    write_results(records, pairs_path, str(output_dir))
+    return output_dir
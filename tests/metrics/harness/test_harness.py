@@ -0,0 +1,114 @@
+"""Tests for the resumable evaluation harness."""
+
+import json
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from metrics.evaluator import Evaluator
+from metrics.harness import CHECKPOINT_FILE, EvaluationHarness, load_checkpoint
+from metrics.harness_report import build_bot_tables, format_summary
+from metrics.qa_pairs import REFERENCE_KEY, iter_qa_pairs
+
+REPEATED_QUESTION = 'Какая мощность?'
+REPEATED_REFERENCE = 'Мощность не более двух киловатт'
+OTHER_ANSWER = 'Срок службы десять лет'
+BERT_SCORE_TOLERANCE = 1e-4
+ENCODING = 'utf-8'
+
+
+def test_batched_scores_match_single_pair_scores(harness, evaluator, pairs_path, qa_pairs):
+    """Test that batched pairs get the scores of separate evaluation."""
+    records = harness.score_batch(list(iter_qa_pairs(pairs_path)))
+
+    for record, pair in zip(records, qa_pairs):
+        expected = evaluator.evaluate_text_similarity(pair['bot1_answer'], pair[REFERENCE_KEY])
+        expected_bert_score = expected['bert_score']
+        bot_scores = record['scores']['1']
+        assert bot_scores.pop('BERTScore') == pytest.approx(expected_bert_score, abs=BERT_SCORE_TOLERANCE)
+        for name, rouge_score in expected['rouge'].items():
+            expected_f1 = rouge_score['f1']
+            assert bot_scores[name.upper()] == pytest.approx(expected_f1)
+    assert records[1]['scores']['2'] is None
+
+
+def test_cached_answers_are_not_scored_again(stub_bert_path, pairs_path, tmp_path):
+    """Test that a run with the result cache reuses the scores of an earlier
+    run."""
+    cache_path = str(tmp_path / 'metric_cache.sqlite')
+    qa_items = list(iter_qa_pairs(pairs_path))
+    first_harness = EvaluationHarness(Evaluator(stub_bert_path, cache_path=cache_path), config_key='cached')
+    first_records = first_harness.score_batch(qa_items)
+    first_harness.evaluator.cache.close()
+
+    evaluator = Evaluator(stub_bert_path, cache_path=cache_path)
+    evaluator.bert_score.embed_texts = Mock()
+    evaluator.rouge.rouge.compute_token_scores = Mock()
+    records = EvaluationHarness(evaluator, config_key='cached').score_batch(qa_items)
+
+    assert records == first_records
+    evaluator.bert_score.embed_texts.assert_not_called()
+    evaluator.rouge.rouge.compute_token_scores.assert_not_called()
+
+
+def test_interrupted_run_resumes(harness, pairs_path, tmp_path):
+    """Test that a rerun scores only the pairs missing from the checkpoint."""
+    checkpoint_path = tmp_path / CHECKPOINT_FILE
+    qa_items = list(iter_qa_pairs(pairs_path))
+    harness.run(qa_items[:2], str(checkpoint_path))
+    with checkpoint_path.open('a', encoding=ENCODING) as checkpoint_file:
+        checkpoint_file.write('{"index": 2, "trunc')
+
+    records = harness.run(qa_items, str(checkpoint_path))
+
+    checkpoint_lines = checkpoint_path.read_text(encoding=ENCODING).splitlines()
+    resumed = load_checkpoint(str(checkpoint_path), harness.config_key)
+    assert sorted(records) == [0, 1, 2]
+    assert json.loads(checkpoint_lines[-1])['index'] == 2
+    assert len(checkpoint_lines) == len(qa_items) + 1
+    assert sorted(resumed) == [0, 1, 2]
+    assert load_checkpoint(str(checkpoint_path), 'other config') == {}
+
+
+def test_result_tables_use_notebook_format(results_dir, qa_pairs):
+    """Test that result tables have the layout of notebooks/results."""
+    bot1 = pd.read_csv(results_dir / 'bot1_metrics.csv')
+    bot2 = pd.read_csv(results_dir / 'bot2_metrics.csv')
+    retrieval = pd.read_csv(results_dir / 'retrieval_metrics.csv')
+
+    assert list(bot1.columns) == ['question', 'BERTScore', 'ROUGE-1', 'ROUGE-2']
+    assert len(bot1) == len(qa_pairs)
+    assert len(bot2) == len(qa_pairs) - 1
+    assert list(retrieval.columns) == ['Metric', 'Bot 1', 'Bot 2']
+    assert list(retrieval['Metric']) == ['MRR', 'NDCG']
+
+
+def test_summary_uses_notebook_format(results_dir, qa_pairs):
+    """Test that the summary has the sections of notebooks/results."""
+    summary = (results_dir / 'summary.txt').read_text(encoding=ENCODING)
+    reference = qa_pairs[0][REFERENCE_KEY]
+
+    assert 'Bot 2 Summary Statistics:' in summary
+    assert 'Bot 1 - MRR: ' in summary
+    assert 'Best answers by ROUGE-2:' in summary
+    assert f'Reference: {reference}' in summary
+
+
+def test_best_answers_of_repeated_questions(harness, tmp_path):
+    """Test that best answers of a repeated question keep their pair."""
+    pairs_path = tmp_path / 'qa_pairs.json'
+    pairs = [
+        {'question': REPEATED_QUESTION, 'bot1_answer': REPEATED_REFERENCE, REFERENCE_KEY: REPEATED_REFERENCE},
+        {'question': REPEATED_QUESTION, 'bot1_answer': OTHER_ANSWER, REFERENCE_KEY: 'Десять лет'},
+    ]
+    serialized = json.dumps({'qa_pairs': pairs}, ensure_ascii=False)
+    pairs_path.write_text(serialized, encoding=ENCODING)
+    checkpoint_path = tmp_path / CHECKPOINT_FILE
+    qa_items = iter_qa_pairs(str(pairs_path))
+    records = harness.run(qa_items, str(checkpoint_path))
+
+    summary = format_summary(build_bot_tables(records), {}, str(pairs_path))
+
+    assert f'Answer: {REPEATED_REFERENCE}' in summary
+    assert f'Answer: {OTHER_ANSWER}' not in summary
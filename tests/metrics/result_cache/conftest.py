@@ -0,0 +1,27 @@
+"""Fixtures for metric result cache tests."""
+
+import pytest
+
+from metrics.result_cache import MetricResultCache
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    """Get a path for the cache database.
+
+    Returns:
+        str: Path to the SQLite file
+    """
+    return str(tmp_path / 'metrics_cache.sqlite')
+
+
+@pytest.fixture
+def result_cache(cache_path):
+    """Open a metric result cache.
+
+    Yields:
+        MetricResultCache: Cache
+    """
+    cache = MetricResultCache(cache_path)
+    yield cache
+    cache.close()
@@ -0,0 +1,64 @@
+"""Tests for the persistent metric result cache."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from metrics.evaluator import Evaluator
+from metrics.result_cache import MetricResultCache, config_key
+
+CANDIDATES = ('сервер и блок питания', 'срок службы десять лет')
+REFERENCES = ('блок питания и сервер', 'средний срок службы десять лет')
+ROUGE_METRIC = 'rouge'
+LENGTH_METRIC = 'length'
+CONFIG = 'config'
+
+
+def _lengths(candidates, references):
+    """Compute a stub metric of text pairs."""
+    return [len(candidate) for candidate in candidates]
+
+
+def test_results_persist_between_instances(result_cache, cache_path):
+    """Test that stored results are read back by a new cache instance."""
+    config = config_key({'rouge_types': [1, 2]})
+    other_config = config_key({'rouge_types': [1]})
+    candidate, reference = CANDIDATES[1], REFERENCES[1]
+    pair_results = [{'f1': 0.5}, {'f1': 0.75}]
+    result_cache.put_many(ROUGE_METRIC, config, CANDIDATES, REFERENCES, pair_results)
+    result_cache.close()
+
+    reopened = MetricResultCache(cache_path)
+    assert reopened.get(ROUGE_METRIC, config, candidate, reference) == {'f1': 0.75}
+    assert reopened.get(ROUGE_METRIC, other_config, candidate, reference) is None
+    assert reopened.get('bert_score', config, candidate, reference) is None
+    reopened.close()
+
+
+def test_only_new_pairs_are_computed(result_cache):
+    """Test that get_or_compute computes only missing pairs."""
+    compute = Mock(side_effect=_lengths)
+
+    first_candidates = CANDIDATES[:1]
+    first_references = REFERENCES[:1]
+    result_cache.get_or_compute(LENGTH_METRIC, CONFIG, first_candidates, first_references, compute)
+    lengths = result_cache.get_or_compute(LENGTH_METRIC, CONFIG, CANDIDATES, REFERENCES, compute)
+
+    computed = [call_args.args[0] for call_args in compute.call_args_list]
+    assert computed == [[CANDIDATES[0]], [CANDIDATES[1]]]
+    assert lengths == [len(candidate) for candidate in CANDIDATES]
+    assert len(result_cache) == 2
+
+
+def test_evaluator_reuses_cached_scores(stub_bert_path, cache_path, monkeypatch):
+    """Test that an evaluator reuses scores cached by another evaluator."""
+    first_evaluator = Evaluator(bert_model_name=stub_bert_path, cache_path=cache_path)
+    first_scores = first_evaluator.evaluate_text_similarity(list(CANDIDATES), list(REFERENCES))
+
+    evaluator = Evaluator(bert_model_name=stub_bert_path, cache_path=cache_path)
+    monkeypatch.setattr(evaluator.bert_score, 'embed_texts', pytest.fail)
+    monkeypatch.setattr(evaluator.rouge.rouge, 'compute_scores', pytest.fail)
+    cached_scores = evaluator.evaluate_text_similarity(list(CANDIDATES), list(REFERENCES))
+
+    assert cached_scores['bert_score'] == pytest.approx(first_scores['bert_score'])
+    assert cached_scores['rouge'] == first_scores['rouge']
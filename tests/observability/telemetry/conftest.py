@@ -0,0 +1,15 @@
+"""Fixtures for telemetry tests."""
+
+import pytest
+
+from observability.prometheus import MetricsRegistry
+
+
+@pytest.fixture
+def metrics_registry() -> MetricsRegistry:
+    """Create an empty registry separate from the global one.
+
+    Returns:
+        MetricsRegistry: Empty registry
+    """
+    return MetricsRegistry()
@@ -0,0 +1,77 @@
+"""Tests for the Prometheus text metrics registry and endpoint."""
+
+import urllib.request
+
+import pytest
+
+from observability.prometheus import Counter, Gauge, Histogram
+from observability.telemetry import (
+    CACHE_HITS,
+    record_cache_lookup,
+    serve_metrics,
+)
+
+BUCKETS = (0.1, 1.0)
+QUEUE_SIZE = 3
+
+
+def test_counter_and_gauge_render(metrics_registry):
+    """Test labeled counter and function gauge exposition."""
+    requests = metrics_registry.register(Counter('requests_total', 'Requests', ('bot',)))
+    queue = metrics_registry.register(Gauge('queue_depth', 'Queue depth'))
+    requests.labels(bot='solo').inc()
+    requests.labels(bot='solo').inc(2)
+    queue.set_function(lambda: QUEUE_SIZE)
+
+    text = metrics_registry.render()
+
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{bot="solo"} 3.0' in text
+    assert f'queue_depth {QUEUE_SIZE}' in text
+
+
+def test_histogram_buckets_are_cumulative(metrics_registry):
+    """Test histogram buckets, sum and count."""
+    histogram = Histogram('latency_seconds', 'Latency', ('stage',), buckets=BUCKETS)
+    latency = metrics_registry.register(histogram)
+    stage_latency = latency.labels(stage='query')
+    for observation in (0.05, 0.5, 0.5, 5.0):
+        stage_latency.observe(observation)
+
+    lines = metrics_registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{stage="query",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="query",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{stage="query",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{stage="query"} 6.05' in lines
+    assert 'latency_seconds_count{stage="query"} 4' in lines
+
+
+def test_label_values_are_escaped(metrics_registry):
+    """Test that quotes and newlines in label values keep the format valid."""
+    counter = metrics_registry.register(Counter('escaped_total', 'Escaped', ('model',)))
+    counter.labels(model='a"b\nc').inc()
+
+    assert r'escaped_total{model="a\"b\nc"} 1.0' in metrics_registry.render()
+
+
+def test_wrong_labels_are_rejected(metrics_registry):
+    """Test that label names must match the metric definition."""
+    counter = metrics_registry.register(Counter('labeled_total', 'Labeled', ('bot',)))
+    with pytest.raises(ValueError, match='Expected labels'):
+        counter.labels(stage='query')
+
+
+def test_endpoint_serves_global_registry():
+    """Test that the HTTP endpoint returns the exposition text."""
+    hits_before = CACHE_HITS.labels(cache='test_cache').metric_value
+    record_cache_lookup('test_cache', hits=1, requests=2)
+    server = serve_metrics(port=0)
+
+    url = f'http://127.0.0.1:{server.server_port}/metrics'
+    with urllib.request.urlopen(url) as response:  # noqa: S310
+        text = response.read().decode('utf-8')
+
+    assert CACHE_HITS.labels(cache='test_cache').metric_value == hits_before + 1
+    assert 'qa_cache_requests_total{cache="test_cache"}' in text
+    assert '# TYPE qa_stage_latency_seconds histogram' in text
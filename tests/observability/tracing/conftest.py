@@ -0,0 +1,19 @@
+"""Fixtures for tracing tests."""
+
+import pytest
+
+from observability.tracing import Tracer, disable_tracing, enable_tracing
+
+
+@pytest.fixture
+def memory_tracer() -> Tracer:
+    """Enable tracing into memory for a single test.
+
+    Yields:
+        Tracer: Global tracer with no recorded spans
+    """
+    tracer = enable_tracing()
+    tracer.spans.clear()
+    yield tracer
+    disable_tracing()
+    tracer.spans.clear()
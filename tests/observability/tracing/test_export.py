@@ -0,0 +1,48 @@
+"""Tests for trace export to JSONL and Chrome trace files."""
+
+import json
+
+from observability.tracing import Tracer, disable_tracing, enable_tracing, span
+
+TOP_K = 2
+NEW_TOKENS = 5
+
+
+def test_jsonl_export_streams_spans(tmp_path):
+    """Test that every finished span is written as a JSON line."""
+    trace_path = tmp_path / 'trace.jsonl'
+    enable_tracing(str(trace_path))
+    with span('query', k=TOP_K):
+        span('search').end()
+    disable_tracing()
+
+    lines = trace_path.read_text(encoding='utf-8').splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record['name'] for record in records] == ['search', 'query']
+    assert records[1]['attributes'] == {'k': TOP_K}
+
+
+def test_chrome_trace_export(tmp_path):
+    """Test that the Chrome trace contains complete events."""
+    trace_path = tmp_path / 'trace.json'
+    tracer = enable_tracing(str(trace_path))
+    tracer.spans.clear()
+    span('generate', new_tokens=NEW_TOKENS).end()
+    disable_tracing()
+    tracer.spans.clear()
+
+    events = json.loads(trace_path.read_text(encoding='utf-8'))['traceEvents']
+    assert len(events) == 1
+    assert events[0]['ph'] == 'X'
+    assert events[0]['args'] == {'new_tokens': NEW_TOKENS}
+
+
+def test_memory_keeps_last_spans():
+    """Test that in-memory tracing keeps a bounded number of recent spans."""
+    bounded_tracer = Tracer(max_spans=2)
+    bounded_tracer.enable()
+    for name in ('first', 'second', 'third'):
+        bounded_tracer.start_span(name).end()
+    bounded_tracer.disable()
+
+    assert [finished_span.name for finished_span in bounded_tracer.spans] == ['second', 'third']
@@ -0,0 +1,44 @@
+"""Tests for tracing of LangChain retrieval chains."""
+
+from langchain.chains import RetrievalQA
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.llms import FakeListLLM
+from langchain_community.vectorstores import FAISS
+
+from observability.langchain_tracing import TracedEmbeddings, tracing_callbacks
+from observability.tracing import NOOP_SPAN, disable_tracing, span
+
+EMBEDDING_SIZE = 8
+TOP_K = 2
+QUERY_SPAN = 'query'
+
+
+def test_disabled_tracing_returns_noop_span():
+    """Test that nothing is recorded while tracing is disabled."""
+    disable_tracing()
+    with span('stage', chunks=1) as stage_span:
+        stage_span.set_attribute('tokens', 1)
+
+    assert stage_span is NOOP_SPAN
+    assert tracing_callbacks() == []
+
+
+def test_retrieval_chain_stages_are_traced(memory_tracer):
+    """Test that a RetrievalQA call is split into stage spans."""
+    embeddings = TracedEmbeddings(FakeEmbeddings(size=EMBEDDING_SIZE))
+    vectorstore = FAISS.from_texts(['первый фрагмент', 'второй фрагмент', 'третий фрагмент'], embeddings)
+    qa_chain = RetrievalQA.from_chain_type(
+        llm=FakeListLLM(responses=['ответ']),
+        retriever=vectorstore.as_retriever(search_kwargs={'k': TOP_K}),
+    )
+
+    with span(QUERY_SPAN):
+        qa_chain.invoke({'query': 'вопрос'}, config={'callbacks': tracing_callbacks()})
+
+    spans = {finished_span.name: finished_span for finished_span in memory_tracer.spans}
+    chain_span = spans['chain:RetrievalQA']
+    assert spans['embed_documents'].attributes['texts'] == 3
+    assert spans['search'].attributes['k'] == TOP_K
+    assert spans['embed_query'].parent_id == chain_span.parent_id == spans[QUERY_SPAN].span_id
+    assert spans['search'].parent_id == chain_span.span_id
+    assert 'generate' in spans
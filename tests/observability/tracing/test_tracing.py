@@ -0,0 +1,66 @@
+"""Tests for nesting and error recording of tracing spans."""
+
+import asyncio
+
+import pytest
+
+from observability.tracing import span, traced
+
+OUTER_SPAN = 'process_docx'
+INNER_SPAN = 'chunk'
+FAILING_SPAN = 'failing_stage'
+TASK_NAMES = ('first', 'second')
+
+
+def _spans_by_name(tracer):
+    """Index recorded spans by name."""
+    return {finished_span.name: finished_span for finished_span in tracer.spans}
+
+
+async def _traced_task(name):
+    """Open a task span and a nested span across await points."""
+    with span(name):
+        await asyncio.sleep(0)
+        with span(f'{name}_inner'):
+            await asyncio.sleep(0)
+
+
+async def _run_tasks():
+    """Run traced tasks concurrently."""
+    await asyncio.gather(*map(_traced_task, TASK_NAMES))
+
+
+@traced(FAILING_SPAN)
+def _failing_stage():
+    """Raise inside a traced function."""
+    raise ValueError('failure')
+
+
+def test_spans_are_nested_with_attributes(memory_tracer):
+    """Test that inner spans point to the enclosing span."""
+    with span(OUTER_SPAN) as outer_span:
+        with span(INNER_SPAN) as inner_span:
+            inner_span.set_attribute('chunks', 3)
+
+    spans = _spans_by_name(memory_tracer)
+    assert spans[INNER_SPAN].parent_id == outer_span.span_id
+    assert spans[INNER_SPAN].attributes == {'chunks': 3}
+    assert spans[OUTER_SPAN].parent_id is None
+    assert spans[OUTER_SPAN].duration_ns >= spans[INNER_SPAN].duration_ns
+
+
+def test_concurrent_tasks_keep_their_parents(memory_tracer):
+    """Test that spans of concurrent tasks nest under their own task span."""
+    asyncio.run(_run_tasks())
+
+    spans = _spans_by_name(memory_tracer)
+    for name in TASK_NAMES:
+        assert spans[f'{name}_inner'].parent_id == spans[name].span_id
+
+
+def test_errors_are_recorded(memory_tracer):
+    """Test that a failed span keeps the exception type."""
+    with pytest.raises(ValueError, match='failure'):
+        _failing_stage()
+
+    assert _spans_by_name(memory_tracer)[FAILING_SPAN].attributes['error'] == 'ValueError'
@@ -0,0 +1,85 @@
+"""Fixtures with a ChatBot on stub LLM clients."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from QAbot import ChatBot
+
+BLACKLISTED_ANSWER = 'Не люблю менять тему разговора.'
+
+
+class StubSummarizer:
+    """Summarizing LLM failing on the answers listed in ``failing``."""
+
+    def __init__(self):
+        self.failing = set()
+
+    def invoke(self, prompt: str) -> SimpleNamespace:
+        """Summarize the answer at the end of a prompt.
+
+        Args:
+            prompt: Summary prompt ending with the answer
+
+        Returns:
+            SimpleNamespace: Message with the summary in ``content``
+
+        Raises:
+            ConnectionError: If the answer is listed in ``failing``
+        """
+        answer = prompt.rsplit(': ', 1)[-1]
+        if answer in self.failing:
+            raise ConnectionError('summary service is unavailable')
+        return SimpleNamespace(content=f'summary of {answer}')
+
+
+class StubQAChain:
+    """QA chain answering with the number of the question."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs: dict, config: dict) -> dict:
+        """Answer a query.
+
+        Args:
+            inputs: Chain inputs with the query
+            config: Run config
+
+        Returns:
+            dict: Chain outputs with the answer in ``result``
+        """
+        self.calls += 1
+        return {'result': f'a{self.calls}'}
+
+    async def ainvoke(self, inputs: dict, config: dict) -> dict:
+        """Answer a query asynchronously.
+
+        Args:
+            inputs: Chain inputs with the query
+            config: Run config
+
+        Returns:
+            dict: Chain outputs with the answer in ``result``
+        """
+        return self.invoke(inputs, config)
+
+
+@pytest.fixture
+def chatbot():
+    """Create a ChatBot on stub clients without a document index.
+
+    Yields:
+        ChatBot: Chat bot
+    """
+    bot = ChatBot.__new__(ChatBot)
+    bot.giga_chat_simple = StubSummarizer()
+    bot.qa_chain = StubQAChain()
+    bot.docx_context = ''
+    bot.message_history = []
+    bot.response_blacklist = BLACKLISTED_ANSWER
+    bot.inappropriate_request_message = 'inappropriate'
+    bot._pending_summary = None  # noqa: WPS437
+    bot._summary_executor = ThreadPoolExecutor(max_workers=1)  # noqa: WPS437
+    yield bot
+    bot.close()
@@ -0,0 +1,20 @@
+"""Tests for a chat bot reusing a persisted document collection."""
+
+from unittest.mock import Mock
+
+import QAbot
+from QAbot import ChatBot
+
+
+def test_reused_collection_has_no_documents(monkeypatch, tmp_path):
+    """A bot over a persisted collection skips loading and has no documents."""
+    docx_path = tmp_path / 'manual.docx'
+    docx_path.write_bytes(b'docx')
+    for client_name in ('GigaChat', 'GigaChatEmbeddings', 'RetrievalQA', 'create_client', 'serve_metrics'):
+        monkeypatch.setattr(QAbot, client_name, Mock())
+    monkeypatch.setattr(QAbot, 'load_collection', Mock(return_value=Mock()))
+    monkeypatch.setattr(ChatBot, 'load_documents', Mock())
+
+    with ChatBot(str(docx_path), persist_directory=str(tmp_path)) as bot:
+        assert bot.documents == []
+    ChatBot.load_documents.assert_not_called()
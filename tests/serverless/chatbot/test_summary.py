@@ -0,0 +1,66 @@
+"""Tests for background summarization of the dialog history."""
+
+import asyncio
+
+import pytest
+
+QUESTIONS = ('q1', 'q2', 'q3')
+ANSWERS = ('a1', 'a2', 'a3')
+
+
+async def ask_in_order(chatbot, questions):
+    """Ask questions one after another with ``aget_answer``.
+
+    Args:
+        chatbot: Chat bot
+        questions: Questions
+
+    Returns:
+        list: Answers
+    """
+    answers = []
+    for question in questions:
+        answers.append(await chatbot.aget_answer(question))  # noqa: WPS476
+    return answers
+
+
+def test_summary_is_collected_on_next_question(chatbot):
+    """The summary of an answer joins the history before the next question."""
+    chatbot.get_answer(QUESTIONS[0])
+    assert chatbot.get_answer(QUESTIONS[1]) == ANSWERS[1]
+    assert chatbot.message_history == ['Question: q1?', 'Chatbot AI: summary of a1', 'Question: q2?']
+
+
+def test_failed_summary_falls_back_to_answer(chatbot):
+    """A failed summary keeps the full answer and later questions work."""
+    chatbot.giga_chat_simple.failing.add(ANSWERS[0])
+
+    answers = [chatbot.get_answer(question) for question in QUESTIONS]
+
+    assert answers == list(ANSWERS)
+    assert chatbot.message_history == [
+        'Question: q1?',
+        'Chatbot AI: a1',
+        'Question: q2?',
+        'Chatbot AI: summary of a2',
+        'Question: q3?',
+    ]
+
+
+def test_closed_chatbot_stops_summaries(chatbot):
+    """Leaving the chat bot context waits for the summary and stops its
+    thread."""
+    with chatbot:
+        assert chatbot.get_answer(QUESTIONS[0]) == ANSWERS[0]
+
+    with pytest.raises(RuntimeError, match='shutdown'):
+        chatbot.get_answer(QUESTIONS[1])
+
+
+def test_failed_summary_async(chatbot):
+    """The asynchronous path recovers from a failed summary in the same way."""
+    chatbot.giga_chat_simple.failing.add(ANSWERS[0])
+
+    assert asyncio.run(ask_in_order(chatbot, QUESTIONS)) == list(ANSWERS)
+    assert chatbot.message_history[1] == 'Chatbot AI: a1'
+    assert chatbot.message_history[3] == 'Chatbot AI: summary of a2'
@@ -0,0 +1,10 @@
+"""Conftest for serverless bot tests."""
+
+import sys
+from pathlib import Path
+
+# Serverless modules import each other as top-level modules
+src_path = Path(__file__).parent.parent.parent / 'src'
+serverless_path = str(src_path / 'serverless')
+if serverless_path not in sys.path:
+    sys.path.insert(0, serverless_path)
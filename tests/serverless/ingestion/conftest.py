@@ -0,0 +1,133 @@
+"""Fixtures with a local mock embeddings server."""
+
+import asyncio
+import json
+import threading
+import urllib.request
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+MAX_REQUEST_BYTES = 400
+MAX_TEXT_CHARS = 120
+
+
+class MockEmbeddingsState:
+    """Behaviour and request log of the mock server."""
+
+    def __init__(self):
+        self.failures_left = 0
+        self.batch_sizes = []
+        self.rejected = 0
+
+    def respond(self, body_size: int, texts: list) -> tuple:
+        """Decide the reply to an embeddings request.
+
+        Args:
+            body_size: Request body size in bytes
+            texts: Texts to embed
+
+        Returns:
+            tuple: (HTTP status, JSON payload)
+        """
+        longest_text = max(map(len, texts), default=0)
+        if self.failures_left:
+            self.failures_left -= 1
+            status = HTTPStatus.SERVICE_UNAVAILABLE
+        elif body_size > MAX_REQUEST_BYTES or longest_text > MAX_TEXT_CHARS:
+            self.rejected += 1
+            status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        else:
+            self.batch_sizes.append(len(texts))
+            rows = [{'embedding': fake_vector(text)} for text in texts]
+            return HTTPStatus.OK, {'data': rows}
+        return status, {'status': status}
+
+
+class MockEmbeddingsServer(ThreadingHTTPServer):
+    """HTTP server sharing its state with the request handlers."""
+
+    def __init__(self, state: MockEmbeddingsState):
+        super().__init__(('127.0.0.1', 0), MockEmbeddingsHandler)
+        self.state = state
+
+
+class MockEmbeddingsHandler(BaseHTTPRequestHandler):
+    """Request handler of the mock embeddings API."""
+
+    def do_POST(self):  # noqa: N802
+        """Embed the posted texts or reply with an error."""
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        texts = json.loads(body)['input']
+        state = self.server.state
+        status, payload = state.respond(len(body), texts)
+        encoded = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *args):
+        """Silence request logging."""
+
+
+def fake_vector(text: str) -> list:
+    """Deterministic embedding used by the mock server.
+
+    Args:
+        text: Input text
+
+    Returns:
+        list: Two-dimensional vector
+    """
+    return [float(len(text)), 1.0]
+
+
+class MockServerEmbeddings(Embeddings):
+    """Minimal HTTP embeddings client for the mock server."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def embed_documents(self, texts):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'input': texts}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request) as response:
+            return [row['embedding'] for row in json.load(response)['data']]
+
+    async def aembed_documents(self, texts):
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def expected_vector():
+    """Get the embedding function of the mock server.
+
+    Returns:
+        Callable: Function mapping a text to its mock embedding
+    """
+    return fake_vector
+
+
+@pytest.fixture
+def mock_server():
+    """Run the mock embeddings server on a free local port.
+
+    Yields:
+        tuple: (embeddings client, server state)
+    """
+    state = MockEmbeddingsState()
+    server = MockEmbeddingsServer(state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield MockServerEmbeddings(f'http://127.0.0.1:{server.server_port}/embeddings'), state
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,77 @@
+"""Tests for the serverless embedding ingestion stage."""
+
+import urllib.error
+
+import pytest
+from ingestion import BatchedEmbeddings, EmbeddingIngestor
+
+SHORT_TEXT_COUNT = 12
+MAX_BATCH_SIZE = 5
+BATCH_BYTES = 1000
+NO_BACKOFF = 0
+RETRY_FAILURES = 2
+# Texts of 100 chars fit one by one but not six in a request
+LONG_TEXT = 'x' * 100
+LONG_TEXT_COUNT = 6
+# Words of a text longer than the server accepts
+OVERSIZED_WORDS = 40
+
+
+def make_ingestor(client, **kwargs):
+    """Create an ingestor without backoff delays."""
+    kwargs.setdefault('backoff_seconds', NO_BACKOFF)
+    return EmbeddingIngestor(client, max_batch_bytes=BATCH_BYTES, **kwargs)
+
+
+def test_embed_preserves_order(mock_server, expected_vector):
+    """Test that concurrent batches return vectors in input order."""
+    client, state = mock_server
+    texts = [f'text number {index}' for index in range(SHORT_TEXT_COUNT)]
+    vectors = make_ingestor(client, max_batch_size=MAX_BATCH_SIZE).embed(texts)
+    assert vectors == [expected_vector(text) for text in texts]
+    assert state.batch_sizes and max(state.batch_sizes) <= MAX_BATCH_SIZE
+
+
+def test_only_offending_batch_is_split(mock_server, expected_vector):
+    """Test that a 413 splits only the rejected batch."""
+    client, state = mock_server
+    texts = [LONG_TEXT for _ in range(LONG_TEXT_COUNT)] + ['short']
+    ingestor = make_ingestor(client)
+    vectors = ingestor.embed(texts)
+    assert vectors == [expected_vector(text) for text in texts]
+    assert state.rejected == ingestor.splits
+
+
+def test_transient_errors_are_retried(mock_server, expected_vector):
+    """Test retries on transient server errors."""
+    client, state = mock_server
+    state.failures_left = RETRY_FAILURES
+    ingestor = make_ingestor(client, max_concurrency=1)
+    assert ingestor.embed(['hello']) == [expected_vector('hello')]
+    assert ingestor.requests == RETRY_FAILURES + 1
+
+
+def test_retries_are_bounded(mock_server):
+    """Test that the error surfaces after the last retry."""
+    client, state = mock_server
+    state.failures_left = RETRY_FAILURES + 1
+    with pytest.raises(urllib.error.HTTPError):
+        make_ingestor(client, max_retries=RETRY_FAILURES).embed(['hello'])
+
+
+def test_oversized_text_is_embedded_by_parts(mock_server, expected_vector):
+    """Test that an oversized text is embedded as the mean of its parts."""
+    client, _ = mock_server
+    text = ' '.join('word' for _ in range(OVERSIZED_WORDS))
+    vector = make_ingestor(client).embed([text])[0]
+    assert vector[1] == expected_vector(text)[1]
+    assert vector[0] < len(text)
+
+
+def test_batched_embeddings_wrapper(mock_server, expected_vector):
+    """Test the LangChain embeddings wrapper."""
+    client, _ = mock_server
+    embeddings = BatchedEmbeddings(client, backoff_seconds=NO_BACKOFF)
+    texts = ['a', 'bb']
+    assert embeddings.embed_documents(texts) == [expected_vector(text) for text in texts]
+    assert embeddings.embed_query('ccc') == expected_vector('ccc')
@@ -0,0 +1,25 @@
+"""Tests for payload batching and error parsing of the ingestion stage."""
+
+import urllib.error
+from http import HTTPStatus
+
+from ingestion import batch_by_payload, get_error_status
+
+TOO_LARGE = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+UNAVAILABLE = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_batch_by_payload_limits_size_and_count():
+    """Test batching by payload bytes and batch size."""
+    texts = ['aa', 'bb', 'cc', 'dddd']
+    batches = batch_by_payload(texts, max_batch_bytes=4, max_batch_size=3)
+    assert batches == [[0, 1], [2], [3]]
+
+
+def test_get_error_status_variants():
+    """Test status extraction from different client errors."""
+    json_error = Exception(f'{{"status":{TOO_LARGE.value},"message":"too large"}}')
+    http_error = urllib.error.HTTPError('url', UNAVAILABLE, 'unavailable', None, None)
+    assert get_error_status(json_error) == TOO_LARGE
+    assert get_error_status(http_error) == UNAVAILABLE
+    assert get_error_status(ValueError('other')) is None
@@ -0,0 +1,80 @@
+"""Tests for Chroma collections reused across runs."""
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.documents import Document
+from persistent_db import (
+    FINGERPRINT_LENGTH,
+    build_collection,
+    collection_name,
+    create_client,
+    document_fingerprint,
+    load_collection,
+)
+
+EMBEDDING_SIZE = 8
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+MODEL_NAME = 'encoder'
+OTHER_FINGERPRINT = '0' * FINGERPRINT_LENGTH
+CHUNKS = ('Состав изделия: сервер и блок питания', 'Средний срок службы десять лет')
+
+
+@pytest.fixture
+def docx_path(tmp_path) -> str:
+    """Write a file standing in for a DOCX document.
+
+    Returns:
+        str: Path to the file
+    """
+    path = tmp_path / 'manual.docx'
+    path.write_bytes(b'docx content')
+    return str(path)
+
+
+@pytest.fixture
+def embeddings() -> DeterministicFakeEmbedding:
+    """Create offline embeddings that depend only on the text.
+
+    Returns:
+        DeterministicFakeEmbedding: Embeddings
+    """
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+def test_fingerprint_tracks_file_and_parameters(docx_path):
+    """Test that the fingerprint changes with the file and index settings."""
+    fingerprint = document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP, MODEL_NAME)
+
+    assert document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP, MODEL_NAME) == fingerprint
+    assert document_fingerprint(docx_path, CHUNK_SIZE, 0, MODEL_NAME) != fingerprint
+    assert document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP) != fingerprint
+    with open(docx_path, 'ab') as docx_file:
+        docx_file.write(b'edited')
+    assert document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP, MODEL_NAME) != fingerprint
+
+
+def test_collection_is_reloaded(docx_path, embeddings, tmp_path):
+    """Test that a collection built in one run is reused by a new client."""
+    persist_directory = str(tmp_path / 'chroma')
+    fingerprint = document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP)
+    documents = [Document(page_content=chunk) for chunk in CHUNKS]
+    build_collection(create_client(persist_directory), fingerprint, documents, embeddings)
+
+    client = create_client(persist_directory)
+    reloaded = load_collection(client, fingerprint, embeddings)
+
+    assert reloaded is not None
+    found = reloaded.similarity_search(CHUNKS[1], k=1)
+    assert found[0].page_content == CHUNKS[1]
+    assert load_collection(client, OTHER_FINGERPRINT, embeddings) is None
+
+
+def test_incomplete_collection_is_dropped(docx_path, embeddings, tmp_path):
+    """Test that a collection of an interrupted build is not reused."""
+    client = create_client(str(tmp_path / 'chroma'))
+    fingerprint = document_fingerprint(docx_path, CHUNK_SIZE, CHUNK_OVERLAP)
+    client.create_collection(collection_name(fingerprint), metadata={'fingerprint': fingerprint})
+
+    assert load_collection(client, fingerprint, embeddings) is None
+    assert collection_name(fingerprint) not in {collection.name for collection in client.list_collections()}
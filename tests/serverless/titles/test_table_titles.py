@@ -0,0 +1,82 @@
+"""Tests for memoized document content and cached table titles."""
+
+import os
+from types import SimpleNamespace
+
+import docx
+import pytest
+from dtt import DocumentProcessor
+
+SENTENCES = ('Перечень изделий комплекта', 'Параметры питания шкафа')
+
+
+class StubTitleLLM:
+    """Title LLM recording the prompts it was asked."""
+
+    def __init__(self, model: str = 'GigaChat'):
+        self.model = model
+        self.prompts = []
+
+    async def ainvoke(self, prompt: str) -> SimpleNamespace:
+        """Make a title from the prompt.
+
+        Args:
+            prompt: Title prompt
+
+        Returns:
+            SimpleNamespace: Message with the title in ``content``
+        """
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=f'Название {len(self.prompts)}')
+
+
+@pytest.fixture
+def docx_path(tmp_path) -> str:
+    """Write a document with three tables, two after the same sentence.
+
+    Returns:
+        str: Path to the DOCX file
+    """
+    document = docx.Document()
+    for sentence in (*SENTENCES, SENTENCES[0]):
+        document.add_paragraph(f'Вступление. {sentence}.')
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = 'сервер'
+        table.cell(0, 1).text = '220 В'
+    path = str(tmp_path / 'manual.docx')
+    document.save(path)
+    return path
+
+
+def test_content_is_processed_once(docx_path):
+    """Test that repeated calls reuse content and request titles once."""
+    llm = StubTitleLLM()
+    processor = DocumentProcessor(docx_path, llm)
+
+    titles = processor.get_table_titles()
+
+    assert processor.process_content() is processor.process_content()
+    assert len(llm.prompts) == len(SENTENCES)
+    assert titles == ['Название 1', 'Название 2', 'Название 1']
+
+
+def test_titles_are_reloaded_from_cache(docx_path, tmp_path):
+    """Test that a new processor reads titles from the cache, not the LLM."""
+    cache_path = str(tmp_path / 'titles.json')
+    titles = DocumentProcessor(docx_path, StubTitleLLM(), title_cache_path=cache_path).get_table_titles()
+    llm = StubTitleLLM()
+
+    assert DocumentProcessor(docx_path, llm, title_cache_path=cache_path).get_table_titles() == titles
+    assert not llm.prompts
+    assert sorted(os.listdir(tmp_path)) == ['manual.docx', 'titles.json']
+
+
+def test_titles_of_another_model_are_requested(docx_path, tmp_path):
+    """Test that cached titles are keyed by the title model."""
+    cache_path = str(tmp_path / 'titles.json')
+    DocumentProcessor(docx_path, StubTitleLLM(), title_cache_path=cache_path).get_table_titles()
+    llm = StubTitleLLM(model='GigaChat-Max')
+
+    DocumentProcessor(docx_path, llm, title_cache_path=cache_path).get_table_titles()
+
+    assert len(llm.prompts) == len(SENTENCES)